@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多项目批量发布模块
+按清单文件对多个项目（可混合IAR和MDK）执行完整的编译发布流程，限制同时发布的项目数和各编译工具的并发数，汇总生成一份发布报告
+"""
+
+import os
+import json
+import time
+import threading
+import contextlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from lib_logger import logger
+from firmware_pipeline import FirmwarePipeline, PipelineHooks
+from typing import Callable, Dict, List, Optional
+
+# 清单中项目可以直接指定的发布相关配置
+PROJECT_KEYS = ('compile_tool', 'info_file', 'fw_publish_directory', 'remote_publish_directory')
+
+# 自动查找得到的项目相关配置，不从基础配置继承
+PROJECT_SPECIFIC_KEYS = ('project_settings', 'project_name', 'iar_project_path', 'mdk_project_path',
+                         'iar_workspace_path', 'mdk_workspace_path', 'output_bin_path')
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    """
+    读取批量发布清单，项目路径和发布目录中的相对路径相对于清单文件所在目录
+
+    清单格式:
+        {
+            "max_parallel_projects": 2,
+            "toolchain_limits": {"IAR": 1, "MDK": 1},
+            "defaults": {配置项: 值},
+            "projects": [
+                {"name": "board_a", "path": "../board_a", "branch": "main", "compile_tool": "IAR", "tool_path": "...",
+                 "configuration": "Release", "build_all": false, "message": "更新信息",
+                 "fw_publish_directory": "...", "remote_publish_directory": "...", "config": {配置项: 值}}
+            ]
+        }
+
+    Args:
+        manifest_path: 清单文件路径
+
+    Returns:
+        Dict: 清单内容
+
+    Raises:
+        ValueError: 清单格式错误
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    projects = manifest.get('projects')
+    if not isinstance(projects, list) or not projects:
+        raise ValueError("清单中没有项目(projects)")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    names = set()
+    for index, project in enumerate(projects):
+        if not isinstance(project, dict) or not project.get('path'):
+            raise ValueError(f"第 {index + 1} 个项目缺少项目路径(path)")
+        project['path'] = os.path.abspath(os.path.join(base_dir, project['path']))
+        for key in ('fw_publish_directory', 'remote_publish_directory'):
+            # ./fw_publish 形式的发布目录保持相对于项目目录
+            if project.get(key) and not project[key].startswith(('./', '../', '.\\', '..\\')):
+                project[key] = os.path.abspath(os.path.join(base_dir, project[key]))
+        project.setdefault('name', os.path.basename(project['path'].rstrip('\\/')))
+        if project['name'] in names:
+            raise ValueError(f"项目名称重复: {project['name']}")
+        names.add(project['name'])
+    return manifest
+
+
+def merge_project_config(base_config: Dict, project: Dict, defaults: Dict = None) -> Dict:
+    """
+    合并项目的配置：基础配置 < 公共配置 < 项目config < 项目直接指定的编译工具和发布目录
+
+    Args:
+        base_config: 基础配置（如用户配置文件）
+        project: 项目描述（清单中的项目格式）
+        defaults: 各项目共用的配置（清单中的defaults）
+
+    Returns:
+        Dict: 项目使用的配置
+    """
+    config = json.loads(json.dumps(base_config or {}))
+    # 基础配置中查找到的项目路径和bin起始地址属于其他项目，由流程按本项目重新查找
+    for key in PROJECT_SPECIFIC_KEYS:
+        config.pop(key, None)
+    config.get('binary_settings', {}).pop('bin_start_address', None)
+    config.update(defaults or {})
+    config.update(project.get('config', {}))
+    for key in PROJECT_KEYS:
+        if project.get(key):
+            config[key] = project[key]
+    compile_tool = config.get('compile_tool', 'IAR')
+    if project.get('tool_path'):
+        config['iar_installation_path' if compile_tool == 'IAR' else 'mdk_installation_path'] = project['tool_path']
+    if project.get('remote_publish_directory'):
+        config['enable_remote_publish'] = True
+    if 'build_all' in project:
+        config['build_all_configurations'] = bool(project['build_all'])
+    return config
+
+
+class ToolchainLimiter:
+    """编译工具并发限制：各项目共享，同一编译工具同时执行的编译不超过上限"""
+
+    def __init__(self, limits: Dict[str, int] = None):
+        """
+        Args:
+            limits: {编译工具: 同时编译数上限}，未列出的编译工具不限制
+        """
+        self._semaphores = {tool.upper(): threading.BoundedSemaphore(max(1, int(limit)))
+                            for tool, limit in (limits or {}).items() if limit}
+
+    def slot(self, compile_tool: str):
+        """
+        获取编译名额的上下文管理器，名额用完时等待
+
+        Args:
+            compile_tool: 编译工具
+
+        Returns:
+            上下文管理器
+        """
+        semaphore = self._semaphores.get((compile_tool or '').upper())
+        return semaphore if semaphore else contextlib.nullcontext()
+
+
+class BatchPipelineHooks(PipelineHooks):
+    """批量发布回调：输出带项目名前缀，提交信息使用清单中的更新信息，需要确认时自动继续"""
+
+    def __init__(self, project_name: str, commit_message: str = None, output: Callable[[str], None] = None,
+                 verbose: bool = False):
+        """
+        Args:
+            project_name: 项目名称（输出前缀）
+            commit_message: 更新信息（追加在默认提交信息之后）
+            output: 输出函数，为None时只写日志
+            verbose: 是否输出详细日志
+        """
+        super().__init__(assume_yes=True)
+        self.project_name = project_name
+        self.commit_message = commit_message
+        self.output = output
+        self.verbose = verbose
+        self.errors = []
+
+    def _emit(self, message: str):
+        if self.output:
+            self.output(f"[{self.project_name}] {message}")
+
+    def log(self, message: str):
+        logger.info(f"[{self.project_name}] {message}")
+        if self.verbose:
+            self._emit(message)
+
+    def status(self, message: str):
+        self._emit(f"==> {message}")
+
+    def build_output(self, event, configuration_name: str = None):
+        if event.kind == 'diagnostic':
+            self._emit(f"{configuration_name + ': ' if configuration_name else ''}{event}")
+
+    def ask_commit_message(self, default_message: str) -> str:
+        if self.commit_message:
+            return f"{default_message} - {self.commit_message}"
+        return default_message
+
+    def show_error(self, title_key: str, message: str):
+        self.errors.append(f"{self.text(title_key)}: {message}")
+        self._emit(f"{self.text(title_key)}: {message}")
+
+    def show_success(self, message: str):
+        pass
+
+
+class BatchRelease:
+    """多项目批量发布"""
+
+    DEFAULT_MAX_PARALLEL_PROJECTS = 2
+
+    def __init__(self, manifest: Dict, base_config: Dict = None, output: Callable[[str], None] = None,
+                 verbose: bool = False):
+        """
+        初始化批量发布
+
+        Args:
+            manifest: load_manifest 读取的清单
+            base_config: 基础配置（如用户配置文件），清单中的defaults和项目配置在其之上覆盖
+            output: 进度输出函数
+            verbose: 是否输出详细日志
+        """
+        self.manifest = manifest
+        self.base_config = base_config or {}
+        self.output = output
+        self.verbose = verbose
+        self.projects = manifest['projects']
+        self.max_parallel = max(1, int(manifest.get('max_parallel_projects') or self.DEFAULT_MAX_PARALLEL_PROJECTS))
+        self.limiter = ToolchainLimiter(manifest.get('toolchain_limits', {}))
+        self._pipelines: Dict[str, FirmwarePipeline] = {}
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+
+    def build_project_config(self, project: Dict) -> Dict:
+        """
+        合并项目的配置（见 merge_project_config）
+
+        Args:
+            project: 清单中的项目
+
+        Returns:
+            Dict: 项目使用的配置
+        """
+        return merge_project_config(self.base_config, project, self.manifest.get('defaults'))
+
+    def cancel(self):
+        """取消批量发布：未开始的项目不再执行，正在执行的项目在当前阶段完成后停止"""
+        self._cancel_event.set()
+        with self._lock:
+            for pipeline in self._pipelines.values():
+                pipeline.cancel()
+
+    def release_project(self, project: Dict) -> Dict:
+        """
+        对单个项目执行完整的编译发布流程
+
+        Args:
+            project: 清单中的项目
+
+        Returns:
+            Dict: {'name', 'path', 'branch', 'compile_tool', 'configuration', 'success', 'message', 'version',
+                   'commit_id', 'resumed', 'duration', 'errors'}
+        """
+        name = project['name']
+        config = self.build_project_config(project)
+        result = {
+            'name': name,
+            'path': project['path'],
+            'branch': project.get('branch'),
+            'compile_tool': config.get('compile_tool', 'IAR'),
+            'configuration': project.get('configuration'),
+            'success': False,
+            'message': '',
+            'version': None,
+            'commit_id': None,
+            'resumed': False,
+            'duration': 0.0,
+            'errors': []
+        }
+        start_time = time.time()
+        hooks = BatchPipelineHooks(name, project.get('message'), self.output, self.verbose)
+        try:
+            if self._cancel_event.is_set():
+                result['message'] = "批量发布已取消，未执行"
+                return result
+            if not os.path.isdir(project['path']):
+                result['message'] = f"项目路径不存在: {project['path']}"
+                return result
+
+            pipeline = FirmwarePipeline(config, project['path'], hooks)
+            pipeline.toolchain_limiter = self.limiter
+            with self._lock:
+                self._pipelines[name] = pipeline
+
+            if project.get('branch'):
+                # 各分支在各自的工作树中编译，同一项目的不同分支可以同时发布
+                success, message = pipeline.use_branch(project['branch'])
+                if not success:
+                    result['message'] = message
+                    return result
+            pipeline.discover_paths()
+            if not pipeline.load_configurations(project.get('configuration')):
+                result['message'] = "未能选择编译配置"
+                return result
+            result['configuration'] = pipeline.selected_configuration.get('name')
+            if pipeline.build_all and len(pipeline.available_configurations) > 1:
+                result['configuration'] = f"全部配置({len(pipeline.available_configurations)})"
+
+            success, message, info = pipeline.run()
+            result.update({
+                'success': success,
+                'message': message,
+                'version': info.get('version'),
+                'commit_id': info.get('commit_id'),
+                'resumed': info.get('resumed', False)
+            })
+        except Exception as e:
+            logger.error(f"[{name}] 批量发布异常: {e}")
+            result['message'] = f"发布异常: {e}"
+        finally:
+            with self._lock:
+                self._pipelines.pop(name, None)
+            result['duration'] = time.time() - start_time
+            result['errors'] = hooks.errors
+        return result
+
+    def run(self, on_finished: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        按清单顺序提交所有项目，同时发布的项目数不超过 max_parallel_projects
+
+        Args:
+            on_finished: 每个项目完成后的回调，参数为项目结果
+
+        Returns:
+            List[Dict]: 按清单顺序排列的项目结果
+        """
+        limits = ', '.join(f"{tool}={limit}" for tool, limit in self.manifest.get('toolchain_limits', {}).items())
+        logger.info(f"批量发布: {len(self.projects)} 个项目, 同时发布 {self.max_parallel} 个"
+                    f"{f', 编译工具并发 {limits}' if limits else ''}")
+
+        def job(project: Dict) -> Dict:
+            result = self.release_project(project)
+            if on_finished:
+                try:
+                    on_finished(result)
+                except Exception as e:
+                    logger.error(f"项目完成回调异常: {e}")
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix='release') as executor:
+            futures = [executor.submit(job, project) for project in self.projects]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def format_report(results: List[Dict]) -> List[str]:
+        """
+        生成汇总报告
+
+        Args:
+            results: run 的返回结果
+
+        Returns:
+            List[str]: 报告行
+        """
+        succeeded = sum(1 for result in results if result['success'])
+        lines = [f"批量发布完成: 成功 {succeeded}/{len(results)}"]
+        for result in results:
+            status = '成功' if result['success'] else '失败'
+            first_line = (result['message'] or '').strip().split('\n')[0]
+            version = f" {result['version']} ({result['commit_id']})" if result['version'] else ""
+            resumed = " [检查点继续]" if result['resumed'] else ""
+            branch = f"@{result['branch']}" if result.get('branch') else ""
+            lines.append(f"{result['name']}{branch} [{result['compile_tool']}/{result['configuration'] or '-'}]: "
+                         f"{status}{version}{resumed} {result['duration']:.1f}秒 {first_line}")
+        return lines
+
+    @staticmethod
+    def write_report(results: List[Dict], report_path: str) -> bool:
+        """
+        把汇总报告写入JSON文件
+
+        Args:
+            results: run 的返回结果
+            report_path: 报告文件路径
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            report = {
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'total': len(results),
+                'succeeded': sum(1 for result in results if result['success']),
+                'projects': results
+            }
+            directory = os.path.dirname(os.path.abspath(report_path))
+            os.makedirs(directory, exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+            return True
+        except Exception as e:
+            logger.error(f"写入批量发布报告失败: {e}")
+            return False
+
+
+__all__ = ['load_manifest', 'merge_project_config', 'ToolchainLimiter', 'BatchPipelineHooks', 'BatchRelease']
+
+
+if __name__ == "__main__":
+    # 测试编译工具并发限制：IAR同时只允许1个，MDK同时2个
+    limiter = ToolchainLimiter({'IAR': 1, 'MDK': 2})
+    running = {'IAR': 0, 'MDK': 0}
+    peak = {'IAR': 0, 'MDK': 0}
+    counter_lock = threading.Lock()
+
+    def fake_compile(tool):
+        with limiter.slot(tool):
+            with counter_lock:
+                running[tool] += 1
+                peak[tool] = max(peak[tool], running[tool])
+            time.sleep(0.1)
+            with counter_lock:
+                running[tool] -= 1
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(fake_compile, ['IAR', 'MDK'] * 3))
+    print(f"最大并发: {peak}")
@@ -16,23 +16,26 @@ import struct
 import hashlib
 import zlib
 from lib_logger import logger
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 from pathlib import Path
+from memory_model import MemoryModel
 
 
 class BinaryModifier:
     """二进制文件修改器"""
     
-    def __init__(self, config: dict, feature_settings: dict = None):
+    def __init__(self, config: dict, feature_settings: dict = None, memory_model: MemoryModel = None):
         """
         初始化二进制文件修改器
         
         Args:
             config: 配置字典，包含二进制文件相关设置
             feature_settings: 功能设置字典，控制哪些功能启用
+            memory_model: 链接脚本内存模型（可选），提供时在写入前校验字段地址和镜像大小
         """
         self.config = config
         self.feature_settings = feature_settings or {}
+        self.memory_model = memory_model
         
         # 从配置中获取偏移量和大小
         self.firmware_version_offset = config.get('firmware_version_offset', 0)
@@ -48,6 +51,8 @@ class BinaryModifier:
         logger.info(f"BinaryModifier配置 - bin_checksum_offset: 0x{self.bin_checksum_offset:X}")
         logger.info(f"BinaryModifier配置 - hash_value_offset: 0x{self.hash_value_offset:X}")
         self.commit_id_size = config.get('commit_id_size', 7)
+        # 固件版本字段长度，与信息文件中的声明一致（const char __Firmware_Version[10]）
+        self.firmware_version_size = config.get('firmware_version_size', 10)
         self.crc_size = config.get('crc_size', 4)
         self.reserved_area_size = config.get('reserved_area_size', 0x200)
         # 从binary_settings中获取bin_start_address，如果没有则从根级别获取
@@ -107,6 +112,65 @@ class BinaryModifier:
         else:
             self.actual_hash_value_offset = 0
     
+    def _get_enabled_fields(self) -> List[Tuple[str, int, int]]:
+        """
+        获取需要写入的字段列表
+        
+        Returns:
+            List[Tuple[str, int, int]]: (字段名, 绝对地址, 长度)列表
+        """
+        fields = []
+        if self.enable_git_commit_id:
+            fields.append(('Git提交ID', self.git_commit_id_offset, self.commit_id_size))
+        if self.enable_file_size:
+            fields.append(('文件大小', self.file_size_offset, 4))
+        if self.enable_bin_checksum:
+            fields.append(('校验和', self.bin_checksum_offset, self.crc_size))
+        if self.enable_hash_value:
+            fields.append(('哈希校验和', self.hash_value_offset, 32))
+        return fields
+    
+    def validate_layout(self, file_size: int, include_version: bool = False) -> Tuple[bool, str]:
+        """
+        在写入前校验镜像大小和各字段地址
+        
+        校验字段是否落在bin文件范围内；提供内存模型时还会校验bin起始地址位于Flash区域、
+        镜像不超出该Flash区域的末尾，以及各字段地址位于同一Flash区域内
+        
+        Args:
+            file_size: bin文件大小
+            include_version: 是否同时校验固件版本字段（需要写入版本号时）
+            
+        Returns:
+            Tuple[bool, str]: (是否有效, 错误信息)
+        """
+        errors = []
+        image_end = self.bin_start_address + file_size
+        
+        flash_region = None
+        if self.memory_model:
+            flash_region = self.memory_model.flash_region_for(self.bin_start_address)
+            if flash_region is None:
+                errors.append(f"bin起始地址0x{self.bin_start_address:08X}不在链接脚本定义的任何Flash区域内")
+            else:
+                valid, message = self.memory_model.validate_range(self.bin_start_address, file_size, within=flash_region)
+                if not valid:
+                    errors.append(f"镜像大小{file_size}字节超出Flash区域: {message}")
+        
+        fields = self._get_enabled_fields()
+        if include_version:
+            fields.insert(0, ('固件版本', self.firmware_version_offset, self.firmware_version_size))
+        for name, address, length in fields:
+            if address < self.bin_start_address or address + length > image_end:
+                errors.append(f"{name}地址0x{address:08X}(长度{length})超出bin文件范围 "
+                              f"0x{self.bin_start_address:08X}-0x{image_end - 1:08X}")
+            elif flash_region and not flash_region.contains(address, length):
+                errors.append(f"{name}地址0x{address:08X}不在Flash区域{flash_region.name}内")
+        
+        if errors:
+            return False, "\n".join(errors)
+        return True, ""
+    
     def calculate_crc32(self, data: bytes) -> int:
         """
         计算CRC32值
@@ -441,7 +505,8 @@ class BinaryModifier:
             logger.error(f"读取CRC失败: {e}")
             return None
     
-    def modify_binary_file(self, file_path: str, commit_id: str, firmware_version: str = None) -> Tuple[bool, str, dict]:
+    def modify_binary_file(self, file_path: str, commit_id: str, firmware_version: str = None,
+                           patch_version: str = None) -> Tuple[bool, str, dict]:
         """
         修改二进制文件，写入固件信息
         
@@ -449,6 +514,7 @@ class BinaryModifier:
             file_path: bin文件路径
             commit_id: commit ID
             firmware_version: 固件版本（可选）
+            patch_version: 需要写入镜像的版本号（免编译更新版本号时使用），为None时保留编译时写入的版本
             
         Returns:
             Tuple[bool, str, dict]: (是否成功, 消息, 文件信息)
@@ -472,6 +538,12 @@ class BinaryModifier:
             
             result_info['file_size'] = os.path.getsize(file_path)
             
+            # 写入前校验镜像大小和字段地址，尽早给出明确的错误原因
+            valid, layout_error = self.validate_layout(result_info['file_size'], include_version=bool(patch_version))
+            if not valid:
+                logger.error(f"二进制文件布局校验失败: {layout_error}")
+                return False, f"二进制文件布局校验失败:\n{layout_error}", result_info
+            
             # 创建原始文件的备份
             backup_path = self._create_backup(file_path)
             if backup_path:
@@ -480,8 +552,14 @@ class BinaryModifier:
             else:
                 logger.warning("创建备份文件失败，继续执行修改")
             
-            # 跳过固件版本写入（编译时已正确设置）
-            if firmware_version:
+            # 免编译更新版本号时写入新版本，否则跳过固件版本写入（编译时已正确设置）
+            if patch_version:
+                old_version = self.read_firmware_version(file_path)
+                if not self.write_firmware_version(file_path, patch_version):
+                    return False, "写入固件版本失败", result_info
+                result_info['firmware_version_written'] = True
+                logger.info(f"固件版本已更新: {old_version} -> {patch_version}")
+            elif firmware_version:
                 logger.info(f"跳过固件版本写入（编译时已正确设置）: {firmware_version}")
                 result_info['firmware_version_written'] = False  # 标记为未写入
             
@@ -572,13 +650,16 @@ class BinaryModifier:
             
             # 检查偏移量是否超出文件大小
             file_size = os.path.getsize(file_path)
-            if self.actual_firmware_version_offset + 16 > file_size:  # 假设版本字符串最大16字节
+            if self.actual_firmware_version_offset + self.firmware_version_size > file_size:
                 logger.error(f"固件版本偏移量超出文件大小")
                 return False
             
-            # 将版本字符串转换为字节
-            version_bytes = version.encode('utf-8')[:16]  # 限制长度
-            version_bytes = version_bytes.ljust(16, b'\x00')  # 填充到16字节
+            # 将版本字符串转换为字节，保留结尾的'\0'
+            version_bytes = version.encode('utf-8')
+            if len(version_bytes) >= self.firmware_version_size:
+                logger.error(f"固件版本过长: {version}，字段长度 {self.firmware_version_size} 字节")
+                return False
+            version_bytes = version_bytes.ljust(self.firmware_version_size, b'\x00')
             
             # 写入文件
             with open(file_path, 'r+b') as f:
@@ -592,6 +673,25 @@ class BinaryModifier:
             logger.error(f"写入固件版本失败: {e}")
             return False
     
+    def read_firmware_version(self, file_path: str) -> Optional[str]:
+        """
+        读取镜像中的固件版本
+        
+        Args:
+            file_path: bin文件路径
+            
+        Returns:
+            Optional[str]: 固件版本字符串，读取失败返回None
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(self.actual_firmware_version_offset)
+                version_bytes = f.read(self.firmware_version_size)
+            return version_bytes.split(b'\x00', 1)[0].decode('utf-8', errors='replace')
+        except Exception as e:
+            logger.error(f"读取固件版本失败: {e}")
+            return None
+    
     def write_file_size(self, file_path: str, size: int) -> bool:
         """
         写入文件大小
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译结果缓存模块
+以项目输入文件和编译依赖的头文件内容、链接脚本、工具链和配置名称的哈希为键缓存编译输出（bin/out/axf/map），命中时直接恢复，按LRU在容量上限内淘汰
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from lib_logger import logger
+from parse_cache import get_cache_root
+from typing import Dict, Iterable, List, Optional
+
+# 项目输入中需要计入的头文件扩展名
+HEADER_EXTENSIONS = ('.h', '.hpp', '.hh', '.inc')
+
+# 缓存索引的读改写按缓存目录加锁（同一目录可能有多个 BuildCache 实例，如并行编译多个配置）
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+def _index_lock(cache_dir: str) -> threading.Lock:
+    """获取缓存目录的索引锁"""
+    with _index_locks_guard:
+        return _index_locks.setdefault(os.path.normcase(os.path.abspath(cache_dir)), threading.Lock())
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> Optional[str]:
+    """
+    计算文件内容的SHA1
+
+    Args:
+        path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        Optional[str]: 十六进制摘要，文件无法读取时返回None
+    """
+    try:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def collect_input_files(project_inputs: Dict, extra_files: Iterable[str] = ()) -> List[str]:
+    """
+    汇总影响编译结果的文件：项目列出的源文件、源文件目录和包含目录中的头文件以及额外文件
+
+    项目文件通常不列出头文件，这里把源文件所在目录和包含目录（不递归）中的头文件一并计入；
+    其他位置的头文件需要通过编译依赖索引（dependency_index）计入
+
+    Args:
+        project_inputs: 分析器 get_project_inputs 的结果
+        extra_files: 额外文件（项目文件、链接脚本等）
+
+    Returns:
+        List[str]: 去重排序后的存在的文件路径
+    """
+    files = set()
+    directories = set(project_inputs.get('include_dirs', []))
+    for source in project_inputs.get('sources', []):
+        if os.path.isfile(source):
+            files.add(os.path.normcase(os.path.abspath(source)))
+            directories.add(os.path.dirname(source))
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith(HEADER_EXTENSIONS):
+                        files.add(os.path.normcase(os.path.abspath(entry.path)))
+        except OSError:
+            continue
+    for path in extra_files:
+        if path and os.path.isfile(path):
+            files.add(os.path.normcase(os.path.abspath(path)))
+    return sorted(files)
+
+
+def toolchain_fingerprint(executable_path: str) -> Dict:
+    """
+    生成工具链指纹：可执行文件路径、大小和修改时间（工具链升级后随之变化）
+
+    Args:
+        executable_path: 编译工具可执行文件路径
+
+    Returns:
+        Dict: 指纹信息
+    """
+    try:
+        st = os.stat(executable_path)
+        return {'path': os.path.normcase(os.path.abspath(executable_path)), 'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns}
+    except OSError:
+        return {'path': executable_path or '', 'size': None, 'mtime_ns': None}
+
+
+class BuildCache:
+    """编译结果缓存"""
+
+    CACHE_NAMESPACE = 'build_cache'
+    INDEX_NAME = 'index.json'
+    # 缓存键格式版本，键的组成变化时递增
+    KEY_VERSION = 2
+    DEFAULT_MAX_SIZE_MB = 512
+
+    def __init__(self, cache_dir: str = None, max_size_mb: int = None):
+        """
+        初始化编译结果缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为程序缓存目录下的build_cache
+            max_size_mb: 缓存容量上限(MB)
+        """
+        self.cache_dir = cache_dir or os.path.join(get_cache_root(), self.CACHE_NAMESPACE)
+        self.max_size = int((max_size_mb or self.DEFAULT_MAX_SIZE_MB) * 1024 * 1024)
+        self.index_path = os.path.join(self.cache_dir, self.INDEX_NAME)
+        self._lock = _index_lock(self.cache_dir)
+
+    def compute_key(self, input_files: Iterable[str], properties: Dict,
+                    file_hashes: Dict[str, str] = None) -> str:
+        """
+        计算缓存键
+
+        Args:
+            input_files: 影响编译结果的文件
+            properties: 其他影响编译结果的属性（配置名称、工具链指纹等），需可JSON序列化
+            file_hashes: 已计算的文件哈希 {路径: 哈希}（例如源文件清单），其中的文件不再重复读取
+
+        Returns:
+            str: 缓存键
+        """
+        file_hashes = file_hashes or {}
+        digest = hashlib.sha1()
+        digest.update(json.dumps({'version': self.KEY_VERSION, 'properties': properties},
+                                 sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        for path in sorted(input_files):
+            digest.update(b'\0' + path.encode('utf-8') + b'\0')
+            digest.update((file_hashes.get(path) or hash_file(path) or 'missing').encode('ascii'))
+        return digest.hexdigest()
+
+    def _load_index(self) -> Dict:
+        """读取缓存索引"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"编译缓存索引损坏，重新建立: {e}")
+            return {}
+
+    def _save_index(self, index: Dict):
+        """写入缓存索引（先写临时文件再替换）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.index_path)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """
+        查询缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict]: 缓存条目，未命中或缓存文件缺失时返回None
+        """
+        with self._lock:
+            entry = self._load_index().get(key)
+        if not entry:
+            return None
+        entry_dir = os.path.join(self.cache_dir, key)
+        for item in entry['files'].values():
+            if not os.path.exists(os.path.join(entry_dir, item['name'])):
+                return None
+        return entry
+
+    def restore(self, key: str) -> Optional[Dict]:
+        """
+        把缓存的编译输出恢复到原输出位置
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict]: 恢复的文件 {类型: 路径}，未命中或恢复失败返回None
+        """
+        entry = self.lookup(key)
+        if not entry:
+            return None
+        entry_dir = os.path.join(self.cache_dir, key)
+        restored = {}
+        try:
+            for kind, item in entry['files'].items():
+                os.makedirs(os.path.dirname(item['path']), exist_ok=True)
+                shutil.copyfile(os.path.join(entry_dir, item['name']), item['path'])
+                restored[kind] = item['path']
+
+            with self._lock:
+                index = self._load_index()
+                if key in index:
+                    index[key]['last_used'] = datetime.now().isoformat(timespec='seconds')
+                    index[key]['hits'] = index[key].get('hits', 0) + 1
+                    self._save_index(index)
+            logger.info(f"编译缓存命中，已恢复 {len(restored)} 个文件: {key[:12]}")
+            return restored
+
+        except Exception as e:
+            logger.error(f"恢复编译缓存失败: {key[:12]}, 错误: {e}")
+            return None
+
+    def store(self, key: str, artifacts: Dict[str, str], description: str = '') -> bool:
+        """
+        保存编译输出到缓存，超出容量上限时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            artifacts: 编译输出 {类型: 路径}，例如 {'bin_file': ..., 'out_file': ..., 'map_file': ...}
+            description: 条目说明（项目/配置名称）
+
+        Returns:
+            bool: 是否成功
+        """
+        files = {kind: path for kind, path in artifacts.items() if path and os.path.isfile(path)}
+        if not files:
+            return False
+
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            temp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            os.makedirs(temp_dir)
+            entry_files = {}
+            total_size = 0
+            for kind, path in files.items():
+                name = f"{kind}{os.path.splitext(path)[1]}"
+                shutil.copyfile(path, os.path.join(temp_dir, name))
+                entry_files[kind] = {'name': name, 'path': os.path.abspath(path)}
+                total_size += os.path.getsize(path)
+
+            now = datetime.now().isoformat(timespec='seconds')
+            with self._lock:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(temp_dir, entry_dir)
+                index = self._load_index()
+                index[key] = {
+                    'description': description,
+                    'files': entry_files,
+                    'size': total_size,
+                    'created': now,
+                    'last_used': now,
+                    'hits': 0
+                }
+                self._evict(index, keep=key)
+                self._save_index(index)
+            logger.info(f"编译输出已缓存: {description} ({total_size} 字节), 键: {key[:12]}")
+            return True
+
+        except Exception as e:
+            logger.error(f"保存编译缓存失败: {description}, 错误: {e}")
+            return False
+
+    def _evict(self, index: Dict, keep: str = None):
+        """按最近使用时间淘汰条目，直到总大小不超过容量上限（调用方持有锁）"""
+        total = sum(entry.get('size', 0) for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k].get('last_used', '')):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            total -= index[key].get('size', 0)
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            del index[key]
+            logger.info(f"淘汰编译缓存条目: {key[:12]}")
+
+    def clear(self):
+        """清空编译缓存"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        logger.info("编译缓存已清空")
+
+
+if __name__ == "__main__":
+    # 测试编译缓存：保存、命中恢复和LRU淘汰
+    import tempfile
+    work_dir = tempfile.mkdtemp()
+    source = os.path.join(work_dir, 'main.c')
+    output = os.path.join(work_dir, 'Exe', 'Proj.bin')
+    os.makedirs(os.path.dirname(output))
+    with open(source, 'w') as f:
+        f.write('int main(void) { return 0; }\n')
+    with open(output, 'wb') as f:
+        f.write(os.urandom(4096))
+
+    cache = BuildCache(os.path.join(work_dir, 'cache'), max_size_mb=0.006)
+    inputs = collect_input_files({'sources': [source], 'include_dirs': []})
+    key = cache.compute_key(inputs, {'configuration': 'Debug'})
+    print(f"缓存键: {key}")
+    print(f"保存: {cache.store(key, {'bin_file': output}, 'Proj/Debug')}")
+    os.remove(output)
+    print(f"恢复: {cache.restore(key)}, 文件存在: {os.path.exists(output)}")
+
+    other = cache.compute_key(inputs, {'configuration': 'Release'})
+    cache.store(other, {'bin_file': output}, 'Proj/Release')
+    print(f"淘汰后Debug条目: {cache.lookup(key)}")
+    shutil.rmtree(work_dir)
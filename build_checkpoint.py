@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译检查点模块
+按编译ID（提交、项目文件和配置）记录编译、二进制修改、发布和远程发布各阶段的输入哈希、输出和状态，失败后重新执行时从第一个未完成的阶段继续
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from lib_logger import logger
+from parse_cache import get_cache_root
+from typing import Dict, Optional
+
+# 检查点记录的阶段（按执行顺序）
+STAGES = ('compile', 'modify', 'publish', 'remote_publish')
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+STATUS_PENDING = 'pending'
+
+
+def hash_inputs(inputs: Dict) -> str:
+    """
+    计算阶段输入的哈希
+
+    Args:
+        inputs: 阶段输入（可JSON序列化，无法序列化的值按字符串处理）
+
+    Returns:
+        str: 十六进制摘要
+    """
+    text = json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class BuildCheckpoint:
+    """一次编译发布的检查点"""
+
+    def __init__(self, store: 'CheckpointStore', data: Dict):
+        """
+        Args:
+            store: 所属的检查点存储
+            data: 检查点数据 {'build_id', 'project_file', 'configuration', 'commit_id', 'version',
+                  'firmware_version', 'branch', 'created_at', 'stages': {阶段: 记录}}
+        """
+        self.store = store
+        self.data = data
+        self.data.setdefault('stages', {})
+
+    @property
+    def build_id(self) -> str:
+        return self.data['build_id']
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.data.get('version')
+
+    @property
+    def image_path(self) -> str:
+        """编译生成的原始镜像（修改二进制文件之前）的保存路径"""
+        return self.store.image_path(self.build_id)
+
+    def stage(self, name: str) -> Dict:
+        """获取阶段记录 {'status', 'inputs_hash', 'outputs', 'message', 'updated_at'}"""
+        return self.data['stages'].get(name) or {'status': STATUS_PENDING, 'inputs_hash': None, 'outputs': {}}
+
+    def outputs(self, name: str) -> Dict:
+        """获取阶段输出"""
+        return self.stage(name).get('outputs') or {}
+
+    def is_done(self, name: str, inputs_hash: str) -> bool:
+        """
+        阶段是否已完成且输入未变化
+
+        Args:
+            name: 阶段名称
+            inputs_hash: 本次的输入哈希
+
+        Returns:
+            bool: 可以跳过该阶段时返回True
+        """
+        record = self.stage(name)
+        return record['status'] in (STATUS_DONE, STATUS_SKIPPED) and record.get('inputs_hash') == inputs_hash
+
+    def record(self, name: str, status: str, inputs_hash: str = None, outputs: Dict = None, message: str = ''):
+        """
+        记录阶段结果并保存，之后的阶段依赖本阶段的输出，一并重置为未执行
+
+        Args:
+            name: 阶段名称
+            status: 阶段状态
+            inputs_hash: 输入哈希
+            outputs: 阶段输出（可JSON序列化）
+            message: 失败信息等说明
+        """
+        self.data['stages'][name] = {
+            'status': status,
+            'inputs_hash': inputs_hash,
+            'outputs': outputs or {},
+            'message': message,
+            'updated_at': datetime.now().isoformat(timespec='seconds')
+        }
+        if name in STAGES:
+            for later in STAGES[STAGES.index(name) + 1:]:
+                self.data['stages'].pop(later, None)
+        self.store.save(self)
+
+    def first_incomplete(self) -> Optional[str]:
+        """第一个未完成的阶段，全部完成时返回None"""
+        for name in STAGES:
+            if self.stage(name)['status'] not in (STATUS_DONE, STATUS_SKIPPED):
+                return name
+        return None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.first_incomplete() is None
+
+
+class CheckpointStore:
+    """检查点存储：每个编译ID一个状态文件和一份原始镜像"""
+
+    CACHE_NAMESPACE = 'build_checkpoints'
+    # 超过该天数的检查点在开始新的编译时清理
+    MAX_AGE_DAYS = 30
+
+    def __init__(self, cache_dir: str = None):
+        """
+        初始化检查点存储
+
+        Args:
+            cache_dir: 存储目录，默认为程序缓存目录下的build_checkpoints
+        """
+        self.cache_dir = cache_dir or os.path.join(get_cache_root(), self.CACHE_NAMESPACE)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_build_id(project_file: str, configuration: str, commit_id: str) -> str:
+        """
+        生成编译ID：同一提交、项目文件和配置的编译发布共用一个检查点
+
+        Args:
+            project_file: 项目文件路径
+            configuration: 配置名称
+            commit_id: Git提交ID
+
+        Returns:
+            str: 编译ID
+        """
+        text = f"{os.path.normcase(os.path.abspath(project_file))}|{configuration}"
+        return f"{commit_id}_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]}"
+
+    def state_path(self, build_id: str) -> str:
+        """状态文件路径"""
+        return os.path.join(self.cache_dir, f"{build_id}.json")
+
+    def image_path(self, build_id: str) -> str:
+        """原始镜像路径"""
+        return os.path.join(self.cache_dir, f"{build_id}.bin")
+
+    def load(self, build_id: str) -> Optional[BuildCheckpoint]:
+        """
+        读取检查点
+
+        Args:
+            build_id: 编译ID
+
+        Returns:
+            Optional[BuildCheckpoint]: 检查点，不存在或无法读取时返回None
+        """
+        try:
+            with open(self.state_path(build_id), 'r', encoding='utf-8') as f:
+                return BuildCheckpoint(self, json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取编译检查点失败，视为无检查点: {e}")
+            return None
+
+    def start(self, build_id: str, info: Dict) -> BuildCheckpoint:
+        """
+        开始新的编译发布，覆盖同一编译ID之前的检查点
+
+        Args:
+            build_id: 编译ID
+            info: 编译信息（项目文件、配置、提交、版本等）
+
+        Returns:
+            BuildCheckpoint: 新的检查点
+        """
+        self.cleanup()
+        try:
+            os.remove(self.image_path(build_id))
+        except OSError:
+            pass
+        data = dict(info, build_id=build_id, created_at=datetime.now().isoformat(timespec='seconds'), stages={})
+        checkpoint = BuildCheckpoint(self, data)
+        self.save(checkpoint)
+        return checkpoint
+
+    def save(self, checkpoint: BuildCheckpoint) -> bool:
+        """
+        保存检查点（先写临时文件再替换，中断时不会留下不完整的状态文件）
+
+        Args:
+            checkpoint: 检查点
+
+        Returns:
+            bool: 是否成功
+        """
+        state_path = self.state_path(checkpoint.build_id)
+        temp_path = f"{state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(checkpoint.data, f, ensure_ascii=False, indent=2, default=str)
+                os.replace(temp_path, state_path)
+            return True
+        except Exception as e:
+            logger.error(f"保存编译检查点失败: {e}")
+            return False
+
+    def save_image(self, build_id: str, bin_path: str) -> bool:
+        """
+        保存编译生成的原始镜像，重新执行二进制修改时从该镜像恢复
+
+        Args:
+            build_id: 编译ID
+            bin_path: 编译生成的bin文件
+
+        Returns:
+            bool: 是否成功
+        """
+        image_path = self.image_path(build_id)
+        temp_path = f"{image_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            shutil.copyfile(bin_path, temp_path)
+            os.replace(temp_path, image_path)
+            return True
+        except Exception as e:
+            logger.error(f"保存编译镜像失败: {e}")
+            return False
+
+    def remove(self, build_id: str):
+        """删除检查点"""
+        for path in (self.state_path(build_id), self.image_path(build_id)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def cleanup(self, max_age_days: int = None) -> int:
+        """
+        清理过期的检查点
+
+        Args:
+            max_age_days: 保留天数，默认 MAX_AGE_DAYS
+
+        Returns:
+            int: 删除的检查点数量
+        """
+        expire_before = time.time() - (max_age_days or self.MAX_AGE_DAYS) * 86400
+        removed = 0
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                expired = [entry.name[:-len('.json')] for entry in entries
+                           if entry.name.endswith('.json') and entry.stat().st_mtime < expire_before]
+        except OSError:
+            return 0
+        for build_id in expired:
+            self.remove(build_id)
+            removed += 1
+        if removed:
+            logger.info(f"已清理 {removed} 个过期的编译检查点")
+        return removed
+
+
+__all__ = ['STAGES', 'STATUS_DONE', 'STATUS_FAILED', 'STATUS_SKIPPED', 'STATUS_PENDING',
+           'hash_inputs', 'BuildCheckpoint', 'CheckpointStore']
+
+
+if __name__ == "__main__":
+    # 测试：远程发布失败后重新执行时只需重试远程发布
+    import tempfile
+    work_dir = tempfile.mkdtemp()
+    store = CheckpointStore(work_dir)
+    build_id = CheckpointStore.make_build_id(os.path.join(work_dir, 'demo.ewp'), 'Debug', 'abc1234')
+    checkpoint = store.start(build_id, {'commit_id': 'abc1234', 'version': 'V1.0.0.2'})
+    compile_hash = hash_inputs({'commit_id': 'abc1234', 'configuration': 'Debug'})
+    checkpoint.record('compile', STATUS_DONE, compile_hash, {'raw_sha1': '0' * 40})
+    checkpoint.record('modify', STATUS_DONE, hash_inputs({'raw_sha1': '0' * 40}), {'bin_sha1': '1' * 40})
+    checkpoint.record('publish', STATUS_DONE, hash_inputs({'bin_sha1': '1' * 40}))
+    checkpoint.record('remote_publish', STATUS_FAILED, hash_inputs({'remote': '//server/fw'}), message='网络不可用')
+
+    reloaded = store.load(build_id)
+    print(f"第一个未完成阶段: {reloaded.first_incomplete()}")
+    print(f"编译可跳过: {reloaded.is_done('compile', compile_hash)}")
+    shutil.rmtree(work_dir, ignore_errors=True)
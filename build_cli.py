@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行编译发布工具
+不启动界面，在命令行或持续集成环境中执行与界面"开始编译"相同的编译发布流程
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from lib_logger import logger, set_log_level
+from firmware_pipeline import FirmwarePipeline, PipelineHooks
+
+# 未指定配置文件时依次查找（与界面加载配置的顺序一致）
+CONFIG_CANDIDATES = ('user_config.json', 'config.json', 'user_config.example.json')
+
+
+def get_script_dir() -> str:
+    """获取脚本所在目录，兼容exe和Python脚本环境"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def find_config_file(config_path: str = None) -> str:
+    """
+    确定使用的配置文件
+
+    Args:
+        config_path: 命令行指定的配置文件
+
+    Returns:
+        str: 配置文件路径，未找到返回空字符串
+    """
+    if config_path:
+        return config_path if os.path.exists(config_path) else ""
+    for name in CONFIG_CANDIDATES:
+        path = os.path.join(get_script_dir(), name)
+        if os.path.exists(path):
+            return path
+    return ""
+
+
+class CliPipelineHooks(PipelineHooks):
+    """命令行回调：日志输出到标准输出，确认时询问终端用户或使用 --yes 的默认回答"""
+
+    def __init__(self, commit_message: str = None, assume_yes: bool = False, verbose: bool = False):
+        """
+        初始化命令行回调
+
+        Args:
+            commit_message: 更新信息（追加在默认提交信息之后），为None时使用默认提交信息
+            assume_yes: 需要确认时是否自动继续
+            verbose: 是否输出详细日志
+        """
+        super().__init__(assume_yes)
+        self.commit_message = commit_message
+        self.verbose = verbose
+
+    def log(self, message: str):
+        if self.verbose:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+    def status(self, message: str):
+        print(f"==> {message}", flush=True)
+
+    def build_output(self, event, configuration_name: str = None):
+        # 编译进度只在详细模式输出，诊断信息总是输出
+        if event.kind == 'diagnostic' or self.verbose:
+            prefix = f"[{configuration_name}]" if configuration_name else ""
+            print(f"    {prefix}{event}" if event.kind == 'diagnostic' else f"    {prefix}{event.message}", flush=True)
+
+    def on_version(self, current_version, next_version: str):
+        print(f"    版本: {current_version or '未知'} -> {next_version}", flush=True)
+
+    def ask_commit_message(self, default_message: str) -> str:
+        if self.commit_message:
+            return f"{default_message} - {self.commit_message}"
+        return default_message
+
+    def confirm(self, message: str) -> bool:
+        if self.assume_yes:
+            return True
+        if not sys.stdin.isatty():
+            print(f"{message}\n非交互环境，取消（使用 --yes 自动继续）", flush=True)
+            return False
+        answer = input(f"{message} [y/N] ").strip().lower()
+        return answer in ('y', 'yes')
+
+    def show_error(self, title_key: str, message: str):
+        print(f"{self.text(title_key)}: {message}", file=sys.stderr, flush=True)
+
+    def show_success(self, message: str):
+        print(message, flush=True)
+
+
+def run_batch(manifest_path: str, base_config: dict, report_path: str = None, verbose: bool = False) -> int:
+    """
+    按清单批量发布多个项目
+
+    Args:
+        manifest_path: 清单文件路径
+        base_config: 基础配置
+        report_path: 汇总报告输出路径
+        verbose: 是否输出详细日志
+
+    Returns:
+        int: 退出码，全部成功返回0
+    """
+    from batch_release import BatchRelease, load_manifest
+
+    try:
+        manifest = load_manifest(manifest_path)
+    except Exception as e:
+        print(f"加载批量发布清单失败: {manifest_path}: {e}", file=sys.stderr)
+        return 2
+
+    def output(message):
+        print(message, flush=True)
+
+    def on_finished(result):
+        output(f"[{result['name']}] {'发布成功' if result['success'] else '发布失败'} ({result['duration']:.1f}秒)")
+
+    batch = BatchRelease(manifest, base_config, output, verbose)
+    try:
+        results = batch.run(on_finished)
+    except KeyboardInterrupt:
+        batch.cancel()
+        print("已取消批量发布", file=sys.stderr)
+        return 1
+
+    print()
+    for line in BatchRelease.format_report(results):
+        print(line)
+    if report_path and BatchRelease.write_report(results, report_path):
+        print(f"报告: {report_path}")
+    return 0 if all(result['success'] for result in results) else 1
+
+
+def run_on_server(args) -> int:
+    """
+    把编译发布任务提交到编译服务，输出服务推送的进度（与本地执行的输出格式相同）
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        int: 退出码
+    """
+    from build_output import BuildEvent
+    from build_server import BuildServerClient
+
+    project_path = os.path.abspath(args.project_path)
+    request = {
+        'path': project_path,
+        'branch': args.branch,
+        'configuration': args.configuration,
+        'message': args.message,
+        # 服务端无法交互确认，未指定 --yes 时需要确认的操作按"否"处理
+        'assume_yes': args.yes
+    }
+    if args.tool:
+        request['compile_tool'] = args.tool
+    if args.tool_path:
+        request['tool_path'] = args.tool_path
+    if args.all:
+        request['build_all'] = True
+    if args.config:
+        try:
+            with open(args.config, 'r', encoding='utf-8') as f:
+                request['config'] = json.load(f)
+        except Exception as e:
+            print(f"加载配置文件失败: {args.config}: {e}", file=sys.stderr)
+            return 2
+
+    hooks = CliPipelineHooks(args.message, args.yes, args.verbose)
+    client = BuildServerClient(args.server, args.token)
+    try:
+        job = client.submit(request)
+    except Exception as e:
+        print(f"提交任务到编译服务失败: {args.server}: {e}", file=sys.stderr)
+        return 2
+    hooks.status(f"任务 {job['job_id']} 已提交到 {client.url}")
+
+    finished = None
+    error_shown = False
+    try:
+        for event in client.stream_events(job['job_id']):
+            event_type = event['type']
+            if event_type == 'log':
+                hooks.log(event['message'])
+            elif event_type == 'status':
+                hooks.status(event['message'])
+            elif event_type == 'output':
+                hooks.build_output(BuildEvent(**event['event']), event.get('configuration'))
+            elif event_type == 'version':
+                hooks.on_version(event['current'], event['next'])
+            elif event_type == 'error':
+                error_shown = True
+                print(f"{event['title']}: {event['message']}", file=sys.stderr, flush=True)
+            elif event_type == 'success':
+                hooks.show_success(event['message'])
+            elif event_type == 'finished':
+                finished = event
+    except KeyboardInterrupt:
+        client.cancel(job['job_id'])
+        print(f"已请求取消任务 {job['job_id']}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"与编译服务的连接中断: {e}", file=sys.stderr)
+        return 1
+
+    if not finished:
+        return 1
+    result = finished.get('result', {})
+    if finished['state'] == 'succeeded':
+        logger.info(f"编译发布完成: {result.get('version')} ({result.get('commit_id')})")
+        return 0
+    if not error_shown and result.get('message'):
+        print(result['message'], file=sys.stderr)
+    return 1
+
+
+def main(argv=None) -> int:
+    """命令行入口，返回退出码"""
+    parser = argparse.ArgumentParser(description="嵌入式固件编译发布（命令行）")
+    parser.add_argument('project_path', nargs='?', help="项目根目录（使用 --batch 时不需要）")
+    parser.add_argument('--config', help=f"配置文件，默认依次查找: {', '.join(CONFIG_CANDIDATES)}")
+    parser.add_argument('--tool', choices=['IAR', 'MDK'], help="编译工具，覆盖配置文件中的compile_tool")
+    parser.add_argument('--tool-path', help="编译工具安装目录，覆盖配置文件中的安装路径")
+    parser.add_argument('--branch', help="在该分支的工作树中编译发布（工作树在缓存目录中按分支创建并复用）")
+    parser.add_argument('--configuration', help="编译配置名称，默认使用项目中的第一个配置")
+    parser.add_argument('--all', action='store_true', help="并行编译全部配置")
+    parser.add_argument('-m', '--message', help="更新信息，写入Git提交和Release Notes")
+    parser.add_argument('-y', '--yes', action='store_true', help="需要确认时自动继续")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出详细日志")
+    parser.add_argument('--batch', metavar='MANIFEST', help="按清单批量发布多个项目（IAR和MDK可混合）")
+    parser.add_argument('--report', help="批量发布的汇总报告（JSON）输出路径")
+    parser.add_argument('--server', nargs='?', const='http://127.0.0.1:8765', metavar='URL',
+                        help="提交到编译服务执行（build_server.py），默认 http://127.0.0.1:8765")
+    parser.add_argument('--token', default=os.environ.get('EFM_BUILD_SERVER_TOKEN'),
+                        help="编译服务的访问令牌（默认读取环境变量 EFM_BUILD_SERVER_TOKEN）")
+    args = parser.parse_args(argv)
+    if not args.batch and not args.project_path:
+        parser.error("需要指定项目根目录或 --batch 清单")
+
+    set_log_level('INFO' if args.verbose else 'WARNING')
+
+    if args.server and not args.batch:
+        return run_on_server(args)
+
+    config_path = find_config_file(args.config)
+    if not config_path:
+        print(f"未找到配置文件: {args.config or ', '.join(CONFIG_CANDIDATES)}", file=sys.stderr)
+        return 2
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"加载配置文件失败: {config_path}: {e}", file=sys.stderr)
+        return 2
+
+    if args.batch:
+        return run_batch(args.batch, config, args.report, args.verbose)
+
+    if args.tool:
+        config['compile_tool'] = args.tool
+    if args.tool_path:
+        key = 'iar_installation_path' if config.get('compile_tool', 'IAR') == 'IAR' else 'mdk_installation_path'
+        config[key] = args.tool_path
+    if args.all:
+        config['build_all_configurations'] = True
+
+    project_path = os.path.abspath(args.project_path)
+    if not os.path.isdir(project_path):
+        print(f"项目路径不存在: {project_path}", file=sys.stderr)
+        return 2
+
+    hooks = CliPipelineHooks(args.message, args.yes, args.verbose)
+    pipeline = FirmwarePipeline(config, project_path, hooks)
+    if args.branch:
+        success, message = pipeline.use_branch(args.branch)
+        if not success:
+            print(message, file=sys.stderr)
+            return 2
+    pipeline.discover_paths()
+    if not pipeline.load_configurations(args.configuration):
+        print("未能选择编译配置", file=sys.stderr)
+        return 2
+
+    success, message, info = pipeline.run()
+    if success:
+        logger.info(f"编译发布完成: {info.get('version')} ({info.get('commit_id')})")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
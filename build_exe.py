@@ -117,7 +117,7 @@ a = Analysis(
         ('user_config.example.json', '.'),
         ('docs', 'docs'),
     ],
-    hiddenimports=[],
+    hiddenimports=['locales.zh_CN', 'locales.zh_TW', 'locales.en_US'],  # 语言包按需导入
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译输出流式处理模块
+在后台线程中逐行读取编译进程输出（或跟踪编译日志文件），增量解析编译进度、警告和错误并实时回调
+"""
+
+import os
+import re
+import time
+import locale
+import threading
+import subprocess
+from collections import deque
+from lib_logger import logger
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+class BuildEvent:
+    """编译输出事件"""
+
+    # 事件类型
+    OUTPUT = 'output'            # 普通输出行
+    PROGRESS = 'progress'        # 编译/链接进度
+    DIAGNOSTIC = 'diagnostic'    # 警告/错误
+    SUMMARY = 'summary'          # 错误/警告统计、程序大小等汇总信息
+
+    def __init__(self, kind: str, message: str, file: str = None, line: int = None,
+                 severity: str = None, code: str = None, count: int = None):
+        """
+        初始化编译输出事件
+
+        Args:
+            kind: 事件类型
+            message: 事件内容（诊断事件为诊断信息，其余为原始输出行）
+            file: 诊断对应的源文件
+            line: 诊断对应的行号
+            severity: 诊断级别，'error'、'warning' 或 'remark'
+            code: 诊断编号，例如 Pe550、#177-D、L6218E
+            count: 进度事件中已处理的源文件数量
+        """
+        self.kind = kind
+        self.message = message
+        self.file = file
+        self.line = line
+        self.severity = severity
+        self.code = code
+        self.count = count
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            'kind': self.kind,
+            'message': self.message,
+            'file': self.file,
+            'line': self.line,
+            'severity': self.severity,
+            'code': self.code,
+            'count': self.count
+        }
+
+    def __str__(self) -> str:
+        if self.kind == self.DIAGNOSTIC:
+            location = f"{self.file}({self.line})" if self.file and self.line else (self.file or '')
+            code = f"[{self.code}]" if self.code else ''
+            return f"{self.severity}{code}: {location}{': ' if location else ''}{self.message}"
+        return self.message
+
+
+def _normalize_severity(text: str) -> str:
+    """统一诊断级别名称"""
+    text = text.lower()
+    if 'error' in text:
+        return 'error'
+    if 'warning' in text:
+        return 'warning'
+    return 'remark'
+
+
+class BuildOutputMonitor:
+    """编译输出监视器：逐行增量解析IAR/MDK编译输出，统计诊断信息并分发事件"""
+
+    # IAR编译器原始格式: "C:\proj\main.c",45  Warning[Pe550]: variable "x" was set but never used
+    _IAR_INLINE = re.compile(
+        r'^"(?P<file>[^"]+)",(?P<line>\d+)\s+(?P<sev>Fatal Error|Error|Warning|Remark)\[(?P<code>\w+)\]:\s*(?P<msg>.*)$')
+    # IarBuild格式: Warning[Pe550]: variable "x" was set but never used C:\proj\main.c 45
+    _IAR_BUILD = re.compile(
+        r'^(?P<sev>Fatal Error|Error|Warning|Remark)\[(?P<code>\w+)\]:\s*(?P<msg>.*?)'
+        r'(?:\s+(?P<file>(?:[A-Za-z]:[\\/]|/)\S.*?)\s+(?P<line>\d+))?\s*$')
+    _IAR_SOURCE = re.compile(r'^\s*(?P<file>[^\s\\/]+\.(?:c|cc|cpp|cxx|s|asm|s79|S))\s*$')
+    _IAR_TOTAL = re.compile(r'^\s*Total number of (?P<kind>errors|warnings):\s*(?P<count>\d+)')
+
+    # armcc格式: ..\Src\main.c(45): warning:  #550-D: variable "x"  was set but never used
+    _KEIL_ARMCC = re.compile(
+        r'^(?P<file>[^(]+?)\((?P<line>\d+)\):\s*(?P<sev>fatal error|error|warning|note|remark)\s*:?\s*'
+        r'(?:(?P<code>#\w+(?:-D)?)\s*:\s*)?(?P<msg>.*)$', re.IGNORECASE)
+    # armclang格式: ../Src/main.c:45:5: warning: unused variable 'x' [-Wunused-variable]
+    _KEIL_CLANG = re.compile(
+        r'^(?P<file>.+?):(?P<line>\d+):(?:\d+:)?\s*(?P<sev>fatal error|error|warning|note):\s*'
+        r'(?P<msg>.*?)(?:\s*\[(?P<code>-W[\w-]+)\])?$')
+    # armlink格式: .\Objects\Proj.axf: Error: L6218E: Undefined symbol foo (referred from main.o).
+    _KEIL_LINKER = re.compile(
+        r'^(?:(?P<file>.+?):\s*)?(?P<sev>Fatal error|Error|Warning):\s*(?P<code>[LQC]\d+[EWU]):\s*(?P<msg>.*)$')
+    _KEIL_PROGRESS = re.compile(r'^(?P<action>compiling|assembling|linking|FromELF)\b\s*(?P<file>.*?)(?:\.\.\.)?\s*$',
+                                re.IGNORECASE)
+    _KEIL_TOTAL = re.compile(r'-\s*(?P<errors>\d+)\s+Error\(s\),\s*(?P<warnings>\d+)\s+Warning\(s\)')
+
+    def __init__(self, toolchain: str = 'IAR', callback: Callable[[BuildEvent], None] = None):
+        """
+        初始化编译输出监视器
+
+        Args:
+            toolchain: 工具链，'IAR' 或 'MDK'
+            callback: 事件回调，在读取输出的线程中调用
+        """
+        self.toolchain = toolchain
+        self.callback = callback
+        self.diagnostics: List[BuildEvent] = []
+        self.files_processed = 0
+        # 编译器自身给出的错误/警告统计，未给出时为None
+        self.reported_errors: Optional[int] = None
+        self.reported_warnings: Optional[int] = None
+        self.summary_lines: List[str] = []
+        # 各源文件的编译耗时(秒)：从该文件的进度行到下一条进度行的间隔（并行编译时为估计值）
+        self.compile_times: Dict[str, float] = {}
+        # 本次编译（或汇编）的源文件名，增量编译时用于区分未重新编译的文件
+        self.compiled_files: Set[str] = set()
+        self._current_file: Optional[str] = None
+        self._current_start = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def errors(self) -> List[BuildEvent]:
+        """已解析的错误"""
+        return [d for d in self.diagnostics if d.severity == 'error']
+
+    @property
+    def warnings(self) -> List[BuildEvent]:
+        """已解析的警告"""
+        return [d for d in self.diagnostics if d.severity == 'warning']
+
+    def feed(self, line: str) -> Optional[BuildEvent]:
+        """
+        解析一行编译输出并分发事件，可从多个线程调用
+
+        Args:
+            line: 输出行
+
+        Returns:
+            Optional[BuildEvent]: 解析得到的事件，空行返回None
+        """
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            return None
+        with self._lock:
+            event = self._parse_iar(line) if self.toolchain == 'IAR' else self._parse_mdk(line)
+            if event.kind == BuildEvent.DIAGNOSTIC:
+                self.diagnostics.append(event)
+            elif event.kind == BuildEvent.SUMMARY:
+                self.summary_lines.append(line.strip())
+        if self.callback:
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.debug(f"编译输出回调异常: {e}")
+        return event
+
+    def _diagnostic(self, match, default_file: str = None) -> BuildEvent:
+        """由正则匹配结果构造诊断事件"""
+        groups = match.groupdict()
+        line = groups.get('line')
+        return BuildEvent(BuildEvent.DIAGNOSTIC, (groups.get('msg') or '').strip(),
+                          file=(groups.get('file') or default_file or None),
+                          line=int(line) if line else None,
+                          severity=_normalize_severity(groups['sev']),
+                          code=groups.get('code'))
+
+    def _progress(self, line: str, file: str = None) -> BuildEvent:
+        """构造进度事件"""
+        self.files_processed += 1
+        self._finish_file_timing()
+        if file:
+            self._current_file = os.path.basename(file.strip().replace('\\', '/'))
+            self._current_start = time.monotonic()
+            self.compiled_files.add(self._current_file)
+        return BuildEvent(BuildEvent.PROGRESS, line.strip(), count=self.files_processed)
+
+    def _finish_file_timing(self):
+        """结束当前源文件的计时"""
+        if self._current_file:
+            elapsed = time.monotonic() - self._current_start
+            self.compile_times[self._current_file] = self.compile_times.get(self._current_file, 0.0) + elapsed
+            self._current_file = None
+
+    def _parse_iar(self, line: str) -> BuildEvent:
+        """解析IAR输出行"""
+        for pattern in (self._IAR_INLINE, self._IAR_BUILD):
+            match = pattern.match(line)
+            if match:
+                return self._diagnostic(match)
+        match = self._IAR_TOTAL.match(line)
+        if match:
+            if match.group('kind') == 'errors':
+                self.reported_errors = int(match.group('count'))
+            else:
+                self.reported_warnings = int(match.group('count'))
+            return BuildEvent(BuildEvent.SUMMARY, line.strip())
+        match = self._IAR_SOURCE.match(line)
+        if match:
+            return self._progress(line, match.group('file'))
+        if line.strip() == 'Linking' or line.startswith('Building configuration'):
+            self._finish_file_timing()
+            return BuildEvent(BuildEvent.PROGRESS, line.strip(), count=self.files_processed)
+        return BuildEvent(BuildEvent.OUTPUT, line)
+
+    def _parse_mdk(self, line: str) -> BuildEvent:
+        """解析MDK输出行"""
+        for pattern in (self._KEIL_LINKER, self._KEIL_ARMCC, self._KEIL_CLANG):
+            match = pattern.match(line)
+            if match:
+                return self._diagnostic(match)
+        match = self._KEIL_TOTAL.search(line)
+        if match:
+            self.reported_errors = int(match.group('errors'))
+            self.reported_warnings = int(match.group('warnings'))
+            return BuildEvent(BuildEvent.SUMMARY, line.strip())
+        if line.startswith('Program Size:') or line.startswith('Build Time Elapsed'):
+            return BuildEvent(BuildEvent.SUMMARY, line.strip())
+        match = self._KEIL_PROGRESS.match(line)
+        if match:
+            if match.group('action').lower() in ('compiling', 'assembling'):
+                return self._progress(line, match.group('file'))
+            self._finish_file_timing()
+            return BuildEvent(BuildEvent.PROGRESS, line.strip(), count=self.files_processed)
+        return BuildEvent(BuildEvent.OUTPUT, line)
+
+    def format_summary(self, max_items: int = 20) -> str:
+        """
+        生成诊断汇总文本
+
+        Args:
+            max_items: 最多列出的诊断条数（错误优先）
+
+        Returns:
+            str: 汇总文本
+        """
+        errors, warnings = self.errors, self.warnings
+        error_count = self.reported_errors if self.reported_errors is not None else len(errors)
+        warning_count = self.reported_warnings if self.reported_warnings is not None else len(warnings)
+        lines = [f"已处理源文件: {self.files_processed}，错误: {error_count}，警告: {warning_count}"]
+        listed = (errors + warnings)[:max_items]
+        lines.extend(str(d) for d in listed)
+        remaining = len(errors) + len(warnings) - len(listed)
+        if remaining > 0:
+            lines.append(f"... 其余 {remaining} 条诊断信息见日志")
+        return '\n'.join(lines)
+
+
+def _default_encoding() -> str:
+    """编译器输出使用系统默认编码（中文Windows下通常为GBK）"""
+    return locale.getpreferredencoding(False) or 'utf-8'
+
+
+def _read_pipe(pipe, emit: Callable[[str], None]):
+    """读取进程输出管道直到结束"""
+    try:
+        for line in iter(pipe.readline, ''):
+            emit(line)
+    except Exception as e:
+        logger.debug(f"读取编译输出失败: {e}")
+    finally:
+        try:
+            pipe.close()
+        except Exception:
+            pass
+
+
+def _tail_file(path: str, emit: Callable[[str], None], stop_event: threading.Event,
+               poll_interval: float = 0.2, encoding: str = None):
+    """
+    跟踪日志文件的新增内容，直到stop_event置位后读完剩余内容
+
+    Args:
+        path: 日志文件路径
+        emit: 行回调
+        stop_event: 停止事件
+        poll_interval: 轮询间隔（秒）
+        encoding: 文件编码
+    """
+    position = 0
+    pending = ''
+    encoding = encoding or _default_encoding()
+    while True:
+        stopping = stop_event.is_set()
+        try:
+            size = os.path.getsize(path)
+            if size < position:
+                # 文件被重新创建，从头读取
+                position, pending = 0, ''
+            if size > position:
+                with open(path, 'rb') as f:
+                    f.seek(position)
+                    data = f.read(size - position)
+                position += len(data)
+                pending += data.decode(encoding, errors='replace')
+                *lines, pending = pending.split('\n')
+                for line in lines:
+                    emit(line)
+        except OSError:
+            pass
+        if stopping:
+            break
+        stop_event.wait(poll_interval)
+    if pending:
+        emit(pending)
+
+
+def run_streaming_process(cmd, cwd: str = None, timeout: float = None, on_line: Callable[[str], None] = None,
+                          tail_file: str = None, shell: bool = False, creationflags: int = 0,
+                          keep_lines: int = 200) -> Tuple[int, List[str]]:
+    """
+    启动进程并在后台线程中逐行读取输出，可同时跟踪进程写入的日志文件
+
+    只保留最后 keep_lines 行输出用于错误信息，完整输出通过 on_line 实时处理
+
+    Args:
+        cmd: 命令列表（shell模式下为字符串）
+        cwd: 工作目录
+        timeout: 超时时间（秒），超时后终止进程并抛出subprocess.TimeoutExpired
+        on_line: 行回调，在读取线程中调用
+        tail_file: 需要跟踪的日志文件（例如MDK的 -o 日志），启动前会删除旧文件
+        shell: 是否使用shell执行
+        creationflags: Windows进程创建标志
+        keep_lines: 保留的输出行数
+
+    Returns:
+        Tuple[int, List[str]]: (返回码, 最后若干行输出)
+    """
+    tail = deque(maxlen=keep_lines)
+    emit_lock = threading.Lock()
+
+    def emit(line: str):
+        line = line.rstrip('\r\n')
+        with emit_lock:
+            tail.append(line)
+            if on_line:
+                on_line(line)
+
+    if tail_file and os.path.exists(tail_file):
+        try:
+            os.remove(tail_file)
+        except OSError as e:
+            logger.warning(f"无法删除旧的编译日志，可能重复显示旧内容: {tail_file} ({e})")
+
+    encoding = _default_encoding()
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        cwd=cwd,
+        shell=shell,
+        creationflags=creationflags,
+        text=True,
+        encoding=encoding,
+        errors='replace',
+        bufsize=1
+    )
+
+    reader = threading.Thread(target=_read_pipe, args=(process.stdout, emit), name='BuildOutputReader', daemon=True)
+    reader.start()
+    stop_event = threading.Event()
+    tailer = None
+    if tail_file:
+        tailer = threading.Thread(target=_tail_file, args=(tail_file, emit, stop_event),
+                                  kwargs={'encoding': encoding}, name='BuildLogTailer', daemon=True)
+        tailer.start()
+
+    try:
+        returncode = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        reader.join(timeout=5)
+        stop_event.set()
+        if tailer:
+            tailer.join(timeout=5)
+
+    return returncode, list(tail)
+
+
+if __name__ == "__main__":
+    # 测试输出解析
+    monitor = BuildOutputMonitor('MDK', callback=lambda event: print(f"[{event.kind}] {event}"))
+    for sample_line in [
+        "Build target 'Debug'",
+        "compiling main.c...",
+        '..\\Src\\main.c(45): warning:  #550-D: variable "x"  was set but never used',
+        "../Src/uart.c:12:5: error: use of undeclared identifier 'y'",
+        "linking...",
+        ".\\Objects\\Proj.axf: Error: L6218E: Undefined symbol foo (referred from main.o).",
+        '".\\Objects\\Proj.axf" - 2 Error(s), 1 Warning(s).',
+    ]:
+        monitor.feed(sample_line)
+    print(monitor.format_summary())
+
+    # 测试流式执行
+    start = time.time()
+    code, last_lines = run_streaming_process(
+        ['python3', '-c', 'import time\nfor i in range(3):\n    print(f"compiling f{i}.c...", flush=True); time.sleep(0.2)'],
+        on_line=lambda line: print(f"{time.time() - start:.2f}s {line}"))
+    print(f"返回码: {code}, 输出行数: {len(last_lines)}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多配置并行编译调度模块
+根据CPU核心数和工具链自身的并行编译能力确定同时编译的配置数量，输出目录或编译状态文件冲突的配置串行编译
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from lib_logger import logger
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def plan_parallelism(job_count: int, cpu_count: int = None, threads_per_job: int = None,
+                     max_concurrent: int = None) -> Tuple[int, int]:
+    """
+    计算同时编译的任务数量和每个任务的编译线程数，使总线程数不超过CPU核心数
+
+    Args:
+        job_count: 可并行的任务数量
+        cpu_count: CPU核心数，为None时自动检测
+        threads_per_job: 工具链固定使用的编译线程数（无法通过命令行指定时传入），为None表示可由调度器分配
+        max_concurrent: 同时编译的任务数上限
+
+    Returns:
+        Tuple[int, int]: (同时编译的任务数, 每个任务的编译线程数)
+    """
+    cpu_count = max(1, cpu_count or os.cpu_count() or 1)
+    job_count = max(1, job_count)
+
+    if threads_per_job:
+        # 工具链线程数固定，只能通过减少同时编译的任务数避免超额占用CPU
+        threads_per_job = max(1, threads_per_job)
+        concurrent = max(1, min(job_count, cpu_count // threads_per_job))
+    else:
+        concurrent = min(job_count, cpu_count)
+    if max_concurrent:
+        concurrent = max(1, min(concurrent, max_concurrent))
+    if not threads_per_job:
+        threads_per_job = max(1, cpu_count // concurrent)
+    return concurrent, threads_per_job
+
+
+def _normalize_dir(path: str) -> str:
+    """归一化目录路径用于比较"""
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def group_isolated_lanes(configurations: List[Dict],
+                         shared_files: Callable[[Dict], List[str]] = None) -> List[List[Dict]]:
+    """
+    按输出目录和编译状态文件把配置分组：输出/列表目录相同（或互相包含）的配置，以及编译时写入同一文件的配置
+    放入同一组串行编译，不同组之间互不干扰可并行编译。
+    IAR同一项目文件的各配置编译时都会改写项目的 <project>.dep，即使输出目录不同也必须串行编译
+
+    Args:
+        configurations: 配置信息列表，使用 output_dir_abs 和 list_dir_abs
+        shared_files: 返回配置编译时写入的共享文件（如IAR项目文件，代表其.dep文件），为None时只比较目录
+
+    Returns:
+        List[List[Dict]]: 分组结果，组内保持原有顺序
+    """
+    parent = list(range(len(configurations)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def overlaps(first: str, second: str) -> bool:
+        return first == second or first.startswith(second + os.sep) or second.startswith(first + os.sep)
+
+    directories = []
+    for configuration in configurations:
+        dirs = {_normalize_dir(configuration[key]) for key in ('output_dir_abs', 'list_dir_abs')
+                if configuration.get(key)}
+        directories.append(dirs)
+    files = [{_normalize_dir(path) for path in shared_files(configuration) if path} if shared_files else set()
+             for configuration in configurations]
+
+    for i in range(len(configurations)):
+        for j in range(i + 1, len(configurations)):
+            if files[i] & files[j] or any(overlaps(a, b) for a in directories[i] for b in directories[j]):
+                parent[find(j)] = find(i)
+
+    lanes = {}
+    for index, configuration in enumerate(configurations):
+        lanes.setdefault(find(index), []).append(configuration)
+    return list(lanes.values())
+
+
+class BuildScheduler:
+    """多配置并行编译调度器"""
+
+    def __init__(self, configurations: List[Dict], cpu_count: int = None, threads_per_job: int = None,
+                 max_concurrent: int = None, shared_files: Callable[[Dict], List[str]] = None):
+        """
+        初始化调度器
+
+        Args:
+            configurations: 需要编译的配置信息列表
+            cpu_count: CPU核心数，为None时自动检测
+            threads_per_job: 工具链固定使用的编译线程数，为None表示由调度器分配
+            max_concurrent: 同时编译的配置数上限
+            shared_files: 返回配置编译时写入的共享文件，见 group_isolated_lanes
+        """
+        self.configurations = list(configurations)
+        self.lanes = group_isolated_lanes(self.configurations, shared_files)
+        self.concurrent, self.threads_per_job = plan_parallelism(
+            len(self.lanes), cpu_count, threads_per_job, max_concurrent)
+        self._lock = threading.Lock()
+
+        for lane in self.lanes:
+            if len(lane) > 1:
+                names = ', '.join(configuration.get('name', '') for configuration in lane)
+                logger.info(f"配置 {names} 输出目录或项目文件冲突，将串行编译")
+        logger.info(f"并行编译计划: {len(self.configurations)} 个配置, {len(self.lanes)} 组, "
+                    f"同时编译 {self.concurrent} 个, 每个 {self.threads_per_job} 线程")
+
+    def run(self, job: Callable[[Dict, int], Tuple[bool, str, dict]],
+            on_finished: Optional[Callable[[Dict, bool, str, dict], None]] = None) -> List[Dict]:
+        """
+        运行所有配置的编译任务
+
+        Args:
+            job: 单个配置的任务函数，参数为(配置信息, 编译线程数)，返回(是否成功, 消息, 详情)
+            on_finished: 每个配置完成后的回调，参数为(配置信息, 是否成功, 消息, 详情)
+
+        Returns:
+            List[Dict]: 按原配置顺序排列的结果 {'configuration', 'success', 'message', 'info', 'duration'}
+        """
+        results = {}
+
+        def run_lane(lane: List[Dict]):
+            for configuration in lane:
+                start_time = time.time()
+                try:
+                    success, message, info = job(configuration, self.threads_per_job)
+                except Exception as e:
+                    logger.error(f"配置 {configuration.get('name', '')} 编译任务异常: {e}")
+                    success, message, info = False, f"编译任务异常: {e}", {}
+                result = {
+                    'configuration': configuration,
+                    'success': success,
+                    'message': message,
+                    'info': info or {},
+                    'duration': time.time() - start_time
+                }
+                with self._lock:
+                    results[id(configuration)] = result
+                if on_finished:
+                    try:
+                        on_finished(configuration, success, message, result['info'])
+                    except Exception as e:
+                        logger.error(f"编译完成回调异常: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.concurrent, thread_name_prefix='build') as executor:
+            for future in [executor.submit(run_lane, lane) for lane in self.lanes]:
+                future.result()
+
+        return [results[id(configuration)] for configuration in self.configurations]
+
+    @staticmethod
+    def format_results(results: List[Dict]) -> List[str]:
+        """
+        生成各配置编译结果的摘要
+
+        Args:
+            results: run 的返回结果
+
+        Returns:
+            List[str]: 摘要行
+        """
+        succeeded = sum(1 for result in results if result['success'])
+        lines = [f"全部配置编译完成: 成功 {succeeded}/{len(results)}"]
+        for result in results:
+            name = result['configuration'].get('name', '')
+            status = '成功' if result['success'] else '失败'
+            first_line = (result['message'] or '').strip().split('\n')[0]
+            lines.append(f"{name}: {status} ({result['duration']:.1f}秒) {first_line}")
+        return lines
+
+
+if __name__ == "__main__":
+    # 测试调度：Debug/Release输出目录独立可并行，Debug_Test与Debug共用输出目录需串行
+    configurations = [
+        {'name': 'Debug', 'output_dir_abs': '/tmp/proj/Debug/Exe', 'list_dir_abs': '/tmp/proj/Debug/List'},
+        {'name': 'Release', 'output_dir_abs': '/tmp/proj/Release/Exe', 'list_dir_abs': '/tmp/proj/Release/List'},
+        {'name': 'Debug_Test', 'output_dir_abs': '/tmp/proj/Debug/Exe', 'list_dir_abs': '/tmp/proj/Debug/List'},
+    ]
+    scheduler = BuildScheduler(configurations, cpu_count=8)
+    print([[configuration['name'] for configuration in lane] for lane in scheduler.lanes])
+    print(f"同时编译 {scheduler.concurrent} 个, 每个 {scheduler.threads_per_job} 线程")
+
+    def fake_job(configuration, threads):
+        time.sleep(0.2)
+        return True, f"编译成功 ({threads} 线程)", {}
+
+    for line in BuildScheduler.format_results(scheduler.run(fake_job)):
+        print(line)
+    print(plan_parallelism(3, cpu_count=8, threads_per_job=8))
@@ -0,0 +1,750 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地编译服务
+常驻进程保持工具链注册表、项目文件缓存和各项目的路径管理器，通过本机HTTP接口接收编译发布任务，由工作线程池执行（同一项目的任务依次执行），并向客户端实时推送进度
+"""
+
+import os
+import sys
+import json
+import time
+import hmac
+import uuid
+import threading
+import urllib.error
+import urllib.request
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from lib_logger import logger
+from firmware_pipeline import FirmwarePipeline, PipelineHooks
+from batch_release import ToolchainLimiter, merge_project_config
+from worktree_manager import WorktreeManager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# 任务状态
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# 访问令牌请求头（服务监听非本机地址时使用）
+TOKEN_HEADER = 'X-Build-Token'
+
+# 指定工具链和发布目录的请求项，只在设置了访问令牌时接受（否则使用基础配置）
+TRUSTED_REQUEST_KEYS = ('tool_path', 'fw_publish_directory', 'remote_publish_directory')
+TRUSTED_CONFIG_KEYS = ('iar_installation_path', 'mdk_installation_path', 'fw_publish_directory',
+                       'remote_publish_directory', 'enable_remote_publish', 'worktree_directory')
+
+
+class BuildJob:
+    """编译发布任务：请求内容、状态和进度事件"""
+
+    def __init__(self, request: Dict):
+        """
+        Args:
+            request: 任务请求，格式与批量发布清单中的项目相同（path为项目绝对路径）
+        """
+        self.job_id = uuid.uuid4().hex[:12]
+        self.request = request
+        self.project_path = os.path.normcase(os.path.abspath(request['path']))
+        # 排队键为实际编译的目录，指定分支时由 BuildServer.submit 解析为工作树中的项目路径
+        self.project_key = self.project_path
+        self.state = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = {}
+        self.pipeline = None
+        # 已请求取消（任务开始执行但流程尚未创建时由 _execute 检查）
+        self.cancel_requested = False
+        self.events: List[Dict] = []
+        self._condition = threading.Condition()
+
+    def add_event(self, event_type: str, **fields):
+        """添加进度事件并通知等待的客户端"""
+        with self._condition:
+            event = dict(fields, seq=len(self.events), type=event_type,
+                         time=datetime.now().strftime('%H:%M:%S'))
+            self.events.append(event)
+            self._condition.notify_all()
+
+    def wait_events(self, since: int, timeout: float) -> List[Dict]:
+        """
+        获取序号不小于since的事件，没有新事件且任务未结束时最多等待timeout秒；
+        任务结束后 finished 事件一定已在列表中，没有新事件时立即返回空列表
+
+        Args:
+            since: 起始序号
+            timeout: 等待秒数
+
+        Returns:
+            List[Dict]: 事件列表
+        """
+        with self._condition:
+            if len(self.events) <= since and self.state not in FINISHED_STATES:
+                self._condition.wait(timeout)
+            return self.events[since:]
+
+    def finish(self, state: str, result: Dict = None):
+        """结束任务，最后一个事件为 finished（先添加事件再设置结束状态，看到结束状态时事件一定已存在）"""
+        with self._condition:
+            self.result = result or {}
+            self.add_event('finished', state=state, result=self.result)
+            self.finished_at = time.time()
+            self.state = state
+
+    def to_dict(self) -> Dict:
+        """任务摘要"""
+        return {
+            'job_id': self.job_id,
+            'name': self.request.get('name') or os.path.basename(self.request['path'].rstrip('\\/')),
+            'path': self.request['path'],
+            'branch': self.request.get('branch'),
+            'state': self.state,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(timespec='seconds'),
+            'duration': ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0,
+            'events': len(self.events),
+            'result': self.result
+        }
+
+
+class ServerPipelineHooks(PipelineHooks):
+    """编译服务回调：流程中的日志、阶段和编译输出转为任务事件"""
+
+    def __init__(self, job: BuildJob):
+        super().__init__(assume_yes=job.request.get('assume_yes', True))
+        self.job = job
+
+    def log(self, message: str):
+        logger.info(f"[{self.job.job_id}] {message}")
+        self.job.add_event('log', message=message)
+
+    def status(self, message: str):
+        self.job.add_event('status', message=message)
+
+    def build_output(self, event, configuration_name: str = None):
+        self.job.add_event('output', event=event.to_dict(), configuration=configuration_name)
+
+    def on_version(self, current_version, next_version: str):
+        self.job.add_event('version', current=current_version, next=next_version)
+
+    def ask_commit_message(self, default_message: str) -> str:
+        message = self.job.request.get('message')
+        return f"{default_message} - {message}" if message else default_message
+
+    def show_error(self, title_key: str, message: str):
+        self.job.add_event('error', title=self.text(title_key), message=message)
+
+    def show_success(self, message: str):
+        self.job.add_event('success', message=message)
+
+
+class ProjectState:
+    """项目的常驻状态：路径管理器和信息文件路径在同一项目的任务之间复用"""
+
+    def __init__(self):
+        self.compile_tool = None
+        self.path_manager = None
+        self.cached_info_file_path = None
+        self.builds = 0
+
+
+class BuildServer:
+    """编译服务：任务队列、工作线程池和各项目的常驻状态"""
+
+    MAX_FINISHED_JOBS = 200
+
+    def __init__(self, base_config: Dict, workers: int = 2, toolchain_limits: Dict[str, int] = None,
+                 token: str = None):
+        """
+        初始化编译服务
+
+        Args:
+            base_config: 基础配置，任务请求中的配置在其之上覆盖
+            workers: 工作线程数（同时执行的任务数）
+            toolchain_limits: {编译工具: 同时编译数上限}
+            token: 访问令牌，为None时不校验
+        """
+        from project_watcher import ProjectWatcher
+
+        self.base_config = base_config
+        self.workers = max(1, workers)
+        self.limiter = ToolchainLimiter(toolchain_limits)
+        self.token = token
+        self.started_at = time.time()
+        self.project_watcher = ProjectWatcher()
+        self._jobs: Dict[str, BuildJob] = {}
+        self._queue: deque = deque()
+        self._finished: deque = deque()
+        self._running_projects = set()
+        self._projects: Dict[str, ProjectState] = {}
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+
+    def warm_up(self):
+        """预先加载工具链模块和工具链注册表，避免第一个任务承担导入和探测的耗时"""
+        import importlib
+        from toolchain_registry import get_toolchain_registry
+
+        registry = get_toolchain_registry()
+        for compile_tool, key in (('IAR', 'iar_installation_path'), ('MDK', 'mdk_installation_path')):
+            try:
+                package = importlib.import_module(f"lib_{compile_tool}")
+                for name in package.__all__:
+                    getattr(package, name)
+            except Exception as e:
+                logger.warning(f"预加载{compile_tool}模块失败: {e}")
+                continue
+            installation_path = self.base_config.get(key, '')
+            if installation_path:
+                exe_path = registry.find_executable(compile_tool, installation_path)
+                if exe_path:
+                    registry.probe(compile_tool, exe_path)
+                    logger.info(f"{compile_tool}工具链: {exe_path}")
+
+    def start(self):
+        """启动文件监视和工作线程"""
+        self.project_watcher.start()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f'BuildWorker-{index + 1}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"编译服务已启动: {self.workers} 个工作线程")
+
+    def stop(self):
+        """停止服务：取消排队的任务，通知正在执行的任务取消"""
+        with self._condition:
+            self._stopping = True
+            queued = list(self._queue)
+            self._queue.clear()
+            running = [job for job in self._jobs.values() if job.state == JOB_RUNNING]
+            self._condition.notify_all()
+        for job in queued:
+            job.finish(JOB_CANCELLED, {'message': "编译服务已停止"})
+        for job in running:
+            self._cancel_running(job)
+        self.project_watcher.stop()
+
+    @staticmethod
+    def _resolve_project_key(project_path: str, branch: str) -> str:
+        """
+        指定分支的任务的排队键：分支工作树中的项目路径。
+        分支已在主工作区检出时与不指定分支的任务在同一目录编译，得到相同的键
+
+        Args:
+            project_path: 项目路径
+            branch: 分支名称
+
+        Returns:
+            str: 排队键
+        """
+        manager = WorktreeManager(project_path)
+        worktree_root = manager.resolve(branch)
+        if not worktree_root:
+            # 不是Git仓库，任务执行时切换分支会失败，按项目和分支排队
+            return f"{os.path.normcase(os.path.abspath(project_path))}@{branch}"
+        return os.path.normcase(manager.map_path(project_path, worktree_root))
+
+    def submit(self, request: Dict) -> BuildJob:
+        """
+        提交任务
+
+        Args:
+            request: 任务请求 {'path', 'name', 'branch', 'compile_tool', 'tool_path', 'configuration', 'build_all',
+                     'message', 'fw_publish_directory', 'remote_publish_directory', 'config', 'assume_yes'}，
+                     未设置访问令牌时忽略其中指定工具链和发布目录的项
+
+        Returns:
+            BuildJob: 任务
+
+        Raises:
+            ValueError: 请求无效
+        """
+        if not isinstance(request, dict) or not request.get('path'):
+            raise ValueError("任务请求缺少项目路径(path)")
+        if not os.path.isabs(request['path']):
+            raise ValueError(f"项目路径必须是绝对路径: {request['path']}")
+        if not os.path.isdir(request['path']):
+            raise ValueError(f"项目路径不存在: {request['path']}")
+
+        ignored = []
+        if not self.token:
+            request, ignored = self._drop_trusted_keys(request)
+        job = BuildJob(request)
+        if ignored:
+            job.add_event('log', message=f"编译服务未设置访问令牌，忽略请求中的: {', '.join(ignored)}")
+        if request.get('branch'):
+            job.project_key = self._resolve_project_key(request['path'], request['branch'])
+        with self._condition:
+            if self._stopping:
+                raise ValueError("编译服务正在停止")
+            self._jobs[job.job_id] = job
+            self._queue.append(job)
+            position = len(self._queue)
+            self._condition.notify_all()
+        job.add_event('status', message=f"任务已排队，前面还有 {position - 1} 个任务")
+        logger.info(f"任务 {job.job_id} 已提交: {request['path']}")
+        return job
+
+    @staticmethod
+    def _drop_trusted_keys(request: Dict) -> Tuple[Dict, List[str]]:
+        """
+        去掉请求中指定工具链和发布目录的项（未设置访问令牌时任何本机网页都可能提交任务）
+
+        Args:
+            request: 任务请求
+
+        Returns:
+            Tuple[Dict, List[str]]: (去掉这些项后的请求, 被忽略的项)
+        """
+        request = dict(request)
+        ignored = [key for key in TRUSTED_REQUEST_KEYS if request.pop(key, None) is not None]
+        if isinstance(request.get('config'), dict):
+            config = dict(request['config'])
+            ignored += [f"config.{key}" for key in TRUSTED_CONFIG_KEYS if config.pop(key, None) is not None]
+            request['config'] = config
+        return request, ignored
+
+    def get_job(self, job_id: str) -> Optional[BuildJob]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict]:
+        with self._condition:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务：排队中的任务直接取消，正在执行的任务在当前阶段完成后停止
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            bool: 任务是否存在且未结束
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if not job or job.state in FINISHED_STATES:
+                return False
+            if job in self._queue:
+                self._queue.remove(job)
+                queued = True
+            else:
+                queued = False
+        if queued:
+            job.finish(JOB_CANCELLED, {'message': "任务已取消"})
+            self._record_finished(job)
+        else:
+            self._cancel_running(job)
+            job.add_event('status', message="正在取消，当前阶段完成后停止")
+        return True
+
+    def _cancel_running(self, job: BuildJob):
+        """取消正在执行的任务：记录取消请求，流程已创建时通知流程取消"""
+        with self._condition:
+            job.cancel_requested = True
+            pipeline = job.pipeline
+        if pipeline:
+            pipeline.cancel()
+
+    def status(self) -> Dict:
+        """服务状态"""
+        with self._condition:
+            return {
+                'uptime': time.time() - self.started_at,
+                'workers': self.workers,
+                'queued': len(self._queue),
+                'running': sorted(self._running_projects),
+                'projects': {path: {'compile_tool': state.compile_tool, 'builds': state.builds}
+                             for path, state in self._projects.items()},
+                'watcher': self.project_watcher.backend
+            }
+
+    def _next_job(self) -> Optional[BuildJob]:
+        """
+        取出队列中第一个所属项目（分支）没有任务在执行的任务（同一项目同一分支的任务依次执行）。
+        同一仓库（工作树）中的不同项目可以同时执行，修改版本号到提交完成的阶段由
+        GitManager.worktree_lock 按仓库根目录串行执行，各任务只提交自己的更改
+        """
+        with self._condition:
+            while not self._stopping:
+                for job in self._queue:
+                    if job.project_key not in self._running_projects:
+                        self._queue.remove(job)
+                        self._running_projects.add(job.project_key)
+                        job.state = JOB_RUNNING
+                        return job
+                self._condition.wait()
+            return None
+
+    def _worker_loop(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._execute(job)
+            except Exception as e:
+                logger.error(f"任务 {job.job_id} 执行异常: {e}")
+                job.finish(JOB_FAILED, {'message': f"任务执行异常: {e}"})
+            finally:
+                with self._condition:
+                    self._running_projects.discard(job.project_key)
+                    self._condition.notify_all()
+                self._record_finished(job)
+
+    def _record_finished(self, job: BuildJob):
+        """保留最近结束的任务，超出数量时删除最早的任务"""
+        with self._condition:
+            self._finished.append(job.job_id)
+            while len(self._finished) > self.MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.popleft(), None)
+
+    def _execute(self, job: BuildJob):
+        """执行任务：复用项目的常驻状态创建编译发布流程并执行"""
+        job.started_at = time.time()
+        if job.cancel_requested:
+            job.finish(JOB_CANCELLED, {'message': "任务已取消"})
+            return
+        request = job.request
+        config = merge_project_config(self.base_config, request)
+        compile_tool = config.get('compile_tool', 'IAR')
+        hooks = ServerPipelineHooks(job)
+
+        with self._condition:
+            state = self._projects.setdefault(job.project_key, ProjectState())
+
+        pipeline = FirmwarePipeline(config, request['path'], hooks, self.project_watcher)
+        pipeline.toolchain_limiter = self.limiter
+        with self._condition:
+            job.pipeline = pipeline
+            cancel_requested = job.cancel_requested
+        if cancel_requested:
+            # 创建流程期间收到的取消请求
+            pipeline.cancel()
+            job.finish(JOB_CANCELLED, {'message': "任务已取消"})
+            return
+        if request.get('branch'):
+            success, message = pipeline.use_branch(request['branch'])
+            if not success:
+                hooks.show_error('msg_error', message)
+                job.finish(JOB_FAILED, {'message': message})
+                return
+        if state.compile_tool == compile_tool:
+            pipeline.path_manager = state.path_manager
+            pipeline.cached_info_file_path = state.cached_info_file_path
+
+        pipeline.discover_paths()
+        if not pipeline.load_configurations(request.get('configuration')):
+            job.finish(JOB_FAILED, {'message': "未能选择编译配置"})
+            return
+
+        success, message, info = pipeline.run()
+
+        state.compile_tool = compile_tool
+        state.path_manager = pipeline.path_manager
+        state.cached_info_file_path = pipeline.cached_info_file_path
+        state.builds += 1
+
+        result = {
+            'success': success,
+            'message': message,
+            'version': info.get('version'),
+            'commit_id': info.get('commit_id'),
+            'resumed': info.get('resumed', False),
+            'duration': info.get('duration', 0.0)
+        }
+        if success:
+            job.finish(JOB_SUCCEEDED, result)
+        elif pipeline.cancelled:
+            job.finish(JOB_CANCELLED, result)
+        else:
+            job.finish(JOB_FAILED, result)
+
+
+class BuildRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP接口:
+        GET  /status                 服务状态
+        GET  /jobs                   任务列表
+        POST /jobs                   提交任务，请求体为任务请求JSON（Content-Type: application/json），返回任务摘要
+        GET  /jobs/<id>              任务摘要
+        GET  /jobs/<id>/events       逐行输出任务事件（JSON Lines），直到任务结束；?since=N 从第N个事件开始
+        POST /jobs/<id>/cancel       取消任务
+    """
+
+    server_version = 'EFMBuildServer/1.0'
+
+    @property
+    def build_server(self) -> BuildServer:
+        return self.server.build_server
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, data):
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        token = self.build_server.token
+        if token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, '').encode('utf-8'),
+                                             token.encode('utf-8')):
+            self._send_json(401, {'error': "访问令牌无效"})
+            return False
+        return True
+
+    def _same_origin(self) -> bool:
+        """拒绝来自其他网页的请求（浏览器跨站提交时带有其他来源的Origin请求头）"""
+        origin = self.headers.get('Origin')
+        if origin is not None and urlparse(origin).netloc.lower() != (self.headers.get('Host') or '').lower():
+            self._send_json(403, {'error': f"不接受来自其他来源的请求: {origin}"})
+            return False
+        return True
+
+    def _job_or_404(self, job_id: str) -> Optional[BuildJob]:
+        job = self.build_server.get_job(job_id)
+        if not job:
+            self._send_json(404, {'error': f"任务不存在: {job_id}"})
+        return job
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ['status']:
+            self._send_json(200, self.build_server.status())
+        elif parts == ['jobs']:
+            self._send_json(200, self.build_server.list_jobs())
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self._job_or_404(parts[1])
+            if job:
+                self._send_json(200, job.to_dict())
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            job = self._job_or_404(parts[1])
+            if job:
+                since = int(parse_qs(url.query).get('since', ['0'])[0] or 0)
+                self._stream_events(job, since)
+        else:
+            self._send_json(404, {'error': f"未知路径: {url.path}"})
+
+    def do_POST(self):
+        if not self._authorized() or not self._same_origin():
+            return
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+        if parts == ['jobs']:
+            if self.headers.get_content_type() != 'application/json':
+                self._send_json(415, {'error': "请求体必须是JSON（Content-Type: application/json）"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+                job = self.build_server.submit(request)
+                self._send_json(202, job.to_dict())
+            except (ValueError, json.JSONDecodeError) as e:
+                self._send_json(400, {'error': str(e)})
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+            job = self._job_or_404(parts[1])
+            if job:
+                cancelled = self.build_server.cancel(job.job_id)
+                self._send_json(200, {'job_id': job.job_id, 'cancelled': cancelled, 'state': job.state})
+        else:
+            self._send_json(404, {'error': f"未知路径: {self.path}"})
+
+    def _stream_events(self, job: BuildJob, since: int):
+        """逐行发送任务事件直到任务结束（连接在响应结束后关闭）"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while True:
+                events = job.wait_events(since, timeout=1.0)
+                for event in events:
+                    self.wfile.write((json.dumps(event, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+                self.wfile.flush()
+                since += len(events)
+                if events and events[-1]['type'] == 'finished':
+                    return
+                if not events and job.state in FINISHED_STATES:
+                    # 从结束事件之后开始读取（客户端重连）
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端断开不影响任务执行
+            return
+
+
+class BuildServerClient:
+    """编译服务客户端"""
+
+    def __init__(self, url: str = None, token: str = None, timeout: float = 10.0):
+        """
+        Args:
+            url: 服务地址，默认 http://127.0.0.1:8765
+            token: 访问令牌
+            timeout: 普通请求的超时秒数
+        """
+        self.url = (url or f"http://{DEFAULT_HOST}:{DEFAULT_PORT}").rstrip('/')
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, data: Dict = None, timeout: float = None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8') if data is not None else None
+        request = urllib.request.Request(f"{self.url}{path}", data=body, method=method)
+        request.add_header('Content-Type', 'application/json; charset=utf-8')
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        return urllib.request.urlopen(request, timeout=timeout or self.timeout)
+
+    def _call(self, method: str, path: str, data: Dict = None) -> Dict:
+        try:
+            with self._request(method, path, data) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error', str(e))
+            except Exception:
+                message = str(e)
+            raise RuntimeError(message) from None
+
+    def status(self) -> Dict:
+        return self._call('GET', '/status')
+
+    def submit(self, request: Dict) -> Dict:
+        return self._call('POST', '/jobs', request)
+
+    def get_job(self, job_id: str) -> Dict:
+        return self._call('GET', f'/jobs/{job_id}')
+
+    def cancel(self, job_id: str) -> Dict:
+        return self._call('POST', f'/jobs/{job_id}/cancel')
+
+    def stream_events(self, job_id: str, since: int = 0) -> Iterator[Dict]:
+        """
+        逐个获取任务事件直到任务结束
+
+        Args:
+            job_id: 任务ID
+            since: 起始序号
+
+        Yields:
+            Dict: 事件
+        """
+        with self._request('GET', f'/jobs/{job_id}/events?since={since}', timeout=3600) as response:
+            for line in response:
+                line = line.strip()
+                if line:
+                    yield json.loads(line.decode('utf-8'))
+
+    def run_job(self, request: Dict, on_event: Callable[[Dict], None] = None) -> Dict:
+        """
+        提交任务并等待结束
+
+        Args:
+            request: 任务请求
+            on_event: 每个事件的回调
+
+        Returns:
+            Dict: 任务结束事件 {'state', 'result'}
+        """
+        job = self.submit(request)
+        finished = {'state': JOB_FAILED, 'result': {'message': "连接中断"}}
+        for event in self.stream_events(job['job_id']):
+            if on_event:
+                on_event(event)
+            if event['type'] == 'finished':
+                finished = event
+        finished['job_id'] = job['job_id']
+        return finished
+
+
+def serve(base_config: Dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 2,
+          toolchain_limits: Dict[str, int] = None, token: str = None):
+    """
+    启动编译服务并一直运行，Ctrl+C 停止
+
+    Args:
+        base_config: 基础配置
+        host: 监听地址，默认只监听本机
+        port: 端口
+        workers: 工作线程数
+        toolchain_limits: {编译工具: 同时编译数上限}
+        token: 访问令牌
+    """
+    if host not in ('127.0.0.1', 'localhost', '::1') and not token:
+        logger.warning("编译服务监听非本机地址且未设置访问令牌，局域网内的任何人都可以提交任务")
+
+    build_server = BuildServer(base_config, workers, toolchain_limits, token)
+    build_server.warm_up()
+    build_server.start()
+
+    httpd = ThreadingHTTPServer((host, port), BuildRequestHandler)
+    httpd.daemon_threads = True
+    httpd.build_server = build_server
+    logger.info(f"编译服务监听 http://{host}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        build_server.stop()
+        logger.info("编译服务已停止")
+
+
+def main(argv=None) -> int:
+    """启动编译服务的命令行入口"""
+    import argparse
+    from build_cli import CONFIG_CANDIDATES, find_config_file
+
+    parser = argparse.ArgumentParser(description="本地编译服务：常驻进程执行编译发布任务")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"监听地址，默认 {DEFAULT_HOST}")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"端口，默认 {DEFAULT_PORT}")
+    parser.add_argument('--config', help=f"基础配置文件，默认依次查找: {', '.join(CONFIG_CANDIDATES)}")
+    parser.add_argument('--workers', type=int, default=2, help="同时执行的任务数（同一项目的任务依次执行）")
+    parser.add_argument('--toolchain-limit', action='append', default=[], metavar='TOOL=N',
+                        help="编译工具同时编译数上限，例如 IAR=1，可重复指定")
+    parser.add_argument('--token', default=os.environ.get('EFM_BUILD_SERVER_TOKEN'),
+                        help="访问令牌（默认读取环境变量 EFM_BUILD_SERVER_TOKEN）")
+    args = parser.parse_args(argv)
+
+    config_path = find_config_file(args.config)
+    if not config_path:
+        print(f"未找到配置文件: {args.config or ', '.join(CONFIG_CANDIDATES)}", file=sys.stderr)
+        return 2
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            base_config = json.load(f)
+        toolchain_limits = {}
+        for item in args.toolchain_limit:
+            tool, _, limit = item.partition('=')
+            toolchain_limits[tool.strip().upper()] = int(limit)
+    except Exception as e:
+        print(f"启动参数错误: {e}", file=sys.stderr)
+        return 2
+
+    serve(base_config, args.host, args.port, args.workers, toolchain_limits, args.token)
+    return 0
+
+
+__all__ = ['BuildJob', 'BuildServer', 'BuildServerClient', 'serve', 'DEFAULT_HOST', 'DEFAULT_PORT']
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,7 @@
 根据编译工具类型创建相应的构建器
 """
 
-from lib_IAR.builder import IARBuilder
-from lib_MDK.builder import MDKBuilder
+# 各编译工具的模块在创建实例时才导入，只加载实际使用的工具链，缩短启动时间
 
 
 class BuilderFactory:
@@ -25,13 +24,12 @@ class BuilderFactory:
         Returns:
             相应的构建器实例
         """
-        if compile_tool == 'IAR':
-            return IARBuilder(config, configuration)
-        elif compile_tool == 'MDK':
+        if compile_tool == 'MDK':
+            from lib_MDK.builder import MDKBuilder
             return MDKBuilder(config, configuration)
-        else:
-            # 默认使用IAR
-            return IARBuilder(config, configuration)
+        # 默认使用IAR
+        from lib_IAR.builder import IARBuilder
+        return IARBuilder(config, configuration)
     
     @staticmethod
     def get_common_methods():
@@ -49,7 +47,10 @@ class BuilderFactory:
             'check_bin_file',
             'get_bin_file_info',
             'get_build_info',
-            'diagnose_environment'
+            'diagnose_environment',
+            'set_output_callback',
+            'set_parallel_jobs',
+            'get_executable_path'
         ]
     
     @staticmethod
@@ -61,7 +62,8 @@ class BuilderFactory:
             list: IAR独有方法名列表
         """
         return [
-            'test_iar_command'
+            'test_iar_command',
+            'build_workspace_batch'
         ]
     
     @staticmethod
@@ -75,7 +77,8 @@ class BuilderFactory:
         return [
             'test_mdk_command',
             'get_build_output_path',
-            'check_build_output'
+            'check_build_output',
+            'build_multi_project'
         ]
 
 
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译依赖索引模块
+解析IAR(.dep)和Keil(.d/.dep)编译器生成的依赖文件，建立头文件到编译单元的反向索引，预测修改文件后需要重新编译的范围和耗时
+"""
+
+import os
+import re
+import glob
+import json
+import hashlib
+import threading
+from lib_logger import logger
+from parse_cache import ParseCache, get_cache_root
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+# 编译单元（源文件）扩展名
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx', '.s', '.asm', '.s79')
+
+# make格式依赖规则: .\objects\main.o: ..\Src\main.c
+_MAKE_RULE = re.compile(r'^(?P<target>\S.*?\.(?:o|obj))\s*:\s*(?P<deps>.*)$', re.IGNORECASE)
+# Keil项目依赖文件: F (..\Src\main.c)(0x5F1234AB)(...) / I (..\Inc\main.h)(0x5F1234AB)
+_KEIL_DEP = re.compile(r'^(?P<kind>[FI])\s+\((?P<path>[^)]+)\)\(0x[0-9A-Fa-f]+\)')
+
+
+def _normalize(path: str, base_dir: str) -> str:
+    """依赖文件中的路径转换为与源文件清单一致的绝对路径"""
+    path = path.strip().strip('"').replace('\\', os.sep)
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def _add_unit(units: Dict[str, List[str]], source: str, headers: Iterable[str]):
+    """合并编译单元的依赖"""
+    dependencies = units.setdefault(source, [])
+    for header in headers:
+        if header != source and header not in dependencies:
+            dependencies.append(header)
+
+
+def parse_make_dependencies(text: str, base_dir: str) -> Dict[str, List[str]]:
+    """
+    解析make格式的依赖文件（Keil armcc/armclang的.d文件，IAR --dependencies=m 输出）
+
+    Args:
+        text: 依赖文件内容
+        base_dir: 相对路径的基准目录（编译时的工作目录，即项目文件所在目录）
+
+    Returns:
+        Dict[str, List[str]]: {源文件: [依赖的头文件]}
+    """
+    # 合并续行，转义的空格替换为占位符后再按空白分割
+    text = re.sub(r'\\\r?\n', ' ', text).replace('\\ ', '\0')
+    rules: Dict[str, List[str]] = {}
+    for line in text.splitlines():
+        match = _MAKE_RULE.match(line.strip())
+        if not match:
+            continue
+        deps = rules.setdefault(match.group('target'), [])
+        deps.extend(item.replace('\0', ' ') for item in match.group('deps').split())
+
+    units: Dict[str, List[str]] = {}
+    for deps in rules.values():
+        paths = [_normalize(dep, base_dir) for dep in deps if dep]
+        sources = [path for path in paths if path.endswith(SOURCE_EXTENSIONS)]
+        if sources:
+            _add_unit(units, sources[0], paths)
+    return units
+
+
+def parse_keil_project_dependencies(text: str, base_dir: str) -> Dict[str, List[str]]:
+    """
+    解析Keil目标依赖文件（Objects目录下的<项目>_<目标>.dep）
+
+    Args:
+        text: 依赖文件内容
+        base_dir: 相对路径的基准目录（项目文件所在目录）
+
+    Returns:
+        Dict[str, List[str]]: {源文件: [依赖的头文件]}
+    """
+    units: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        match = _KEIL_DEP.match(line.strip())
+        if not match:
+            continue
+        path = _normalize(match.group('path'), base_dir)
+        if match.group('kind') == 'F':
+            current = path
+            units.setdefault(current, [])
+        elif current:
+            _add_unit(units, current, [path])
+    return units
+
+
+def parse_iar_dependencies(dep_path: str, project_dir: str) -> Dict[str, Dict[str, List[str]]]:
+    """
+    解析IAR项目依赖文件（项目目录下的<项目>.dep，XML格式）
+
+    新版本格式中工具输入以输出表(outputs)中的序号列出，旧版本格式直接列出路径，两种都支持
+
+    Args:
+        dep_path: 依赖文件路径
+        project_dir: 项目文件所在目录（$PROJ_DIR$）
+
+    Returns:
+        Dict[str, Dict[str, List[str]]]: {配置名称: {源文件: [依赖的头文件]}}
+    """
+    from lib_IAR.project_analyzer import IARProjectAnalyzer
+
+    def resolve(path: str) -> str:
+        path = IARProjectAnalyzer._resolve_macro_path(path, project_dir)
+        return os.path.normcase(os.path.abspath(path)) if path else ''
+
+    result: Dict[str, Dict[str, List[str]]] = {}
+    root = ET.parse(dep_path).getroot()
+    for configuration in root.findall('configuration'):
+        name = (configuration.findtext('name') or '').strip()
+        table_node = configuration.find('outputs')
+        table = [(item.text or '').strip() for item in table_node.findall('file')] if table_node is not None else []
+
+        units: Dict[str, List[str]] = {}
+        for file_node in configuration.findall('file'):
+            source = resolve(file_node.findtext('name') or '')
+            if not source or not source.endswith(SOURCE_EXTENSIONS):
+                continue
+            headers = []
+            for item in file_node.iterfind('inputs/tool/file'):
+                tokens = (item.text or '').split()
+                if tokens and all(token.isdigit() for token in tokens):
+                    paths = [table[int(token)] for token in tokens if int(token) < len(table)]
+                else:
+                    paths = [(item.text or '').strip()]
+                headers.extend(resolve(path) for path in paths if path)
+            _add_unit(units, source, [header for header in headers if header])
+        result[name] = units
+    return result
+
+
+class DependencyIndex:
+    """编译单元依赖索引及其反向索引（头文件 -> 编译单元）"""
+
+    def __init__(self, units: Dict[str, List[str]] = None):
+        """
+        初始化依赖索引
+
+        Args:
+            units: {源文件: [依赖的头文件]}
+        """
+        self.units = units or {}
+        self.reverse: Dict[str, set] = {}
+        for source, headers in self.units.items():
+            for header in headers:
+                self.reverse.setdefault(header, set()).add(source)
+
+    def all_files(self) -> List[str]:
+        """索引中的全部文件（编译单元及其依赖的头文件）"""
+        return sorted(set(self.units) | set(self.reverse))
+
+    @property
+    def unit_count(self) -> int:
+        """编译单元数量"""
+        return len(self.units)
+
+    def affected_units(self, changed_files: Iterable[str]) -> List[str]:
+        """
+        获取修改的文件会导致重新编译的编译单元
+
+        Args:
+            changed_files: 修改的文件（绝对路径，与源文件清单一致）
+
+        Returns:
+            List[str]: 需要重新编译的源文件
+        """
+        affected = set()
+        for path in changed_files:
+            if path in self.units:
+                affected.add(path)
+            affected.update(self.reverse.get(path, ()))
+        return sorted(affected)
+
+
+def find_dependency_files(compile_tool: str, project_file: str, configuration: Dict) -> List[str]:
+    """
+    查找配置对应的编译器依赖文件
+
+    IAR: 项目目录下的<项目>.dep，以及目标文件目录(Exe目录同级的Obj)中的.d文件；
+    MDK: 输出目录(Objects)中的.d和.dep文件
+
+    Args:
+        compile_tool: 编译工具，'IAR' 或 'MDK'
+        project_file: 项目文件路径
+        configuration: 编译配置信息
+
+    Returns:
+        List[str]: 依赖文件路径
+    """
+    output_dir = configuration.get('output_dir_abs', '')
+    files = []
+    if compile_tool == 'IAR':
+        project_dep = f"{os.path.splitext(project_file)[0]}.dep"
+        if os.path.isfile(project_dep):
+            files.append(project_dep)
+        if output_dir:
+            files.extend(glob.glob(os.path.join(os.path.dirname(output_dir), 'Obj', '*.d')))
+    elif output_dir:
+        files.extend(glob.glob(os.path.join(output_dir, '*.d')))
+        files.extend(glob.glob(os.path.join(output_dir, '*.dep')))
+    return sorted(set(files))
+
+
+class DependencyIndexLoader:
+    """依赖索引加载器：逐个解析依赖文件，解析结果按文件修改时间缓存"""
+
+    # 解析器版本，解析逻辑变化时递增，使旧的磁盘缓存失效
+    PARSER_VERSION = 1
+
+    def __init__(self, use_cache: bool = True):
+        """
+        初始化依赖索引加载器
+
+        Args:
+            use_cache: 是否使用磁盘解析缓存
+        """
+        self.parse_cache = ParseCache('dependency_files') if use_cache else None
+
+    def _parse_file(self, dep_path: str, project_dir: str) -> Dict:
+        """解析单个依赖文件，返回 {配置名称或'*': 编译单元}"""
+        if self.parse_cache:
+            cached = self.parse_cache.load(dep_path, self.PARSER_VERSION)
+            if cached is not None:
+                return cached
+
+        with open(dep_path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        if text.lstrip().startswith('<'):
+            # IAR项目依赖文件为XML格式
+            result = parse_iar_dependencies(dep_path, project_dir)
+        elif dep_path.lower().endswith('.dep'):
+            result = {'*': parse_keil_project_dependencies(text, project_dir)}
+        else:
+            result = {'*': parse_make_dependencies(text, project_dir)}
+
+        if self.parse_cache:
+            self.parse_cache.save(dep_path, self.PARSER_VERSION, result)
+        return result
+
+    def load(self, compile_tool: str, project_file: str, configuration: Dict,
+             configuration_name: str) -> Optional[DependencyIndex]:
+        """
+        加载配置的依赖索引
+
+        Args:
+            compile_tool: 编译工具，'IAR' 或 'MDK'
+            project_file: 项目文件路径
+            configuration: 编译配置信息
+            configuration_name: 实际编译的配置名称
+
+        Returns:
+            Optional[DependencyIndex]: 依赖索引，没有依赖文件（从未编译过）时返回None
+        """
+        project_dir = os.path.dirname(os.path.abspath(project_file))
+        units: Dict[str, List[str]] = {}
+        for dep_path in find_dependency_files(compile_tool, project_file, configuration):
+            try:
+                parsed = self._parse_file(dep_path, project_dir)
+            except Exception as e:
+                logger.warning(f"解析依赖文件失败，忽略: {dep_path} ({e})")
+                continue
+            for source, headers in parsed.get(configuration_name, parsed.get('*', {})).items():
+                _add_unit(units, source, headers)
+        if not units:
+            return None
+        logger.debug(f"依赖索引: {len(units)} 个编译单元")
+        return DependencyIndex(units)
+
+
+class CompileTimeHistory:
+    """各源文件的历史编译耗时（指数滑动平均），按项目文件/配置保存"""
+
+    CACHE_NAMESPACE = 'compile_times'
+    # 新样本权重
+    SMOOTHING = 0.5
+    # 没有任何历史记录时每个编译单元的估计耗时(秒)
+    DEFAULT_SECONDS = 1.0
+
+    def __init__(self, project_file: str, configuration: str, cache_dir: str = None):
+        """
+        初始化编译耗时历史
+
+        Args:
+            project_file: 项目文件路径
+            configuration: 配置名称
+            cache_dir: 存储目录，默认为程序缓存目录下的compile_times
+        """
+        directory = cache_dir or os.path.join(get_cache_root(), self.CACHE_NAMESPACE)
+        text = f"{os.path.normcase(os.path.abspath(project_file))}|{configuration}"
+        self.path = os.path.join(directory, f"{hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]}.json")
+        self._lock = threading.Lock()
+        self.times = self._load()
+
+    def _load(self) -> Dict[str, float]:
+        """读取历史记录"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"读取编译耗时历史失败，重新记录: {e}")
+            return {}
+
+    def record(self, compile_times: Dict[str, float]) -> bool:
+        """
+        记录一次编译中各源文件的耗时
+
+        Args:
+            compile_times: {源文件名: 耗时(秒)}，编译输出监视器的 compile_times
+
+        Returns:
+            bool: 是否成功
+        """
+        if not compile_times:
+            return False
+        try:
+            with self._lock:
+                for name, seconds in compile_times.items():
+                    key = name.lower()
+                    old = self.times.get(key)
+                    self.times[key] = seconds if old is None else old + self.SMOOTHING * (seconds - old)
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.times, f, ensure_ascii=False, indent=1)
+                os.replace(temp_path, self.path)
+            return True
+        except Exception as e:
+            logger.error(f"保存编译耗时历史失败: {e}")
+            return False
+
+    def estimate(self, sources: Iterable[str]) -> float:
+        """
+        估计编译指定源文件的耗时，没有记录的文件按已记录文件的平均耗时计算
+
+        Args:
+            sources: 源文件路径
+
+        Returns:
+            float: 估计耗时(秒)
+        """
+        average = sum(self.times.values()) / len(self.times) if self.times else self.DEFAULT_SECONDS
+        return sum(self.times.get(os.path.basename(source).lower(), average) for source in sources)
+
+
+def predict_rebuild(index: DependencyIndex, changed_files: Iterable[str], history: CompileTimeHistory = None,
+                    near_full_ratio: float = 0.8) -> Dict:
+    """
+    预测修改文件后的重新编译范围
+
+    Args:
+        index: 依赖索引
+        changed_files: 修改的文件
+        history: 编译耗时历史，用于估计耗时
+        near_full_ratio: 需要重新编译的编译单元比例达到该值时视为接近完整编译
+
+    Returns:
+        Dict: {'units', 'total', 'ratio', 'estimated_seconds', 'full_seconds', 'near_full', 'triggers'}，
+              triggers 为导致重新编译最多的修改文件 [(文件, 编译单元数)]
+    """
+    changed_files = list(changed_files)
+    units = index.affected_units(changed_files)
+    total = index.unit_count
+    ratio = len(units) / total if total else 0.0
+    triggers = sorted(((path, len(index.affected_units([path]))) for path in changed_files),
+                      key=lambda item: item[1], reverse=True)
+    return {
+        'units': units,
+        'total': total,
+        'ratio': ratio,
+        'estimated_seconds': history.estimate(units) if history else None,
+        'full_seconds': history.estimate(index.units) if history else None,
+        'near_full': total > 1 and ratio >= near_full_ratio,
+        'triggers': [item for item in triggers if item[1] > 0][:5]
+    }
+
+
+def format_prediction(prediction: Dict, max_units: int = 10) -> List[str]:
+    """
+    生成重新编译范围预测的描述行
+
+    Args:
+        prediction: predict_rebuild 的结果
+        max_units: 最多列出的编译单元数量
+
+    Returns:
+        List[str]: 描述行
+    """
+    lines = [f"预计重新编译 {len(prediction['units'])}/{prediction['total']} 个编译单元"
+             f" ({prediction['ratio']:.0%})"]
+    if prediction['estimated_seconds'] is not None:
+        lines[0] += f"，估计耗时 {prediction['estimated_seconds']:.1f} 秒（完整编译约 {prediction['full_seconds']:.1f} 秒）"
+    for source in prediction['units'][:max_units]:
+        lines.append(f"  {os.path.basename(source)}")
+    if len(prediction['units']) > max_units:
+        lines.append(f"  ... 其余 {len(prediction['units']) - max_units} 个")
+    if prediction['near_full']:
+        triggers = ', '.join(f"{os.path.basename(path)}({count})" for path, count in prediction['triggers'])
+        lines.append(f"警告: 修改的文件导致接近完整编译，主要来源: {triggers}")
+    return lines
+
+
+if __name__ == "__main__":
+    # 测试依赖解析和重新编译范围预测
+    import tempfile
+    work_dir = tempfile.mkdtemp()
+    make_text = (".\\objects\\main.o: ..\\Src\\main.c\n"
+                 ".\\objects\\main.o: ..\\Inc\\config.h\n"
+                 "objects/uart.o: ../Src/uart.c \\\n  ../Inc/config.h ../Inc/uart.h\n")
+    keil_text = ("Dependencies for Project 'Proj', Target 'Proj': (DO NOT MODIFY !)\n"
+                 "F (..\\Src\\gpio.c)(0x5F1234AB)(--c99 -c -o .\\objects\\gpio.o)\n"
+                 "I (..\\Inc\\gpio.h)(0x5F1234AB)\n")
+    project_dir = os.path.join(work_dir, 'MDK-ARM')
+    units = parse_make_dependencies(make_text, project_dir)
+    for source, headers in parse_keil_project_dependencies(keil_text, project_dir).items():
+        _add_unit(units, source, headers)
+    index = DependencyIndex(units)
+
+    history = CompileTimeHistory('Proj.uvprojx', 'Proj', os.path.join(work_dir, 'times'))
+    history.record({'main.c': 2.0, 'uart.c': 1.0, 'gpio.c': 0.5})
+    config_h = _normalize('../Inc/config.h', project_dir)
+    prediction = predict_rebuild(index, [config_h], history, near_full_ratio=0.6)
+    for line in format_prediction(prediction):
+        print(line)
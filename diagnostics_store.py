@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译诊断信息存储模块
+将每次编译的警告/错误以结构化记录保存在固件发布目录下的SQLite数据库中，并按分支和配置比较新增/已修复的诊断；
+增量编译只输出重新编译的文件的诊断，未重新编译的文件沿用上一次编译的诊断
+"""
+
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from lib_logger import logger
+from typing import Dict, Iterable, List, Optional
+
+
+def diagnostic_fingerprint(file: Optional[str], severity: str, code: Optional[str], message: str) -> str:
+    """
+    计算诊断信息指纹，用于跨编译比较
+
+    不包含行号（代码增删会使行号整体偏移），文件只取文件名，消息中的连续空白归一化
+
+    Args:
+        file: 源文件路径
+        severity: 诊断级别
+        code: 诊断编号
+        message: 诊断信息
+
+    Returns:
+        str: 指纹
+    """
+    file_name = re.split(r'[\\/]', file)[-1].lower() if file else ''
+    normalized = re.sub(r'\s+', ' ', message or '').strip()
+    text = '\x1f'.join((file_name, severity or '', code or '', normalized))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class DiagnosticsStore:
+    """编译诊断信息存储"""
+
+    STORE_DIR = 'diagnostics'
+    DB_NAME = 'diagnostics.db'
+    # 每个分支/配置保留的编译记录数量
+    MAX_BUILDS_PER_KEY = 100
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS builds (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            branch TEXT NOT NULL,
+            configuration TEXT NOT NULL,
+            toolchain TEXT,
+            version TEXT,
+            commit_id TEXT,
+            timestamp TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            incremental INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL,
+            warning_count INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_builds_key ON builds (branch, configuration, id);
+        CREATE TABLE IF NOT EXISTS diagnostics (
+            build_id INTEGER NOT NULL REFERENCES builds (id) ON DELETE CASCADE,
+            file TEXT,
+            line INTEGER,
+            severity TEXT NOT NULL,
+            code TEXT,
+            message TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            carried INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_diagnostics_build ON diagnostics (build_id, severity);
+        CREATE INDEX IF NOT EXISTS idx_diagnostics_fingerprint ON diagnostics (fingerprint);
+    """
+
+    def __init__(self, publish_directory: str):
+        """
+        初始化诊断信息存储
+
+        Args:
+            publish_directory: 固件发布目录
+        """
+        self.db_path = os.path.join(publish_directory, self.STORE_DIR, self.DB_NAME)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接并确保表结构存在"""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.executescript(self._SCHEMA)
+        # 旧版本创建的数据库缺少的列
+        for table, column in (('builds', 'incremental'), ('diagnostics', 'carried')):
+            columns = [row['name'] for row in conn.execute(f'PRAGMA table_info({table})')]
+            if column not in columns:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """在事务中使用数据库连接，结束后关闭连接"""
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_build(self, branch_name: str, configuration: str, diagnostics: Iterable, toolchain: str = '',
+                     version: str = None, commit_id: str = None, success: bool = True,
+                     compiled_files: Optional[Iterable[str]] = None) -> Optional[int]:
+        """
+        记录一次编译的诊断信息
+
+        增量编译（compiled_files不为None）时，上一次编译中不属于重新编译的文件的诊断沿用到本次记录，
+        同一指纹本次已输出的次数不重复沿用（头文件的警告会随包含它的重新编译的文件再次输出）
+
+        Args:
+            branch_name: 分支名称
+            configuration: 编译配置名称
+            diagnostics: 诊断事件（BuildEvent）或含file/line/severity/code/message键的字典
+            toolchain: 工具链名称
+            version: 版本号
+            commit_id: Git提交ID
+            success: 编译是否成功
+            compiled_files: 增量编译时重新编译的源文件名，完整编译时为None
+
+        Returns:
+            Optional[int]: 编译记录ID，失败返回None
+        """
+        rows = []
+        for item in diagnostics:
+            record = item if isinstance(item, dict) else item.to_dict()
+            severity = record.get('severity') or 'warning'
+            message = record.get('message') or ''
+            rows.append((record.get('file'), record.get('line'), severity, record.get('code'), message,
+                         diagnostic_fingerprint(record.get('file'), severity, record.get('code'), message), 0))
+        incremental = compiled_files is not None
+
+        try:
+            with self._lock, self._transaction() as conn:
+                if incremental:
+                    rows.extend(self._carried_rows(conn, branch_name, configuration, rows, compiled_files))
+                error_count = sum(1 for row in rows if row[2] == 'error')
+                warning_count = sum(1 for row in rows if row[2] == 'warning')
+                cursor = conn.execute(
+                    'INSERT INTO builds (branch, configuration, toolchain, version, commit_id, timestamp, '
+                    'success, incremental, error_count, warning_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (branch_name, configuration, toolchain, version, commit_id,
+                     datetime.now().strftime('%Y-%m-%d %H:%M:%S'), int(success), int(incremental),
+                     error_count, warning_count))
+                build_id = cursor.lastrowid
+                conn.executemany(
+                    'INSERT INTO diagnostics (build_id, file, line, severity, code, message, fingerprint, carried) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', [(build_id,) + row for row in rows])
+                # 只保留每个分支/配置最近的编译记录
+                conn.execute(
+                    'DELETE FROM builds WHERE branch = ? AND configuration = ? AND id NOT IN '
+                    '(SELECT id FROM builds WHERE branch = ? AND configuration = ? ORDER BY id DESC LIMIT ?)',
+                    (branch_name, configuration, branch_name, configuration, self.MAX_BUILDS_PER_KEY))
+            carried = sum(1 for row in rows if row[6])
+            logger.info(f"诊断信息已记录: 编译 #{build_id}, 错误 {error_count}, 警告 {warning_count}"
+                        f"{f', 沿用未重新编译文件的诊断 {carried} 条' if carried else ''}")
+            return build_id
+        except Exception as e:
+            logger.error(f"记录诊断信息失败: {self.db_path}, 错误: {e}")
+            return None
+
+    @staticmethod
+    def _carried_rows(conn: sqlite3.Connection, branch_name: str, configuration: str, rows: List[tuple],
+                      compiled_files: Iterable[str]) -> List[tuple]:
+        """
+        增量编译时需要沿用的上一次编译的诊断
+
+        Args:
+            conn: 数据库连接
+            branch_name: 分支名称
+            configuration: 编译配置名称
+            rows: 本次编译输出的诊断记录
+            compiled_files: 重新编译的源文件名
+
+        Returns:
+            List[tuple]: 沿用的诊断记录（carried为1）
+        """
+        previous = conn.execute('SELECT id FROM builds WHERE branch = ? AND configuration = ? ORDER BY id DESC LIMIT 1',
+                                (branch_name, configuration)).fetchone()
+        if not previous:
+            return []
+        compiled = {re.split(r'[\\/]', name)[-1].lower() for name in compiled_files if name}
+        emitted = Counter(row[5] for row in rows)
+        carried = []
+        for item in conn.execute('SELECT * FROM diagnostics WHERE build_id = ? ORDER BY rowid', (previous['id'],)):
+            # 没有文件的诊断（链接器等）每次编译都会重新输出
+            if not item['file'] or re.split(r'[\\/]', item['file'])[-1].lower() in compiled:
+                continue
+            if emitted[item['fingerprint']] > 0:
+                emitted[item['fingerprint']] -= 1
+                continue
+            carried.append((item['file'], item['line'], item['severity'], item['code'], item['message'],
+                            item['fingerprint'], 1))
+        return carried
+
+    def get_build(self, build_id: int) -> Optional[Dict]:
+        """获取编译记录"""
+        try:
+            with self._lock, self._transaction() as conn:
+                row = conn.execute('SELECT * FROM builds WHERE id = ?', (build_id,)).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"读取编译记录失败: {e}")
+            return None
+
+    def get_previous_build(self, build_id: int) -> Optional[Dict]:
+        """获取同一分支/配置上的前一次编译记录"""
+        try:
+            with self._lock, self._transaction() as conn:
+                row = conn.execute(
+                    'SELECT prev.* FROM builds AS cur JOIN builds AS prev '
+                    'ON prev.branch = cur.branch AND prev.configuration = cur.configuration AND prev.id < cur.id '
+                    'WHERE cur.id = ? ORDER BY prev.id DESC LIMIT 1', (build_id,)).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"读取编译记录失败: {e}")
+            return None
+
+    def get_diagnostics(self, build_id: int, severity: str = None) -> List[Dict]:
+        """
+        获取编译的诊断记录
+
+        Args:
+            build_id: 编译记录ID
+            severity: 只返回指定级别，为None时返回全部
+
+        Returns:
+            List[Dict]: 诊断记录
+        """
+        try:
+            with self._lock, self._transaction() as conn:
+                if severity:
+                    rows = conn.execute('SELECT * FROM diagnostics WHERE build_id = ? AND severity = ? ORDER BY rowid',
+                                        (build_id, severity)).fetchall()
+                else:
+                    rows = conn.execute('SELECT * FROM diagnostics WHERE build_id = ? ORDER BY rowid',
+                                        (build_id,)).fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"读取诊断记录失败: {e}")
+            return []
+
+    def compare_with_previous(self, build_id: int, severity: str = 'warning') -> Dict:
+        """
+        与同一分支/配置上的前一次编译比较诊断信息
+
+        同一指纹出现多次时按次数比较，例如同一警告从2处变为3处记为新增1处
+
+        Args:
+            build_id: 编译记录ID
+            severity: 比较的诊断级别
+
+        Returns:
+            Dict: {'previous_build': 前一次编译记录或None, 'new': 新增诊断, 'fixed': 已修复诊断}
+        """
+        previous = self.get_previous_build(build_id)
+        current = self.get_diagnostics(build_id, severity)
+        if not previous:
+            return {'previous_build': None, 'new': [], 'fixed': []}
+        before = self.get_diagnostics(previous['id'], severity)
+
+        def subtract(items: List[Dict], counts: Counter) -> List[Dict]:
+            result = []
+            remaining = Counter(counts)
+            for item in items:
+                if remaining[item['fingerprint']] > 0:
+                    remaining[item['fingerprint']] -= 1
+                else:
+                    result.append(item)
+            return result
+
+        return {
+            'previous_build': previous,
+            'new': subtract(current, Counter(d['fingerprint'] for d in before)),
+            'fixed': subtract(before, Counter(d['fingerprint'] for d in current))
+        }
+
+    @staticmethod
+    def format_comparison(comparison: Dict, limit: int = 10) -> List[str]:
+        """
+        生成新增/已修复警告的描述
+
+        Args:
+            comparison: compare_with_previous 的结果
+            limit: 每类最多列出的条数
+
+        Returns:
+            List[str]: 描述行
+        """
+        previous = comparison.get('previous_build')
+        if not previous:
+            return ["本分支/配置无历史编译记录，本次作为诊断基准"]
+
+        against = previous.get('version') or previous.get('timestamp')
+        lines = [f"新增警告 {len(comparison['new'])} 条，已修复 {len(comparison['fixed'])} 条（对比 {against}）"]
+        for title, items in (('新增', comparison['new']), ('已修复', comparison['fixed'])):
+            for item in items[:limit]:
+                location = f"{item['file']}({item['line']})" if item.get('file') and item.get('line') else (item.get('file') or '')
+                code = f"[{item['code']}]" if item.get('code') else ''
+                lines.append(f"{title}{code}: {location}{': ' if location else ''}{item['message']}")
+            if len(items) > limit:
+                lines.append(f"... 其余 {len(items) - limit} 条{title}警告")
+        return lines
+
+
+if __name__ == "__main__":
+    # 测试诊断信息比较
+    import tempfile
+    store = DiagnosticsStore(tempfile.mkdtemp())
+    first = store.record_build('main', 'Debug', [
+        {'file': 'src/main.c', 'line': 10, 'severity': 'warning', 'code': 'Pe550', 'message': 'variable "x" was set but never used'},
+        {'file': 'src/uart.c', 'line': 20, 'severity': 'warning', 'code': 'Pe177', 'message': 'variable "y" was declared but never referenced'},
+    ], 'IAR', 'V1.0.0.1')
+    second = store.record_build('main', 'Debug', [
+        {'file': 'src/main.c', 'line': 14, 'severity': 'warning', 'code': 'Pe550', 'message': 'variable "x" was set but never used'},
+        {'file': 'src/crc.c', 'line': 5, 'severity': 'warning', 'code': 'Pe223', 'message': 'function "foo" declared implicitly'},
+    ], 'IAR', 'V1.0.0.2')
+    for line in DiagnosticsStore.format_comparison(store.compare_with_previous(second)):
+        print(line)
+    print(f"数据库: {store.db_path}")
@@ -5,16 +5,19 @@
 根据编译工具类型创建相应的文件管理器
 """
 
-from typing import Union
-from lib_IAR.file_manager import IARFileManager
-from lib_MDK.file_manager import MDKFileManager
+from typing import TYPE_CHECKING, Union
+
+# 各编译工具的模块在创建实例时才导入，只加载实际使用的工具链，缩短启动时间
+if TYPE_CHECKING:
+    from lib_IAR.file_manager import IARFileManager
+    from lib_MDK.file_manager import MDKFileManager
 
 
 class FileManagerFactory:
     """文件管理器工厂类"""
     
     @staticmethod
-    def create_file_manager(compile_tool: str, config: dict, project_path: str = None, path_manager=None) -> Union[IARFileManager, MDKFileManager]:
+    def create_file_manager(compile_tool: str, config: dict, project_path: str = None, path_manager=None) -> Union['IARFileManager', 'MDKFileManager']:
         """
         根据编译工具类型创建相应的文件管理器
         
@@ -31,8 +34,10 @@ class FileManagerFactory:
             ValueError: 当编译工具类型不支持时
         """
         if compile_tool.upper() == 'IAR':
+            from lib_IAR.file_manager import IARFileManager
             return IARFileManager(config, project_path, path_manager)
         elif compile_tool.upper() == 'MDK':
+            from lib_MDK.file_manager import MDKFileManager
             return MDKFileManager(config, project_path, path_manager)
         else:
             raise ValueError(f"不支持的编译工具类型: {compile_tool}。支持的类型: IAR, MDK")
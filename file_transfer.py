@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件传输模块
+向网络共享等远程目录分块复制文件：多个文件同时复制，先写入临时文件再重命名，中断后从已校验的位置继续，并按字节/秒报告进度
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from lib_logger import logger
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_RETRIES = 3
+# 继续复制前校验临时文件末尾的字节数
+VERIFY_SIZE = 64 * 1024
+# 进度回调的最小间隔（秒）
+PROGRESS_INTERVAL = 1.0
+
+
+def format_rate(bytes_per_second: float) -> str:
+    """格式化传输速度"""
+    for unit in ('B/s', 'KB/s', 'MB/s'):
+        if bytes_per_second < 1024:
+            return f"{bytes_per_second:.1f} {unit}"
+        bytes_per_second /= 1024
+    return f"{bytes_per_second:.1f} GB/s"
+
+
+def temp_path_for(source_path: str, destination_path: str) -> str:
+    """
+    临时文件路径：按源文件的大小和修改时间区分，源文件变化后不会从旧的临时文件继续
+
+    Args:
+        source_path: 源文件
+        destination_path: 目标文件
+
+    Returns:
+        str: 临时文件路径
+    """
+    stat = os.stat(source_path)
+    key = hashlib.sha1(f"{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8')).hexdigest()[:8]
+    return f"{destination_path}.{key}.part"
+
+
+class TransferProgress:
+    """传输进度：多个文件共用，累计已复制字节数并按间隔调用进度回调"""
+
+    def __init__(self, total_bytes: int, callback: Callable[[Dict], None] = None,
+                 interval: float = PROGRESS_INTERVAL):
+        """
+        Args:
+            total_bytes: 需要复制的总字节数
+            callback: 进度回调，参数为 {'bytes', 'total', 'elapsed', 'bytes_per_second', 'file'}
+            interval: 两次回调的最小间隔（秒）
+        """
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.interval = interval
+        self.copied_bytes = 0
+        self.resumed_bytes = 0
+        self.start_time = time.perf_counter()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    @property
+    def bytes_per_second(self) -> float:
+        """本次实际传输的速度（不含继续复制时跳过的部分）"""
+        elapsed = self.elapsed
+        return (self.copied_bytes - self.resumed_bytes) / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self, file_name: str = None) -> Dict:
+        return {
+            'bytes': self.copied_bytes,
+            'total': self.total_bytes,
+            'elapsed': self.elapsed,
+            'bytes_per_second': self.bytes_per_second,
+            'file': file_name
+        }
+
+    def skip(self, size: int):
+        """记录继续复制时已在临时文件中的字节"""
+        with self._lock:
+            self.copied_bytes += size
+            self.resumed_bytes += size
+
+    def discard(self, copied: int, resumed: int):
+        """复制中断时撤销本次尝试的统计（重试时重新统计临时文件中已有的字节）"""
+        with self._lock:
+            self.copied_bytes -= copied
+            self.resumed_bytes -= resumed
+
+    def add(self, size: int, file_name: str = None, force: bool = False):
+        """记录新复制的字节，到达回调间隔时报告进度"""
+        with self._lock:
+            self.copied_bytes += size
+            now = time.perf_counter()
+            if not self.callback or (not force and now - self._last_report < self.interval):
+                return
+            self._last_report = now
+            snapshot = self.snapshot(file_name)
+        try:
+            self.callback(snapshot)
+        except Exception as e:
+            logger.error(f"传输进度回调异常: {e}")
+
+
+def _verified_offset(source_path: str, temp_path: str, source_size: int) -> int:
+    """
+    临时文件中可以继续使用的字节数：末尾 VERIFY_SIZE 字节与源文件一致时为临时文件大小，否则为0
+
+    Args:
+        source_path: 源文件
+        temp_path: 临时文件
+        source_size: 源文件大小
+
+    Returns:
+        int: 继续复制的起始位置
+    """
+    try:
+        temp_size = os.path.getsize(temp_path)
+    except OSError:
+        return 0
+    if temp_size == 0 or temp_size > source_size:
+        return 0
+    verify_start = max(0, temp_size - VERIFY_SIZE)
+    try:
+        with open(source_path, 'rb') as src, open(temp_path, 'rb') as tmp:
+            src.seek(verify_start)
+            tmp.seek(verify_start)
+            if src.read(temp_size - verify_start) == tmp.read(temp_size - verify_start):
+                return temp_size
+    except OSError as e:
+        logger.warning(f"校验临时文件失败，从头复制: {e}")
+    return 0
+
+
+def copy_resumable(source_path: str, destination_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                   retries: int = DEFAULT_RETRIES, progress: TransferProgress = None) -> Tuple[bool, str]:
+    """
+    分块复制文件：写入临时文件，完成后重命名为目标文件；复制中断时重试，从临时文件中已校验的位置继续
+
+    Args:
+        source_path: 源文件
+        destination_path: 目标文件
+        buffer_size: 每次读写的字节数
+        retries: 中断后的重试次数
+        progress: 传输进度，为None时不报告
+
+    Returns:
+        Tuple[bool, str]: (是否成功, 失败时的错误信息)
+    """
+    file_name = os.path.basename(destination_path)
+    try:
+        source_size = os.path.getsize(source_path)
+        temp_path = temp_path_for(source_path, destination_path)
+        os.makedirs(os.path.dirname(os.path.abspath(destination_path)), exist_ok=True)
+    except OSError as e:
+        return False, f"准备复制 {file_name} 失败: {e}"
+
+    last_error = ''
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(min(2 ** (attempt - 1), 10))
+        offset = _verified_offset(source_path, temp_path, source_size)
+        if offset:
+            logger.info(f"{file_name}: 从 {offset}/{source_size} 字节继续复制")
+        if progress:
+            progress.skip(offset)
+        copied = offset
+        try:
+            with open(source_path, 'rb') as src, open(temp_path, 'r+b' if offset else 'wb') as dst:
+                src.seek(offset)
+                dst.seek(offset)
+                dst.truncate()
+                while True:
+                    chunk = src.read(buffer_size)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    copied += len(chunk)
+                    if progress:
+                        progress.add(len(chunk), file_name)
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            if os.path.getsize(temp_path) != source_size:
+                raise OSError(f"复制后的大小 {os.path.getsize(temp_path)} 与源文件 {source_size} 不一致")
+            os.replace(temp_path, destination_path)
+            try:
+                shutil.copystat(source_path, destination_path)
+            except OSError:
+                pass
+            return True, ""
+
+        except OSError as e:
+            last_error = str(e)
+            if progress:
+                progress.discard(copied, offset)
+            logger.warning(f"复制 {file_name} 中断（第 {attempt + 1}/{retries + 1} 次）: {e}")
+
+    return False, f"复制 {file_name} 失败: {last_error}"
+
+
+def copy_files(files: List[Tuple[str, str]], max_workers: int = DEFAULT_MAX_WORKERS,
+               buffer_size: int = DEFAULT_BUFFER_SIZE, retries: int = DEFAULT_RETRIES,
+               progress_callback: Callable[[Dict], None] = None) -> Tuple[Dict[str, Tuple[bool, str]], Dict]:
+    """
+    同时复制多个文件
+
+    Args:
+        files: [(源文件, 目标文件)]
+        max_workers: 同时复制的文件数
+        buffer_size: 每次读写的字节数
+        retries: 每个文件中断后的重试次数
+        progress_callback: 进度回调，参数见 TransferProgress
+
+    Returns:
+        Tuple[Dict[str, Tuple[bool, str]], Dict]: ({目标文件: (是否成功, 错误信息)}, 传输统计)
+    """
+    total_bytes = 0
+    for source_path, _ in files:
+        try:
+            total_bytes += os.path.getsize(source_path)
+        except OSError:
+            pass
+    progress = TransferProgress(total_bytes, progress_callback)
+
+    results = {}
+    if files:
+        workers = max(1, min(max_workers or DEFAULT_MAX_WORKERS, len(files)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='transfer') as executor:
+            futures = {destination: executor.submit(copy_resumable, source, destination, buffer_size, retries, progress)
+                       for source, destination in files}
+            for destination, future in futures.items():
+                try:
+                    results[destination] = future.result()
+                except Exception as e:
+                    logger.error(f"复制文件异常: {e}")
+                    results[destination] = (False, str(e))
+
+    progress.add(0, force=True)
+    stats = progress.snapshot()
+    stats['resumed_bytes'] = progress.resumed_bytes
+    logger.info(f"复制 {len(files)} 个文件, {stats['bytes']} 字节, 耗时 {stats['elapsed']:.2f}秒, "
+                f"{format_rate(stats['bytes_per_second'])}")
+    return results, stats
+
+
+def transfer_settings(config: Dict) -> Dict:
+    """
+    从配置中读取远程复制参数
+
+    Args:
+        config: 配置字典（remote_copy_workers、remote_copy_buffer_kb、remote_copy_retries）
+
+    Returns:
+        Dict: copy_files 的 max_workers、buffer_size 和 retries 参数
+    """
+    return {
+        'max_workers': int(config.get('remote_copy_workers', DEFAULT_MAX_WORKERS)),
+        'buffer_size': max(64, int(config.get('remote_copy_buffer_kb', DEFAULT_BUFFER_SIZE // 1024))) * 1024,
+        'retries': int(config.get('remote_copy_retries', DEFAULT_RETRIES))
+    }
+
+
+__all__ = ['DEFAULT_BUFFER_SIZE', 'DEFAULT_MAX_WORKERS', 'DEFAULT_RETRIES', 'format_rate', 'temp_path_for',
+           'TransferProgress', 'copy_resumable', 'copy_files', 'transfer_settings']
+
+
+if __name__ == "__main__":
+    # 测试：复制到一半的临时文件在下次复制时从已校验的位置继续
+    import tempfile
+    work_dir = tempfile.mkdtemp()
+    source = os.path.join(work_dir, 'firmware.bin')
+    with open(source, 'wb') as f:
+        f.write(os.urandom(3 * 1024 * 1024))
+    destination = os.path.join(work_dir, 'remote', 'firmware.bin')
+    os.makedirs(os.path.dirname(destination))
+    with open(source, 'rb') as src, open(temp_path_for(source, destination), 'wb') as part:
+        part.write(src.read(1024 * 1024))
+
+    results, stats = copy_files([(source, destination)], buffer_size=256 * 1024,
+                                progress_callback=lambda p: print(f"{p['bytes']}/{p['total']} "
+                                                                  f"{format_rate(p['bytes_per_second'])}"))
+    print(results, f"继续复制跳过 {stats['resumed_bytes']} 字节")
+    with open(source, 'rb') as a, open(destination, 'rb') as b:
+        print(f"内容一致: {a.read() == b.read()}")
+    shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,2156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+固件编译发布流程模块
+不依赖界面的编译发布流程：路径查找、配置检查、Git提交、版本更新、编译、二进制修改和发布，进度和确认通过回调接口完成
+"""
+
+import os
+import re
+import shutil
+import threading
+import contextlib
+from datetime import datetime
+from lib_logger import logger
+from typing import Optional, Tuple
+
+from git_manager import GitManager
+from builder_factory import BuilderFactory
+from project_analyzer_factory import ProjectAnalyzerFactory
+from binary_modifier import BinaryModifier
+from file_manager_factory import FileManagerFactory
+from version_manager import VersionManager
+from info_manager_factory import InfoManagerFactory
+from path_manager_factory import PathManagerFactory
+from stage_executor import StageError, StageExecutor
+from worktree_manager import WorktreeManager
+
+# 编译缓存、源文件清单、依赖索引、诊断数据库和尺寸分析只在编译阶段使用，在使用时导入以缩短命令行启动时间
+
+# 固件尺寸信息在编译后才能得到，写入release note后单独提交（不计入发布提交）
+SIZE_REPORT_COMMIT_MESSAGE = "{version} 固件尺寸信息"
+
+# 流程使用的提示文本（简体中文），界面通过回调接口替换为当前语言
+DEFAULT_TEXTS = {
+    'start_build_process': '开始编译流程...',
+    'compiling_project': '编译项目中...',
+    'modifying_binary': '修改二进制文件...',
+    'processing_files': '处理输出文件...',
+    'publishing_firmware': '发布固件...',
+    'publishing_remote': '发布到远程目录...',
+    'input_update_info': '输入更新信息...',
+    'committing_changes': '提交更改...',
+    'updating_version': '更新版本号...',
+    'updating_release_notes': '更新Release Notes...',
+    'committing_version_changes': '提交版本号更改和Release Notes...',
+    'building_all_configs': '并行编译全部配置...',
+    'build_process_complete': '编译流程完成',
+    'release_note_title': 'Release Notes',
+    'release_note_created': 'Release note文件已创建',
+    'release_note_updated': 'Release note文件已更新',
+    'msg_compile_success_no_bin': '编译成功但未找到输出bin文件',
+    'msg_compile_failed': '编译失败',
+    'msg_modify_failed': '修改失败',
+    'msg_file_process_failed': '文件处理失败',
+    'msg_firmware_publish_failed': '固件发布失败',
+    'msg_firmware_publish_error': '固件发布异常',
+    'msg_not_git_repo': '当前目录不是Git仓库',
+    'msg_cannot_get_commit_id': '无法获取commit ID',
+    'msg_config_incomplete': '配置不完整',
+    'msg_compile_complete': '编译完成！',
+    'msg_compile_exception': '编译流程异常',
+    'msg_success': '成功',
+    'msg_error': '错误',
+}
+
+
+class PipelineHooks:
+    """编译发布流程的回调接口，默认实现输出到日志并自动确认，界面和命令行通过继承替换"""
+
+    def __init__(self, assume_yes: bool = True):
+        """
+        初始化回调接口
+
+        Args:
+            assume_yes: 需要确认时的默认回答
+        """
+        self.assume_yes = assume_yes
+
+    def text(self, key: str) -> str:
+        """获取提示文本"""
+        return DEFAULT_TEXTS.get(key, key)
+
+    def log(self, message: str):
+        """输出日志"""
+        logger.info(message)
+
+    def status(self, message: str):
+        """更新当前阶段"""
+        logger.info(message)
+
+    def build_output(self, event, configuration_name: str = None):
+        """
+        处理编译输出事件
+
+        Args:
+            event: BuildEvent编译输出事件
+            configuration_name: 多配置并行编译时的配置名称
+        """
+        prefix = f"[{configuration_name}]" if configuration_name else ""
+        if event.kind == 'diagnostic':
+            severity = '错误' if event.severity == 'error' else '警告' if event.severity == 'warning' else '提示'
+            self.log(f"{prefix}[{severity}] {event}")
+        else:
+            self.log(f"{prefix}[编译] {event.message}")
+
+    def on_config_updated(self, config: dict):
+        """路径查找或配置选择更新了配置（bin起始地址等）"""
+
+    def on_version(self, current_version: Optional[str], next_version: str):
+        """确定了当前版本和发布版本"""
+
+    def ask_commit_message(self, default_message: str) -> str:
+        """
+        获取提交信息（用于Git提交和Release Notes）
+
+        Args:
+            default_message: 默认提交信息
+
+        Returns:
+            str: 提交信息，返回空字符串表示取消输入
+        """
+        return default_message
+
+    def confirm(self, message: str) -> bool:
+        """请求确认，返回是否继续"""
+        self.log(f"{message} -> {'继续' if self.assume_yes else '取消'}")
+        return self.assume_yes
+
+    def show_error(self, title_key: str, message: str):
+        """报告流程失败"""
+        logger.error(f"{self.text(title_key)}: {message}")
+
+    def show_success(self, message: str):
+        """报告流程成功"""
+        logger.info(message)
+
+
+class FirmwarePipeline:
+    """固件编译发布流程"""
+
+    def __init__(self, config: dict, project_path: str, hooks: PipelineHooks = None, project_watcher=None):
+        """
+        初始化编译发布流程
+
+        Args:
+            config: 配置字典（流程中会更新路径、bin起始地址和信息文件地址等）
+            project_path: 项目根目录
+            hooks: 回调接口，为None时使用默认实现（输出日志、自动确认）
+            project_watcher: 项目文件监视器，提供时缓存版本号和flash偏移，为None时每次直接读取
+        """
+        self.config = config
+        self.project_path = project_path
+        # 指定分支编译时 project_path 切换到分支工作树中的项目目录，这里保留原项目目录
+        self.source_project_path = project_path
+        self.branch = None
+        self.hooks = hooks or PipelineHooks()
+        self.project_watcher = project_watcher
+
+        self.path_manager = None
+        self.git_manager = None
+        self.version_manager = None
+        self.info_manager = None
+        self.builder = None
+        self.binary_modifier = None
+        self.file_manager = None
+
+        self.available_configurations = []
+        self.selected_configuration = None
+        # 是否并行编译全部配置
+        self.build_all = config.get('build_all_configurations', False)
+        self.cached_info_file_path = None
+        # 本分支已发布的最新版本（lookup_published_version 的结果）
+        self.latest_published_version = None
+        # 是否从上次未完成的编译发布的检查点继续（同一提交重新执行时）
+        self.resume_build = False
+        # 编译工具并发限制（批量发布多个项目时共享），为None时不限制
+        self.toolchain_limiter = None
+
+        # 取消流程：尚未开始的阶段不再执行
+        self._cancel_event = threading.Event()
+        self._stage_executor = None
+
+        # 多配置并行编译时保护release note和远程发布目录的写入
+        self._release_note_lock = threading.Lock()
+        self._remote_publish_lock = threading.Lock()
+
+    def log_message(self, message: str):
+        """输出日志"""
+        self.hooks.log(message)
+
+    def update_status(self, message: str):
+        """更新当前阶段"""
+        self.hooks.status(message)
+
+    def get_text(self, key: str) -> str:
+        """获取提示文本"""
+        return self.hooks.text(key)
+
+    def cancel(self):
+        """取消流程：正在执行的阶段完成后停止，不再执行后续阶段"""
+        self._cancel_event.set()
+        if self._stage_executor:
+            self._stage_executor.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        """流程是否已取消"""
+        return self._cancel_event.is_set()
+
+    def _toolchain_slot(self, compile_tool: str):
+        """获取编译工具的并发名额（未设置并发限制时不等待）"""
+        if self.toolchain_limiter is None:
+            return contextlib.nullcontext()
+        return self.toolchain_limiter.slot(compile_tool)
+
+    def _project_file(self, configuration: Optional[dict] = None) -> str:
+        """获取配置所属的项目文件（工作区批量编译的配置属于各自的项目文件）"""
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        return (configuration or {}).get('project_path') or self.config.get(
+            'iar_project_path' if compile_tool == 'IAR' else 'mdk_project_path', '')
+
+    def _release_note_path(self) -> str:
+        """Release Notes文件路径（在项目根目录）"""
+        return os.path.join(os.path.abspath(self.project_path), "RELEASE_NOTES.md")
+
+    def _feature_settings(self) -> dict:
+        """信息文件中各字段的开关和变量名"""
+        return {
+            'enable_git_commit_id': self.config.get('enable_git_commit_id', True),
+            'enable_file_size': self.config.get('enable_file_size', True),
+            'enable_bin_checksum': self.config.get('enable_bin_checksum', True),
+            'enable_hash_value': self.config.get('enable_hash_value', True),
+            'git_commit_id_keyword': self.config.get('git_commit_id_keyword', '__git_commit_id'),
+            'file_size_keyword': self.config.get('file_size_keyword', '__file_size'),
+            'bin_checksum_keyword': self.config.get('bin_checksum_keyword', '__bin_checksum'),
+            'hash_value_keyword': self.config.get('hash_value_keyword', '__hash_value'),
+            'firmware_version_keyword': self.config.get('firmware_version_keyword', '__Firmware_Version')
+        }
+
+    # ------------------------------------------------------------------
+    # 流程阶段
+    # ------------------------------------------------------------------
+
+    def use_branch(self, branch: str) -> Tuple[bool, str]:
+        """
+        在分支的工作树中编译发布（工作树在缓存目录中按分支创建并复用，需在 discover_paths 之前调用）
+
+        Args:
+            branch: 分支名称
+
+        Returns:
+            Tuple[bool, str]: (是否成功, 失败时的错误信息)
+        """
+        manager = WorktreeManager(self.source_project_path, self.config.get('worktree_directory') or None)
+        worktree_root, error_msg = manager.prepare(branch)
+        if not worktree_root:
+            return False, error_msg
+
+        project_path = manager.map_path(self.source_project_path, worktree_root)
+        if not os.path.isdir(project_path):
+            return False, f"分支 {branch} 中没有项目目录: {project_path}"
+
+        self.branch = branch
+        if os.path.normcase(os.path.abspath(project_path)) != os.path.normcase(os.path.abspath(self.project_path)):
+            self.project_path = project_path
+            self.config = manager.map_config(self.config, worktree_root)
+            self.path_manager = None
+            self.cached_info_file_path = None
+        self.log_message(f"分支 {branch} 的项目目录: {self.project_path}")
+        return True, ""
+
+    def discover_paths(self) -> dict:
+        """
+        查找项目文件、链接脚本和信息文件，设置bin起始地址等配置
+
+        Returns:
+            dict: 更新后的配置
+        """
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        if not self.path_manager:
+            self.path_manager = PathManagerFactory.create_path_manager(compile_tool, self.project_path)
+        else:
+            # 确保项目路径是最新的
+            self.path_manager.set_project_path(self.project_path)
+        self.config = self.path_manager.auto_find_paths(self.config)
+
+        # 从项目文件中提取项目名称
+        project_file = self._project_file()
+        if project_file and os.path.exists(project_file):
+            project_name = os.path.splitext(os.path.basename(project_file))[0]
+            self.config['project_name'] = project_name
+            self.log_message(f"检测到项目名称: {project_name}")
+
+        self.hooks.on_config_updated(self.config)
+        return self.config
+
+    def load_configurations(self, configuration_name: str = None) -> bool:
+        """
+        解析项目文件中的编译配置并选择要编译的配置
+
+        Args:
+            configuration_name: 配置名称，为None时选择第一个配置
+
+        Returns:
+            bool: 是否选择了配置
+        """
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        project_file = self._project_file()
+        if not project_file or not os.path.exists(project_file):
+            file_extension = ProjectAnalyzerFactory.get_file_extension(compile_tool)
+            self.log_message(f"未找到{compile_tool}项目文件({file_extension})")
+            return False
+
+        analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+        analyze_method = getattr(analyzer, ProjectAnalyzerFactory.get_analyze_method_name(compile_tool))
+        result = analyze_method(project_file)
+        configurations = result.get('configurations', []) if result else []
+        if not configurations:
+            self.log_message(f"项目文件中没有可用的编译配置: {project_file}")
+            return False
+        self.available_configurations = configurations
+
+        if configuration_name:
+            selected = next((c for c in configurations if c['name'] == configuration_name), None)
+            if not selected:
+                self.log_message(f"未找到编译配置 {configuration_name}，可用配置: "
+                                 f"{', '.join(c['name'] for c in configurations)}")
+                return False
+        else:
+            selected = configurations[0]
+        self.selected_configuration = selected
+        self.log_message(f"选择的编译配置: {selected['name']} (共 {len(configurations)} 个配置)")
+
+        flash_offset = self.get_flash_offset(selected)
+        if flash_offset:
+            self.config.setdefault('binary_settings', {})['bin_start_address'] = flash_offset
+            self.hooks.on_config_updated(self.config)
+        return True
+
+    def check_build_config(self) -> Tuple[bool, str]:
+        """
+        检查编译配置是否完整，并从信息文件中解析各字段地址
+
+        Returns:
+            Tuple[bool, str]: (是否完整, 缺少配置时的提示信息)
+        """
+        missing_configs = []
+
+        self.log_message("开始检查编译配置...")
+
+        # 检查编译工具安装路径
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        if compile_tool == 'IAR':
+            tool_path = self.config.get('iar_installation_path', '')
+            tool_name = "IAR"
+        else:  # MDK
+            tool_path = self.config.get('mdk_installation_path', '')
+            tool_name = "MDK"
+
+        self.log_message(f"{tool_name}路径: {tool_path}")
+        if not tool_path:
+            missing_configs.append(f"{tool_name}安装路径")
+
+        # 检查bin起始地址
+        binary_settings = self.config.get('binary_settings', {})
+        self.log_message(f"binary_settings配置: {binary_settings}")
+        bin_start_address = binary_settings.get('bin_start_address', 0)
+        self.log_message(f"检查bin起始地址: 0x{bin_start_address:08X}")
+        if bin_start_address == 0:
+            missing_configs.append("bin起始地址")
+            self.log_message("警告: bin起始地址未设置，这可能导致编译失败")
+
+        # 检查编译配置选择
+        if not self.selected_configuration:
+            missing_configs.append("编译配置选择")
+            self.log_message("错误: 未选择编译配置")
+        else:
+            self.log_message(f"选择的编译配置: {self.selected_configuration.get('name', 'N/A')}")
+            self.log_message(f"配置中的bin文件: {self.selected_configuration.get('bin_file', 'N/A')}")
+
+        # 检查信息文件
+        info_file_name = self.config.get('info_file', '')
+        self.log_message(f"信息文件名: {info_file_name}")
+        if not info_file_name:
+            missing_configs.append("信息文件")
+        elif not self.project_path:
+            missing_configs.append("项目路径")
+        else:
+            self.log_message(f"项目路径: {self.project_path}")
+            info_file_path, error_msg = self.get_info_file_path_with_details()
+            if info_file_path:
+                self.log_message(f"找到的信息文件路径: {info_file_path}")
+                if not self.info_manager:
+                    self.info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
+
+                try:
+                    feature_settings = self._feature_settings()
+                    binary_config = self.info_manager.analyze_config_file(info_file_path, feature_settings)
+                    self.config.update(binary_config)
+
+                    # 检查地址是否已解析
+                    missing_fields = []
+                    if binary_config.get('firmware_version_offset', 0) == 0:
+                        missing_fields.append(f"{feature_settings['firmware_version_keyword']}地址")
+                    if binary_config.get('git_commit_id_offset', 0) == 0:
+                        missing_fields.append(f"{feature_settings['git_commit_id_keyword']}地址")
+                    if binary_config.get('file_size_offset', 0) == 0:
+                        missing_fields.append(f"{feature_settings['file_size_keyword']}地址")
+                    if binary_config.get('bin_checksum_offset', 0) == 0:
+                        missing_fields.append(f"{feature_settings['bin_checksum_keyword']}地址")
+
+                    if missing_fields:
+                        missing_configs.extend(missing_fields)
+                except Exception as e:
+                    missing_configs.append(f"配置文件分析失败: {e}")
+            else:
+                # 显示详细的错误信息
+                self.log_message(error_msg)
+                if "找到多个信息文件" in error_msg:
+                    missing_configs.append("找到多个信息文件")
+                elif "未找到信息文件" in error_msg:
+                    missing_configs.append("未找到信息文件")
+                else:
+                    missing_configs.append("信息文件查找失败")
+
+        if not missing_configs:
+            return True, ""
+
+        error_msg = f"编译配置不完整，缺少以下配置:\n{', '.join(missing_configs)}\n\n"
+        error_msg += "请查看日志输出获取详细错误信息，然后在设置中进行配置:\n"
+
+        # 根据具体的错误类型提供针对性的建议
+        if "找到多个信息文件" in missing_configs:
+            error_msg += "1. 删除项目中的重复信息文件，只保留一个\n"
+            error_msg += "2. 建议保留源代码目录中的文件，删除构建系统生成的临时文件\n"
+            error_msg += "3. 在'项目设置'中指定具体的信息文件路径"
+        elif "未找到信息文件" in missing_configs:
+            error_msg += "1. 在'项目设置'中选择信息文件（如main.c）\n"
+            error_msg += "2. 确保信息文件中包含正确的#pragma location定义"
+        else:
+            error_msg += "1. 在'项目设置'中配置编译工具安装目录和bin起始地址\n"
+            error_msg += "2. 在'项目设置'中选择信息文件（如main.c）\n"
+            error_msg += "3. 确保信息文件中包含正确的#pragma location定义"
+
+        self.log_message(f"配置检查失败: {', '.join(missing_configs)}")
+        return False, error_msg
+
+    def check_git(self) -> dict:
+        """
+        检查Git仓库状态
+
+        Returns:
+            dict: {'is_repo', 'has_changes', 'branch', 'commit_info'}
+        """
+        self.git_manager = GitManager(self.project_path)
+        status = {'is_repo': False, 'has_changes': False, 'branch': None, 'commit_info': {}}
+        if not self.git_manager.is_git_repo():
+            return status
+
+        status['is_repo'] = True
+        status['has_changes'] = self.git_manager.has_uncommitted_changes()
+        commit_info = self.git_manager.get_commit_info()
+        status['commit_info'] = commit_info
+        status['branch'] = commit_info.get('branch')
+        if commit_info.get('commit_id'):
+            self.log_message(f"当前commit: {commit_info['short_commit_id']}")
+            self.log_message(f"分支: {commit_info['branch']}")
+            self.log_message(f"作者: {commit_info['author']}")
+        if not status['branch']:
+            logger.warning("无法获取Git分支信息")
+        return status
+
+    def lookup_published_version(self, branch: str = None):
+        """
+        查找本分支已发布的最新版本（只依赖Git分支，可以与查找路径、检查配置同时进行）
+
+        Args:
+            branch: Git分支名称
+
+        Returns:
+            Optional[Tuple[int, int, int, int]]: 已发布的最新版本，没有已发布版本时为None
+        """
+        fw_publish_dir = self.config.get('fw_publish_directory', './fw_publish')
+        self.version_manager = VersionManager(self.config.get('version_settings', {}), self.source_project_path,
+                                              fw_publish_dir, branch)
+        self.latest_published_version = self.version_manager.get_latest_version_from_files()
+        return self.latest_published_version
+
+    def check_version(self, branch: str = None, published_checked: bool = False) -> Tuple[Optional[str], str]:
+        """
+        读取信息文件中的当前版本，并根据已发布的固件确定发布版本
+
+        Args:
+            branch: Git分支名称，用于查找本分支已发布的版本
+            published_checked: 是否已通过 lookup_published_version 查找过已发布版本
+
+        Returns:
+            Tuple[Optional[str], str]: (当前版本, 发布版本)，无法读取当前版本时为(None, 默认版本)
+        """
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        if not published_checked or not self.version_manager:
+            self.lookup_published_version(branch)
+        self.info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
+
+        main_file_path, _ = self.get_info_file_path_with_details()
+        current_version = self.get_info_file_version(main_file_path, verify=True) if main_file_path else None
+
+        if current_version:
+            next_version, explanation = self.version_manager.get_next_version_from(
+                current_version, self.latest_published_version)
+            self.log_message(f"当前版本: {current_version}")
+            self.log_message(f"下一个版本: {next_version}")
+            self.log_message(explanation)
+        else:
+            next_version = "V0.0.0.1"
+            self.log_message(f"无法提取版本，使用默认版本: {next_version}")
+
+        self.hooks.on_version(current_version, next_version)
+        return current_version, next_version
+
+    def prepare(self) -> dict:
+        """
+        执行编译前的检查阶段：查找路径并检查配置、检查Git并查找已发布版本两条分支同时执行，
+        最后确定发布版本。总耗时取决于较慢的分支，而不是各阶段之和
+
+        Returns:
+            dict: StageExecutor.run 的结果，results 包含 git（check_git 的结果）和 version（(当前版本, 发布版本)），
+            失败时 error 为 StageError，其 detail 为错误对话框标题的文本键
+        """
+        def paths_stage(inputs):
+            self.discover_paths()
+            if not self.selected_configuration:
+                self.load_configurations()
+
+        def config_stage(inputs):
+            success, error_msg = self.check_build_config()
+            if not success:
+                raise StageError(error_msg, 'msg_config_incomplete')
+
+        def git_stage(inputs):
+            git_status = self.check_git()
+            if not git_status['is_repo']:
+                raise StageError(self.get_text('msg_not_git_repo'), 'msg_error')
+            return git_status
+
+        def published_stage(inputs):
+            return self.lookup_published_version(inputs['git']['branch'])
+
+        def version_stage(inputs):
+            return self.check_version(inputs['git']['branch'], published_checked=True)
+
+        executor = StageExecutor()
+        executor.add_stage('paths', paths_stage)
+        executor.add_stage('config', config_stage, depends=['paths'])
+        executor.add_stage('git', git_stage)
+        executor.add_stage('published_version', published_stage, depends=['git'])
+        executor.add_stage('version', version_stage, depends=['config', 'published_version', 'git'])
+
+        self._stage_executor = executor
+        if self.cancelled:
+            executor.cancel()
+        try:
+            result = executor.run()
+        finally:
+            self._stage_executor = None
+        for line in StageExecutor.format_timings(result):
+            self.log_message(f"编译前检查 {line}")
+        return result
+
+    def commit_release(self, current_version: Optional[str],
+                       next_version: str) -> Tuple[bool, str, str, Optional[str]]:
+        """
+        提交未提交的更改，更新信息文件中的版本号和Release Notes并提交
+
+        Args:
+            current_version: 当前版本
+            next_version: 发布版本
+
+        Returns:
+            Tuple[bool, str, str, Optional[str]]: (是否继续编译, 实际发布的版本号, 提交信息, 发布提交的7位ID)
+        """
+        # 获取更新信息，用于Git提交和Release Notes
+        self.update_status(self.get_text('input_update_info'))
+        default_message = f"发布{next_version}版本"
+        commit_message = self.hooks.ask_commit_message(default_message)
+
+        if not commit_message:
+            self.log_message("用户取消了更新信息输入")
+            if not self.hooks.confirm("未输入更新信息，是否继续编译？\n建议输入更新信息用于Release Notes。"):
+                return False, next_version, "", None
+            commit_message = default_message
+
+        # 同一仓库中的其他项目（批量发布、编译服务）可能同时发布，修改版本号到提交完成期间独占暂存区
+        with self.git_manager.worktree_lock():
+            next_version = self._commit_release_locked(current_version, next_version, commit_message)
+            # 释放锁之后HEAD可能已是其他项目的提交，在锁内获取发布提交的ID（7位短ID，与SourceTree一致）
+            commit_id = self.git_manager.get_short_commit_id(7)
+            # 检查是否还有其他未提交的更改
+            has_changes = self.git_manager.has_uncommitted_changes()
+        if has_changes:
+            if not self.hooks.confirm("检测到未提交的更改，是否继续编译？\n建议先提交更改。"):
+                return False, next_version, commit_message, commit_id
+
+        return True, next_version, commit_message, commit_id
+
+    def _commit_release_locked(self, current_version: Optional[str], next_version: str, commit_message: str) -> str:
+        """
+        提交未提交的更改，更新版本号和Release Notes并提交（调用方持有工作区提交锁）
+
+        Args:
+            current_version: 当前版本
+            next_version: 发布版本
+            commit_message: 提交信息
+
+        Returns:
+            str: 实际发布的版本号（版本号更新失败时为当前版本）
+        """
+        has_changes = self.git_manager.has_uncommitted_changes()
+
+        # 如果有未提交的更改，进行Git提交
+        if has_changes:
+            self.update_status(self.get_text('committing_changes'))
+            self.log_message(f"准备提交: {commit_message}")
+            if self.git_manager.commit_changes(commit_message):
+                self.log_message(f"Git提交成功: {commit_message}")
+            else:
+                self.log_message("Git提交失败，但继续编译流程")
+        else:
+            self.log_message("没有未提交的更改，跳过Git提交")
+
+        # 如果版本号需要更新，更新信息文件
+        if current_version and next_version != current_version:
+            self.update_status(self.get_text('updating_version'))
+            main_file_path, error_msg = self.get_info_file_path_with_details()
+            if main_file_path:
+                success, message = self.info_manager.update_version_in_info_file(main_file_path, next_version)
+            else:
+                success, message = False, f"未找到信息文件\n\n{error_msg}"
+            if success:
+                self.log_message(f"版本号更新成功: {message}")
+            else:
+                self.log_message(f"版本号更新失败: {message}")
+                # 继续使用原版本号
+                next_version = current_version
+
+        # 创建或更新Release Note（无论版本号是否更新都执行）
+        self.update_status(self.get_text('updating_release_notes'))
+        self.create_or_update_release_note(next_version, commit_message)
+
+        # 提交版本号更新和Release Note
+        if self.git_manager.has_uncommitted_changes():
+            self.update_status(self.get_text('committing_version_changes'))
+            self.log_message(f"准备提交: {commit_message}")
+            if self.git_manager.commit_changes(commit_message):
+                self.log_message(f"Git提交成功: {commit_message}")
+            else:
+                self.log_message("Git提交失败，但继续编译流程")
+
+        return next_version
+
+    def build_and_publish(self, commit_id: str, next_version: str, branch_name: str,
+                          firmware_version: Optional[str], only_version_changed: bool) -> Tuple[bool, str, dict]:
+        """
+        按配置选择编译方式（IAR工作区批量编译、MDK多项目工作区、全部配置并行编译或单个配置），并修改、发布固件
+
+        Args:
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            only_version_changed: 是否只有版本号变化
+
+        Returns:
+            Tuple[bool, str, dict]: (是否成功, 消息, 详情)，详情包含 error_title、diagnostic_lines，多配置时包含 results
+        """
+        compile_tool = self.config.get('compile_tool', 'IAR')
+
+        # 工作区批量编译：一次调用IarBuild编译批量编译中的所有项目，再逐个修改、发布输出文件
+        batch_name = self.config.get('iar_workspace_batch', '').strip()
+        if compile_tool == 'IAR' and batch_name:
+            return self._build_workspace_batch(batch_name, commit_id, next_version, branch_name,
+                                               firmware_version, only_version_changed)
+
+        # MDK多项目工作区：一次调用UV4编译工作区中的项目，再逐个修改、发布生成的固件
+        if compile_tool == 'MDK' and self.config.get('use_mdk_workspace', False):
+            return self._build_mdk_workspace(commit_id, next_version, branch_name,
+                                             firmware_version, only_version_changed)
+
+        # 编译全部配置：按CPU核心数并行编译，各配置独立完成二进制修改和发布
+        if self.build_all and len(self.available_configurations) > 1:
+            return self._build_all_configurations(commit_id, next_version, branch_name,
+                                                  firmware_version, only_version_changed)
+
+        # 编译当前选择的配置并修改、发布固件
+        return self._build_and_publish_configuration(
+            self.selected_configuration, commit_id, next_version, branch_name, firmware_version, only_version_changed)
+
+    def run(self) -> Tuple[bool, str, dict]:
+        """
+        执行完整的编译发布流程
+
+        Returns:
+            Tuple[bool, str, dict]: (是否成功, 消息, 详情)，详情包含 current_version、version、commit_id、
+            duration、stage_timings（编译前各检查阶段耗时）、resumed（是否从检查点继续）以及 build_and_publish 返回的详情
+        """
+        result_info = {'current_version': None, 'version': None, 'commit_id': None, 'duration': 0.0}
+        try:
+            self.update_status(self.get_text('start_build_process'))
+
+            # 1-4. 查找项目路径并检查配置、检查Git状态并查找已发布版本（两条分支同时执行），确定发布版本
+            prepared = self.prepare()
+            result_info['stage_timings'] = dict(prepared['timings'])
+            if not prepared['success']:
+                error = prepared['error']
+                if prepared['cancelled'] and error is None:
+                    return False, "编译已取消", result_info
+                if isinstance(error, StageError):
+                    self.hooks.show_error(error.detail or 'msg_error', error.message)
+                    return False, error.message, result_info
+                self.log_message(f"编译流程异常: {error}")
+                self.hooks.show_error('msg_error', f"{self.get_text('msg_compile_exception')}: {error}")
+                return False, str(error), result_info
+            branch_name = prepared['results']['git']['branch']
+            current_version, next_version = prepared['results']['version']
+            result_info['current_version'] = current_version
+
+            if self.cancelled:
+                return False, "编译已取消", result_info
+
+            # 上次同一提交的编译发布未完成（如远程发布失败）时从检查点继续，不重新提交和编译
+            resume = self.find_resumable_build(current_version)
+            self.resume_build = False
+            if resume:
+                self.resume_build = self.hooks.confirm(
+                    f"检测到上次未完成的编译发布（{resume['version']}，{resume['commit_id']}），是否从检查点继续？\n"
+                    f"选择否将重新提交版本并编译。")
+            if self.resume_build:
+                next_version = resume['version']
+                commit_id = resume['commit_id']
+                firmware_version = resume['firmware_version'] or f"{current_version} -> {next_version}"
+                for config_name, stage in resume['stages'].items():
+                    self.log_message(f"检查点: {config_name} 从 {stage or '完成'} 继续")
+                self.hooks.on_version(current_version, next_version)
+            else:
+                # 5. 提交更改、更新版本号和Release Notes
+                proceed, next_version, _, commit_id = self.commit_release(current_version, next_version)
+                if not proceed:
+                    return False, "用户取消了编译", result_info
+
+                # 6. 发布提交的commit ID
+                if not commit_id:
+                    message = self.get_text('msg_cannot_get_commit_id')
+                    self.hooks.show_error('msg_error', message)
+                    return False, message, result_info
+                firmware_version = f"{current_version or '未知'} -> {next_version}"
+            result_info['version'] = next_version
+            result_info['commit_id'] = commit_id
+            result_info['resumed'] = self.resume_build
+            self.log_message(f"使用commit ID: {commit_id}")
+
+            if self.cancelled:
+                return False, "编译已取消", result_info
+
+            # 是否只有版本号变化由源文件清单差异判断（_compile_configuration），读到版本号不代表代码没有变化，
+            # 没有清单可用时（未启用、生成失败、工作区批量编译）按普通编译处理
+            only_version_changed = False
+
+            # 7. 编译、修改和发布
+            compile_start_time = datetime.now()
+            success, message, build_info = self.build_and_publish(
+                commit_id, next_version, branch_name or "main", firmware_version, only_version_changed)
+            result_info.update(build_info)
+            result_info['duration'] = (datetime.now() - compile_start_time).total_seconds()
+            self.commit_size_report(next_version)
+
+            compile_time_str = f"{result_info['duration']:.1f}秒"
+            report = f"编译时间: {compile_time_str}\n\n{message}"
+            diagnostic_lines = build_info.get('diagnostic_lines')
+            if diagnostic_lines:
+                report += f"\n\n{diagnostic_lines[0]}"
+
+            if not success:
+                if build_info.get('error_title'):
+                    self.hooks.show_error(build_info['error_title'], report if 'results' in build_info else message)
+                return False, message, result_info
+
+            self.update_status(self.get_text('build_process_complete'))
+            self.hooks.show_success(f"{self.get_text('msg_compile_complete')}\n\n{report}")
+            return True, message, result_info
+
+        except Exception as e:
+            self.log_message(f"编译流程异常: {e}")
+            self.hooks.show_error('msg_error', f"{self.get_text('msg_compile_exception')}: {e}")
+            return False, str(e), result_info
+
+    # ------------------------------------------------------------------
+    # 项目信息
+    # ------------------------------------------------------------------
+
+    def get_info_file_path_with_details(self) -> Tuple[Optional[str], str]:
+        """
+        获取信息文件路径，并返回详细的错误信息
+
+        Returns:
+            tuple: (文件路径, 错误信息)
+        """
+        if self.cached_info_file_path and os.path.exists(self.cached_info_file_path):
+            return self.cached_info_file_path, ""
+
+        if not self.path_manager:
+            compile_tool = self.config.get('compile_tool', 'IAR')
+            self.path_manager = PathManagerFactory.create_path_manager(compile_tool, self.project_path)
+
+        info_file_name = self.config.get('info_file', 'main.c')
+        file_path, error_msg = self.path_manager.find_info_file_with_details(info_file_name)
+        if file_path:
+            self.cached_info_file_path = file_path
+        return file_path, error_msg
+
+    def get_info_file_version(self, info_file_path: str, verify: bool = False) -> Optional[str]:
+        """
+        读取信息文件中的固件版本（有项目文件监视器时缓存结果，信息文件变化时失效）
+
+        Args:
+            info_file_path: 信息文件路径
+            verify: 是否同步校验文件签名，编译流程中使用以避免读到过期版本
+
+        Returns:
+            str: 固件版本，失败返回None
+        """
+        if not self.info_manager:
+            self.info_manager = InfoManagerFactory.create_manager(self.config.get('compile_tool', 'IAR'), self.config)
+        if not self.project_watcher:
+            return self.info_manager.extract_version_from_info_file(info_file_path)
+
+        cache_key = ('info_version', os.path.abspath(info_file_path),
+                     self.config.get('firmware_version_keyword', '__Firmware_Version'))
+        version = self.project_watcher.get(cache_key, verify=verify)
+        if version is not None:
+            return version
+
+        signatures = self.project_watcher.snapshot(files=[info_file_path])
+        version = self.info_manager.extract_version_from_info_file(info_file_path)
+        if version:
+            self.project_watcher.put(cache_key, version, snapshot=signatures)
+        return version
+
+    def get_flash_offset(self, configuration: Optional[dict]) -> Optional[int]:
+        """
+        获取配置对应的flash偏移地址（有项目文件监视器时缓存结果，链接脚本变化时失效）
+
+        Args:
+            configuration: 编译配置信息
+
+        Returns:
+            int: flash偏移地址，失败返回None
+        """
+        linker_file = None
+        if configuration:
+            # 项目分析阶段已并行解析过链接脚本，直接使用结果
+            if configuration.get('flash_offset') is not None:
+                return configuration['flash_offset']
+            linker_file = configuration.get('icf_file') or configuration.get('sct_file')
+
+        if not self.path_manager:
+            compile_tool = self.config.get('compile_tool', 'IAR')
+            self.path_manager = PathManagerFactory.create_path_manager(compile_tool, self.project_path)
+
+        cache_key = ('flash_offset', os.path.abspath(linker_file)) if linker_file and self.project_watcher else None
+        if cache_key:
+            flash_offset = self.project_watcher.get(cache_key)
+            if flash_offset is not None:
+                return flash_offset
+
+        signatures = self.project_watcher.snapshot(files=[linker_file]) if cache_key else None
+        flash_offset = self.path_manager.get_flash_offset_from_configuration(configuration)
+        if cache_key and flash_offset is not None:
+            self.project_watcher.put(cache_key, flash_offset, snapshot=signatures)
+        return flash_offset
+
+    def get_memory_model(self, configuration: Optional[dict]):
+        """
+        获取配置对应链接脚本的内存模型（解析器按文件缓存）
+
+        Args:
+            configuration: 编译配置信息
+
+        Returns:
+            MemoryModel: 内存模型，无链接脚本或解析失败返回None
+        """
+        if not configuration:
+            return None
+        linker_file = configuration.get('icf_file') or configuration.get('sct_file')
+        if not linker_file or not os.path.exists(linker_file):
+            return None
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+        return analyzer.get_memory_model(linker_file)
+
+    # ------------------------------------------------------------------
+    # 源文件清单和编译缓存
+    # ------------------------------------------------------------------
+
+    def scan_source_manifest(self, configuration: Optional[dict], builder) -> Optional[dict]:
+        """
+        生成配置的源文件清单，并读取上一次成功编译时保存的清单
+
+        Args:
+            configuration: 编译配置信息
+            builder: 构建器，用于获取编译工具路径和实际编译的配置名称
+
+        Returns:
+            Optional[dict]: {'store', 'project_file', 'manifest', 'previous', 'info_file'}，未启用或失败时为None
+        """
+        if not configuration or not self.config.get('enable_source_manifest', True):
+            return None
+        try:
+            from build_cache import collect_input_files, toolchain_fingerprint
+            from source_manifest import SourceManifest, ManifestStore, version_masked_digest
+
+            compile_tool = self.config.get('compile_tool', 'IAR')
+            project_file = self._project_file(configuration)
+            if not project_file or not os.path.exists(project_file):
+                return None
+            analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+            linker_file = configuration.get('icf_file') or configuration.get('sct_file')
+            input_files = collect_input_files(analyzer.get_project_inputs(project_file), [project_file, linker_file])
+
+            store = ManifestStore()
+            previous = store.load(project_file, builder.build_config)
+            info_file, _ = self.get_info_file_path_with_details()
+            # 信息文件去掉版本号后的哈希，用于区分只修改了版本号和修改了信息文件中的代码
+            info_digest = version_masked_digest(
+                info_file, self.config.get('firmware_version_keyword', '__Firmware_Version')) if info_file else None
+            manifest = SourceManifest.scan(input_files, {
+                'linker_file': os.path.normcase(os.path.abspath(linker_file)) if linker_file else '',
+                'options_digest': analyzer.get_configuration_digest(project_file, builder.build_config),
+                'toolchain': toolchain_fingerprint(builder.get_executable_path()),
+                'info_digest': info_digest or ''
+            }, previous)
+            return {'store': store, 'project_file': project_file, 'manifest': manifest,
+                    'previous': previous, 'info_file': info_file}
+
+        except Exception as e:
+            self.log_message(f"生成源文件清单失败: {e}")
+            return None
+
+    def predict_rebuild_scope(self, configuration: Optional[dict], builder, manifest_state: dict) -> Optional[dict]:
+        """
+        根据编译器依赖文件和源文件清单差异预测需要重新编译的编译单元及耗时
+
+        Args:
+            configuration: 编译配置信息
+            builder: 构建器，用于获取实际编译的配置名称
+            manifest_state: scan_source_manifest 的结果
+
+        Returns:
+            Optional[dict]: predict_rebuild 的结果，无上次清单、无修改或无依赖文件时返回None
+        """
+        if not manifest_state or not manifest_state['previous']:
+            return None
+        try:
+            from dependency_index import DependencyIndexLoader, CompileTimeHistory, predict_rebuild
+
+            changes = manifest_state['manifest'].diff(manifest_state['previous'])
+            changed_files = changes['added'] + changes['removed'] + changes['modified']
+            if not changed_files:
+                return None
+            compile_tool = self.config.get('compile_tool', 'IAR')
+            project_file = manifest_state['project_file']
+            index = DependencyIndexLoader().load(compile_tool, project_file, configuration, builder.build_config)
+            if not index:
+                return None
+            history = CompileTimeHistory(project_file, builder.build_config)
+            return predict_rebuild(index, changed_files, history,
+                                   self.config.get('near_full_rebuild_ratio', 0.8))
+
+        except Exception as e:
+            self.log_message(f"预测重新编译范围失败: {e}")
+            return None
+
+    def record_compile_times(self, builder):
+        """把本次编译各源文件的耗时记入编译耗时历史"""
+        monitor = getattr(builder, 'last_build_monitor', None)
+        if not monitor or not monitor.compile_times:
+            return
+        from dependency_index import CompileTimeHistory
+        project_file = self._project_file(builder.configuration)
+        if project_file:
+            CompileTimeHistory(project_file, builder.build_config).record(monitor.compile_times)
+
+    def compute_build_cache_key(self, configuration: Optional[dict], builder, manifest_state: Optional[dict] = None):
+        """
+        计算配置的编译缓存键：项目源文件和头文件、编译依赖的头文件、项目文件、链接脚本的内容，工具链和配置名称
+
+        编译器依赖文件列出了每个编译单元实际包含的头文件；没有依赖文件（从未编译过）时无法确认头文件是否变化，不使用缓存
+
+        Args:
+            configuration: 编译配置信息
+            builder: 构建器，用于获取编译工具路径和实际编译的配置名称
+            manifest_state: scan_source_manifest 的结果，提供时直接使用清单中的文件和哈希
+
+        Returns:
+            Tuple[Optional[BuildCache], Optional[str]]: (编译缓存, 缓存键)，未启用或计算失败时为(None, None)
+        """
+        if not configuration or not self.config.get('enable_build_cache', True):
+            return None, None
+        try:
+            from build_cache import BuildCache, collect_input_files, toolchain_fingerprint
+            from dependency_index import DependencyIndexLoader
+
+            compile_tool = self.config.get('compile_tool', 'IAR')
+            project_file = self._project_file(configuration)
+            if not project_file or not os.path.exists(project_file):
+                return None, None
+            dependency_index = DependencyIndexLoader().load(compile_tool, project_file, configuration,
+                                                            builder.build_config)
+            if not dependency_index:
+                logger.info("没有编译依赖信息，不使用编译缓存")
+                return None, None
+            file_hashes = None
+            if manifest_state:
+                file_hashes = manifest_state['manifest'].file_hashes()
+                input_files = sorted(file_hashes)
+            else:
+                analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+                linker_file = configuration.get('icf_file') or configuration.get('sct_file')
+                input_files = collect_input_files(analyzer.get_project_inputs(project_file), [project_file, linker_file])
+            input_files = sorted(set(input_files) | set(dependency_index.all_files()))
+
+            build_cache = BuildCache(max_size_mb=self.config.get('build_cache_max_mb'))
+            cache_key = build_cache.compute_key(input_files, {
+                'compile_tool': compile_tool,
+                'project_file': os.path.normcase(os.path.abspath(project_file)),
+                'configuration': builder.build_config,
+                'toolchain': toolchain_fingerprint(builder.get_executable_path())
+            }, file_hashes)
+            logger.info(f"编译缓存键: {cache_key[:12]} ({len(input_files)} 个输入文件)")
+            return build_cache, cache_key
+
+        except Exception as e:
+            self.log_message(f"计算编译缓存键失败，正常编译: {e}")
+            return None, None
+
+    def store_build_outputs(self, build_cache, cache_key: str, configuration: dict) -> bool:
+        """
+        把配置的编译输出（bin/out/axf/map）存入编译缓存
+
+        Args:
+            build_cache: 编译缓存
+            cache_key: 缓存键
+            configuration: 编译配置信息
+
+        Returns:
+            bool: 是否成功
+        """
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        project_file = self._project_file(configuration)
+        analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+        outputs = analyzer.find_build_outputs(project_file, configuration)
+        artifacts = {kind: outputs.get(kind) for kind in ('bin_file', 'out_file', 'axf_file', 'map_file')}
+        return build_cache.store(cache_key, artifacts, f"{os.path.basename(project_file)}/{configuration.get('name', '')}")
+
+    def get_version_patch_image(self, configuration: Optional[dict], builder,
+                                manifest_state: Optional[dict]) -> Optional[str]:
+        """
+        免编译更新版本号：源文件清单显示只有信息文件中的版本号变化时，把上次编译保存的镜像复制到输出位置
+
+        需要在配置中启用 enable_fast_version_bump；发布out/axf文件时不可用（其中的版本号不会更新）
+
+        Args:
+            configuration: 编译配置信息
+            builder: 构建器，用于获取实际编译的配置名称
+            manifest_state: scan_source_manifest 的结果
+
+        Returns:
+            Optional[str]: 复制到输出位置的bin文件路径，不满足条件时返回None
+        """
+        if not manifest_state or not self.config.get('enable_fast_version_bump', False):
+            return None
+        if self.config.get('publish_out_file', False):
+            self.log_message("发布out/axf文件时不能免编译更新版本号，正常编译")
+            return None
+        from source_manifest import is_info_file_only_change
+        if not is_info_file_only_change(manifest_state['manifest'], manifest_state['previous'],
+                                        manifest_state['info_file']):
+            return None
+        bin_file = configuration.get('bin_file')
+        image_path = manifest_state['store'].image_path(manifest_state['project_file'], builder.build_config)
+        if not bin_file or not image_path:
+            return None
+        try:
+            os.makedirs(os.path.dirname(bin_file), exist_ok=True)
+            shutil.copyfile(image_path, bin_file)
+            return bin_file
+        except Exception as e:
+            self.log_message(f"恢复上次编译的镜像失败，正常编译: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # 编译检查点
+    # ------------------------------------------------------------------
+
+    def _checkpoint_configurations(self) -> list:
+        """本次编译发布记录检查点的配置（工作区批量编译一次编译多个项目，不记录检查点）"""
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        if compile_tool == 'IAR' and self.config.get('iar_workspace_batch', '').strip():
+            return []
+        if compile_tool == 'MDK' and self.config.get('use_mdk_workspace', False):
+            return []
+        if self.build_all and len(self.available_configurations) > 1:
+            return list(self.available_configurations)
+        return [self.selected_configuration] if self.selected_configuration else []
+
+    def _checkpoint_build_id(self, configuration: dict, commit_id: str) -> str:
+        """配置在该提交的编译ID"""
+        from build_checkpoint import CheckpointStore
+        return CheckpointStore.make_build_id(self._project_file(configuration), configuration.get('name', ''),
+                                             commit_id)
+
+    def find_resumable_build(self, current_version: Optional[str]) -> Optional[dict]:
+        """
+        查找可以继续的编译发布：发布提交（之后可能有单独提交的尺寸信息）上次的编译发布有未完成的阶段，且没有未提交的更改
+
+        Args:
+            current_version: 信息文件中的当前版本（上次编译发布已把版本号更新并提交）
+
+        Returns:
+            Optional[dict]: {'commit_id', 'version', 'firmware_version', 'stages': {配置名称: 第一个未完成阶段}}，
+            没有可继续的编译发布时返回None
+        """
+        if not self.config.get('enable_build_checkpoint', True) or not current_version or not self.git_manager:
+            return None
+        configurations = self._checkpoint_configurations()
+        if not configurations:
+            return None
+
+        # 源文件有未提交的更改时输入已变化，重新提交和编译
+        uncommitted = self.git_manager.get_uncommitted_files()
+        if uncommitted is None or uncommitted:
+            return None
+
+        # 发布后单独提交了尺寸信息时，固件中的提交ID为其上一个提交
+        release_rev = 'HEAD'
+        if self.git_manager.get_commit_subject() == SIZE_REPORT_COMMIT_MESSAGE.format(version=current_version):
+            release_rev = 'HEAD~1'
+        commit_id = self.git_manager.get_short_commit_id(7, release_rev)
+        if not commit_id:
+            return None
+
+        from build_checkpoint import CheckpointStore
+        store = CheckpointStore()
+        checkpoints = [store.load(self._checkpoint_build_id(configuration, commit_id))
+                       for configuration in configurations]
+        if any(checkpoint is None or checkpoint.version != current_version for checkpoint in checkpoints):
+            return None
+        if all(checkpoint.is_complete for checkpoint in checkpoints):
+            return None
+        return {
+            'commit_id': commit_id,
+            'version': current_version,
+            'firmware_version': checkpoints[0].data.get('firmware_version'),
+            'stages': {configuration.get('name', ''): checkpoint.first_incomplete()
+                       for configuration, checkpoint in zip(configurations, checkpoints)}
+        }
+
+    def open_build_checkpoint(self, configuration: Optional[dict], commit_id: str, next_version: str,
+                              branch_name: str, firmware_version: Optional[str]):
+        """
+        获取配置本次编译发布的检查点：继续上次的编译发布时读取已有检查点，否则开始新的检查点
+
+        Args:
+            configuration: 编译配置信息
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+
+        Returns:
+            Optional[BuildCheckpoint]: 检查点，未启用或没有配置时返回None
+        """
+        if not configuration or not self.config.get('enable_build_checkpoint', True):
+            return None
+        try:
+            from build_checkpoint import CheckpointStore
+            store = CheckpointStore()
+            build_id = self._checkpoint_build_id(configuration, commit_id)
+            if self.resume_build:
+                checkpoint = store.load(build_id)
+                if checkpoint and checkpoint.version == next_version:
+                    stage = checkpoint.first_incomplete()
+                    self.log_message(f"[{configuration.get('name', '')}] 从检查点继续: "
+                                     f"{f'从 {stage} 阶段开始' if stage else '各阶段均已完成'}")
+                    return checkpoint
+            return store.start(build_id, {
+                'project_file': self._project_file(configuration),
+                'configuration': configuration.get('name', ''),
+                'commit_id': commit_id,
+                'version': next_version,
+                'firmware_version': firmware_version,
+                'branch': branch_name
+            })
+        except Exception as e:
+            self.log_message(f"编译检查点不可用: {e}")
+            return None
+
+    def _compile_checkpoint_inputs(self, configuration: dict, commit_id: str, next_version: str) -> str:
+        """编译阶段的输入哈希：提交、项目文件、配置、版本和工具链"""
+        from build_checkpoint import hash_inputs
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        return hash_inputs({
+            'commit_id': commit_id,
+            'project_file': self._project_file(configuration),
+            'configuration': configuration.get('name', ''),
+            'version': next_version,
+            'compile_tool': compile_tool,
+            'tool_path': self.config.get('iar_installation_path' if compile_tool == 'IAR' else 'mdk_installation_path', '')
+        })
+
+    def _restore_checkpoint_image(self, checkpoint, bin_path: Optional[str]) -> bool:
+        """
+        把检查点保存的原始镜像复制到编译输出位置（已是原始镜像时不复制）
+
+        Args:
+            checkpoint: 编译检查点
+            bin_path: 编译输出的bin文件路径
+
+        Returns:
+            bool: 是否复制了镜像
+        """
+        from build_cache import hash_file
+        if not bin_path or not os.path.isfile(checkpoint.image_path):
+            return False
+        if hash_file(bin_path) == checkpoint.outputs('compile').get('raw_sha1'):
+            return False
+        try:
+            os.makedirs(os.path.dirname(bin_path), exist_ok=True)
+            shutil.copyfile(checkpoint.image_path, bin_path)
+            self.log_message(f"已从检查点恢复原始镜像: {bin_path}")
+            return True
+        except Exception as e:
+            self.log_message(f"从检查点恢复原始镜像失败: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # 编译和发布
+    # ------------------------------------------------------------------
+
+    def _build_and_publish_configuration(self, configuration: Optional[dict], commit_id: str, next_version: str,
+                                         branch_name: str, firmware_version: Optional[str],
+                                         only_version_changed: bool, parallel_jobs: Optional[int] = None,
+                                         concurrent: bool = False) -> Tuple[bool, str, dict]:
+        """
+        编译单个配置，并完成二进制修改、文件处理、发布、尺寸分析和远程发布
+
+        启用编译检查点时记录各阶段的输入哈希、输出和状态，同一提交重新执行时跳过输入未变化的已完成阶段
+
+        Args:
+            configuration: 编译配置信息
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            only_version_changed: 是否只有版本号变化（未启用源文件清单时决定增量编译还是清理编译）
+            parallel_jobs: 单次编译的并行编译线程数，为None时使用工具链默认值
+            concurrent: 是否与其他配置并行执行（并行时日志带配置名前缀，不替换当前的构建器和文件管理器）
+
+        Returns:
+            Tuple[bool, str, dict]: (是否成功, 消息, 详情)，详情包含 error_title（失败时的提示标题键）和 diagnostic_lines
+        """
+        from build_cache import hash_file
+        from build_checkpoint import STATUS_DONE, STATUS_FAILED
+
+        config_name = configuration.get('name', '') if configuration else ''
+        prefix = f"[{config_name}] " if concurrent else ""
+        result_info = {'error_title': 'msg_compile_failed', 'diagnostic_lines': [], 'publish_info': {}}
+
+        def log(message):
+            self.log_message(f"{prefix}{message}")
+
+        def status(key):
+            self.update_status(f"{prefix}{self.get_text(key)}")
+
+        compile_tool = self.config.get('compile_tool', 'IAR')
+
+        # 根据编译工具初始化相应的编译器
+        builder = BuilderFactory.create_builder(compile_tool, self.config, configuration)
+        if concurrent:
+            builder.set_output_callback(lambda event: self.hooks.build_output(event, config_name))
+        else:
+            builder.set_output_callback(self.hooks.build_output)
+            self.builder = builder
+        builder.set_parallel_jobs(parallel_jobs)
+
+        # 同一提交上次的编译已完成（之后的阶段失败）时跳过编译，使用检查点保存的原始镜像
+        checkpoint = self.open_build_checkpoint(configuration, commit_id, next_version, branch_name,
+                                                firmware_version)
+        compile_inputs = self._compile_checkpoint_inputs(configuration, commit_id, next_version) if checkpoint else None
+        if checkpoint and checkpoint.is_done('compile', compile_inputs) and os.path.isfile(checkpoint.image_path):
+            compile_outputs = checkpoint.outputs('compile')
+            patch_version = compile_outputs.get('patch_version')
+            if compile_outputs.get('bin_file'):
+                configuration['bin_file'] = compile_outputs['bin_file']
+            if not configuration.get('bin_file') or not os.path.exists(configuration['bin_file']):
+                self._restore_checkpoint_image(checkpoint, configuration.get('bin_file'))
+            log("检查点: 该提交已编译完成，跳过编译")
+            compiled = False
+        else:
+            success, message, patch_version = self._compile_configuration(
+                configuration, builder, commit_id, next_version, branch_name, only_version_changed,
+                result_info, log, status)
+            if not success:
+                if checkpoint:
+                    checkpoint.record('compile', STATUS_FAILED, compile_inputs, message=message.split('\n')[0])
+                return False, message, result_info
+            compiled = True
+
+        # 获取bin文件信息
+        bin_info = builder.get_bin_file_info(configuration)
+        if not bin_info['exists']:
+            if checkpoint:
+                checkpoint.record('compile', STATUS_FAILED, compile_inputs,
+                                  message=self.get_text('msg_compile_success_no_bin'))
+            return False, self.get_text('msg_compile_success_no_bin'), result_info
+
+        # 保存修改二进制文件之前的原始镜像，之后的阶段失败时不需要重新编译
+        if checkpoint and compiled and checkpoint.store.save_image(checkpoint.build_id, bin_info['path']):
+            checkpoint.record('compile', STATUS_DONE, compile_inputs, {
+                'bin_file': bin_info['path'],
+                'raw_sha1': hash_file(bin_info['path']),
+                'patch_version': patch_version
+            })
+
+        log("编译成功")
+
+        success, message, publish_result = self._publish_configuration_image(
+            configuration, bin_info, commit_id, next_version, branch_name, firmware_version, concurrent,
+            patch_version, checkpoint)
+        result_info.update(publish_result)
+        return success, message, result_info
+
+    def _compile_configuration(self, configuration: Optional[dict], builder, commit_id: str, next_version: str,
+                               branch_name: str, only_version_changed: bool, result_info: dict,
+                               log, status) -> Tuple[bool, str, Optional[str]]:
+        """
+        编译单个配置：仅版本号变化时直接在上次编译的镜像中写入新版本，输入未变化时恢复编译缓存中的输出，否则智能编译
+
+        Args:
+            configuration: 编译配置信息
+            builder: 编译器
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            only_version_changed: 是否只有版本号变化
+            result_info: 编译详情，写入 diagnostic_lines
+            log: 日志输出函数
+            status: 阶段状态更新函数
+
+        Returns:
+            Tuple[bool, str, Optional[str]]: (是否成功, 消息, 需要写入镜像的版本号（免编译更新版本号时）)
+        """
+        compile_tool = self.config.get('compile_tool', 'IAR')
+
+        manifest_state = self.scan_source_manifest(configuration, builder)
+        if self.get_version_patch_image(configuration, builder, manifest_state):
+            log(f"仅信息文件中的版本号变化，跳过编译，在上次编译的镜像中写入版本 {next_version}")
+            manifest_state['store'].save(manifest_state['project_file'], builder.build_config,
+                                         manifest_state['manifest'])
+            return True, "", next_version
+
+        build_cache, cache_key = self.compute_build_cache_key(configuration, builder, manifest_state)
+        restored = build_cache.restore(cache_key) if cache_key else None
+        if restored:
+            log(f"编译缓存命中，跳过编译，已恢复: {', '.join(os.path.basename(path) for path in restored.values())}")
+            # 输出目录在分析项目时不存在时配置中没有输出文件路径，使用恢复的路径
+            if configuration is not None:
+                configuration.update(restored)
+            return True, "", None
+
+        status('compiling_project')
+        incremental = only_version_changed
+        if not manifest_state:
+            log(f"没有可用的源文件清单，跳过基于清单的变化检测，使用{'增量' if incremental else '清理'}编译")
+        else:
+            from source_manifest import decide_build_strategy
+            from dependency_index import format_prediction
+
+            # 根据与上次成功编译的源文件清单差异决定增量编译还是完整编译
+            force_rebuild, reason = decide_build_strategy(
+                manifest_state['manifest'], manifest_state['previous'], manifest_state['info_file'])
+            log(reason)
+            prediction = None if force_rebuild else self.predict_rebuild_scope(
+                configuration, builder, manifest_state)
+            if prediction:
+                for line in format_prediction(prediction):
+                    log(line)
+                if prediction['near_full']:
+                    # 几乎所有编译单元都要重新编译时直接完整编译，同时清除过期的目标文件
+                    force_rebuild = True
+                    log("重新编译范围接近完整编译，改为完整编译")
+            incremental = not force_rebuild
+        with self._toolchain_slot(compile_tool):
+            success, message = builder.smart_build(incremental)
+        self.record_compile_times(builder)
+
+        # 记录本次编译的诊断信息，并与本分支/配置的上一次编译比较
+        result_info['diagnostic_lines'] = self.record_build_diagnostics(
+            success, branch_name, next_version, commit_id, builder, configuration, incremental)
+
+        if not success:
+            return False, message, None
+
+        # 首次编译前输出目录不存在，配置中没有输出文件路径，编译后重新定位
+        if configuration and not configuration.get('bin_file'):
+            analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+            outputs = analyzer.find_build_outputs(self._project_file(configuration), configuration)
+            configuration.update({kind: path for kind, path in outputs.items() if path})
+
+        if manifest_state:
+            manifest_state['store'].save(manifest_state['project_file'], builder.build_config,
+                                         manifest_state['manifest'])
+            if configuration.get('bin_file') and os.path.exists(configuration['bin_file']):
+                manifest_state['store'].save_image(manifest_state['project_file'], builder.build_config,
+                                                   configuration['bin_file'])
+
+        # 在修改二进制文件之前缓存原始编译输出（本次编译更新了依赖文件，重新计算缓存键）
+        build_cache, cache_key = self.compute_build_cache_key(configuration, builder, manifest_state)
+        if cache_key:
+            self.store_build_outputs(build_cache, cache_key, configuration)
+        return True, message, None
+
+    def _publish_configuration_image(self, configuration: Optional[dict], bin_info: dict, commit_id: str,
+                                     next_version: str, branch_name: str, firmware_version: Optional[str],
+                                     concurrent: bool = False, patch_version: Optional[str] = None,
+                                     checkpoint=None) -> Tuple[bool, str, dict]:
+        """
+        对已编译配置的bin文件进行二进制修改、文件处理、发布、尺寸分析和远程发布
+
+        Args:
+            configuration: 编译配置信息
+            bin_info: bin文件信息（get_bin_file_info 的结果）
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            concurrent: 是否与其他配置并行执行（并行时日志带配置名前缀，不替换当前的文件管理器）
+            patch_version: 需要写入镜像的版本号（免编译更新版本号时使用）
+            checkpoint: 编译检查点，提供时跳过输入未变化的已完成阶段并记录各阶段结果
+
+        Returns:
+            Tuple[bool, str, dict]: (是否成功, 消息, 详情)，详情包含 error_title 和 publish_info
+        """
+        from build_cache import hash_file
+        from build_checkpoint import STATUS_DONE, STATUS_FAILED, STATUS_SKIPPED, hash_inputs
+        from file_transfer import format_rate
+
+        config_name = configuration.get('name', '') if configuration else ''
+        prefix = f"[{config_name}] " if concurrent else ""
+        result_info = {'error_title': None, 'publish_info': {}}
+
+        def log(message):
+            self.log_message(f"{prefix}{message}")
+
+        def status(key):
+            self.update_status(f"{prefix}{self.get_text(key)}")
+
+        compile_tool = self.config.get('compile_tool', 'IAR')
+
+        # 修改二进制文件，使用该配置链接脚本中的flash起始地址
+        status('modifying_binary')
+        modifier_config = self.config
+        flash_offset = configuration.get('flash_offset') if configuration else None
+        if flash_offset:
+            modifier_config = dict(self.config)
+            modifier_config['binary_settings'] = dict(self.config.get('binary_settings', {}), bin_start_address=flash_offset)
+        memory_model = self.get_memory_model(configuration)
+        binary_modifier = BinaryModifier(modifier_config, self._feature_settings(), memory_model)
+        if not concurrent:
+            self.binary_modifier = binary_modifier
+
+        modify_inputs = None
+        if checkpoint:
+            modify_inputs = hash_inputs({
+                'raw_sha1': checkpoint.outputs('compile').get('raw_sha1'),
+                'commit_id': commit_id,
+                'firmware_version': firmware_version,
+                'patch_version': patch_version,
+                'features': self._feature_settings(),
+                'binary_settings': modifier_config.get('binary_settings', {}),
+                'offsets': {key: value for key, value in modifier_config.items() if key.endswith(('_offset', '_size'))}
+            })
+        if checkpoint and checkpoint.is_done('modify', modify_inputs) and \
+                hash_file(bin_info['path']) == checkpoint.outputs('modify').get('bin_sha1'):
+            log("检查点: 二进制文件已修改，跳过")
+        else:
+            # 重新修改前恢复原始镜像，避免在已修改的文件上再次写入
+            if checkpoint:
+                self._restore_checkpoint_image(checkpoint, bin_info['path'])
+
+            # 记录二进制文件信息
+            log(f"准备修改二进制文件: {bin_info['path']}")
+            log(f"文件大小: {bin_info['size']} 字节")
+            log(f"Commit ID: {commit_id}")
+
+            success, message, mod_info = binary_modifier.modify_binary_file(bin_info['path'], commit_id,
+                                                                            firmware_version, patch_version)
+            if not success:
+                log(f"二进制文件修改失败: {message}")
+                if checkpoint:
+                    checkpoint.record('modify', STATUS_FAILED, modify_inputs, message=message)
+                result_info['error_title'] = 'msg_modify_failed'
+                return False, message, result_info
+
+            log("二进制文件修改成功")
+            log(f"修改详情: {message}")
+            if checkpoint:
+                checkpoint.record('modify', STATUS_DONE, modify_inputs, {'bin_sha1': hash_file(bin_info['path'])})
+
+        # 处理文件
+        status('processing_files')
+        # 发布文件名中的项目名称和相对发布目录按原项目目录（分支工作树在缓存目录中）
+        file_manager = FileManagerFactory.create_file_manager(compile_tool, self.config, self.source_project_path,
+                                                              self.path_manager)
+        if not concurrent:
+            self.file_manager = file_manager
+
+        success, message, file_info = file_manager.process_bin_file(bin_info['path'], commit_id, version=next_version)
+        if not success:
+            result_info['error_title'] = 'msg_file_process_failed'
+            return False, message, result_info
+
+        log("文件处理成功")
+
+        # 发布固件到fw_publish目录
+        status('publishing_firmware')
+        try:
+            add_timestamp = self.config.get('add_timestamp_to_filename', False)
+            publish_out_file = self.config.get('publish_out_file', False)
+            bin_sha1 = hash_file(bin_info['path']) if checkpoint else None
+            publish_inputs = hash_inputs({
+                'bin_sha1': bin_sha1,
+                'version': next_version,
+                'commit_id': commit_id,
+                'branch': branch_name,
+                'fw_publish_directory': self.config.get('fw_publish_directory', './fw_publish'),
+                'add_timestamp': add_timestamp,
+                'publish_out_file': publish_out_file
+            }) if checkpoint else None
+            published = checkpoint.outputs('publish') if checkpoint else {}
+            if checkpoint and checkpoint.is_done('publish', publish_inputs) and \
+                    hash_file(published.get('destination_path') or '') == bin_sha1:
+                message = f"固件已发布: {published['destination_path']}"
+                log(f"检查点: {message}，跳过")
+                publish_info = published
+            else:
+                current_timestamp = datetime.now() if add_timestamp else None
+                success, message, publish_info = file_manager.publish_firmware(
+                    bin_info['path'], commit_id, next_version, timestamp=current_timestamp,
+                    add_timestamp=add_timestamp, publish_out_file=publish_out_file,
+                    configuration=configuration, branch_name=branch_name)
+
+                if not success:
+                    log(f"固件发布失败: {message}")
+                    if checkpoint:
+                        checkpoint.record('publish', STATUS_FAILED, publish_inputs, message=message)
+                    result_info['error_title'] = 'msg_firmware_publish_failed'
+                    return False, message, result_info
+
+                log("固件发布成功")
+                log(f"发布详情: {message}")
+                if checkpoint:
+                    checkpoint.record('publish', STATUS_DONE, publish_inputs, {
+                        key: publish_info.get(key) for key in ('destination_path', 'out_destination_path', 'file_size')
+                    })
+
+                # 分析固件尺寸并与上一发布版本比较，结果写入release note（在远程发布之前完成，流程结束时单独提交）
+                size_lines = self.analyze_firmware_size(
+                    configuration, next_version, commit_id, branch_name,
+                    publish_info.get('destination_path'), memory_model, file_manager)
+                self.append_size_report_to_release_note(next_version, size_lines, configuration)
+            result_info['publish_info'] = publish_info
+
+            # 发布到远程目录（如果启用了）
+            enable_remote_publish = self.config.get('enable_remote_publish', False)
+            remote_publish_dir = self.config.get('remote_publish_directory', '').strip()
+            log(f"检查远程发布配置: 启用={enable_remote_publish}, 目录='{remote_publish_dir}'")
+            remote_inputs = hash_inputs({
+                'bin_sha1': bin_sha1,
+                'destination_path': publish_info.get('destination_path'),
+                'remote_publish_directory': remote_publish_dir if enable_remote_publish else None,
+                'branch': branch_name,
+                'publish_out_file': publish_out_file
+            }) if checkpoint else None
+
+            if not (enable_remote_publish and remote_publish_dir):
+                if checkpoint:
+                    checkpoint.record('remote_publish', STATUS_SKIPPED, remote_inputs)
+            elif checkpoint and checkpoint.is_done('remote_publish', remote_inputs):
+                log("检查点: 已发布到远程目录，跳过")
+            else:
+                status('publishing_remote')
+                try:
+                    # 获取当前分支名称
+                    git_info = self.git_manager.get_commit_info()
+                    remote_branch = git_info.get('branch')
+                    if not remote_branch:
+                        error_msg = "无法获取Git分支信息，请检查Git仓库状态"
+                        logger.error(error_msg)
+                        log(error_msg)
+                        if checkpoint:
+                            checkpoint.record('remote_publish', STATUS_FAILED, remote_inputs, message=error_msg)
+                        result_info['error_title'] = None
+                        return False, error_msg, result_info
+                    else:
+                        logger.info(f"检测到Git分支: {remote_branch}")
+                        log(f"当前Git分支: {remote_branch}")
+
+                    # 使用重命名后的bin文件路径
+                    renamed_bin_path = publish_info.get('destination_path')
+                    if not renamed_bin_path or not os.path.exists(renamed_bin_path):
+                        log("重命名后的bin文件不存在，使用原始文件")
+                        renamed_bin_path = bin_info['path']
+
+                    release_note_path = self._release_note_path()
+                    log(f"远程发布文件: bin={renamed_bin_path}, release_note={release_note_path}")
+
+                    # 发布到远程目录（各配置共用release note，并行编译时依次发布）
+                    with self._remote_publish_lock:
+                        remote_success, remote_message, remote_info = file_manager.publish_to_remote(
+                            renamed_bin_path, release_note_path, remote_branch, publish_out_file,
+                            configuration=configuration, progress_callback=lambda progress: log(
+                                f"远程发布进度: {progress['bytes']}/{progress['total']} 字节, "
+                                f"{format_rate(progress['bytes_per_second'])}"))
+
+                    if remote_success and remote_info.get('bin_file_copied', True):
+                        log("远程发布成功")
+                        log(f"远程发布详情: {remote_message}")
+                        if checkpoint:
+                            checkpoint.record('remote_publish', STATUS_DONE, remote_inputs,
+                                              {'remote_directory': remote_info.get('remote_directory')})
+                    else:
+                        log(f"远程发布失败: {remote_message}")
+                        # 远程发布失败不影响主流程，只记录日志；重新执行编译发布时从检查点只重试远程发布
+                        if checkpoint:
+                            checkpoint.record('remote_publish', STATUS_FAILED, remote_inputs, message=remote_message)
+                            log("重新执行编译发布将跳过已完成的阶段，只重试远程发布")
+                except Exception as e:
+                    log(f"远程发布异常: {e}")
+                    # 远程发布异常不影响主流程，只记录日志
+                    if checkpoint:
+                        checkpoint.record('remote_publish', STATUS_FAILED, remote_inputs, message=str(e))
+
+        except Exception as e:
+            error_msg = f"发布固件时发生异常: {e}"
+            log(error_msg)
+            result_info['error_title'] = 'msg_firmware_publish_error'
+            return False, error_msg, result_info
+
+        return True, message, result_info
+
+    def _build_all_configurations(self, commit_id: str, next_version: str, branch_name: str,
+                                  firmware_version: Optional[str], only_version_changed: bool) -> Tuple[bool, str, dict]:
+        """
+        并行编译全部配置，每个配置独立完成二进制修改和发布
+
+        同时编译的配置数由CPU核心数和工具链的并行编译线程数决定：IAR通过 -parallel N 为每个配置分配线程，
+        MDK的线程数由µVision设置决定（mdk_parallel_jobs，默认按全部核心计算），只能减少同时编译的配置数；
+        输出目录冲突或属于同一IAR项目文件的配置串行编译
+
+        Args:
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            only_version_changed: 是否只有版本号变化
+
+        Returns:
+            Tuple[bool, str, dict]: (是否全部成功, 汇总信息, 详情)
+        """
+        from build_scheduler import BuildScheduler
+
+        self.update_status(self.get_text('building_all_configs'))
+
+        compile_tool = self.config.get('compile_tool', 'IAR')
+        threads_per_job = None
+        if compile_tool == 'MDK':
+            threads_per_job = self.config.get('mdk_parallel_jobs') or os.cpu_count()
+
+        def shared_files(configuration):
+            # IAR同一项目文件的配置编译时共用 <project>.dep
+            return [self._project_file(configuration)] if compile_tool == 'IAR' else []
+
+        scheduler = BuildScheduler(self.available_configurations, threads_per_job=threads_per_job,
+                                   max_concurrent=self.config.get('max_parallel_configurations'),
+                                   shared_files=shared_files)
+        self.log_message(f"编译全部配置: {len(self.available_configurations)} 个配置, "
+                         f"同时编译 {scheduler.concurrent} 个, 每个 {scheduler.threads_per_job} 线程")
+
+        def build_job(configuration, parallel_jobs):
+            return self._build_and_publish_configuration(
+                configuration, commit_id, next_version, branch_name, firmware_version,
+                only_version_changed, parallel_jobs if compile_tool == 'IAR' else None, concurrent=True)
+
+        def on_finished(configuration, success, message, info):
+            name = configuration.get('name', '')
+            if success:
+                self.log_message(f"[{name}] 编译发布完成")
+            else:
+                first_line = (message or '').strip().split('\n')[0]
+                self.log_message(f"[{name}] 编译发布失败: {first_line}")
+
+        results = scheduler.run(build_job, on_finished)
+        return self._summarize_multi_build_results(results)
+
+    def _build_workspace_batch(self, batch_name: str, commit_id: str, next_version: str, branch_name: str,
+                               firmware_version: Optional[str], only_version_changed: bool) -> Tuple[bool, str, dict]:
+        """
+        通过工作区(.eww)批量编译一次编译多个项目/配置，编译后查找所有输出文件并逐个修改、发布
+
+        Args:
+            batch_name: 工作区中的批量编译名称
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            only_version_changed: 是否只有版本号变化
+
+        Returns:
+            Tuple[bool, str, dict]: (是否全部成功, 汇总信息, 详情)
+        """
+        self.update_status(self.get_text('compiling_project'))
+
+        builder = BuilderFactory.create_builder('IAR', self.config, self.selected_configuration)
+        builder.set_output_callback(self.hooks.build_output)
+        self.builder = builder
+        self.log_message(f"工作区批量编译: {builder.workspace_path}, 批量编译: {batch_name}")
+        self.log_message(f"工作区批量编译不使用源文件清单，跳过基于清单的变化检测，使用{'增量' if only_version_changed else '清理'}编译")
+
+        with self._toolchain_slot('IAR'):
+            success, message = builder.build_workspace_batch(batch_name, force_rebuild=not only_version_changed)
+        diagnostic_lines = self.record_build_diagnostics(success, branch_name, next_version, commit_id,
+                                                         builder, {'name': f"batch_{batch_name}"}, only_version_changed)
+        if not success:
+            return False, message, {'error_title': 'msg_compile_failed', 'diagnostic_lines': diagnostic_lines}
+
+        # 编译完成后重新分析批量编译成员，输出目录此时才一定存在
+        analyzer = ProjectAnalyzerFactory.create_analyzer('IAR')
+        configurations = analyzer.get_batch_configurations(builder.workspace_path, batch_name)
+        if not configurations:
+            return False, f"批量编译 {batch_name} 中没有可发布的配置", {'error_title': 'msg_compile_failed',
+                                                                 'diagnostic_lines': diagnostic_lines}
+        self.log_message(f"批量编译成功，发布 {len(configurations)} 个固件: "
+                         f"{', '.join(configuration['name'] for configuration in configurations)}")
+        return self._publish_workspace_images(builder, configurations, commit_id, next_version, branch_name,
+                                              firmware_version, diagnostic_lines)
+
+    def _build_mdk_workspace(self, commit_id: str, next_version: str, branch_name: str,
+                             firmware_version: Optional[str], only_version_changed: bool) -> Tuple[bool, str, dict]:
+        """
+        通过一次UV4调用编译多项目工作区(.uvmpw)，编译后逐个修改、发布本次生成的固件
+
+        Args:
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            only_version_changed: 是否只有版本号变化
+
+        Returns:
+            Tuple[bool, str, dict]: (是否全部成功, 汇总信息, 详情)
+        """
+        self.update_status(self.get_text('compiling_project'))
+        compile_start_time = datetime.now()
+        project_names = self.config.get('mdk_workspace_projects') or None
+        all_targets = self.config.get('mdk_workspace_all_targets', True)
+
+        builder = BuilderFactory.create_builder('MDK', self.config, self.selected_configuration)
+        builder.set_output_callback(self.hooks.build_output)
+        self.builder = builder
+        self.log_message(f"MDK工作区编译: {builder.workspace_path}, "
+                         f"项目: {', '.join(project_names) if project_names else '全部'}")
+        self.log_message(f"工作区编译不使用源文件清单，跳过基于清单的变化检测，使用{'增量' if only_version_changed else '清理'}编译")
+
+        with self._toolchain_slot('MDK'):
+            success, message = builder.build_multi_project(project_names, all_targets,
+                                                           force_rebuild=not only_version_changed)
+        diagnostic_lines = self.record_build_diagnostics(success, branch_name, next_version, commit_id,
+                                                         builder, {'name': 'workspace'}, only_version_changed)
+        if not success:
+            return False, message, {'error_title': 'msg_compile_failed', 'diagnostic_lines': diagnostic_lines}
+
+        # 编译完成后一次性分析所有成员项目的目标和输出文件，只发布本次编译生成的固件
+        analyzer = ProjectAnalyzerFactory.create_analyzer('MDK')
+        workspace = analyzer.analyze_uvmpw_file(builder.workspace_path, project_names)
+        build_start = compile_start_time.timestamp()
+        configurations = []
+        for configuration in (workspace or {}).get('configurations', []):
+            bin_file = configuration.get('bin_file')
+            if bin_file and os.path.exists(bin_file) and os.path.getmtime(bin_file) >= build_start:
+                configurations.append(configuration)
+            else:
+                self.log_message(f"[{configuration['name']}] 本次编译未生成bin文件，跳过发布")
+        if not configurations:
+            return False, self.get_text('msg_compile_success_no_bin'), {'error_title': 'msg_compile_failed',
+                                                                        'diagnostic_lines': diagnostic_lines}
+        self.log_message(f"工作区编译成功，发布 {len(configurations)} 个固件: "
+                         f"{', '.join(configuration['name'] for configuration in configurations)}")
+        return self._publish_workspace_images(builder, configurations, commit_id, next_version, branch_name,
+                                              firmware_version, diagnostic_lines)
+
+    def _publish_workspace_images(self, builder, configurations: list, commit_id: str, next_version: str,
+                                  branch_name: str, firmware_version: Optional[str],
+                                  diagnostic_lines: list = None) -> Tuple[bool, str, dict]:
+        """
+        逐个修改、发布一次编译生成的多个固件，并汇总结果
+
+        Args:
+            builder: 执行编译的构建器
+            configurations: 生成固件的配置信息列表
+            commit_id: Git提交ID
+            next_version: 发布的版本号
+            branch_name: 分支名称
+            firmware_version: 写入固件的版本信息
+            diagnostic_lines: 诊断信息比较结果
+
+        Returns:
+            Tuple[bool, str, dict]: (是否全部成功, 汇总信息, 详情)
+        """
+        results = []
+        for configuration in configurations:
+            start_time = datetime.now()
+            bin_info = builder.get_bin_file_info(configuration)
+            if bin_info['exists']:
+                success, message, info = self._publish_configuration_image(
+                    configuration, bin_info, commit_id, next_version, branch_name,
+                    firmware_version, concurrent=True)
+            else:
+                success, message, info = False, self.get_text('msg_compile_success_no_bin'), {}
+            results.append({
+                'configuration': configuration,
+                'success': success,
+                'message': message,
+                'info': info,
+                'duration': (datetime.now() - start_time).total_seconds()
+            })
+        return self._summarize_multi_build_results(results, diagnostic_lines)
+
+    def _summarize_multi_build_results(self, results: list, diagnostic_lines: list = None) -> Tuple[bool, str, dict]:
+        """
+        输出多个配置的编译发布结果并生成汇总信息
+
+        Args:
+            results: 结果列表，每项包含 configuration、success、message、duration
+            diagnostic_lines: 诊断信息比较结果
+
+        Returns:
+            Tuple[bool, str, dict]: (是否全部成功, 汇总信息, 详情)
+        """
+        from build_scheduler import BuildScheduler
+
+        summary_lines = BuildScheduler.format_results(results)
+        for line in summary_lines:
+            self.log_message(line)
+        all_success = all(result['success'] for result in results)
+        return all_success, '\n'.join(summary_lines), {
+            'error_title': None if all_success else 'msg_compile_failed',
+            'diagnostic_lines': diagnostic_lines or [],
+            'results': results
+        }
+
+    # ------------------------------------------------------------------
+    # 编译记录和Release Notes
+    # ------------------------------------------------------------------
+
+    def record_build_diagnostics(self, success: bool, branch_name: str, version: str = None,
+                                 commit_id: str = None, builder=None, configuration: dict = None,
+                                 incremental: bool = False) -> list:
+        """
+        将本次编译解析出的诊断信息存入发布目录下的诊断数据库，并报告相对上一次编译新增/已修复的警告；
+        增量编译时未重新编译的文件沿用上一次编译的诊断，不会被误报为已修复
+
+        Args:
+            success: 编译是否成功
+            branch_name: 分支名称
+            version: 版本号
+            commit_id: Git提交ID
+            builder: 执行编译的构建器，为None时使用当前构建器
+            configuration: 编译的配置信息，为None时使用当前选择的配置
+            incremental: 是否为增量编译
+
+        Returns:
+            list: 比较结果描述行，无诊断数据时为空列表
+        """
+        try:
+            monitor = getattr(builder or self.builder, 'last_build_monitor', None)
+            if monitor is None or not self.version_manager:
+                return []
+            from diagnostics_store import DiagnosticsStore
+
+            configuration = configuration or self.selected_configuration
+            config_name = configuration.get('name', '') if configuration else ''
+            store = DiagnosticsStore(self.version_manager.fw_publish_dir)
+            build_id = store.record_build(branch_name, config_name or self.config.get('build_configuration', ''),
+                                          monitor.diagnostics, self.config.get('compile_tool', 'IAR'),
+                                          version, commit_id, success,
+                                          monitor.compiled_files if incremental else None)
+            if build_id is None:
+                return []
+
+            lines = store.format_comparison(store.compare_with_previous(build_id))
+            for line in lines:
+                self.log_message(f"[诊断] {line}")
+            return lines
+
+        except Exception as e:
+            self.log_message(f"记录编译诊断信息失败: {e}")
+            return []
+
+    def analyze_firmware_size(self, configuration: Optional[dict], version: str, commit_id: str,
+                              branch_name: str, firmware_path: str = None, memory_model=None,
+                              file_manager=None) -> list:
+        """
+        解析本次编译的map文件，将尺寸报告记录到发布目录，并与本分支上一个发布版本比较
+
+        Args:
+            configuration: 编译配置信息
+            version: 发布的版本号
+            commit_id: Git提交ID
+            branch_name: 分支名称
+            firmware_path: 发布的固件文件路径
+            memory_model: 链接脚本内存模型，用于计算Flash/RAM占用百分比
+            file_manager: 发布使用的文件管理器，为None时使用当前文件管理器
+
+        Returns:
+            list: 尺寸摘要和差异描述行，未找到map文件时为空列表
+        """
+        try:
+            if not configuration:
+                return []
+            from map_analyzer import SizeHistory, compare_size_reports, format_size_summary, format_size_delta
+
+            compile_tool = self.config.get('compile_tool', 'IAR')
+            project_file = self._project_file(configuration)
+            analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+            # 重新定位输出文件，map文件在本次编译后才可能出现
+            map_file = analyzer.find_build_outputs(project_file, configuration).get('map_file')
+            if not map_file:
+                self.log_message("未找到map文件，跳过尺寸分析")
+                return []
+
+            report = analyzer.get_size_report(map_file)
+            if not report:
+                self.log_message(f"map文件解析失败，跳过尺寸分析: {map_file}")
+                return []
+
+            flash_region = memory_model.primary_flash_region() if memory_model else None
+            ram_region = memory_model.primary_ram_region() if memory_model else None
+            lines = format_size_summary(report, flash_region.size if flash_region else None,
+                                        ram_region.size if ram_region else None)
+
+            config_name = configuration.get('name', '')
+            history = SizeHistory((file_manager or self.file_manager).fw_publish_directory)
+            previous = history.get_previous(branch_name, config_name, version)
+            if previous:
+                comparison = compare_size_reports(previous['report'], report)
+                lines.extend(format_size_delta(comparison, previous.get('version', '')))
+            else:
+                lines.append(f"分支 {branch_name} 配置 {config_name} 无历史尺寸记录，本次作为基准")
+            history.record(branch_name, config_name, version, commit_id, report, firmware_path)
+
+            self.log_message(f"固件尺寸分析 ({os.path.basename(map_file)}):")
+            for line in lines:
+                self.log_message(f"  {line}")
+            return lines
+
+        except Exception as e:
+            self.log_message(f"固件尺寸分析失败: {e}")
+            return []
+
+    def _format_changes_for_release_note(self, commit_message: str) -> str:
+        """
+        格式化用户输入的更新信息，以分号或句号为界换行
+
+        Args:
+            commit_message: 原始提交信息
+
+        Returns:
+            str: 格式化后的文本
+        """
+        try:
+            # 移除可能的前缀（如"发布V1.0.0.1版本 - "）
+            if " - " in commit_message:
+                user_input = commit_message.split(" - ", 1)[1]
+            else:
+                user_input = commit_message
+
+            # 按分号和句号分割文本，支持中英文标点符号
+            sentences = [s.strip() for s in re.split(r'[;；。.]', user_input) if s.strip()]
+
+            # 如果只有一个句子，直接返回
+            if len(sentences) <= 1:
+                return f"- {user_input}"
+
+            # 多个句子，每个句子一行，添加项目符号
+            return "\n".join(f"- {sentence}" for sentence in sentences)
+
+        except Exception as e:
+            # 如果格式化失败，返回原始文本
+            self.log_message(f"格式化更新信息失败: {e}")
+            return f"- {commit_message}"
+
+    def create_or_update_release_note(self, version: str, commit_message: str,
+                                      timestamp: datetime = None) -> bool:
+        """
+        创建或更新release note文件
+
+        Args:
+            version: 版本号
+            commit_message: 提交信息
+            timestamp: 时间戳，如果为None则使用当前时间
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            if timestamp is None:
+                timestamp = datetime.now()
+
+            # release note文件路径（放在项目主目录）
+            release_note_path = self._release_note_path()
+
+            # 准备新的条目
+            new_entry = f"## {version} - {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"
+
+            # 格式化用户输入的更新信息，以分号或句号为界换行
+            formatted_changes = self._format_changes_for_release_note(commit_message)
+            new_entry += f"**Changes:**\n{formatted_changes}\n\n"
+
+            if os.path.exists(release_note_path):
+                with open(release_note_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+                # 在文件开头插入新条目
+                content = new_entry + content if content.strip() else new_entry
+
+                with open(release_note_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+                self.log_message(self.get_text('release_note_updated'))
+            else:
+                header = f"# {self.get_text('release_note_title')}\n\n"
+                header += "本文档记录了固件版本的更新历史。\n\n"
+                header += "---\n\n"
+
+                with open(release_note_path, 'w', encoding='utf-8') as f:
+                    f.write(header + new_entry)
+
+                self.log_message(self.get_text('release_note_created'))
+
+            self.log_message(f"Release note文件路径: {release_note_path}")
+            return True
+
+        except Exception as e:
+            self.log_message(f"创建/更新release note失败: {e}")
+            return False
+
+    def commit_size_report(self, version: str) -> bool:
+        """
+        单独提交写入release note的固件尺寸信息，发布后工作区不留未提交的更改
+
+        Args:
+            version: 版本号
+
+        Returns:
+            bool: 是否提交
+        """
+        if not self.git_manager:
+            return False
+        release_note_path = os.path.normcase(self._release_note_path())
+        message = SIZE_REPORT_COMMIT_MESSAGE.format(version=version)
+        with self.git_manager.worktree_lock():
+            uncommitted = self.git_manager.get_uncommitted_files() or []
+            if release_note_path not in (os.path.normcase(path) for path in uncommitted):
+                return False
+            committed = self.git_manager.commit_changes(message, [self._release_note_path()])
+        if committed:
+            self.log_message(f"Git提交成功: {message}")
+            return True
+        self.log_message(f"提交固件尺寸信息失败: {message}")
+        return False
+
+    def append_size_report_to_release_note(self, version: str, size_lines: list,
+                                           configuration: dict = None) -> bool:
+        """
+        将固件尺寸摘要和差异追加到release note中对应版本的条目
+
+        Args:
+            version: 版本号
+            size_lines: analyze_firmware_size 返回的描述行
+            configuration: 编译的配置信息，为None时使用当前选择的配置
+
+        Returns:
+            bool: 是否成功
+        """
+        if not size_lines:
+            return False
+        try:
+            release_note_path = self._release_note_path()
+            if not os.path.exists(release_note_path):
+                return False
+
+            # 多配置并行编译时各配置依次写入
+            with self._release_note_lock:
+                with open(release_note_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+                # 定位该版本条目，插入到下一个版本条目之前
+                heading = f"## {version} - "
+                start = content.find(heading)
+                if start < 0:
+                    self.log_message(f"Release note中未找到版本 {version} 的条目，跳过尺寸信息")
+                    return False
+                next_entry = content.find("\n## ", start + len(heading))
+                insert_at = len(content) if next_entry < 0 else next_entry + 1
+
+                configuration = configuration or self.selected_configuration
+                config_name = configuration.get('name', '') if configuration else ''
+                size_entry = f"**Size{f' ({config_name})' if config_name else ''}:**\n"
+                size_entry += "".join(f"- {line}\n" for line in size_lines) + "\n"
+                content = content[:insert_at] + size_entry + content[insert_at:]
+
+                with open(release_note_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                return True
+
+        except Exception as e:
+            self.log_message(f"写入release note尺寸信息失败: {e}")
+            return False
+
+
+if __name__ == "__main__":
+    # 测试编译发布流程：只执行路径查找、配置检查和版本检查，不编译
+    import sys
+    import json
+    if len(sys.argv) < 3:
+        print("用法: python firmware_pipeline.py <配置文件> <项目路径>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        test_config = json.load(f)
+    pipeline = FirmwarePipeline(test_config, sys.argv[2])
+    pipeline.discover_paths()
+    pipeline.load_configurations()
+    print(f"配置检查: {pipeline.check_build_config()}")
+    git_status = pipeline.check_git()
+    print(f"Git状态: {git_status}")
+    print(f"版本: {pipeline.check_version(git_status['branch'])}")
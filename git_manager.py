@@ -7,10 +7,15 @@ Git管理模块
 
 import subprocess
 import os
+import threading
 from lib_logger import logger
 import sys
 from datetime import datetime
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List
+
+# 同一工作区（仓库主工作区或某个工作树）只有一个暂存区，其中的多个项目同时发布时依次暂存、提交
+_worktree_locks: Dict[str, threading.RLock] = {}
+_worktree_locks_guard = threading.Lock()
 
 
 class GitManager:
@@ -40,14 +45,48 @@ class GitManager:
         self.repo_path = os.path.abspath(repo_path)
         
     def is_git_repo(self) -> bool:
-        """检查是否为Git仓库"""
+        """检查是否为Git仓库（项目目录也可以是仓库中的子目录）"""
         try:
             git_dir = os.path.join(self.repo_path, '.git')
-            return os.path.exists(git_dir) or os.path.exists(git_dir + '.git')
+            if os.path.exists(git_dir) or os.path.exists(git_dir + '.git'):
+                return True
+            return self.get_top_level() is not None
         except Exception as e:
             logger.error(f"检查Git仓库失败: {e}")
             return False
     
+    def get_top_level(self) -> Optional[str]:
+        """
+        获取所在工作区的根目录（工作树中为工作树根目录）
+        
+        Returns:
+            str: 根目录，不在Git仓库中时返回None
+        """
+        try:
+            kwargs = self._get_subprocess_kwargs()
+            kwargs['cwd'] = self.repo_path
+            kwargs['timeout'] = 30
+            result = subprocess.run(['git', 'rev-parse', '--show-toplevel'], **kwargs)
+            if result.returncode == 0 and result.stdout.strip():
+                return os.path.abspath(result.stdout.strip())
+            return None
+        except Exception as e:
+            logger.error(f"获取仓库根目录失败: {e}")
+            return None
+    
+    def worktree_lock(self) -> threading.RLock:
+        """
+        获取所在工作区的提交锁：修改要提交的文件、暂存和提交期间持有，
+        避免同一仓库中的其他项目同时提交时争用 index.lock 或把对方暂存的更改提交进来
+        
+        Returns:
+            threading.RLock: 按工作区根目录共享的锁
+        """
+        top_level = self.get_top_level() or self.repo_path
+        key = os.path.normcase(os.path.realpath(top_level))
+        with _worktree_locks_guard:
+            return _worktree_locks.setdefault(key, threading.RLock())
+    
     def has_uncommitted_changes(self) -> bool:
         """
         检查是否有未提交的更改
@@ -79,11 +118,56 @@ class GitManager:
         except Exception as e:
             logger.error(f"检查未提交更改失败: {e}")
             return True
-    
-    def get_current_commit_id(self) -> Optional[str]:
+
+    def get_uncommitted_files(self) -> Optional[List[str]]:
+        """
+        获取有未提交更改的文件（包括未跟踪的文件）
+
+        Returns:
+            List[str]: 文件绝对路径列表，失败时返回None
         """
-        获取当前HEAD的commit ID
+        try:
+            kwargs = self._get_subprocess_kwargs()
+            kwargs['cwd'] = self.repo_path
+            kwargs['timeout'] = 30
+
+            # git status输出的路径相对于仓库根目录
+            result = subprocess.run(['git', 'rev-parse', '--show-toplevel'], **kwargs)
+            if result.returncode != 0:
+                logger.error(f"获取仓库根目录失败: {result.stderr}")
+                return None
+            top_level = result.stdout.strip()
+
+            result = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=all'], **kwargs)
+            if result.returncode != 0:
+                logger.error(f"Git status命令失败: {result.stderr}")
+                return None
+
+            files = []
+            for line in result.stdout.splitlines():
+                if len(line) < 4:
+                    continue
+                path = line[3:]
+                # 重命名的格式为 "原路径 -> 新路径"
+                if ' -> ' in path:
+                    path = path.split(' -> ', 1)[1]
+                files.append(os.path.abspath(os.path.join(top_level, path.strip('"'))))
+            return files
+
+        except subprocess.TimeoutExpired:
+            logger.error("Git status命令超时")
+            return None
+        except Exception as e:
+            logger.error(f"获取未提交的文件失败: {e}")
+            return None
+
+    def get_current_commit_id(self, rev: str = 'HEAD') -> Optional[str]:
+        """
+        获取当前HEAD（或指定提交）的commit ID
         
+        Args:
+            rev: 提交，默认HEAD
+            
         Returns:
             str: 完整的commit hash，失败时返回None
         """
@@ -93,7 +177,7 @@ class GitManager:
             kwargs['timeout'] = 30
             
             result = subprocess.run(
-                ['git', 'rev-parse', 'HEAD'],
+                ['git', 'rev-parse', '--verify', '--quiet', f'{rev}^{{commit}}'],
                 **kwargs
             )
             
@@ -112,17 +196,18 @@ class GitManager:
             logger.error(f"获取commit ID异常: {e}")
             return None
     
-    def get_short_commit_id(self, length: int = 8) -> Optional[str]:
+    def get_short_commit_id(self, length: int = 8, rev: str = 'HEAD') -> Optional[str]:
         """
         获取短commit ID
         
         Args:
             length: commit ID长度，默认8位
+            rev: 提交，默认HEAD
             
         Returns:
             str: 短commit hash，失败时返回None
         """
-        full_commit_id = self.get_current_commit_id()
+        full_commit_id = self.get_current_commit_id(rev)
         if full_commit_id:
             return full_commit_id[:length]
         return None
@@ -205,12 +290,36 @@ class GitManager:
         
         return info
     
-    def commit_changes(self, message: str = None) -> bool:
+    def get_commit_subject(self, rev: str = 'HEAD') -> Optional[str]:
+        """
+        获取提交信息的标题行
+        
+        Args:
+            rev: 提交，默认HEAD
+            
+        Returns:
+            str: 标题行，失败时返回None
+        """
+        try:
+            kwargs = self._get_subprocess_kwargs()
+            kwargs['cwd'] = self.repo_path
+            kwargs['timeout'] = 30
+            result = subprocess.run(['git', 'log', '-1', '--pretty=format:%s', rev, '--'], **kwargs)
+            if result.returncode == 0:
+                return result.stdout.strip()
+            logger.error(f"获取提交信息失败: {result.stderr}")
+            return None
+        except Exception as e:
+            logger.error(f"获取提交信息异常: {e}")
+            return None
+    
+    def commit_changes(self, message: str = None, paths: List[str] = None) -> bool:
         """
         提交当前更改
         
         Args:
             message: 提交信息，如果为None则使用默认信息
+            paths: 只提交这些文件（暂存区中的其他更改不提交），为None时提交全部更改
             
         Returns:
             bool: 提交是否成功
@@ -220,14 +329,14 @@ class GitManager:
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 message = f"Auto build: {timestamp}"
             
-            # 添加所有更改
+            # 添加所有更改（或指定的文件）
             kwargs = self._get_subprocess_kwargs()
             kwargs['cwd'] = self.repo_path
             kwargs['timeout'] = 30
             kwargs['check'] = True
             
             subprocess.run(
-                ['git', 'add', '.'],
+                ['git', 'add', '--'] + list(paths) if paths else ['git', 'add', '.'],
                 **kwargs
             )
             
@@ -237,7 +346,7 @@ class GitManager:
             kwargs['timeout'] = 30
             
             result = subprocess.run(
-                ['git', 'commit', '-m', message],
+                ['git', 'commit', '-m', message] + (['--'] + list(paths) if paths else []),
                 **kwargs
             )
             
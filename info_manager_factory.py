@@ -6,8 +6,7 @@
 统一管理版本信息更新和配置分析功能
 """
 
-from lib_IAR.info_manager import IARInfoManager
-from lib_MDK.info_manager import MDKInfoManager
+# 各编译工具的模块在创建实例时才导入，只加载实际使用的工具链，缩短启动时间
 
 
 class InfoManagerFactory:
@@ -25,13 +24,12 @@ class InfoManagerFactory:
         Returns:
             相应的信息管理器实例
         """
-        if compile_tool == 'IAR':
-            return IARInfoManager(config)
-        elif compile_tool == 'MDK':
+        if compile_tool == 'MDK':
+            from lib_MDK.info_manager import MDKInfoManager
             return MDKInfoManager(config)
-        else:
-            # 默认使用IAR
-            return IARInfoManager(config)
+        # 默认使用IAR
+        from lib_IAR.info_manager import IARInfoManager
+        return IARInfoManager(config)
     
     @staticmethod
     def get_common_methods():
@@ -5,16 +5,38 @@ IAR工具链库
 包含IAR相关的所有模块
 """
 
-from .path_manager import IARPathManager
-from .info_manager import IARInfoManager
-from .file_manager import IARFileManager
-from .builder import IARBuilder
-from .project_analyzer import IARProjectAnalyzer
+import importlib
+
+# 类名 -> 子模块，首次访问时导入（从子模块直接导入时不会加载其余模块）
+_LAZY_IMPORTS = {
+    'IARPathManager': 'path_manager',
+    'IARInfoManager': 'info_manager',
+    'IARFileManager': 'file_manager',
+    'IARBuilder': 'builder',
+    'IARProjectAnalyzer': 'project_analyzer',
+    'ICFParser': 'icf_parser',
+    'IARMapParser': 'map_parser',
+    'IARWorkspaceParser': 'workspace_parser',
+}
+
+
+def __getattr__(name):
+    """按需导入子模块中的类"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'IARPathManager',
     'IARInfoManager', 
     'IARFileManager',
     'IARBuilder',
-    'IARProjectAnalyzer'
+    'IARProjectAnalyzer',
+    'ICFParser',
+    'IARMapParser',
+    'IARWorkspaceParser'
 ]
@@ -9,8 +9,10 @@ import subprocess
 import os
 from lib_logger import logger
 import time
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, Callable, List
 from pathlib import Path
+from build_output import BuildOutputMonitor, BuildEvent, run_streaming_process
+from toolchain_registry import get_toolchain_registry, INVOCATION_MODES
 
 
 class IARBuilder:
@@ -41,10 +43,17 @@ class IARBuilder:
         
         # 项目根目录从config中获取，这是用户设置的项目根目录
         self.project_path = config.get('project_path', '')
-        self.build_config = config.get('build_configuration', 'Debug')
+        # 优先编译传入的配置，未提供时使用配置文件中的编译配置名称
+        self.build_config = (configuration or {}).get('name') or config.get('build_configuration', 'Debug')
         self.clean_before_build = config.get('clean_before_build', False)  # 默认使用增量编译
         self.timeout_seconds = config.get('timeout_seconds', 300)
         
+        # 编译输出事件回调和最近一次编译的输出监视器
+        self.output_callback: Optional[Callable[[BuildEvent], None]] = None
+        self.last_build_monitor: Optional[BuildOutputMonitor] = None
+        # 单次编译使用的并行编译线程数，None表示使用工具链默认值
+        self.parallel_jobs: Optional[int] = None
+        
         # 验证路径
         logger.info(f"IAR可执行文件: {self.iar_exe_path}")
         logger.info(f"IAR工作区文件: {self.workspace_path}")
@@ -55,9 +64,31 @@ class IARBuilder:
         self.diagnose_environment()
         self.test_iar_command()
     
+    def set_output_callback(self, callback: Optional[Callable[[BuildEvent], None]]):
+        """
+        设置编译输出事件回调，编译过程中每解析一行输出调用一次（在读取输出的线程中调用）
+        
+        Args:
+            callback: 事件回调，为None时取消
+        """
+        self.output_callback = callback
+    
+    def get_executable_path(self) -> str:
+        """获取编译工具可执行文件（IarBuild.exe）路径"""
+        return self.iar_exe_path
+    
+    def set_parallel_jobs(self, jobs: Optional[int]):
+        """
+        设置单次编译的并行编译线程数（IarBuild -parallel N），多配置并行编译时由调度器分配
+        
+        Args:
+            jobs: 线程数，为None时使用IarBuild默认值
+        """
+        self.parallel_jobs = jobs if jobs and jobs > 0 else None
+    
     def _find_iar_executable(self, iar_dir: str) -> str:
         """
-        在IAR安装目录中查找IarBuild.exe
+        在IAR安装目录中查找IarBuild.exe（查找结果记入工具链注册表，之后不再逐个探测候选路径）
         
         Args:
             iar_dir: IAR安装目录
@@ -65,31 +96,16 @@ class IARBuilder:
         Returns:
             str: IarBuild.exe的完整路径，未找到返回默认路径
         """
+        default_path = 'C:/Program Files (x86)/IAR Systems/Embedded Workbench 8.3/common/bin/IarBuild.exe'
         if not iar_dir:
-            return 'C:/Program Files (x86)/IAR Systems/Embedded Workbench 8.3/common/bin/IarBuild.exe'
-        
-        possible_paths = [
-            os.path.join(iar_dir, "common", "bin", "IarBuild.exe"),
-            os.path.join(iar_dir, "bin", "IarBuild.exe"),
-            os.path.join(iar_dir, "IarBuild.exe"),
-            os.path.join(iar_dir, "arm", "bin", "IarBuild.exe"),
-            os.path.join(iar_dir, "EWARM", "bin", "IarBuild.exe")
-        ]
-        
-        logger.info(f"搜索IAR可执行文件，尝试以下路径:")
-        for i, path in enumerate(possible_paths, 1):
-            exists = os.path.exists(path)
-            logger.info(f"  {i}. {path} - {'存在' if exists else '不存在'}")
-            if exists:
-                logger.info(f"找到IAR可执行文件: {path}")
-                return path
-        
-        # 如果没找到，检查是否是直接指定的exe路径
-        if iar_dir.endswith('.exe') and os.path.exists(iar_dir):
-            return iar_dir
+            return default_path
+        
+        path = get_toolchain_registry().find_executable('IAR', iar_dir)
+        if path:
+            logger.info(f"找到IAR可执行文件: {path}")
+            return path
         
         # 如果都没找到，返回默认路径
-        default_path = 'C:/Program Files (x86)/IAR Systems/Embedded Workbench 8.3/common/bin/IarBuild.exe'
         logger.warning(f"在IAR目录中未找到IarBuild.exe: {iar_dir}")
         logger.warning(f"使用默认路径: {default_path}")
         return default_path
@@ -174,49 +190,12 @@ class IARBuilder:
         logger.info("=== 环境诊断结束 ===")
     
     def test_iar_command(self) -> bool:
-        """测试IAR命令是否能正常执行"""
+        """测试IAR命令是否能正常执行（探测结果记入工具链注册表，IarBuild.exe未变化时不再重复执行）"""
         try:
-            logger.info("测试IAR命令执行...")
-            # 简单的测试命令
-            test_cmd = [self.iar_exe_path, "-?"]
-            
-            # 尝试不同的调用方式
-            for use_shell in [False, True]:
-                try:
-                    logger.info(f"尝试执行IAR测试命令 (shell={use_shell})...")
-                    if use_shell:
-                        # 对于shell模式，需要特殊处理包含空格的路径
-                        cmd_str = ' '.join(f'"{arg}"' for arg in test_cmd)
-                        result = subprocess.run(
-                            cmd_str,
-                            capture_output=True,
-                            text=True,
-                            timeout=10,
-                            shell=True
-                        )
-                    else:
-                        result = subprocess.run(
-                            test_cmd,
-                            capture_output=True,
-                            text=True,
-                            timeout=10,
-                            shell=False
-                        )
-                    
-                    logger.info(f"IAR测试命令返回码: {result.returncode}")
-                    logger.info(f"stdout: {result.stdout[:200]}...")
-                    logger.info(f"stderr: {result.stderr[:200]}...")
-                    
-                    if result.returncode == 0 or "IAR" in result.stderr or "IAR" in result.stdout:
-                        logger.info(f"IAR命令测试成功 (shell={use_shell})")
-                        return True
-                    else:
-                        logger.warning(f"IAR命令测试失败 (shell={use_shell}): {result.stderr}")
-                        
-                except Exception as e:
-                    logger.warning(f"IAR命令测试异常 (shell={use_shell}): {e}")
-                    continue
-            
+            entry = get_toolchain_registry().probe('IAR', self.iar_exe_path)
+            if entry and entry.get('probed'):
+                logger.info(f"IAR命令测试成功，版本: {entry.get('version') or '未知'}")
+                return True
             logger.error("所有IAR命令测试方式都失败")
             return False
             
@@ -302,6 +281,8 @@ class IARBuilder:
                     '-make',
                     self.build_config
                 ]
+            if self.parallel_jobs:
+                cmd.extend(['-parallel', str(self.parallel_jobs)])
             
             logger.info(f"执行命令: {' '.join(cmd)}")
             
@@ -318,76 +299,27 @@ class IARBuilder:
             
             # 执行编译
             start_time = time.time()
-            result = None
-            
-            # 尝试不同的调用方式
-            for attempt, (use_shell, use_creationflags) in enumerate([
-                (False, subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0),
-                (False, 0),  # 不使用CREATE_NO_WINDOW
-                (True, 0)    # 使用shell模式
-            ]):
-                try:
-                    logger.info(f"编译尝试 {attempt + 1}/3: shell={use_shell}, creationflags={use_creationflags}")
-                    
-                    if use_shell:
-                        # 对于shell模式，需要特殊处理包含空格的路径
-                        cmd_str = ' '.join(f'"{arg}"' for arg in cmd)
-                        logger.info(f"执行shell命令: {cmd_str}")
-                        result = subprocess.run(
-                            cmd_str,
-                            capture_output=True,
-                            text=True,
-                            timeout=self.timeout_seconds,
-                            shell=True,
-                            cwd=os.path.dirname(self.iar_project_path) if self.iar_project_path else None
-                        )
-                    else:
-                        logger.info(f"执行命令: {' '.join(cmd)}")
-                        result = subprocess.run(
-                            cmd,
-                            capture_output=True,
-                            text=True,
-                            timeout=self.timeout_seconds,
-                            creationflags=use_creationflags,
-                            shell=False,
-                            cwd=os.path.dirname(self.iar_project_path) if self.iar_project_path else None
-                        )
-                    
-                    # 如果成功执行，跳出循环
-                    logger.info(f"编译尝试 {attempt + 1} 成功执行，返回码: {result.returncode}")
-                    break
-                    
-                except PermissionError as e:
-                    logger.warning(f"编译尝试 {attempt + 1} 权限不足: {e}")
-                    if attempt == 2:  # 最后一次尝试
-                        return False, f"权限不足，无法执行IAR编译。请尝试以管理员身份运行程序。\n错误详情: {e}"
-                    continue
-                except FileNotFoundError as e:
-                    logger.warning(f"编译尝试 {attempt + 1} 找不到文件: {e}")
-                    if attempt == 2:  # 最后一次尝试
-                        return False, f"找不到IAR可执行文件: {self.iar_exe_path}\n请检查IAR安装路径是否正确。"
-                    continue
-                except Exception as e:
-                    logger.warning(f"编译尝试 {attempt + 1} 异常: {e}")
-                    if attempt == 2:  # 最后一次尝试
-                        return False, f"执行IAR编译时发生异常: {e}"
-                    continue
+            returncode, output_lines, monitor, error = self._execute_build_command(
+                cmd, os.path.dirname(self.iar_project_path) if self.iar_project_path else None)
+            if error:
+                return False, error
             
-            if result is None:
+            if returncode is None:
                 return False, "所有编译尝试都失败了"
             end_time = time.time()
             
             compile_time = end_time - start_time
             logger.info(f"编译耗时: {compile_time:.2f}秒")
+            summary = monitor.format_summary()
             
             # 分析编译结果
-            if result.returncode == 0:
+            if returncode == 0:
                 logger.info("编译成功")
-                output_info = f"编译成功\n耗时: {compile_time:.2f}秒\n\n输出信息:\n{result.stdout}"
+                output_info = f"编译成功\n耗时: {compile_time:.2f}秒\n\n{summary}"
                 return True, output_info
             else:
                 logger.error("编译失败")
-                error_info = f"编译失败\n返回码: {result.returncode}\n\n错误信息:\n{result.stderr}\n\n输出信息:\n{result.stdout}"
+                error_info = f"编译失败\n返回码: {returncode}\n\n{summary}\n\n输出信息(最后{len(output_lines)}行):\n" + '\n'.join(output_lines)
                 return False, error_info
                 
         except subprocess.TimeoutExpired:
@@ -397,6 +329,139 @@ class IARBuilder:
             logger.error(f"编译异常: {e}")
             return False, f"编译异常: {str(e)}"
     
+    def _execute_build_command(self, cmd: List[str], cwd: Optional[str]) -> Tuple[Optional[int], List[str], Optional[BuildOutputMonitor], str]:
+        """
+        执行IarBuild命令，依次尝试不同的调用方式，逐行解析输出
+        
+        Args:
+            cmd: 命令参数列表
+            cwd: 工作目录
+            
+        Returns:
+            Tuple[Optional[int], List[str], Optional[BuildOutputMonitor], str]: (返回码, 最后的输出行, 输出监视器, 错误信息)，
+            全部调用方式都失败时返回码为None
+        """
+        returncode = None
+        output_lines = []
+        monitor = None
+        
+        # 尝试不同的调用方式，工具链注册表中记录的可用方式排在最前
+        registry = get_toolchain_registry()
+        modes = registry.get_invocation_order(self.iar_exe_path)
+        for attempt, mode in enumerate(modes):
+            use_shell, use_creationflags = INVOCATION_MODES[mode]
+            try:
+                logger.info(f"编译尝试 {attempt + 1}/{len(modes)}: {mode}, shell={use_shell}, creationflags={use_creationflags}")
+                
+                if use_shell:
+                    # 对于shell模式，需要特殊处理包含空格的路径
+                    run_cmd = ' '.join(f'"{arg}"' for arg in cmd)
+                    logger.info(f"执行shell命令: {run_cmd}")
+                else:
+                    run_cmd = cmd
+                    logger.info(f"执行命令: {' '.join(cmd)}")
+                
+                # 在后台线程中逐行读取输出，实时解析进度和诊断信息
+                monitor = BuildOutputMonitor('IAR', self.output_callback)
+                returncode, output_lines = run_streaming_process(
+                    run_cmd,
+                    cwd=cwd,
+                    timeout=self.timeout_seconds,
+                    on_line=self._make_line_handler(monitor),
+                    shell=use_shell,
+                    creationflags=use_creationflags
+                )
+                self.last_build_monitor = monitor
+                registry.record_invocation(self.iar_exe_path, mode)
+                
+                # 如果成功执行，跳出循环
+                logger.info(f"编译尝试 {attempt + 1} 成功执行，返回码: {returncode}")
+                break
+                
+            except PermissionError as e:
+                logger.warning(f"编译尝试 {attempt + 1} 权限不足: {e}")
+                if attempt == len(modes) - 1:  # 最后一次尝试
+                    return None, [], None, f"权限不足，无法执行IAR编译。请尝试以管理员身份运行程序。\n错误详情: {e}"
+                continue
+            except FileNotFoundError as e:
+                logger.warning(f"编译尝试 {attempt + 1} 找不到文件: {e}")
+                if attempt == len(modes) - 1:  # 最后一次尝试
+                    return None, [], None, f"找不到IAR可执行文件: {self.iar_exe_path}\n请检查IAR安装路径是否正确。"
+                continue
+            except Exception as e:
+                logger.warning(f"编译尝试 {attempt + 1} 异常: {e}")
+                if attempt == len(modes) - 1:  # 最后一次尝试
+                    return None, [], None, f"执行IAR编译时发生异常: {e}"
+                continue
+        
+        return returncode, output_lines, monitor, ''
+    
+    def build_workspace_batch(self, batch_name: str, force_rebuild: bool = False) -> Tuple[bool, str]:
+        """
+        编译工作区中的批量编译定义（IarBuild <workspace.eww> -make|-build -batch <name>）
+        
+        一次调用编译批量编译中的所有项目/配置（如bootloader和应用程序），工具链启动和license检出只需一次
+        
+        Args:
+            batch_name: 批量编译名称
+            force_rebuild: 是否全部重新编译
+            
+        Returns:
+            Tuple[bool, str]: (编译是否成功, 输出信息)
+        """
+        try:
+            logger.info(f"开始批量编译工作区: {self.workspace_path}, 批量编译: {batch_name}")
+            
+            if not os.path.exists(self.iar_exe_path):
+                return False, f"IAR可执行文件不存在: {self.iar_exe_path}"
+            if not self.workspace_path or not os.path.exists(self.workspace_path):
+                return False, f"工作区文件不存在: {self.workspace_path}"
+            
+            cmd = [
+                self.iar_exe_path,
+                self.workspace_path,
+                '-build' if force_rebuild or self.clean_before_build else '-make',
+                '-batch',
+                batch_name
+            ]
+            if self.parallel_jobs:
+                cmd.extend(['-parallel', str(self.parallel_jobs)])
+            
+            start_time = time.time()
+            returncode, output_lines, monitor, error = self._execute_build_command(
+                cmd, os.path.dirname(self.workspace_path))
+            if error:
+                return False, error
+            if returncode is None:
+                return False, "所有编译尝试都失败了"
+            
+            compile_time = time.time() - start_time
+            logger.info(f"批量编译耗时: {compile_time:.2f}秒")
+            summary = monitor.format_summary()
+            
+            if returncode == 0:
+                logger.info("批量编译成功")
+                return True, f"批量编译成功 ({batch_name})\n耗时: {compile_time:.2f}秒\n\n{summary}"
+            else:
+                logger.error("批量编译失败")
+                return False, (f"批量编译失败 ({batch_name})\n返回码: {returncode}\n\n{summary}\n\n"
+                               f"输出信息(最后{len(output_lines)}行):\n" + '\n'.join(output_lines))
+                
+        except subprocess.TimeoutExpired:
+            logger.error("批量编译超时")
+            return False, f"编译超时 (>{self.timeout_seconds}秒)"
+        except Exception as e:
+            logger.error(f"批量编译异常: {e}")
+            return False, f"编译异常: {str(e)}"
+    
+    @staticmethod
+    def _make_line_handler(monitor: BuildOutputMonitor) -> Callable[[str], None]:
+        """创建输出行处理函数：写入日志文件并交给监视器解析"""
+        def handle(line: str):
+            logger.debug(f"[IAR] {line}")
+            monitor.feed(line)
+        return handle
+    
     def check_bin_file(self) -> bool:
         """
         检查生成的bin文件是否存在
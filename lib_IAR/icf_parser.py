@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IAR ICF链接脚本解析模块
+解析符号、存储器和区域定义，构建内存模型（支持符号表达式、多bank区域和条件块）
+"""
+
+from lib_logger import logger
+from typing import Dict, List, Tuple
+from memory_model import (LinkerScriptParser, MemoryModel, MemoryRegion, ExpressionEvaluator, LinkerScriptError,
+                          TOKEN_IDENT, TOKEN_OP, strip_comments, tokenize, skip_statement,
+                          skip_block, classify_memory_type)
+
+
+class ICFParser(LinkerScriptParser):
+    """IAR ICF链接脚本解析器"""
+
+    PARSER_VERSION = 1
+    CACHE_NAMESPACE = 'iar_icf'
+    SCRIPT_TYPE = 'ICF'
+
+    def parse(self, content: str, source: str = '') -> MemoryModel:
+        """
+        解析ICF内容
+
+        Args:
+            content: ICF文件内容
+            source: 来源路径（仅用于记录）
+
+        Returns:
+            MemoryModel: 内存模型
+        """
+        self._model = MemoryModel(source)
+        self._regions: Dict[str, List[Tuple[int, int]]] = {}
+        self._evaluator = ExpressionEvaluator(self._model.symbols, functions={
+            'minimum': min,
+            'maximum': max,
+        })
+        tokens = tokenize(strip_comments(content))
+        self._parse_statements(tokens, 0, len(tokens))
+
+        # 每个区域的每个区间作为一个内存区域，多区间（多bank）区域以序号区分
+        for name, intervals in self._regions.items():
+            memory_type = classify_memory_type(name)
+            for index, (start, end) in enumerate(intervals):
+                region_name = name if len(intervals) == 1 else f"{name}[{index}]"
+                self._model.add_region(MemoryRegion(region_name, start, end - start + 1, memory_type))
+
+        if self._model.entry_address is None:
+            self._model.entry_address = self._model.symbols.get('__ICFEDIT_intvec_start__')
+        return self._model
+
+    def _parse_statements(self, tokens: List[Tuple[str, str]], pos: int, end: int):
+        """解析 [pos, end) 范围内的语句序列"""
+        while pos < end:
+            kind, text = tokens[pos]
+            try:
+                if kind == TOKEN_IDENT and text == 'define':
+                    pos = self._parse_define(tokens, pos + 1)
+                elif kind == TOKEN_IDENT and text == 'if':
+                    pos = self._parse_if(tokens, pos + 1)
+                elif kind == TOKEN_IDENT and text == 'place':
+                    pos = self._parse_place(tokens, pos + 1)
+                elif kind == TOKEN_OP and text in (';', '}'):
+                    pos += 1
+                else:
+                    pos = skip_statement(tokens, pos)
+            except LinkerScriptError as e:
+                logger.debug(f"跳过无法解析的ICF语句 ({text}): {e}")
+                pos = skip_statement(tokens, pos + 1)
+
+    def _expect(self, tokens: List[Tuple[str, str]], pos: int, value: str) -> int:
+        """检查当前词法单元，返回下一位置"""
+        if pos >= len(tokens) or tokens[pos][1] != value:
+            found = tokens[pos][1] if pos < len(tokens) else '<EOF>'
+            raise LinkerScriptError(f"期望 '{value}'，实际为 '{found}'")
+        return pos + 1
+
+    def _parse_define(self, tokens: List[Tuple[str, str]], pos: int) -> int:
+        """解析 define 语句"""
+        # define [exported] symbol NAME = expr;
+        if pos < len(tokens) and tokens[pos][1] == 'exported':
+            pos += 1
+        keyword = tokens[pos][1] if pos < len(tokens) else ''
+
+        if keyword == 'symbol':
+            name = tokens[pos + 1][1]
+            if pos + 2 < len(tokens) and tokens[pos + 2][1] == '=':
+                value, pos = self._evaluator.evaluate(tokens, pos + 3)
+                self._model.symbols[name] = value
+            return skip_statement(tokens, pos)
+
+        if keyword == 'memory':
+            # define memory [NAME] with size = expr;
+            pos += 1
+            if tokens[pos][1] != 'with':
+                pos += 1
+            pos = self._expect(tokens, pos, 'with')
+            pos = self._expect(tokens, pos, 'size')
+            pos = self._expect(tokens, pos, '=')
+            value, pos = self._evaluator.evaluate(tokens, pos)
+            self._model.symbols.setdefault('__memory_size__', value)
+            return skip_statement(tokens, pos)
+
+        if keyword == 'region':
+            name = tokens[pos + 1][1]
+            pos = self._expect(tokens, pos + 2, '=')
+            intervals, pos = self._parse_region_expr(tokens, pos)
+            self._regions[name] = intervals
+            return skip_statement(tokens, pos)
+
+        # define block / define overlay 等与内存布局无关的定义
+        return skip_statement(tokens, pos)
+
+    def _parse_region_expr(self, tokens: List[Tuple[str, str]], pos: int) -> Tuple[List[Tuple[int, int]], int]:
+        """
+        解析区域表达式，支持 mem:[from X to Y]、[from X size Y]、区域引用及 | 并集、- 差集
+
+        Returns:
+            Tuple[List[Tuple[int, int]], int]: (闭区间列表, 结束位置)
+        """
+        intervals, pos = self._parse_region_term(tokens, pos)
+        while pos < len(tokens) and tokens[pos][1] in ('|', '-', '&'):
+            op = tokens[pos][1]
+            other, pos = self._parse_region_term(tokens, pos + 1)
+            if op == '|':
+                intervals = self._merge_intervals(intervals + other)
+            elif op == '-':
+                intervals = self._subtract_intervals(intervals, other)
+            else:
+                intervals = self._intersect_intervals(intervals, other)
+        return intervals, pos
+
+    def _parse_region_term(self, tokens: List[Tuple[str, str]], pos: int) -> Tuple[List[Tuple[int, int]], int]:
+        """解析单个区域项"""
+        kind, text = tokens[pos]
+        if text == '(':
+            intervals, pos = self._parse_region_expr(tokens, pos + 1)
+            return intervals, self._expect(tokens, pos, ')')
+        if kind == TOKEN_IDENT and text in self._regions:
+            return list(self._regions[text]), pos + 1
+        # 可选的存储器名前缀 mem:
+        if kind == TOKEN_IDENT and pos + 1 < len(tokens) and tokens[pos + 1][1] == ':':
+            pos += 2
+        pos = self._expect(tokens, pos, '[')
+        pos = self._expect(tokens, pos, 'from')
+        start, pos = self._evaluator.evaluate(tokens, pos)
+        keyword = tokens[pos][1]
+        value, pos = self._evaluator.evaluate(tokens, pos + 1)
+        if keyword == 'to':
+            end = value
+        elif keyword == 'size':
+            end = start + value - 1
+        else:
+            raise LinkerScriptError(f"区域定义中无效的关键字: {keyword}")
+
+        intervals = [(start, end)]
+        # mem:[from X to Y repeat N displacement D]
+        if pos < len(tokens) and tokens[pos][1] == 'repeat':
+            count, pos = self._evaluator.evaluate(tokens, pos + 1)
+            displacement = end - start + 1
+            if pos < len(tokens) and tokens[pos][1] == 'displacement':
+                displacement, pos = self._evaluator.evaluate(tokens, pos + 1)
+            intervals = [(start + i * displacement, end + i * displacement) for i in range(max(count, 1))]
+        while pos < len(tokens) and tokens[pos][1] != ']':
+            pos += 1
+        return intervals, self._expect(tokens, pos, ']')
+
+    @staticmethod
+    def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """合并相邻或重叠的闭区间"""
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _subtract_intervals(intervals: List[Tuple[int, int]], removed: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """闭区间差集"""
+        result = list(intervals)
+        for r_start, r_end in removed:
+            next_result = []
+            for start, end in result:
+                if r_end < start or r_start > end:
+                    next_result.append((start, end))
+                    continue
+                if start < r_start:
+                    next_result.append((start, r_start - 1))
+                if end > r_end:
+                    next_result.append((r_end + 1, end))
+            result = next_result
+        return result
+
+    @staticmethod
+    def _intersect_intervals(left: List[Tuple[int, int]], right: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """闭区间交集"""
+        result = []
+        for l_start, l_end in left:
+            for r_start, r_end in right:
+                start, end = max(l_start, r_start), min(l_end, r_end)
+                if start <= end:
+                    result.append((start, end))
+        return sorted(result)
+
+    def _parse_if(self, tokens: List[Tuple[str, str]], pos: int) -> int:
+        """解析 if (cond) { ... } [else if ... | else { ... }]"""
+        pos = self._expect(tokens, pos, '(')
+        condition, pos = self._evaluator.evaluate(tokens, pos)
+        pos = self._expect(tokens, pos, ')')
+        block_end = skip_block(tokens, pos)
+        taken = bool(condition)
+        if taken:
+            self._parse_statements(tokens, pos + 1, block_end - 1)
+        pos = block_end
+
+        if pos < len(tokens) and tokens[pos][1] == 'else':
+            pos += 1
+            if pos < len(tokens) and tokens[pos][1] == 'if':
+                if taken:
+                    # 跳过整个 else if 链
+                    while pos < len(tokens) and tokens[pos][1] != '{':
+                        pos += 1
+                    pos = skip_block(tokens, pos)
+                    while pos + 1 < len(tokens) and tokens[pos][1] == 'else':
+                        pos += 1
+                        while pos < len(tokens) and tokens[pos][1] != '{':
+                            pos += 1
+                        pos = skip_block(tokens, pos)
+                    return pos
+                return self._parse_if(tokens, pos + 1)
+            else_end = skip_block(tokens, pos)
+            if not taken:
+                self._parse_statements(tokens, pos + 1, else_end - 1)
+            pos = else_end
+        return pos
+
+    def _parse_place(self, tokens: List[Tuple[str, str]], pos: int) -> int:
+        """解析 place at address mem:X { ... }，记录中断向量表位置"""
+        if tokens[pos][1] == 'at' and pos + 1 < len(tokens) and tokens[pos + 1][1] == 'address':
+            pos += 2
+            if tokens[pos][0] == TOKEN_IDENT and pos + 1 < len(tokens) and tokens[pos + 1][1] == ':':
+                pos += 2
+            address, pos = self._evaluator.evaluate(tokens, pos)
+            statement_end = skip_statement(tokens, pos)
+            section_names = {text for _, text in tokens[pos:statement_end]}
+            if '.intvec' in section_names and self._model.entry_address is None:
+                self._model.entry_address = address
+            return statement_end
+        return skip_statement(tokens, pos)
+
+
+if __name__ == "__main__":
+    # 测试ICF解析
+    sample = """
+    define symbol __ICFEDIT_intvec_start__ = 0x08000000;
+    define symbol __ICFEDIT_region_ROM_start__ = 0x08000000;
+    define symbol __ICFEDIT_region_ROM_end__   = 0x0807FFFF;
+    define symbol __region_ROM2_start__ = __ICFEDIT_region_ROM_end__ + 1;
+    define symbol __ICFEDIT_region_RAM_start__ = 0x20000000;
+    define symbol __ICFEDIT_region_RAM_end__   = 0x2001FFFF;
+    define memory mem with size = 4G;
+    define region ROM_region = mem:[from __ICFEDIT_region_ROM_start__ to __ICFEDIT_region_ROM_end__]
+                             | mem:[from __region_ROM2_start__ size 512K];
+    define region RAM_region = mem:[from __ICFEDIT_region_RAM_start__ to __ICFEDIT_region_RAM_end__];
+    place at address mem:__ICFEDIT_intvec_start__ { readonly section .intvec };
+    """
+    model = ICFParser(use_cache=False).parse(sample, 'sample.icf')
+    for line in model.describe():
+        print(line)
+    print(f"入口地址: 0x{model.entry_address:08X}")
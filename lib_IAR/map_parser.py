@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IAR map文件解析模块
+逐行解析PLACEMENT SUMMARY和MODULE SUMMARY，统计按节和按目标文件的ROM/RAM占用
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+from map_analyzer import MapFileParser, MapSizeReport, normalize_section_name
+
+
+class IARMapParser(MapFileParser):
+    """IAR ILINK map文件解析器"""
+
+    TOOLCHAIN = 'IAR'
+
+    # 节类型 -> 存储器类型
+    _ROM_KINDS = {'ro code', 'ro data', 'const', 'ro'}
+    _RAM_KINDS = {'rw data', 'zi data', 'inited', 'uninit', 'zero', 'rw', 'noinit'}
+
+    _PLACEMENT_LINE = re.compile(
+        r"^\s+(?P<section>\S.*?)\s+(?P<kind>ro code|ro data|rw data|zi data|const|inited|uninit|zero|noinit|ro|rw)"
+        r"\s+0x[0-9A-Fa-f']+\s+(?P<size>0x[0-9A-Fa-f']+)")
+    # 模块汇总表的数值列，千位以单个空格分隔，例如 "1 024"
+    _NUMBER = re.compile(r"\d+(?: \d{3})*")
+    _COLUMN = re.compile(r"ro code|ro data|rw data(?: \(abs\))?")
+
+    def parse_lines(self, lines: Iterable[str], report: MapSizeReport):
+        """
+        逐行解析IAR map内容
+
+        Args:
+            lines: 行迭代器
+            report: 写入结果的尺寸报告
+        """
+        state = None
+        columns: List[Tuple[str, int]] = []
+        group = ''
+        pending_name = ''
+
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if line.startswith('***'):
+                title = line.strip('* ').upper()
+                if title:
+                    state = ('placement' if title.startswith('PLACEMENT SUMMARY') else
+                             'modules' if title.startswith('MODULE SUMMARY') else None)
+                    columns, group, pending_name = [], '', ''
+                continue
+
+            if state == 'placement':
+                match = self._PLACEMENT_LINE.match(line)
+                if match and not match.group('section').startswith('-'):
+                    size = int(match.group('size').replace("'", ''), 16)
+                    kind = match.group('kind')
+                    section = normalize_section_name(match.group('section').strip('"'))
+                    if kind in self._ROM_KINDS:
+                        report.add_section(section, rom=size)
+                    elif kind in self._RAM_KINDS:
+                        report.add_section(section, ram=size)
+
+            elif state == 'modules':
+                stripped = line.strip()
+                if not columns:
+                    if stripped.startswith('Module') and 'ro code' in line:
+                        columns = [(m.group(0), m.end()) for m in self._COLUMN.finditer(line)]
+                    continue
+                if not stripped or stripped.startswith('-'):
+                    continue
+                if stripped.startswith('Grand Total:'):
+                    values = self._parse_values(line, columns, len(line) - len(line.lstrip()))
+                    report.totals['rom'] = values.get('ro code', 0) + values.get('ro data', 0)
+                    report.totals['ram'] = values.get('rw data', 0)
+                    state = None
+                    continue
+                if stripped.startswith('Total:'):
+                    # 组小计之后的 Gaps、Linker created 等条目不属于任何组
+                    group = ''
+                    continue
+                if stripped.endswith(':') or re.search(r':\s*\[\d+\]$', stripped):
+                    # 目标文件组（目录或库），例如 "dl7M_tln.a: [2]"
+                    group = re.sub(r':\s*(\[\d+\])?$', '', stripped)
+                    pending_name = ''
+                    continue
+
+                name, values = self._parse_module_line(line, columns)
+                if name and not values:
+                    # 名称过长时数值另起一行
+                    pending_name = name
+                    continue
+                name = name or pending_name
+                pending_name = ''
+                if not name:
+                    continue
+                if group.lower().endswith(('.a', '.lib')):
+                    name = f"{group.replace(chr(92), '/').split('/')[-1]}({name})"
+                code = values.get('ro code', 0)
+                ro_data = values.get('ro data', 0)
+                rw_data = values.get('rw data', 0)
+                report.add_object(name, code + ro_data, rw_data, code=code, ro_data=ro_data, rw_data=rw_data)
+
+    def _parse_module_line(self, line: str, columns: List[Tuple[str, int]]) -> Tuple[str, dict]:
+        """拆分模块行的名称和数值部分"""
+        match = re.match(r"\s*(\S(?:.*?\S)?)(?=\s{2,}\d|\s*$)", line)
+        if match and not self._NUMBER.fullmatch(match.group(1)):
+            name, offset = match.group(1), match.end()
+        else:
+            name, offset = '', 0
+        return name, self._parse_values(line, columns, offset)
+
+    def _parse_values(self, line: str, columns: List[Tuple[str, int]], offset: int) -> dict:
+        """按列右对齐位置把数值分配给对应列"""
+        values = {}
+        for match in self._NUMBER.finditer(line, offset):
+            column = self._nearest_column(match.end(), columns)
+            if column and column not in values:
+                values[column] = int(match.group(0).replace(' ', ''))
+        return values
+
+    @staticmethod
+    def _nearest_column(position: int, columns: List[Tuple[str, int]]) -> Optional[str]:
+        """查找右边界距离最近的列"""
+        if not columns:
+            return None
+        return min(columns, key=lambda column: abs(column[1] - position))[0]
+
+
+if __name__ == "__main__":
+    # 测试IAR map解析
+    sample = """
+*******************************************************************************
+*** PLACEMENT SUMMARY
+***
+
+  Section            Kind         Address    Size  Object
+  -------            ----         -------    ----  ------
+"A0":                                       0x140
+  .intvec            ro code  0x0800'4000   0x140  startup_stm32.o [1]
+                            - 0x0800'4140   0x140
+
+"P1":                                      0x1d28
+  .text              ro code  0x0800'4140   0x6a4  main.o [1]
+  .text              ro code  0x0800'47e4   0x1c8  uart.o [1]
+  .rodata            const    0x0800'49ac    0x40  main.o [1]
+  .text              ro code  0x0800'49ec    0x76  ABImemcpy.o [2]
+
+"P2", part 1 of 2:                           0x10
+  .bss               zero     0x2000'0000     0x8  main.o [1]
+  .bss               zero     0x2000'0008     0x8  uart.o [1]
+  CSTACK                      0x2000'0010  0x1000  <Block>
+    CSTACK           uninit   0x2000'0010  0x1000  <Block tail>
+
+*******************************************************************************
+*** MODULE SUMMARY
+***
+
+    Module            ro code  ro data  rw data
+    ------            -------  -------  -------
+command line/config:
+    -------------------------------------------
+    Total:
+
+C:\\Work\\Proj\\EWARM\\Debug\\Obj: [1]
+    main.o              1 700       64        8
+    startup_stm32.o       320
+    a_very_long_module_name_that_wraps.o
+                           12
+    uart.o                456                 8
+    -------------------------------------------
+    Total:              2 488       64       16
+
+dl7M_tln.a: [2]
+    ABImemcpy.o           118
+    -------------------------------------------
+    Total:                118
+
+    Gaps                    4
+    Linker created                  16    4 096
+-----------------------------------------------
+    Grand Total:        2 610       80    4 112
+
+*******************************************************************************
+*** ENTRY LIST
+***
+"""
+    report = IARMapParser().parse(sample, 'sample.map')
+    print(f"ROM {report.rom}, RAM {report.ram}")
+    for name, entry in report.objects.items():
+        print(f"  {name}: {entry}")
+    for name, entry in report.sections.items():
+        print(f"  [{name}] {entry}")
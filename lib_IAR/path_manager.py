@@ -427,7 +427,9 @@ class IARPathManager:
         logger.info(f"当前bin_start_address: 0x{current_bin_start:X}")
         if current_bin_start == 0:
             logger.info("尝试自动获取flash偏移地址...")
-            flash_offset = self.get_flash_offset_from_configuration()
+            # 使用项目文件中第一个配置的ICF文件
+            flash_offset = self.get_flash_offset_from_configuration(
+                self._first_configuration(project_settings.get('iar_project_path', '')))
             if flash_offset:
                 updated_config['binary_settings']['bin_start_address'] = flash_offset
                 logger.info(f"自动获取flash偏移地址成功: 0x{flash_offset:X}")
@@ -446,6 +448,22 @@ class IARPathManager:
         
         return updated_config
     
+    def _first_configuration(self, project_path: str) -> Optional[Dict]:
+        """
+        获取项目文件中的第一个编译配置
+
+        Args:
+            project_path: 项目文件路径
+
+        Returns:
+            Dict: 配置信息，项目文件不存在或解析失败时返回None
+        """
+        if not project_path or not os.path.exists(project_path):
+            return None
+        result = self.iar_analyzer.analyze_ewp_file(project_path)
+        configurations = (result or {}).get('configurations') or []
+        return configurations[0] if configurations else None
+
     def _extract_project_name_from_ewp(self, ewp_path: str) -> Optional[str]:
         """
         从ewp文件中提取项目名称（bin文件名）
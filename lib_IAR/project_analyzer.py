@@ -7,9 +7,17 @@ IAR项目分析器模块
 
 import os
 import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from lib_logger import logger
 from typing import Optional, Dict, Tuple, List
 from pathlib import Path
+from parse_cache import ParseCache
+from memory_model import MemoryModel
+from map_analyzer import MapSizeReport, find_map_file
+from .icf_parser import ICFParser
+from .map_parser import IARMapParser
+from .workspace_parser import IARWorkspaceParser
 
 try:
     from lxml import etree as ET
@@ -22,8 +30,24 @@ except ImportError:
 class IARProjectAnalyzer:
     """IAR项目分析器"""
     
-    def __init__(self):
-        """初始化IAR项目分析器"""
+    # 解析器版本，解析逻辑或结果结构变化时递增，使旧的磁盘缓存失效
+    ANALYZER_VERSION = 3
+    
+    # 流式解析时关心的选项名称
+    _WANTED_OPTIONS = ('ExePath', 'ListPath', 'IlinkIcfFile')
+    
+    # 头文件包含目录选项（C/C++编译器和汇编器）
+    _INCLUDE_OPTIONS = ('CCIncludePath2', 'AUserIncludes')
+    
+    def __init__(self, use_cache: bool = True):
+        """
+        初始化IAR项目分析器
+        
+        Args:
+            use_cache: 是否使用磁盘解析缓存
+        """
+        self.parse_cache = ParseCache('iar_project') if use_cache else None
+        self.inputs_cache = ParseCache('iar_project_inputs') if use_cache else None
     
     def analyze_ewp_file(self, ewp_path: str) -> Optional[Dict]:
         """
@@ -40,10 +64,6 @@ class IARProjectAnalyzer:
                 logger.error(f"IAR项目文件不存在: {ewp_path}")
                 return None
             
-            # 解析XML文件
-            tree = ET.parse(ewp_path)
-            root = tree.getroot()
-            
             result = {
                 'project_path': ewp_path,
                 'configurations': [],
@@ -51,22 +71,22 @@ class IARProjectAnalyzer:
                 'project_dir': os.path.dirname(ewp_path)
             }
             
-            # 解析配置信息
-            configurations = self._parse_configurations(root, result['project_dir'])
+            # 优先使用磁盘缓存的配置模型，命中时跳过XML解析
+            configurations = None
+            if self.parse_cache:
+                configurations = self.parse_cache.load(ewp_path, self.ANALYZER_VERSION)
+            
+            if configurations is not None:
+                logger.debug(f"命中项目解析缓存: {ewp_path}")
+            else:
+                # 流式解析配置信息，不构建完整DOM
+                configurations = self._stream_configurations(ewp_path, result['project_dir'])
+                if self.parse_cache and configurations:
+                    self.parse_cache.save(ewp_path, self.ANALYZER_VERSION, configurations)
             result['configurations'] = configurations
             
-            # 为每个配置查找输出文件
-            for config in configurations:
-                # 记录ICF文件信息
-                if config.get('icf_file'):
-                    icf_file = config['icf_file']
-                    logger.info(f"找到ICF文件: {icf_file} (配置: {config['name']})")
-                else:
-                    logger.warning(f"配置 {config['name']} 中未找到ICF文件")
-                
-                # 查找编译输出文件
-                build_outputs = self.find_build_outputs(ewp_path, config, len(configurations))
-                config.update(build_outputs)
+            # 并行分析所有配置的输出文件和链接脚本（输出目录可能在编译后才出现，不进入缓存）
+            self._analyze_configurations(ewp_path, configurations)
             
             return result
             
@@ -74,48 +94,78 @@ class IARProjectAnalyzer:
             logger.error(f"分析IAR项目文件失败: {e}")
             return None
     
+    def _analyze_configurations(self, project_path: str, configurations: List[Dict], max_workers: int = None):
+        """
+        在线程池中并行分析所有配置的输出文件和ICF文件，结果直接写入配置字典
+        
+        每个配置会补充bin/out文件路径、linker_info（ICF文件分析结果）和flash_offset，
+        多个配置共用的ICF文件只解析一次
+        
+        Args:
+            project_path: 项目文件路径
+            configurations: 配置信息列表
+            max_workers: 最大线程数，默认按任务数量和CPU核数确定
+        """
+        if not configurations:
+            return
+        
+        total_configs = len(configurations)
+        linker_files = sorted({config['icf_file'] for config in configurations
+                               if config.get('icf_file') and os.path.exists(config['icf_file'])})
+        task_count = total_configs + len(linker_files)
+        workers = max_workers or min(task_count, (os.cpu_count() or 1) + 4)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='IARAnalyzer') as executor:
+            linker_futures = {path: executor.submit(self.analyze_icf_file, path) for path in linker_files}
+            output_futures = [executor.submit(self.find_build_outputs, project_path, config, total_configs)
+                              for config in configurations]
+            
+            for config, future in zip(configurations, output_futures):
+                config.update(future.result())
+            
+            for config in configurations:
+                linker_file = config.get('icf_file')
+                if not linker_file:
+                    logger.warning(f"配置 {config['name']} 中未找到ICF文件")
+                linker_future = linker_futures.get(linker_file)
+                linker_info = linker_future.result() if linker_future else None
+                config['linker_info'] = linker_info
+                config['flash_offset'] = linker_info.get('intvec_start') if linker_info else None
+    
     def find_build_outputs(self, project_path: str, configuration: Dict, total_configs: int = 1) -> Dict:
         """
-        查找指定配置的编译输出文件(bin和out)
+        查找指定配置的编译输出文件(bin、out和map)
         
         Args:
             project_path: 项目路径
             configuration: 配置信息
             
         Returns:
-            Dict: 包含bin和out文件路径的字典
+            Dict: 包含bin、out和map文件路径的字典
         """
         result = {
             'bin_file': None,
-            'out_file': None
+            'out_file': None,
+            'map_file': None
         }
         
         try:
             output_dir = configuration.get('output_dir_abs', '')
             config_name = configuration.get('name', '')
             project_name = os.path.splitext(os.path.basename(project_path))[0]
-            logger.info(f"原始项目名: {project_name} (从文件: {os.path.basename(project_path)})")
-            logger.info(f"当前配置名: {config_name}")
             
             # 如果项目名包含配置名后缀，移除它
             if config_name and project_name.endswith(f"_{config_name}"):
                 project_name = project_name[:-len(f"_{config_name}")]
-                logger.info(f"移除配置名后缀后的项目名: {project_name}")
-            else:
-                logger.info(f"项目名不包含配置名后缀，保持原样: {project_name}")
-            
-            logger.info(f"最终项目名: {project_name}")
             
             if not output_dir or not os.path.exists(output_dir):
                 logger.warning(f"配置 {config_name} 的输出目录不存在: {output_dir}")
                 return result
             
             # 构建文件名
-            logger.info(f"配置总数: {total_configs}")
             # IAR编译输出文件名始终是项目名，不包含配置名
             bin_filename = f"{project_name}.bin"
             out_filename = f"{project_name}.out"
-            logger.info(f"IAR编译输出文件名: {bin_filename}")
             
             bin_file_path = os.path.join(output_dir, bin_filename)
             out_file_path = os.path.join(output_dir, out_filename)
@@ -125,9 +175,10 @@ class IARProjectAnalyzer:
             result['out_file'] = out_file_path
             result['total_configs'] = total_configs
             
-            logger.info(f"配置 {config_name}: 生成文件路径")
-            logger.info(f"  bin文件: {bin_file_path}")
-            logger.info(f"  out文件: {out_file_path}")
+            # map文件默认生成在List目录，也可能与输出文件放在一起，只返回实际存在的文件
+            result['map_file'] = find_map_file([configuration.get('list_dir_abs', ''), output_dir], project_name)
+            
+            logger.debug(f"配置 {config_name}: bin文件={bin_file_path}, out文件={out_file_path}, map文件={result['map_file']}")
             
             return result
             
@@ -151,14 +202,7 @@ class IARProjectAnalyzer:
         try:
             # 查找所有configuration节点
             for config_elem in root.findall('.//configuration'):
-                config_info = {
-                    'name': '',
-                    'output_dir': '',
-                    'output_dir_abs': '',
-                    'debug': False,
-                    'toolchain': '',
-                    'icf_file': ''
-                }
+                config_info = self._new_config_info()
                 
                 # 获取配置名称
                 name_elem = config_elem.find('name')
@@ -175,37 +219,17 @@ class IARProjectAnalyzer:
                 if toolchain_elem is not None:
                     config_info['toolchain'] = toolchain_elem.text
                 
-                # 查找输出目录
+                # 查找输出目录和ICF文件配置
                 # 通常在 <option><name>ExePath</name><state>Debug\Exe</state></option>
                 for option in config_elem.findall('.//option'):
                     name_elem = option.find('name')
-                    if name_elem is not None and name_elem.text == 'ExePath':
-                        state_elem = option.find('state')
-                        if state_elem is not None:
-                            config_info['output_dir'] = state_elem.text
-                            # 构建绝对路径
-                            if os.path.isabs(state_elem.text):
-                                config_info['output_dir_abs'] = state_elem.text
-                            else:
-                                config_info['output_dir_abs'] = os.path.join(project_dir, state_elem.text)
-                
-                # 查找ICF文件配置
-                for option in config_elem.findall('.//option'):
-                    name_elem = option.find('name')
-                    if name_elem is not None and name_elem.text == 'IlinkIcfFile':
-                        state_elem = option.find('state')
-                        if state_elem is not None:
-                            icf_file = state_elem.text
-                            # 处理$PROJ_DIR$宏
-                            if icf_file.startswith('$PROJ_DIR$'):
-                                icf_file = icf_file.replace('$PROJ_DIR$', project_dir)
-                            elif not os.path.isabs(icf_file):
-                                icf_file = os.path.join(project_dir, icf_file)
-                            config_info['icf_file'] = icf_file
+                    state_elem = option.find('state')
+                    if name_elem is not None and state_elem is not None:
+                        self._apply_option(config_info, name_elem.text, state_elem.text, project_dir)
                 
                 if config_info['name']:  # 只添加有效的配置
                     configurations.append(config_info)
-                    logger.info(f"找到配置: {config_info['name']}, 输出目录: {config_info['output_dir_abs']}, Debug: {config_info['debug']}")
+                    logger.debug(f"找到配置: {config_info['name']}, 输出目录: {config_info['output_dir_abs']}, Debug: {config_info['debug']}")
             
             return configurations
             
@@ -213,6 +237,242 @@ class IARProjectAnalyzer:
             logger.error(f"解析配置信息失败: {e}")
             return []
     
+    def _stream_configurations(self, ewp_path: str, project_dir: str) -> List[Dict]:
+        """
+        使用iterparse流式解析IAR项目文件中的配置信息
+        
+        只提取配置名称、debug状态、工具链、输出目录和ICF文件；已处理的节点立即从树中移除，
+        遇到配置之后的文件组节点即停止解析，大型项目文件无需构建完整DOM
+        
+        Args:
+            ewp_path: IAR项目文件路径
+            project_dir: 项目目录路径
+            
+        Returns:
+            List[Dict]: 配置信息列表
+        """
+        configurations = []
+        config_info = None
+        option_name = None
+        option_state_seen = False
+        # 当前打开的节点栈
+        stack = []
+        
+        try:
+            with open(ewp_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        # 根节点下出现group/file说明配置已全部读完
+                        if len(stack) == 1 and configurations and elem.tag in ('group', 'file'):
+                            break
+                        if len(stack) == 1 and elem.tag == 'configuration':
+                            config_info = self._new_config_info()
+                        stack.append(elem)
+                        continue
+                    
+                    stack.pop()
+                    parent_tag = stack[-1].tag if stack else None
+                    tag = elem.tag
+                    
+                    if config_info is not None:
+                        if tag == 'name' and parent_tag == 'configuration':
+                            config_info['name'] = elem.text or ''
+                        elif tag == 'debug' and parent_tag == 'configuration':
+                            config_info['debug'] = elem.text == '1'
+                        elif tag == 'name' and parent_tag == 'toolchain':
+                            config_info['toolchain'] = elem.text or ''
+                        elif tag == 'name' and parent_tag == 'option':
+                            option_name = elem.text
+                            option_state_seen = False
+                        elif tag == 'state' and parent_tag == 'option':
+                            # 与DOM解析保持一致，只取第一个state
+                            if not option_state_seen and option_name in self._WANTED_OPTIONS:
+                                self._apply_option(config_info, option_name, elem.text, project_dir)
+                            option_state_seen = True
+                        elif tag == 'option':
+                            option_name = None
+                        elif tag == 'configuration':
+                            if config_info['name']:
+                                configurations.append(config_info)
+                                logger.debug(f"找到配置: {config_info['name']}, 输出目录: {config_info['output_dir_abs']}, Debug: {config_info['debug']}")
+                            config_info = None
+                    
+                    # 节点已处理完毕，从父节点移除以释放内存
+                    if stack:
+                        stack[-1].remove(elem)
+                    else:
+                        elem.clear()
+            
+            return configurations
+            
+        except Exception as e:
+            logger.error(f"流式解析配置信息失败: {e}")
+            return []
+    
+    def get_project_inputs(self, ewp_path: str) -> Dict:
+        """
+        获取项目文件中列出的源文件和所有配置的头文件包含目录（按项目文件缓存）
+        
+        IAR安装目录下的文件（$TOOLKIT_DIR$等其他宏）不属于项目输入，不包含在结果中
+        
+        Args:
+            ewp_path: IAR项目文件路径
+            
+        Returns:
+            Dict: {'sources': 源文件绝对路径列表, 'include_dirs': 包含目录绝对路径列表}
+        """
+        if self.inputs_cache:
+            cached = self.inputs_cache.load(ewp_path, self.ANALYZER_VERSION)
+            if cached is not None:
+                return cached
+        
+        project_dir = os.path.dirname(os.path.abspath(ewp_path))
+        sources = []
+        include_dirs = []
+        option_name = None
+        stack = []
+        
+        try:
+            with open(ewp_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        stack.append(elem)
+                        continue
+                    
+                    stack.pop()
+                    parent_tag = stack[-1].tag if stack else None
+                    tag = elem.tag
+                    
+                    if tag == 'name' and parent_tag == 'file':
+                        path = self._resolve_macro_path(elem.text, project_dir)
+                        if path and path not in sources:
+                            sources.append(path)
+                    elif tag == 'name' and parent_tag == 'option':
+                        option_name = elem.text
+                    elif tag == 'state' and parent_tag == 'option' and option_name in self._INCLUDE_OPTIONS:
+                        path = self._resolve_macro_path(elem.text, project_dir)
+                        if path and path not in include_dirs:
+                            include_dirs.append(path)
+                    elif tag == 'option':
+                        option_name = None
+                    
+                    # 节点已处理完毕，从父节点移除以释放内存
+                    if stack:
+                        stack[-1].remove(elem)
+                    else:
+                        elem.clear()
+            
+        except Exception as e:
+            logger.error(f"解析项目源文件列表失败: {e}")
+            return {'sources': sources, 'include_dirs': include_dirs}
+        
+        result = {'sources': sources, 'include_dirs': include_dirs}
+        if self.inputs_cache:
+            self.inputs_cache.save(ewp_path, self.ANALYZER_VERSION, result)
+        return result
+    
+    def get_configuration_digest(self, ewp_path: str, configuration_name: str) -> Optional[str]:
+        """
+        计算项目文件中指定配置的编译选项摘要，用于判断编译选项是否变化
+        
+        只取项目根节点下的configuration节点，文件组中针对单个配置的选项覆盖不计入
+        
+        Args:
+            ewp_path: IAR项目文件路径
+            configuration_name: 配置名称
+            
+        Returns:
+            Optional[str]: 选项摘要，未找到配置或解析失败返回None
+        """
+        depth = 0
+        try:
+            with open(ewp_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        continue
+                    depth -= 1
+                    if depth == 1 and elem.tag == 'configuration':
+                        if (elem.findtext('name') or '').strip() == configuration_name:
+                            return hashlib.sha1(ET.tostring(elem)).hexdigest()
+                        elem.clear()
+            
+        except Exception as e:
+            logger.error(f"计算配置选项摘要失败: {e}")
+        return None
+    
+    @staticmethod
+    def _resolve_macro_path(path: Optional[str], project_dir: str) -> str:
+        """
+        解析项目文件中的路径（$PROJ_DIR$宏、Windows路径分隔符），其他宏目录返回空字符串
+        
+        Args:
+            path: 项目文件中记录的路径
+            project_dir: 项目目录路径
+            
+        Returns:
+            str: 绝对路径
+        """
+        if not path or not path.strip():
+            return ''
+        path = path.strip().replace('$PROJ_DIR$', project_dir)
+        if '$' in path:
+            return ''
+        path = path.replace('\\', os.sep)
+        if not os.path.isabs(path):
+            path = os.path.join(project_dir, path)
+        return os.path.normpath(path)
+    
+    @staticmethod
+    def _new_config_info() -> Dict:
+        """创建空的配置信息字典"""
+        return {
+            'name': '',
+            'output_dir': '',
+            'output_dir_abs': '',
+            'list_dir': '',
+            'list_dir_abs': '',
+            'debug': False,
+            'toolchain': '',
+            'icf_file': ''
+        }
+    
+    @staticmethod
+    def _apply_option(config_info: Dict, option_name: str, state: str, project_dir: str):
+        """
+        将项目选项写入配置信息
+        
+        Args:
+            config_info: 配置信息字典
+            option_name: 选项名称
+            state: 选项值
+            project_dir: 项目目录路径
+        """
+        if not state:
+            return
+        
+        if option_name == 'ExePath':
+            config_info['output_dir'] = state
+            # 构建绝对路径
+            if os.path.isabs(state):
+                config_info['output_dir_abs'] = state
+            else:
+                config_info['output_dir_abs'] = os.path.join(project_dir, state)
+        elif option_name == 'ListPath':
+            config_info['list_dir'] = state
+            if os.path.isabs(state):
+                config_info['list_dir_abs'] = state
+            else:
+                config_info['list_dir_abs'] = os.path.join(project_dir, state)
+        elif option_name == 'IlinkIcfFile':
+            icf_file = state
+            # 处理$PROJ_DIR$宏
+            if icf_file.startswith('$PROJ_DIR$'):
+                icf_file = icf_file.replace('$PROJ_DIR$', project_dir)
+            elif not os.path.isabs(icf_file):
+                icf_file = os.path.join(project_dir, icf_file)
+            config_info['icf_file'] = icf_file
+    
     def analyze_icf_file(self, icf_path: str) -> Optional[Dict]:
         """
         分析ICF文件，提取flash偏移地址
@@ -291,6 +551,11 @@ class IARProjectAnalyzer:
                     logger.info(f"找到RAM区域: 0x{ram_start:X} - 0x{ram_end:X} (大小: 0x{result['ram_size']:X})")
                     break
             
+            # 使用完整的内存模型覆盖正则结果（支持符号表达式和多bank区域）
+            model = self.get_memory_model(icf_path)
+            if model:
+                self._apply_memory_model(result, model)
+            
             # 验证结果
             if not result['intvec_start'] and not result['flash_start']:
                 logger.warning("未找到flash起始地址信息")
@@ -302,6 +567,56 @@ class IARProjectAnalyzer:
             logger.error(f"分析ICF文件失败: {e}")
             return None
     
+    def get_memory_model(self, icf_path: str) -> Optional[MemoryModel]:
+        """
+        获取ICF文件的内存模型（按文件缓存）
+        
+        Args:
+            icf_path: ICF文件路径
+            
+        Returns:
+            Optional[MemoryModel]: 内存模型，失败返回None
+        """
+        return ICFParser().parse_file(icf_path)
+    
+    def get_size_report(self, map_path: str) -> Optional[MapSizeReport]:
+        """
+        流式解析map文件，统计按目标文件和按节的ROM/RAM占用
+        
+        Args:
+            map_path: map文件路径
+            
+        Returns:
+            Optional[MapSizeReport]: 尺寸报告，失败返回None
+        """
+        return IARMapParser().parse_file(map_path)
+    
+    @staticmethod
+    def _apply_memory_model(result: Dict, model: MemoryModel):
+        """
+        将内存模型中的Flash/RAM区域和中断向量表地址写入ICF分析结果
+        
+        Args:
+            result: analyze_icf_file的结果字典
+            model: 内存模型
+        """
+        if model.entry_address is not None:
+            result['intvec_start'] = model.entry_address
+        
+        flash_region = model.primary_flash_region()
+        if flash_region:
+            result['flash_start'] = flash_region.start
+            result['flash_size'] = flash_region.size
+        
+        ram_region = model.primary_ram_region()
+        if ram_region:
+            result['ram_start'] = ram_region.start
+            result['ram_size'] = ram_region.size
+        
+        result['memory_regions'] = [region.to_dict() for region in model.regions]
+        for line in model.describe():
+            logger.debug(f"ICF内存区域: {line}")
+    
     def get_flash_offset_from_configuration(self, configuration: Dict) -> Optional[int]:
         """
         从配置信息中获取flash偏移地址
@@ -335,6 +650,59 @@ class IARProjectAnalyzer:
             logger.error(f"分析ICF文件失败: {e}")
             return None
     
+    def get_batch_configurations(self, eww_path: str, batch_name: str) -> List[Dict]:
+        """
+        获取工作区批量编译中每个成员（项目/配置）的配置信息和输出文件
+        
+        工作区包含多个项目时，配置名称加上项目名前缀（如 Boot_Release），避免发布文件重名
+        
+        Args:
+            eww_path: 工作区文件路径
+            batch_name: 批量编译名称
+            
+        Returns:
+            List[Dict]: 配置信息列表，每项额外包含 project_path、project_name 和 build_configuration（原配置名称）
+        """
+        try:
+            workspace = IARWorkspaceParser().parse_file(eww_path)
+            if not workspace:
+                return []
+            members = workspace['batches'].get(batch_name)
+            if members is None:
+                logger.error(f"工作区中未找到批量编译 {batch_name}，可用: {', '.join(workspace['batches']) or '无'}")
+                return []
+            
+            multi_project = len({member['project'] for member in members}) > 1
+            projects = {}
+            configurations = []
+            for member in members:
+                project_path = member['project_path']
+                if project_path not in projects:
+                    projects[project_path] = self.analyze_ewp_file(project_path) if project_path else None
+                project_info = projects[project_path]
+                if not project_info:
+                    logger.warning(f"无法分析批量编译成员项目: {member['project']}")
+                    continue
+                
+                for config in project_info['configurations']:
+                    if config['name'] == member['configuration']:
+                        batch_config = dict(config)
+                        batch_config['project_path'] = project_path
+                        batch_config['project_name'] = member['project']
+                        batch_config['build_configuration'] = config['name']
+                        if multi_project:
+                            batch_config['name'] = f"{member['project']}_{config['name']}"
+                        configurations.append(batch_config)
+                        break
+                else:
+                    logger.warning(f"项目 {member['project']} 中未找到配置 {member['configuration']}")
+            
+            return configurations
+            
+        except Exception as e:
+            logger.error(f"获取批量编译配置失败: {e}")
+            return []
+    
     def find_ewp_file(self, project_path: str) -> Optional[str]:
         """
         在项目路径中查找IAR项目文件
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+IAR工作区解析模块
+解析工作区文件(.eww)中的项目列表和批量编译(batch build)定义
+"""
+
+import os
+from lib_logger import logger
+from typing import Dict, Optional
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def resolve_workspace_path(path: str, workspace_dir: str) -> str:
+    """
+    解析工作区文件中的项目路径（$WS_DIR$相对路径、Windows路径分隔符）
+
+    Args:
+        path: 工作区文件中的路径
+        workspace_dir: 工作区文件所在目录
+
+    Returns:
+        str: 绝对路径
+    """
+    path = path.strip().replace('$WS_DIR$', workspace_dir).replace('\\', os.sep)
+    if not os.path.isabs(path):
+        path = os.path.join(workspace_dir, path)
+    return os.path.normpath(path)
+
+
+class IARWorkspaceParser:
+    """IAR工作区解析器"""
+
+    def parse_file(self, eww_path: str) -> Optional[Dict]:
+        """
+        解析工作区文件
+
+        Args:
+            eww_path: 工作区文件路径
+
+        Returns:
+            Optional[Dict]: {'workspace_path', 'workspace_dir', 'projects': [{'name', 'path'}],
+            'batches': {批量编译名称: [{'project', 'project_path', 'configuration'}]}}，失败返回None
+        """
+        try:
+            if not os.path.exists(eww_path):
+                logger.error(f"IAR工作区文件不存在: {eww_path}")
+                return None
+
+            workspace_dir = os.path.dirname(os.path.abspath(eww_path))
+            root = ET.parse(eww_path).getroot()
+
+            projects = []
+            for path_elem in root.findall('./project/path'):
+                if path_elem.text:
+                    project_path = resolve_workspace_path(path_elem.text, workspace_dir)
+                    projects.append({
+                        'name': os.path.splitext(os.path.basename(project_path))[0],
+                        'path': project_path
+                    })
+            project_paths = {project['name']: project['path'] for project in projects}
+
+            batches = {}
+            for definition in root.findall('./batchBuild/batchDefinition'):
+                batch_name = (definition.findtext('name') or '').strip()
+                if not batch_name:
+                    continue
+                members = []
+                for member in definition.findall('member'):
+                    project_name = (member.findtext('project') or '').strip()
+                    configuration = (member.findtext('configuration') or '').strip()
+                    if not project_name or not configuration:
+                        continue
+                    if project_name not in project_paths:
+                        logger.warning(f"批量编译 {batch_name} 引用了工作区中不存在的项目: {project_name}")
+                    members.append({
+                        'project': project_name,
+                        'project_path': project_paths.get(project_name, ''),
+                        'configuration': configuration
+                    })
+                batches[batch_name] = members
+
+            logger.info(f"解析IAR工作区: {eww_path}, 项目 {len(projects)} 个, 批量编译 {len(batches)} 个")
+            return {
+                'workspace_path': eww_path,
+                'workspace_dir': workspace_dir,
+                'projects': projects,
+                'batches': batches
+            }
+
+        except Exception as e:
+            logger.error(f"解析IAR工作区文件失败: {eww_path}, 错误: {e}")
+            return None
+
+
+if __name__ == "__main__":
+    # 测试工作区解析
+    import sys
+    if len(sys.argv) > 1:
+        workspace = IARWorkspaceParser().parse_file(sys.argv[1])
+        if workspace:
+            for project in workspace['projects']:
+                print(f"项目: {project['name']} -> {project['path']}")
+            for name, members in workspace['batches'].items():
+                print(f"批量编译 {name}: " + ', '.join(f"{m['project']}/{m['configuration']}" for m in members))
+    else:
+        print("用法: python -m lib_IAR.workspace_parser <workspace.eww>")
@@ -5,16 +5,38 @@ MDK工具链库
 包含MDK相关的所有模块
 """
 
-from .path_manager import MDKPathManager
-from .info_manager import MDKInfoManager
-from .file_manager import MDKFileManager
-from .builder import MDKBuilder
-from .project_analyzer import MDKProjectAnalyzer
+import importlib
+
+# 类名 -> 子模块，首次访问时导入（从子模块直接导入时不会加载其余模块）
+_LAZY_IMPORTS = {
+    'MDKPathManager': 'path_manager',
+    'MDKInfoManager': 'info_manager',
+    'MDKFileManager': 'file_manager',
+    'MDKBuilder': 'builder',
+    'MDKProjectAnalyzer': 'project_analyzer',
+    'SCTParser': 'sct_parser',
+    'MDKMapParser': 'map_parser',
+    'MDKWorkspaceParser': 'workspace_parser',
+}
+
+
+def __getattr__(name):
+    """按需导入子模块中的类"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'MDKPathManager',
     'MDKInfoManager',
     'MDKFileManager', 
     'MDKBuilder',
-    'MDKProjectAnalyzer'
+    'MDKProjectAnalyzer',
+    'SCTParser',
+    'MDKMapParser',
+    'MDKWorkspaceParser'
 ]
@@ -8,10 +8,13 @@ MDK编译模块
 import subprocess
 import os
 import time
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, Callable, List
 from pathlib import Path
 from lib_logger import logger
+from build_output import BuildOutputMonitor, BuildEvent, run_streaming_process
+from toolchain_registry import get_toolchain_registry
 from .project_analyzer import MDKProjectAnalyzer
+from .workspace_parser import MDKWorkspaceParser
 
 
 class MDKBuilder:
@@ -44,10 +47,17 @@ class MDKBuilder:
         self.project_root = config.get('project_path', '')
         # 实际的项目文件路径
         self.project_path = self.mdk_project_path
-        self.build_config = config.get('build_configuration', 'Debug')
+        # 优先编译传入的配置，未提供时使用配置文件中的编译配置名称
+        self.build_config = (configuration or {}).get('name') or config.get('build_configuration', 'Debug')
         self.clean_before_build = config.get('clean_before_build', False)  # 默认使用增量编译
         self.timeout_seconds = config.get('timeout_seconds', 300)
         
+        # 编译输出事件回调和最近一次编译的输出监视器
+        self.output_callback: Optional[Callable[[BuildEvent], None]] = None
+        self.last_build_monitor: Optional[BuildOutputMonitor] = None
+        # 单次编译使用的并行编译线程数，None表示使用工具链默认值
+        self.parallel_jobs: Optional[int] = None
+        
         # 验证路径
         logger.info(f"MDK可执行文件: {self.mdk_exe_path}")
         logger.info(f"MDK工作区文件: {self.workspace_path}")
@@ -58,9 +68,34 @@ class MDKBuilder:
         self.diagnose_environment()
         self.test_mdk_command()
     
+    def set_output_callback(self, callback: Optional[Callable[[BuildEvent], None]]):
+        """
+        设置编译输出事件回调，编译过程中每解析一行日志调用一次（在读取日志的线程中调用）
+        
+        Args:
+            callback: 事件回调，为None时取消
+        """
+        self.output_callback = callback
+    
+    def get_executable_path(self) -> str:
+        """获取编译工具可执行文件（UV4.exe）路径"""
+        return self.mdk_exe_path
+    
+    def set_parallel_jobs(self, jobs: Optional[int]):
+        """
+        记录单次编译的并行编译线程数
+        
+        UV4命令行不能指定并行编译线程数（-j0只用于隐藏界面），实际线程数取决于µVision中的
+        并行编译设置，这里只记录调度器假定的线程数用于日志
+        
+        Args:
+            jobs: 线程数，为None时使用µVision设置
+        """
+        self.parallel_jobs = jobs if jobs and jobs > 0 else None
+    
     def _find_mdk_executable(self, mdk_dir: str) -> str:
         """
-        在MDK安装目录中查找UV4.exe
+        在MDK安装目录中查找UV4.exe（查找结果记入工具链注册表，之后不再逐个探测候选路径）
         
         Args:
             mdk_dir: MDK安装目录
@@ -71,25 +106,10 @@ class MDKBuilder:
         if not mdk_dir:
             return ""
         
-        possible_paths = [
-            os.path.join(mdk_dir, "UV4", "UV4.exe"),
-            os.path.join(mdk_dir, "UV4.exe"),
-            os.path.join(mdk_dir, "bin", "UV4.exe"),
-            os.path.join(mdk_dir, "ARM", "UV4", "UV4.exe"),
-            os.path.join(mdk_dir, "ARM", "bin", "UV4.exe")
-        ]
-        
-        logger.info(f"搜索MDK可执行文件，尝试以下路径:")
-        for i, path in enumerate(possible_paths, 1):
-            exists = os.path.exists(path)
-            logger.info(f"  {i}. {path} - {'存在' if exists else '不存在'}")
-            if exists:
-                logger.info(f"找到MDK可执行文件: {path}")
-                return path
-        
-        # 如果没找到，检查是否是直接指定的exe路径
-        if mdk_dir.endswith('.exe') and os.path.exists(mdk_dir):
-            return mdk_dir
+        path = get_toolchain_registry().find_executable('MDK', mdk_dir)
+        if path:
+            logger.info(f"找到MDK可执行文件: {path}")
+            return path
         
         # 如果都没找到，返回空字符串
         logger.warning(f"在MDK目录中未找到UV4.exe: {mdk_dir}")
@@ -191,9 +211,10 @@ class MDKBuilder:
         logger.info(f"文件可执行: {os.access(self.mdk_exe_path, os.X_OK)}")
         logger.info("=" * 50)
         
-        # 不执行实际命令，只检查文件
+        # 不执行实际命令，只检查文件；版本信息记入工具链注册表
         if os.path.exists(self.mdk_exe_path) and os.access(self.mdk_exe_path, os.X_OK):
-            logger.info("MDK可执行文件检查通过")
+            entry = get_toolchain_registry().probe('MDK', self.mdk_exe_path)
+            logger.info(f"MDK可执行文件检查通过，版本: {(entry or {}).get('version') or '未知'}")
             return True
         else:
             logger.warning("MDK可执行文件检查失败")
@@ -221,12 +242,12 @@ class MDKBuilder:
         if not os.path.exists(self.mdk_exe_path):
             error_msg = f"MDK可执行文件不存在: {self.mdk_exe_path}"
             logger.error(error_msg)
-            return False, "", error_msg
+            return False, error_msg
         
         if not os.path.exists(self.project_path):
             error_msg = f"MDK项目文件不存在: {self.project_path}"
             logger.error(error_msg)
-            return False, "", error_msg
+            return False, error_msg
         
         try:
             # 设置工作目录为项目文件所在目录
@@ -284,41 +305,126 @@ class MDKBuilder:
             logger.info(f"  - 目标配置: -t {configuration}")
             logger.info(f"  - 项目文件: {self.project_path}")
             logger.info(f"  - 输出日志: -o {log_file}")
+            if self.parallel_jobs:
+                logger.info(f"  - 并行线程: {self.parallel_jobs}（由µVision并行编译设置决定）")
             logger.info(f"工作目录: {project_dir}")
             logger.info("=" * 60)
             
             
-            # 执行编译
+            # 执行编译：UV4把编译信息写入 -o 日志文件，在后台线程中跟踪日志并逐行解析
             logger.info("开始执行编译...")
-            result = subprocess.run(
+            start_time = time.time()
+            monitor = BuildOutputMonitor('MDK', self.output_callback)
+            returncode, output_lines = run_streaming_process(
                 cmd,
-                capture_output=True,
-                text=True,
+                cwd=project_dir,
                 timeout=self.timeout_seconds,
-                cwd=project_dir
+                on_line=self._make_line_handler(monitor),
+                tail_file=log_file
             )
+            self.last_build_monitor = monitor
+            compile_time = time.time() - start_time
+            summary = monitor.format_summary()
             
             # 记录编译结果
             logger.info("=" * 50)
             logger.info("编译结果:")
-            logger.info(f"返回码: {result.returncode}")
-            logger.info(f"标准输出长度: {len(result.stdout)}")
-            logger.info(f"错误输出长度: {len(result.stderr)}")
-            
-            # 显示编译输出的前500个字符
-            if result.stdout:
-                logger.info(f"标准输出内容: {result.stdout[:500]}...")
-            if result.stderr:
-                logger.info(f"错误输出内容: {result.stderr[:500]}...")
-            
+            logger.info(f"返回码: {returncode}")
+            logger.info(f"编译耗时: {compile_time:.2f}秒")
+            logger.info(summary)
             logger.info("=" * 50)
             
-            if result.returncode == 0:
+            # UV4返回码: 0 无错误无警告，1 仅有警告，2 有错误，3 致命错误
+            if returncode in (0, 1) and not monitor.errors:
                 logger.info("✅ 编译成功")
-                return True, result.stdout
+                return True, f"编译成功\n耗时: {compile_time:.2f}秒\n\n{summary}"
+            else:
+                logger.error(f"❌ 编译失败，返回码: {returncode}")
+                return False, (f"编译失败\n返回码: {returncode}\n\n{summary}\n\n"
+                               f"输出信息(最后{len(output_lines)}行):\n" + '\n'.join(output_lines))
+                
+        except subprocess.TimeoutExpired:
+            error_msg = f"编译超时，超过 {self.timeout_seconds} 秒"
+            logger.error(error_msg)
+            return False, error_msg
+        except Exception as e:
+            error_msg = f"编译异常: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    def build_multi_project(self, project_names: List[str] = None, all_targets: bool = True,
+                            force_rebuild: bool = False) -> Tuple[bool, str]:
+        """
+        通过一次UV4调用编译多项目工作区(.uvmpw)中的全部或部分项目
+        
+        完整命令：UV4.exe -b|-r <workspace.uvmpw> [-z] -j0 -o <logfile>，-r 重新编译，-z 编译每个项目的所有目标
+        （不加 -z 时只编译各项目当前活动的目标）。UV4命令行不能选择工作区中的部分项目，
+        指定 project_names 时在工作区目录下生成只包含这些项目的临时工作区文件
+        
+        Args:
+            project_names: 只编译指定的项目（项目文件名，不含扩展名），为None时编译全部项目
+            all_targets: 是否编译每个项目的所有目标
+            force_rebuild: 是否全部重新编译
+            
+        Returns:
+            Tuple[bool, str]: (编译是否成功, 输出信息)
+        """
+        workspace_path = self.workspace_path
+        logger.info(f"开始编译MDK多项目工作区: {workspace_path}")
+        
+        if not os.path.exists(self.mdk_exe_path):
+            error_msg = f"MDK可执行文件不存在: {self.mdk_exe_path}"
+            logger.error(error_msg)
+            return False, error_msg
+        
+        if not workspace_path or not os.path.exists(workspace_path):
+            error_msg = f"MDK工作区文件不存在: {workspace_path}"
+            logger.error(error_msg)
+            return False, error_msg
+        
+        workspace_dir = os.path.dirname(os.path.abspath(workspace_path))
+        build_workspace = workspace_path
+        try:
+            if project_names:
+                base_name = os.path.splitext(os.path.basename(workspace_path))[0]
+                build_workspace = os.path.join(workspace_dir, f"{base_name}_batch.uvmpw")
+                if not MDKWorkspaceParser().write_subset(workspace_path, project_names, build_workspace):
+                    return False, f"无法生成只包含 {', '.join(project_names)} 的工作区文件"
+            
+            cmd = [
+                self.mdk_exe_path,
+                '-r' if force_rebuild or self.clean_before_build else '-b',
+                build_workspace,
+            ]
+            if all_targets:
+                cmd.append('-z')
+            log_file = os.path.join(workspace_dir, "build_workspace.log")
+            cmd.extend(['-j0', '-o', log_file])
+            logger.info(f"完整命令: {' '.join(cmd)}")
+            
+            # UV4把所有项目的编译信息写入同一个 -o 日志文件，在后台线程中跟踪日志并逐行解析
+            start_time = time.time()
+            monitor = BuildOutputMonitor('MDK', self.output_callback)
+            returncode, output_lines = run_streaming_process(
+                cmd,
+                cwd=workspace_dir,
+                timeout=self.timeout_seconds,
+                on_line=self._make_line_handler(monitor),
+                tail_file=log_file
+            )
+            self.last_build_monitor = monitor
+            compile_time = time.time() - start_time
+            summary = monitor.format_summary()
+            logger.info(f"工作区编译返回码: {returncode}, 耗时: {compile_time:.2f}秒")
+            
+            # UV4返回码: 0 无错误无警告，1 仅有警告，2 有错误，3 致命错误
+            if returncode in (0, 1) and not monitor.errors:
+                logger.info("✅ 工作区编译成功")
+                return True, f"工作区编译成功\n耗时: {compile_time:.2f}秒\n\n{summary}"
             else:
-                logger.error(f"❌ 编译失败，返回码: {result.returncode}")
-                return False, f"编译失败: {result.stderr}"
+                logger.error(f"❌ 工作区编译失败，返回码: {returncode}")
+                return False, (f"工作区编译失败\n返回码: {returncode}\n\n{summary}\n\n"
+                               f"输出信息(最后{len(output_lines)}行):\n" + '\n'.join(output_lines))
                 
         except subprocess.TimeoutExpired:
             error_msg = f"编译超时，超过 {self.timeout_seconds} 秒"
@@ -328,6 +434,20 @@ class MDKBuilder:
             error_msg = f"编译异常: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+        finally:
+            if build_workspace != workspace_path and os.path.exists(build_workspace):
+                try:
+                    os.remove(build_workspace)
+                except OSError as e:
+                    logger.warning(f"删除临时工作区文件失败: {e}")
+    
+    @staticmethod
+    def _make_line_handler(monitor: BuildOutputMonitor) -> Callable[[str], None]:
+        """创建输出行处理函数：写入日志文件并交给监视器解析"""
+        def handle(line: str):
+            logger.debug(f"[MDK] {line}")
+            monitor.feed(line)
+        return handle
     
     def clean_project(self) -> bool:
         """
@@ -12,7 +12,8 @@ from lib_logger import logger
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple, Optional, List, Dict
+from typing import Callable, Tuple, Optional, List, Dict
+from file_transfer import copy_files, format_rate, transfer_settings
 
 
 class MDKFileManager:
@@ -250,9 +251,10 @@ class MDKFileManager:
         return files
     
     def publish_to_remote(self, bin_file_path: str, release_note_path: str, branch_name: str = "main", 
-                         publish_out_file: bool = False, configuration: Dict = None) -> Tuple[bool, str, dict]:
+                         publish_out_file: bool = False, configuration: Dict = None,
+                         progress_callback: Callable[[Dict], None] = None) -> Tuple[bool, str, dict]:
         """
-        发布到远程目录
+        发布到远程目录（各文件同时分块复制，中断后从已复制的位置继续）
         
         Args:
             bin_file_path: bin文件路径
@@ -260,10 +262,12 @@ class MDKFileManager:
             branch_name: 分支名称
             publish_out_file: 是否同时发布.axf文件
             configuration: 配置信息
+            progress_callback: 复制进度回调，参数为 {'bytes', 'total', 'elapsed', 'bytes_per_second', 'file'}
             
         Returns:
             Tuple[bool, str, dict]: (成功标志, 消息, 结果信息)
         """
+        result_info = {}
         try:
             if not self.remote_publish_directory:
                 return False, "远程发布目录未配置", {}
@@ -278,41 +282,16 @@ class MDKFileManager:
                 'bin_file_copied': False,
                 'release_note_copied': False,
                 'out_file_copied': False,
-                'files': []
+                'files': [],
+                'bytes_per_second': 0.0
             }
             
-            # 复制bin文件
+            # 需要复制的文件: (类型, 本地路径, 远程文件名)
             bin_filename = os.path.basename(bin_file_path)
-            remote_bin_path = os.path.join(remote_sub_dir, bin_filename)
-            
-            if self.copy_file(bin_file_path, remote_bin_path):
-                result_info['bin_file_copied'] = True
-                result_info['files'].append({
-                    'type': 'bin',
-                    'local_path': bin_file_path,
-                    'remote_path': remote_bin_path,
-                    'filename': bin_filename
-                })
-                logger.info(f"bin文件已复制到远程目录: {remote_bin_path}")
-            else:
-                logger.warning(f"复制bin文件失败: {bin_file_path}")
+            transfers = [('bin', bin_file_path, bin_filename)]
             
-            # 复制Release Notes文件
             if release_note_path and os.path.exists(release_note_path):
-                release_note_filename = os.path.basename(release_note_path)
-                remote_release_note_path = os.path.join(remote_sub_dir, release_note_filename)
-                
-                if self.copy_file(release_note_path, remote_release_note_path):
-                    result_info['release_note_copied'] = True
-                    result_info['files'].append({
-                        'type': 'release_note',
-                        'local_path': release_note_path,
-                        'remote_path': remote_release_note_path,
-                        'filename': release_note_filename
-                    })
-                    logger.info(f"Release Notes已复制到远程目录: {remote_release_note_path}")
-                else:
-                    logger.warning(f"复制Release Notes失败: {release_note_path}")
+                transfers.append(('release_note', release_note_path, os.path.basename(release_note_path)))
             else:
                 logger.warning(f"Release Notes文件不存在: {release_note_path}")
             
@@ -323,31 +302,39 @@ class MDKFileManager:
                     axf_file_path = self.path_manager.find_axf_file(configuration=configuration)
                 if axf_file_path and os.path.exists(axf_file_path):
                     # 生成与bin文件对应的axf文件名
-                    bin_filename = os.path.basename(bin_file_path)
-                    axf_filename = bin_filename.replace('.bin', '.axf')
-                    remote_axf_path = os.path.join(remote_sub_dir, axf_filename)
-                    
-                    if self.copy_file(axf_file_path, remote_axf_path):
-                        result_info['out_file_copied'] = True
-                        result_info['files'].append({
-                            'type': 'axf',
-                            'local_path': axf_file_path,
-                            'remote_path': remote_axf_path,
-                            'filename': axf_filename
-                        })
-                        logger.info(f".axf文件已复制到远程目录: {remote_axf_path}")
-                    else:
-                        logger.warning(f"复制.axf文件失败: {axf_file_path}")
+                    transfers.append(('axf', axf_file_path, bin_filename.replace('.bin', '.axf')))
                 else:
                     logger.warning(f"未找到对应的.axf文件，源bin文件: {bin_file_path}")
             
+            copy_results, stats = copy_files(
+                [(local_path, os.path.join(remote_sub_dir, filename)) for _, local_path, filename in transfers],
+                progress_callback=progress_callback, **transfer_settings(self.config))
+            result_info['bytes_per_second'] = stats['bytes_per_second']
+            
+            copied_flags = {'bin': 'bin_file_copied', 'release_note': 'release_note_copied', 'axf': 'out_file_copied'}
+            for file_type, local_path, filename in transfers:
+                remote_path = os.path.join(remote_sub_dir, filename)
+                copied, error_msg = copy_results.get(remote_path, (False, ''))
+                if copied:
+                    result_info[copied_flags[file_type]] = True
+                    result_info['files'].append({
+                        'type': file_type,
+                        'local_path': local_path,
+                        'remote_path': remote_path,
+                        'filename': filename
+                    })
+                    logger.info(f"{filename} 已复制到远程目录: {remote_path}")
+                else:
+                    logger.warning(f"复制{filename}失败: {error_msg}")
+            
             success_msg = f"远程发布成功\n"
             success_msg += f"远程目录: {remote_sub_dir}\n"
             success_msg += f"bin文件: {'已复制' if result_info['bin_file_copied'] else '复制失败'}\n"
             success_msg += f"Release Notes: {'已复制' if result_info['release_note_copied'] else '复制失败'}\n"
             if publish_out_file:
                 success_msg += f".axf文件: {'已复制' if result_info['out_file_copied'] else '复制失败'}\n"
-            success_msg += f"文件数量: {len(result_info['files'])}"
+            success_msg += f"文件数量: {len(result_info['files'])}\n"
+            success_msg += f"传输速度: {format_rate(stats['bytes_per_second'])}"
             
             return True, success_msg, result_info
             
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MDK map/htm文件解析模块
+逐行解析armlink的Image component sizes和Memory Map，统计按目标文件和按节的ROM/RAM占用；
+无map文件时可从静态调用图(.htm)按函数大小统计代码占用
+"""
+
+import os
+import re
+from typing import Iterable
+from map_analyzer import MapFileParser, MapSizeReport, normalize_section_name
+
+
+class MDKMapParser(MapFileParser):
+    """MDK armlink map/htm文件解析器"""
+
+    TOOLCHAIN = 'MDK'
+
+    _SECTION_LINE = re.compile(
+        r"^\s*0x[0-9A-Fa-f]+\s+(?:0x[0-9A-Fa-f]+|-|COMPRESSED)\s+0x(?P<size>[0-9A-Fa-f]+)\s+"
+        r"(?P<type>Code|Data|Zero)\s+(?P<attr>RO|RW|XO)\s+\d+\s+(?:\*\s+)?(?P<section>\S+)")
+    _TOTAL_LINE = re.compile(r"^\s*Total (ROM|RW)\s+Size\s*\([^)]*\)\s+(\d+)")
+    # 静态调用图中的函数条目，例如: main</STRONG> (Thumb, 120 bytes, Stack size 8 bytes, main.o(i.main))
+    _HTM_FUNCTION = re.compile(
+        r'<a name="(?P<anchor>\[\w+\])"></a>[^<]*</STRONG>\s*\((?:Thumb|ARM), (?P<size>\d+) bytes,'
+        r'.*?(?P<object>[^\s,()]+)\((?P<section>[^()]+)\)\)')
+
+    def parse_lines(self, lines: Iterable[str], report: MapSizeReport):
+        """
+        逐行解析MDK map或htm内容，按来源文件扩展名选择解析方式
+
+        Args:
+            lines: 行迭代器
+            report: 写入结果的尺寸报告
+        """
+        if os.path.splitext(report.source)[1].lower() in ('.htm', '.html'):
+            self._parse_htm_lines(lines, report)
+        else:
+            self._parse_map_lines(lines, report)
+
+    def _parse_map_lines(self, lines: Iterable[str], report: MapSizeReport):
+        """解析armlink map文件"""
+        state = None
+        table = None
+        column_count = 6
+
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('Memory Map of the image'):
+                state = 'memory'
+                continue
+            if stripped.startswith('Image component sizes'):
+                state = 'components'
+                continue
+
+            if state == 'memory':
+                if stripped.startswith('Image Symbol Table') or stripped.startswith('Image component sizes'):
+                    state = None
+                    continue
+                match = self._SECTION_LINE.match(line)
+                if match:
+                    size = int(match.group('size'), 16)
+                    section = normalize_section_name(match.group('section'))
+                    if match.group('attr') == 'RW':
+                        report.add_section(section, ram=size)
+                    else:
+                        report.add_section(section, rom=size)
+
+            elif state == 'components':
+                total = self._TOTAL_LINE.match(line)
+                if total:
+                    report.totals['rom' if total.group(1) == 'ROM' else 'ram'] = int(total.group(2))
+                    continue
+                if 'Code (inc. data)' in line:
+                    # 只统计目标文件表和库汇总表，库成员表与库汇总重复
+                    table = ('objects' if 'Object Name' in line else
+                             'libraries' if stripped.endswith('Library Name') else None)
+                    column_count = 6 if 'Debug' in line else 5
+                    continue
+                if table is None or not stripped or not stripped[0].isdigit():
+                    continue
+                parts = stripped.split(None, column_count)
+                if len(parts) <= column_count or not all(p.isdigit() for p in parts[:column_count]):
+                    continue
+                name = parts[column_count]
+                if 'Totals' in name or name.startswith('('):
+                    continue
+                code, _, ro_data, rw_data, zi_data = (int(p) for p in parts[:5])
+                report.add_object(name, code + ro_data + rw_data, rw_data + zi_data,
+                                  code=code, ro_data=ro_data, rw_data=rw_data, zi_data=zi_data)
+
+    def _parse_htm_lines(self, lines: Iterable[str], report: MapSizeReport):
+        """解析armlink静态调用图，只能得到函数代码大小"""
+        seen = set()
+        for line in lines:
+            match = self._HTM_FUNCTION.search(line)
+            if not match or match.group('anchor') in seen:
+                continue
+            seen.add(match.group('anchor'))
+            size = int(match.group('size'))
+            report.add_object(match.group('object'), size, 0, code=size)
+            report.add_section(normalize_section_name(match.group('section')), rom=size)
+
+
+if __name__ == "__main__":
+    # 测试MDK map解析
+    sample = """
+==============================================================================
+
+Memory Map of the image
+
+  Image Entry point : 0x08004131
+
+  Load Region LR_IROM1 (Base: 0x08004000, Size: 0x00000a3c, Max: 0x0007c000, ABSOLUTE)
+
+    Execution Region ER_IROM1 (Exec base: 0x08004000, Load base: 0x08004000, Size: 0x00000a38, Max: 0x0007c000, ABSOLUTE)
+
+    Exec Addr    Load Addr    Size         Type   Attr      Idx    E Section Name        Object
+
+    0x08004000   0x08004000   0x00000130   Data   RO            3    RESET               startup_stm32f10x_hd.o
+    0x08004130   0x08004130   0x00000000   Code   RO          251  * .ARM.Collect$$$$00000000  mc_w.l(entry.o)
+    0x08004130   0x08004130   0x00000300   Code   RO            5    i.main              main.o
+    0x08004430   0x08004430   0x00000200   Code   RO           12    i.USART_Init        uart.o
+    0x08004630   0x08004630   0x00000004   PAD
+
+    Execution Region RW_IRAM1 (Exec base: 0x20000000, Load base: 0x08004a38, Size: 0x00000408, Max: 0x00020000, ABSOLUTE)
+
+    0x20000000   0x08004a38   0x00000004   Data   RW            6    .data               main.o
+    0x20000004        -       0x00000004   Zero   RW            7    .bss                uart.o
+    0x20000008        -       0x00000400   Zero   RW            1    STACK               startup_stm32f10x_hd.o
+
+==============================================================================
+
+Image component sizes
+
+
+      Code (inc. data)   RO Data    RW Data    ZI Data      Debug   Object Name
+
+       768         40          0          4          0       1234   main.o
+        36          8        304          0       1024        848   startup_stm32f10x_hd.o
+       512          0          0          0          4        900   uart.o
+
+    ----------------------------------------------------------------------
+      1316         48        304          4       1028       2982   Object Totals
+         0          0          0          0          0          0   (incl. Generated)
+
+    ----------------------------------------------------------------------
+
+      Code (inc. data)   RO Data    RW Data    ZI Data      Debug   Library Member Name
+
+         0          0          0          0          0          0   entry.o
+
+    ----------------------------------------------------------------------
+
+      Code (inc. data)   RO Data    RW Data    ZI Data      Debug   Library Name
+
+        86          0          0          0          0          0   mc_w.l
+
+    ----------------------------------------------------------------------
+        86          0          0          0          0          0   Library Totals
+
+==============================================================================
+
+
+    Total RO  Size (Code + RO Data)                 1706 (   1.67kB)
+    Total RW  Size (RW Data + ZI Data)              1032 (   1.01kB)
+    Total ROM Size (Code + RO Data + RW Data)       1710 (   1.67kB)
+
+==============================================================================
+"""
+    report = MDKMapParser().parse(sample, 'sample.map')
+    print(f"ROM {report.rom}, RAM {report.ram}")
+    for name, entry in report.objects.items():
+        print(f"  {name}: {entry}")
+    for name, entry in report.sections.items():
+        print(f"  [{name}] {entry}")
+
+    htm = ('<P><STRONG><a name="[2c]"></a>main</STRONG> (Thumb, 768 bytes, Stack size 8 bytes, main.o(i.main))\n'
+           '<P><STRONG><a name="[2d]"></a>USART_Init</STRONG> (Thumb, 512 bytes, Stack size 16 bytes, uart.o(i.USART_Init))\n')
+    print(MDKMapParser().parse(htm, 'sample.htm').to_dict())
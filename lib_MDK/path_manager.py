@@ -83,6 +83,43 @@ class MDKPathManager:
             logger.error(f"查找MDK项目文件失败: {e}")
             return None
     
+    def find_mdk_workspace(self, pattern: str = "*.uvmpw") -> Optional[str]:
+        """
+        查找MDK多项目工作区文件
+        
+        Args:
+            pattern: 文件匹配模式
+            
+        Returns:
+            str: 找到的工作区文件路径，未找到返回None
+        """
+        try:
+            # 在项目目录及其子目录中查找
+            search_paths = [
+                self.project_path,
+                os.path.join(self.project_path, "MDK-ARM"),
+                os.path.join(self.project_path, "..", "MDK-ARM"),
+                os.path.join(self.project_path, "..", "..", "MDK-ARM"),
+                os.path.join(self.project_path, "..", "..", "..", "MDK-ARM")
+            ]
+            
+            for search_path in search_paths:
+                if os.path.exists(search_path):
+                    # 递归查找匹配的文件
+                    for root, dirs, files in os.walk(search_path):
+                        for file in files:
+                            if file.lower().endswith('.uvmpw'):
+                                file_path = os.path.join(root, file)
+                                logger.info(f"找到MDK工作区文件: {file_path}")
+                                return file_path
+            
+            logger.debug("未找到MDK工作区文件")
+            return None
+            
+        except Exception as e:
+            logger.error(f"查找MDK工作区文件失败: {e}")
+            return None
+    
     def find_bin_file(self, project_name: str = None, configuration: Dict = None) -> Optional[str]:
         """
         查找编译生成的bin文件
@@ -359,6 +396,15 @@ class MDKPathManager:
                 updated_config['mdk_project_path'] = project_path  # 同时更新根级别
                 logger.info(f"自动找到MDK项目文件: {project_path}")
         
+        # 查找多项目工作区文件
+        current_workspace = project_settings.get('mdk_workspace_path', '')
+        if not current_workspace or not os.path.exists(current_workspace):
+            workspace_path = self.find_mdk_workspace()
+            if workspace_path:
+                project_settings['mdk_workspace_path'] = workspace_path
+                updated_config['mdk_workspace_path'] = workspace_path  # 同时更新根级别
+                logger.info(f"自动找到MDK工作区文件: {workspace_path}")
+        
         # 查找bin文件
         current_bin = project_settings.get('output_bin_path', '')
         if not current_bin or not os.path.exists(current_bin):
@@ -381,7 +427,9 @@ class MDKPathManager:
         logger.info(f"当前bin_start_address: 0x{current_bin_start:X}")
         if current_bin_start == 0:
             logger.info("尝试自动获取flash偏移地址...")
-            flash_offset = self.get_flash_offset_from_configuration()
+            # 使用项目文件中第一个配置的SCT文件
+            flash_offset = self.get_flash_offset_from_configuration(
+                self._first_configuration(project_settings.get('mdk_project_path', '')))
             if flash_offset:
                 updated_config['binary_settings']['bin_start_address'] = flash_offset
                 logger.info(f"自动获取flash偏移地址成功: 0x{flash_offset:X}")
@@ -400,6 +448,22 @@ class MDKPathManager:
         
         return updated_config
     
+    def _first_configuration(self, project_path: str) -> Optional[Dict]:
+        """
+        获取项目文件中的第一个编译配置
+
+        Args:
+            project_path: 项目文件路径
+
+        Returns:
+            Dict: 配置信息，项目文件不存在或解析失败时返回None
+        """
+        if not project_path or not os.path.exists(project_path):
+            return None
+        result = self.mdk_analyzer.analyze_uvprojx_file(project_path)
+        configurations = (result or {}).get('configurations') or []
+        return configurations[0] if configurations else None
+
     def _extract_project_name_from_uvprojx(self, uvprojx_path: str) -> Optional[str]:
         """
         从uvprojx文件中提取项目名称（bin文件名）
@@ -7,9 +7,17 @@ MDK项目分析器模块
 
 import os
 import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Tuple, List
 from pathlib import Path
 from lib_logger import logger, set_log_level
+from parse_cache import ParseCache
+from memory_model import MemoryModel
+from map_analyzer import MapSizeReport, find_map_file
+from .sct_parser import SCTParser
+from .map_parser import MDKMapParser
+from .workspace_parser import MDKWorkspaceParser
 
 try:
     from lxml import etree as ET
@@ -22,9 +30,18 @@ except ImportError:
 class MDKProjectAnalyzer:
     """MDK项目分析器"""
     
-    def __init__(self):
-        """初始化MDK项目分析器"""
-        pass
+    # 解析器版本，解析逻辑或结果结构变化时递增，使旧的磁盘缓存失效
+    ANALYZER_VERSION = 3
+    
+    def __init__(self, use_cache: bool = True):
+        """
+        初始化MDK项目分析器
+        
+        Args:
+            use_cache: 是否使用磁盘解析缓存
+        """
+        self.parse_cache = ParseCache('mdk_project') if use_cache else None
+        self.inputs_cache = ParseCache('mdk_project_inputs') if use_cache else None
     
     def analyze_uvprojx_file(self, uvprojx_path: str) -> Optional[Dict]:
         """
@@ -41,10 +58,6 @@ class MDKProjectAnalyzer:
                 logger.error(f"MDK项目文件不存在: {uvprojx_path}")
                 return None
             
-            # 解析XML文件
-            tree = ET.parse(uvprojx_path)
-            root = tree.getroot()
-            
             result = {
                 'project_path': uvprojx_path,
                 'configurations': [],
@@ -52,22 +65,22 @@ class MDKProjectAnalyzer:
                 'project_dir': os.path.dirname(uvprojx_path)
             }
             
-            # 解析配置信息
-            configurations = self._parse_configurations(root, result['project_dir'])
+            # 优先使用磁盘缓存的配置模型，命中时跳过XML解析
+            configurations = None
+            if self.parse_cache:
+                configurations = self.parse_cache.load(uvprojx_path, self.ANALYZER_VERSION)
+            
+            if configurations is not None:
+                logger.debug(f"命中项目解析缓存: {uvprojx_path}")
+            else:
+                # 流式解析配置信息，不构建完整DOM
+                configurations = self._stream_configurations(uvprojx_path, result['project_dir'])
+                if self.parse_cache and configurations:
+                    self.parse_cache.save(uvprojx_path, self.ANALYZER_VERSION, configurations)
             result['configurations'] = configurations
             
-            # 为每个配置查找输出文件
-            for config in configurations:
-                # 记录SCT文件信息
-                if config.get('sct_file'):
-                    sct_file = config['sct_file']
-                    logger.info(f"找到SCT文件: {sct_file} (配置: {config['name']})")
-                else:
-                    logger.warning(f"配置 {config['name']} 中未找到SCT文件")
-                
-                # 查找编译输出文件
-                build_outputs = self.find_build_outputs(uvprojx_path, config, len(configurations))
-                config.update(build_outputs)
+            # 并行分析所有配置的输出文件和链接脚本（输出目录可能在编译后才出现，不进入缓存）
+            self._analyze_configurations(uvprojx_path, configurations)
             
             return result
             
@@ -75,48 +88,78 @@ class MDKProjectAnalyzer:
             logger.error(f"分析MDK项目文件失败: {e}")
             return None
     
+    def _analyze_configurations(self, project_path: str, configurations: List[Dict], max_workers: int = None):
+        """
+        在线程池中并行分析所有配置的输出文件和SCT文件，结果直接写入配置字典
+        
+        每个配置会补充bin/axf文件路径、linker_info（SCT文件分析结果）和flash_offset，
+        多个配置共用的SCT文件只解析一次
+        
+        Args:
+            project_path: 项目文件路径
+            configurations: 配置信息列表
+            max_workers: 最大线程数，默认按任务数量和CPU核数确定
+        """
+        if not configurations:
+            return
+        
+        total_configs = len(configurations)
+        linker_files = sorted({config['sct_file'] for config in configurations
+                               if config.get('sct_file') and os.path.exists(config['sct_file'])})
+        task_count = total_configs + len(linker_files)
+        workers = max_workers or min(task_count, (os.cpu_count() or 1) + 4)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='MDKAnalyzer') as executor:
+            linker_futures = {path: executor.submit(self.analyze_sct_file, path) for path in linker_files}
+            output_futures = [executor.submit(self.find_build_outputs, project_path, config, total_configs)
+                              for config in configurations]
+            
+            for config, future in zip(configurations, output_futures):
+                config.update(future.result())
+            
+            for config in configurations:
+                linker_file = config.get('sct_file')
+                if not linker_file:
+                    logger.warning(f"配置 {config['name']} 中未找到SCT文件")
+                linker_future = linker_futures.get(linker_file)
+                linker_info = linker_future.result() if linker_future else None
+                config['linker_info'] = linker_info
+                config['flash_offset'] = linker_info.get('flash_start_address') if linker_info else None
+    
     def find_build_outputs(self, project_path: str, configuration: Dict, total_configs: int = 1) -> Dict:
         """
-        查找指定配置的编译输出文件(bin和axf)
+        查找指定配置的编译输出文件(bin、axf和map)
         
         Args:
             project_path: 项目路径
             configuration: 配置信息
             
         Returns:
-            Dict: 包含bin和axf文件路径的字典
+            Dict: 包含bin、axf和map文件路径的字典
         """
         result = {
             'bin_file': None,
-            'axf_file': None
+            'axf_file': None,
+            'map_file': None
         }
         
         try:
             output_dir = configuration.get('output_dir_abs', '')
             config_name = configuration.get('name', '')
             project_name = os.path.splitext(os.path.basename(project_path))[0]
-            logger.info(f"原始项目名: {project_name} (从文件: {os.path.basename(project_path)})")
-            logger.info(f"当前配置名: {config_name}")
             
             # 如果项目名包含配置名后缀，移除它
             if config_name and project_name.endswith(f"_{config_name}"):
                 project_name = project_name[:-len(f"_{config_name}")]
-                logger.info(f"移除配置名后缀后的项目名: {project_name}")
-            else:
-                logger.info(f"项目名不包含配置名后缀，保持原样: {project_name}")
-            
-            logger.info(f"最终项目名: {project_name}")
             
             if not output_dir or not os.path.exists(output_dir):
                 logger.warning(f"配置 {config_name} 的输出目录不存在: {output_dir}")
                 return result
             
             # 构建文件名
-            logger.info(f"配置总数: {total_configs}")
             # MDK编译输出文件名始终是项目名，不包含配置名
             bin_filename = f"{project_name}.bin"
             axf_filename = f"{project_name}.axf"
-            logger.info(f"MDK编译输出文件名: {bin_filename}")
             
             bin_file_path = os.path.join(output_dir, bin_filename)
             axf_file_path = os.path.join(output_dir, axf_filename)
@@ -126,9 +169,13 @@ class MDKProjectAnalyzer:
             result['axf_file'] = axf_file_path
             result['total_configs'] = total_configs
             
-            logger.info(f"配置 {config_name}: 生成文件路径")
-            logger.info(f"  bin文件: {bin_file_path}")
-            logger.info(f"  axf文件: {axf_file_path}")
+            # map文件以输出名命名，默认生成在Listings目录；没有map时退而使用输出目录下的静态调用图(.htm)
+            map_name = configuration.get('output_name') or project_name
+            search_dirs = [configuration.get('list_dir_abs', ''), output_dir]
+            result['map_file'] = (find_map_file(search_dirs, map_name) or
+                                  find_map_file(search_dirs, map_name, ('.htm',)))
+            
+            logger.debug(f"配置 {config_name}: bin文件={bin_file_path}, axf文件={axf_file_path}, map文件={result['map_file']}")
             
             return result
             
@@ -150,84 +197,223 @@ class MDKProjectAnalyzer:
         configurations = []
         
         try:
-            # 步骤1: 查找Targets节点
-            # 预期: targets_node 应该是一个Element对象，不是None
+            # 查找Targets节点
             targets_node = root.find('Targets')
-            logger.debug(f"targets_node = {targets_node}")
             if targets_node is None:
                 logger.warning("未找到Targets节点")
                 return configurations
             
-            # 步骤2: 查找所有Target节点
-            # 预期: targets 应该是一个列表，包含至少1个Target节点
-            targets = targets_node.findall('Target')
-            logger.debug(f"targets count = {len(targets)}")
-            
-            for i, target in enumerate(targets):
-                logger.debug(f"处理Target {i+1}")
-                
-                # 步骤3: 查找TargetName节点
-                # 预期: config_name_node 应该是一个Element对象，config_name 应该是 "Release" 或类似
+            for target in targets_node.findall('Target'):
+                # 获取配置名称，跳过无名称的Target
                 config_name_node = target.find('TargetName')
                 config_name = config_name_node.text if config_name_node is not None else ''
-                logger.debug(f"config_name_node = {config_name_node}")
-                logger.debug(f"config_name = '{config_name}'")
                 if not config_name:
-                    logger.debug(f"跳过Target {i+1}，因为config_name为空")
                     continue
                 
-                logger.debug(f"开始解析配置: {config_name}")
-                logger.info(f"解析配置: {config_name}")
-                
-                # 步骤4: 解析输出目录
-                # 预期: output_dir 应该是 ".\Obj\" 或完整路径
-                try:
-                    output_dir = self._parse_output_directory(target, project_dir)
-                    logger.info(f"output_dir = '{output_dir}'")
-                except Exception as e:
-                    logger.error(f"解析输出目录失败: {e}")
-                    output_dir = ''
-                
-                # 步骤5: 解析输出文件名
-                # 预期: output_name 应该是 "Test_Project_MDK" 或类似
-                try:
-                    output_name = self._parse_output_name(target)
-                    logger.info(f"output_name = '{output_name}'")
-                except Exception as e:
-                    logger.error(f"解析输出文件名失败: {e}")
-                    output_name = ''
-                
-                # 步骤6: 解析SCT文件
-                # 预期: sct_file 应该是 ".\Test_Project_MDK.sct" 或完整路径
-                try:
-                    sct_file = self._parse_sct_file(target, project_dir)
-                    logger.info(f"sct_file = '{sct_file}'")
-                except Exception as e:
-                    logger.error(f"解析SCT文件失败: {e}")
-                    sct_file = ''
-                
-                # 步骤7: 解析调试模式
-                # 预期: debug_mode 应该是 True 或 False
+                output_dir = self._parse_output_directory(target, project_dir)
+                output_name = self._parse_output_name(target)
+                list_dir = target.findtext('TargetOption/TargetCommonOption/ListingPath') or ''
+                if list_dir:
+                    list_dir = self._resolve_project_path(list_dir, project_dir)
+                sct_file = self._parse_sct_file(target, project_dir)
                 debug_mode = self._parse_debug_mode(target)
-                logger.debug(f"debug_mode = {debug_mode}")
                 
                 config = {
                     'name': config_name,
                     'output_dir': output_dir,
                     'output_dir_abs': os.path.abspath(output_dir) if output_dir else '',
                     'output_name': output_name,
+                    'list_dir': list_dir,
+                    'list_dir_abs': os.path.abspath(list_dir) if list_dir else '',
                     'sct_file': sct_file,
                     'debug': debug_mode
                 }
                 
                 configurations.append(config)
-                logger.info(f"配置 {config_name}: 输出目录={output_dir}, 输出名={output_name}, SCT文件={sct_file}")
+                logger.debug(f"配置 {config_name}: 输出目录={output_dir}, 输出名={output_name}, SCT文件={sct_file}")
             
         except Exception as e:
             logger.error(f"解析配置信息失败: {e}")
         
         return configurations
     
+    def _stream_configurations(self, uvprojx_path: str, project_dir: str) -> List[Dict]:
+        """
+        使用iterparse流式解析MDK项目文件中的配置信息
+        
+        只提取配置名称、输出目录、输出文件名、SCT文件和调试模式；已处理的节点立即从树中移除，
+        Targets节点结束后即停止解析，大型项目文件无需构建完整DOM
+        
+        Args:
+            uvprojx_path: MDK项目文件路径
+            project_dir: 项目目录路径
+            
+        Returns:
+            List[Dict]: 配置信息列表
+        """
+        configurations = []
+        target_info = None
+        # 当前打开的节点栈
+        stack = []
+        
+        try:
+            with open(uvprojx_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        if elem.tag == 'Target' and len(stack) == 2 and stack[-1].tag == 'Targets':
+                            target_info = {}
+                        stack.append(elem)
+                        continue
+                    
+                    stack.pop()
+                    parent_tag = stack[-1].tag if stack else None
+                    tag = elem.tag
+                    
+                    if target_info is not None:
+                        if tag == 'TargetName' and parent_tag == 'Target':
+                            target_info['name'] = elem.text or ''
+                        elif parent_tag == 'TargetCommonOption' and tag in ('OutputDirectory', 'OutputName', 'ListingPath', 'DebugInformation'):
+                            target_info[tag] = elem.text or ''
+                        elif tag == 'ScatterFile' and parent_tag == 'LDads':
+                            target_info[tag] = elem.text or ''
+                        elif tag == 'Target':
+                            config = self._build_config_from_target(target_info, project_dir)
+                            if config:
+                                configurations.append(config)
+                            target_info = None
+                    
+                    # 节点已处理完毕，从父节点移除以释放内存
+                    if stack:
+                        stack[-1].remove(elem)
+                    else:
+                        elem.clear()
+                    
+                    # 所有Target已读完，后续节点与配置无关
+                    if tag == 'Targets':
+                        break
+            
+            return configurations
+            
+        except Exception as e:
+            logger.error(f"流式解析配置信息失败: {e}")
+            return []
+    
+    def get_project_inputs(self, uvprojx_path: str) -> Dict:
+        """
+        获取项目文件中所有目标列出的源文件和头文件包含目录（按项目文件缓存）
+        
+        Args:
+            uvprojx_path: MDK项目文件路径
+            
+        Returns:
+            Dict: {'sources': 源文件绝对路径列表, 'include_dirs': 包含目录绝对路径列表}
+        """
+        if self.inputs_cache:
+            cached = self.inputs_cache.load(uvprojx_path, self.ANALYZER_VERSION)
+            if cached is not None:
+                return cached
+        
+        project_dir = os.path.dirname(os.path.abspath(uvprojx_path))
+        sources = []
+        include_dirs = []
+        
+        def resolve(path: str) -> str:
+            path = path.strip().replace('\\', os.sep)
+            return os.path.normpath(self._resolve_project_path(path, project_dir)) if path else ''
+        
+        try:
+            with open(uvprojx_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('end',)):
+                    if elem.tag == 'FilePath' and elem.text:
+                        path = resolve(elem.text)
+                        if path and path not in sources:
+                            sources.append(path)
+                    elif elem.tag == 'IncludePath' and elem.text:
+                        for item in elem.text.split(';'):
+                            path = resolve(item)
+                            if path and path not in include_dirs:
+                                include_dirs.append(path)
+                    elif elem.tag in ('File', 'Target'):
+                        # 文件和目标节点处理完毕后释放内存
+                        elem.clear()
+            
+        except Exception as e:
+            logger.error(f"解析项目源文件列表失败: {e}")
+            return {'sources': sources, 'include_dirs': include_dirs}
+        
+        result = {'sources': sources, 'include_dirs': include_dirs}
+        if self.inputs_cache:
+            self.inputs_cache.save(uvprojx_path, self.ANALYZER_VERSION, result)
+        return result
+    
+    def get_configuration_digest(self, uvprojx_path: str, configuration_name: str) -> Optional[str]:
+        """
+        计算项目文件中指定目标的编译选项摘要，用于判断编译选项是否变化
+        
+        摘要不包含Groups节点（源文件列表由源文件清单单独比较）
+        
+        Args:
+            uvprojx_path: MDK项目文件路径
+            configuration_name: 目标名称
+            
+        Returns:
+            Optional[str]: 选项摘要，未找到目标或解析失败返回None
+        """
+        try:
+            with open(uvprojx_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('end',)):
+                    if elem.tag != 'Target':
+                        continue
+                    if (elem.findtext('TargetName') or '').strip() == configuration_name:
+                        groups = elem.find('Groups')
+                        if groups is not None:
+                            elem.remove(groups)
+                        return hashlib.sha1(ET.tostring(elem)).hexdigest()
+                    elem.clear()
+            
+        except Exception as e:
+            logger.error(f"计算目标选项摘要失败: {e}")
+        return None
+    
+    def _build_config_from_target(self, target_info: Dict, project_dir: str) -> Optional[Dict]:
+        """
+        根据流式解析得到的Target字段构建配置信息
+        
+        Args:
+            target_info: Target字段字典
+            project_dir: 项目目录路径
+            
+        Returns:
+            Optional[Dict]: 配置信息，配置名称为空时返回None
+        """
+        config_name = target_info.get('name', '')
+        if not config_name:
+            return None
+        
+        output_dir = target_info.get('OutputDirectory', '')
+        if output_dir:
+            output_dir = self._resolve_project_path(output_dir, project_dir)
+        sct_file = target_info.get('ScatterFile', '')
+        if sct_file:
+            sct_file = self._resolve_project_path(sct_file, project_dir)
+        output_name = target_info.get('OutputName', '')
+        list_dir = target_info.get('ListingPath', '')
+        if list_dir:
+            list_dir = self._resolve_project_path(list_dir, project_dir)
+        
+        config = {
+            'name': config_name,
+            'output_dir': output_dir,
+            'output_dir_abs': os.path.abspath(output_dir) if output_dir else '',
+            'output_name': output_name,
+            'list_dir': list_dir,
+            'list_dir_abs': os.path.abspath(list_dir) if list_dir else '',
+            'sct_file': sct_file,
+            'debug': target_info.get('DebugInformation', '').lower() in ['1', 'true', 'yes']
+        }
+        logger.debug(f"配置 {config_name}: 输出目录={output_dir}, 输出名={output_name}, SCT文件={sct_file}")
+        return config
+    
     def _parse_output_directory(self, target, project_dir: str) -> str:
         """
         解析输出目录
@@ -240,57 +426,13 @@ class MDKProjectAnalyzer:
             str: 输出目录路径
         """
         try:
-            logger.debug("开始解析输出目录")
-            logger.debug(f"project_dir = '{project_dir}'")
-            logger.debug(f"target = {target}")
-            
             # 在TargetOption/TargetCommonOption中查找OutputDirectory
-            target_option = target.find('TargetOption')
-            logger.debug(f"target_option = {target_option is not None}")
-            if target_option is not None:
-                # 先检查TargetOption下有哪些子节点
-                logger.debug(f"TargetOption子节点: {[child.tag for child in target_option]}")
-                
-                # 在TargetCommonOption中查找OutputDirectory
-                target_common_option = target_option.find('TargetCommonOption')
-                logger.debug(f"target_common_option = {target_common_option is not None}")
-                if target_common_option is not None:
-                    # 检查TargetCommonOption下有哪些子节点
-                    logger.debug(f"TargetCommonOption子节点: {[child.tag for child in target_common_option]}")
-                    
-                    # 检查每个子节点的内容
-                    for child in target_common_option:
-                        logger.debug(f"TargetCommonOption子节点 {child.tag}: {child.text}")
-                    
-                    output_dir_node = target_common_option.find('OutputDirectory')
-                    logger.debug(f"output_dir_node = {output_dir_node}")
-                    if output_dir_node is not None:
-                        output_dir = output_dir_node.text or ''
-                        logger.debug(f"output_dir原始值 = '{output_dir}'")
-                        if output_dir:
-                            # 处理相对路径
-                            if not os.path.isabs(output_dir):
-                                # 去掉开头的 .\ 或 ./
-                                if output_dir.startswith('.\\') or output_dir.startswith('./'):
-                                    output_dir = output_dir[2:]
-                                output_dir = os.path.join(project_dir, output_dir)
-                            logger.debug(f"output_dir最终值 = '{output_dir}'")
-                            return output_dir
-                        else:
-                            logger.debug("output_dir为空字符串")
-                    else:
-                        logger.debug("未找到OutputDirectory节点")
-                else:
-                    logger.debug("未找到TargetCommonOption节点")
-            else:
-                logger.debug("未找到TargetOption节点")
+            output_dir = target.findtext('TargetOption/TargetCommonOption/OutputDirectory') or ''
+            if output_dir:
+                return self._resolve_project_path(output_dir, project_dir)
         except Exception as e:
-            logger.debug(f"解析输出目录异常: {e}")
             logger.error(f"解析输出目录失败: {e}")
-            import traceback
-            logger.debug(f"异常堆栈: {traceback.format_exc()}")
         
-        logger.debug("输出目录解析失败，返回空字符串")
         return ''
     
     def _parse_output_name(self, target) -> str:
@@ -304,38 +446,11 @@ class MDKProjectAnalyzer:
             str: 输出文件名
         """
         try:
-            logger.debug("开始解析输出文件名")
             # 在TargetOption/TargetCommonOption中查找OutputName
-            target_option = target.find('TargetOption')
-            logger.debug(f"target_option = {target_option is not None}")
-            if target_option is not None:
-                target_common_option = target_option.find('TargetCommonOption')
-                logger.debug(f"target_common_option = {target_common_option is not None}")
-                if target_common_option is not None:
-                    # 检查TargetCommonOption下有哪些子节点
-                    logger.debug(f"TargetCommonOption子节点: {[child.tag for child in target_common_option]}")
-                    
-                    # 检查每个子节点的内容
-                    for child in target_common_option:
-                        logger.debug(f"TargetCommonOption子节点 {child.tag}: {child.text}")
-                    
-                    output_name_node = target_common_option.find('OutputName')
-                    logger.debug(f"output_name_node = {output_name_node}")
-                    if output_name_node is not None:
-                        output_name = output_name_node.text or ''
-                        logger.debug(f"output_name = '{output_name}'")
-                        return output_name
-                    else:
-                        logger.debug("未找到OutputName节点")
-                else:
-                    logger.debug("未找到TargetCommonOption节点")
-            else:
-                logger.debug("未找到TargetOption节点")
+            return target.findtext('TargetOption/TargetCommonOption/OutputName') or ''
         except Exception as e:
-            logger.debug(f"解析输出文件名异常: {e}")
             logger.error(f"解析输出文件名失败: {e}")
         
-        logger.debug("输出文件名解析失败，返回空字符串")
         return ''
     
     def _parse_sct_file(self, target, project_dir: str) -> str:
@@ -350,53 +465,13 @@ class MDKProjectAnalyzer:
             str: SCT文件路径
         """
         try:
-            logger.debug("开始解析SCT文件")
             # 在TargetOption/TargetArmAds/LDads中查找ScatterFile
-            target_option = target.find('TargetOption')
-            logger.debug(f"target_option = {target_option is not None}")
-            if target_option is not None:
-                target_arm_ads = target_option.find('TargetArmAds')
-                logger.debug(f"target_arm_ads = {target_arm_ads is not None}")
-                if target_arm_ads is not None:
-                    # 检查TargetArmAds下有哪些子节点
-                    logger.debug(f"TargetArmAds子节点: {[child.tag for child in target_arm_ads]}")
-                    
-                    # 在LDads中查找ScatterFile
-                    ldads = target_arm_ads.find('LDads')
-                    logger.debug(f"ldads = {ldads is not None}")
-                    if ldads is not None:
-                        # 检查LDads下有哪些子节点
-                        logger.debug(f"LDads子节点: {[child.tag for child in ldads]}")
-                        
-                        sct_file_node = ldads.find('ScatterFile')
-                        logger.debug(f"sct_file_node = {sct_file_node}")
-                        if sct_file_node is not None:
-                            sct_file = sct_file_node.text or ''
-                            logger.debug(f"sct_file原始值 = '{sct_file}'")
-                            if sct_file:
-                                # 处理相对路径
-                                if not os.path.isabs(sct_file):
-                                    # 去掉开头的 .\ 或 ./
-                                    if sct_file.startswith('.\\') or sct_file.startswith('./'):
-                                        sct_file = sct_file[2:]
-                                    sct_file = os.path.join(project_dir, sct_file)
-                                logger.debug(f"sct_file最终值 = '{sct_file}'")
-                                return sct_file
-                            else:
-                                logger.debug("sct_file为空字符串")
-                        else:
-                            logger.debug("未找到ScatterFile节点")
-                    else:
-                        logger.debug("未找到LDads节点")
-                else:
-                    logger.debug("未找到TargetArmAds节点")
-            else:
-                logger.debug("未找到TargetOption节点")
+            sct_file = target.findtext('TargetOption/TargetArmAds/LDads/ScatterFile') or ''
+            if sct_file:
+                return self._resolve_project_path(sct_file, project_dir)
         except Exception as e:
-            logger.debug(f"解析SCT文件异常: {e}")
             logger.error(f"解析SCT文件路径失败: {e}")
         
-        logger.debug("SCT文件解析失败，返回空字符串")
         return ''
     
     def _parse_debug_mode(self, target) -> bool:
@@ -410,35 +485,33 @@ class MDKProjectAnalyzer:
             bool: 是否为调试模式
         """
         try:
-            logger.debug("开始解析调试模式")
             # 在TargetOption/TargetCommonOption中查找DebugInformation
-            target_option = target.find('TargetOption')
-            logger.debug(f"target_option = {target_option is not None}")
-            if target_option is not None:
-                target_common_option = target_option.find('TargetCommonOption')
-                logger.debug(f"target_common_option = {target_common_option is not None}")
-                if target_common_option is not None:
-                    debug_info_node = target_common_option.find('DebugInformation')
-                    logger.debug(f"debug_info_node = {debug_info_node}")
-                    if debug_info_node is not None:
-                        debug_info = debug_info_node.text or ''
-                        logger.debug(f"debug_info = '{debug_info}'")
-                        is_debug = debug_info.lower() in ['1', 'true', 'yes']
-                        logger.debug(f"is_debug = {is_debug}")
-                        return is_debug
-                    else:
-                        logger.debug("未找到DebugInformation节点")
-                else:
-                    logger.debug("未找到TargetCommonOption节点")
-            else:
-                logger.debug("未找到TargetOption节点")
+            debug_info = target.findtext('TargetOption/TargetCommonOption/DebugInformation') or ''
+            return debug_info.lower() in ['1', 'true', 'yes']
         except Exception as e:
-            logger.debug(f"解析调试模式异常: {e}")
             logger.error(f"解析调试模式失败: {e}")
         
-        logger.debug("调试模式解析失败，返回False")
         return False
     
+    @staticmethod
+    def _resolve_project_path(path: str, project_dir: str) -> str:
+        """
+        将项目文件中的相对路径解析为基于项目目录的路径
+        
+        Args:
+            path: 项目文件中记录的路径
+            project_dir: 项目目录路径
+            
+        Returns:
+            str: 解析后的路径
+        """
+        if os.path.isabs(path):
+            return path
+        # 去掉开头的 .\ 或 ./
+        if path.startswith('.\\') or path.startswith('./'):
+            path = path[2:]
+        return os.path.join(project_dir, path)
+    
     def analyze_sct_file(self, sct_file_path: str) -> Optional[Dict]:
         """
         分析SCT文件，提取配置信息
@@ -489,6 +562,11 @@ class MDKProjectAnalyzer:
                 config_info['ram_size'] = ram_size
                 logger.info(f"从SCT文件提取RAM信息: 起始地址=0x{ram_start:08X}, 大小=0x{ram_size:08X}")
             
+            # 使用完整的内存模型覆盖正则结果（支持#define宏和多加载区域）
+            model = self.get_memory_model(sct_file_path)
+            if model:
+                self._apply_memory_model(config_info, model)
+            
             if config_info['flash_start_address'] is None:
                 logger.warning(f"在SCT文件中未找到Flash起始地址: {sct_file_path}")
                 return None
@@ -499,6 +577,53 @@ class MDKProjectAnalyzer:
             logger.error(f"分析SCT文件失败: {e}")
             return None
     
+    def get_memory_model(self, sct_file_path: str) -> Optional[MemoryModel]:
+        """
+        获取SCT文件的内存模型（按文件缓存）
+        
+        Args:
+            sct_file_path: SCT文件路径
+            
+        Returns:
+            Optional[MemoryModel]: 内存模型，失败返回None
+        """
+        return SCTParser().parse_file(sct_file_path)
+    
+    def get_size_report(self, map_path: str) -> Optional[MapSizeReport]:
+        """
+        流式解析map（或静态调用图htm）文件，统计按目标文件和按节的ROM/RAM占用
+        
+        Args:
+            map_path: map或htm文件路径
+            
+        Returns:
+            Optional[MapSizeReport]: 尺寸报告，失败返回None
+        """
+        return MDKMapParser().parse_file(map_path)
+    
+    @staticmethod
+    def _apply_memory_model(config_info: Dict, model: MemoryModel):
+        """
+        将内存模型中的Flash/RAM区域写入SCT分析结果
+        
+        Args:
+            config_info: analyze_sct_file的结果字典
+            model: 内存模型
+        """
+        flash_region = model.primary_flash_region()
+        if flash_region:
+            config_info['flash_start_address'] = flash_region.start
+            config_info['flash_size'] = flash_region.size
+        
+        ram_region = model.primary_ram_region()
+        if ram_region:
+            config_info['ram_start_address'] = ram_region.start
+            config_info['ram_size'] = ram_region.size
+        
+        config_info['memory_regions'] = [region.to_dict() for region in model.regions]
+        for line in model.describe():
+            logger.debug(f"SCT内存区域: {line}")
+    
     def extract_flash_start_address_from_sct(self, sct_file_path: str) -> Optional[int]:
         """
         从SCT文件中提取Flash起始地址（保持向后兼容）
@@ -549,6 +674,63 @@ class MDKProjectAnalyzer:
             logger.error(f"从配置中获取Flash起始地址失败: {e}")
             return None
     
+    def analyze_uvmpw_file(self, uvmpw_path: str, project_names: List[str] = None) -> Optional[Dict]:
+        """
+        分析多项目工作区文件(.uvmpw)，一次性并行分析所有成员项目的目标和输出文件
+        
+        工作区包含多个项目时，配置名称加上项目名前缀（如 Boot_Release），避免发布文件重名
+        
+        Args:
+            uvmpw_path: 工作区文件路径
+            project_names: 只分析指定的项目（项目文件名，不含扩展名），为None时分析全部项目
+            
+        Returns:
+            Dict: {'workspace_path', 'projects': 各项目分析结果, 'configurations': 所有项目的配置}，
+            配置额外包含 project_path、project_name 和 build_configuration（原目标名称）；失败返回None
+        """
+        try:
+            workspace = MDKWorkspaceParser().parse_file(uvmpw_path)
+            if not workspace:
+                return None
+            
+            members = workspace['projects']
+            if project_names:
+                wanted = {name.lower() for name in project_names}
+                members = [project for project in members if project['name'].lower() in wanted]
+            if not members:
+                logger.error(f"工作区中没有可分析的项目: {uvmpw_path}")
+                return None
+            
+            with ThreadPoolExecutor(max_workers=len(members), thread_name_prefix='MDKWorkspace') as executor:
+                project_results = list(executor.map(lambda project: self.analyze_uvprojx_file(project['path']), members))
+            
+            multi_project = len(members) > 1
+            result = {
+                'workspace_path': uvmpw_path,
+                'projects': [],
+                'configurations': []
+            }
+            for project, project_result in zip(members, project_results):
+                if not project_result:
+                    logger.warning(f"无法分析工作区成员项目: {project['path']}")
+                    continue
+                result['projects'].append(project_result)
+                for config in project_result['configurations']:
+                    workspace_config = dict(config)
+                    workspace_config['project_path'] = project['path']
+                    workspace_config['project_name'] = project['name']
+                    workspace_config['build_configuration'] = config['name']
+                    if multi_project:
+                        workspace_config['name'] = f"{project['name']}_{config['name']}"
+                    result['configurations'].append(workspace_config)
+            
+            logger.info(f"MDK工作区分析完成: {len(result['projects'])} 个项目, {len(result['configurations'])} 个目标")
+            return result
+            
+        except Exception as e:
+            logger.error(f"分析MDK工作区文件失败: {e}")
+            return None
+    
     def get_project_info(self, uvprojx_path: str) -> Optional[Dict]:
         """
         获取MDK项目的基本信息
@@ -585,10 +767,8 @@ class MDKProjectAnalyzer:
                     'flash_start_address': None
                 }
                 
-                # 提取Flash起始地址
-                if config['sct_file']:
-                    flash_start = self.extract_flash_start_address_from_sct(config['sct_file'])
-                    config_info['flash_start_address'] = flash_start
+                # Flash起始地址已在并行分析阶段提取
+                config_info['flash_start_address'] = config.get('flash_offset')
                 
                 project_info['configurations'].append(config_info)
             
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MDK SCT分散加载文件解析模块
+解析加载区域和执行区域，构建内存模型（支持#define宏、相对基址、多加载区域和ImageLimit等函数）
+"""
+
+import re
+from lib_logger import logger
+from typing import Dict, List, Optional, Tuple
+from memory_model import (LinkerScriptParser, MemoryModel, MemoryRegion, ExpressionEvaluator, LinkerScriptError,
+                          TOKEN_IDENT, TOKEN_OP, strip_comments, tokenize, skip_block, classify_memory_type)
+
+
+class SCTParser(LinkerScriptParser):
+    """MDK SCT分散加载文件解析器"""
+
+    PARSER_VERSION = 1
+    CACHE_NAMESPACE = 'mdk_sct'
+    SCRIPT_TYPE = 'SCT'
+
+    # 无参数的区域属性
+    _FLAG_ATTRIBUTES = {'ABSOLUTE', 'PI', 'RELOC', 'OVERLAY', 'EMPTY', 'FIXED', 'ZEROPAD',
+                        'NOCOMPRESS', 'UNINIT', 'AUTO_OVERLAY', 'PROTECTED'}
+    # 带表达式参数的区域属性
+    _VALUE_ATTRIBUTES = {'ALIGN', 'ALIGNALL', 'FILL', 'PADVALUE'}
+
+    def parse(self, content: str, source: str = '') -> MemoryModel:
+        """
+        解析SCT内容
+
+        Args:
+            content: SCT文件内容
+            source: 来源路径（仅用于记录）
+
+        Returns:
+            MemoryModel: 内存模型
+        """
+        self._model = MemoryModel(source)
+        self._regions: Dict[str, MemoryRegion] = {}
+        self._evaluator = ExpressionEvaluator(self._model.symbols, functions={
+            'AlignExpr': lambda value, align: (value + align - 1) & ~(align - 1) if align else value,
+            'SizeOfHeaders': lambda: 0,
+        }, name_functions={
+            'ImageBase': lambda name: self._region(name).start,
+            'ImageLimit': lambda name: self._region(name).end,
+            'ImageLength': lambda name: self._region(name).size,
+            'LoadBase': lambda name: self._region(name).start,
+            'LoadLimit': lambda name: self._region(name).end,
+            'LoadLength': lambda name: self._region(name).size,
+        })
+
+        text = self._preprocess(strip_comments(content, ('//', ';')))
+        tokens = tokenize(text)
+
+        pos = 0
+        previous_load: Optional[MemoryRegion] = None
+        while pos < len(tokens):
+            kind, name = tokens[pos]
+            if kind == TOKEN_IDENT and name == 'ScatterAssert':
+                pos = self._skip_parentheses(tokens, pos + 1)
+                continue
+            if kind != TOKEN_IDENT:
+                pos += 1
+                continue
+            try:
+                previous_load, pos = self._parse_load_region(tokens, pos, previous_load)
+            except LinkerScriptError as e:
+                logger.debug(f"跳过无法解析的SCT加载区域 ({name}): {e}")
+                pos = self._skip_to_block_end(tokens, pos)
+
+        # 入口地址取第一个加载区域（通常为LR_IROM1）的起始地址
+        load_regions = [r for r in self._model.regions if r.kind == 'load']
+        preferred = [r for r in load_regions if r.name.upper() == 'LR_IROM1']
+        entry = (preferred or load_regions or [None])[0]
+        self._model.entry_address = entry.start if entry else None
+        return self._model
+
+    def _preprocess(self, text: str) -> str:
+        """
+        处理预处理指令：记录对象式 #define 宏，忽略其余指令（#! armcc -E、#include、#if 等）
+
+        Args:
+            text: 去除注释后的SCT内容
+
+        Returns:
+            str: 去除预处理指令后的内容
+        """
+        lines = []
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped.startswith('#'):
+                lines.append(line)
+                continue
+            match = re.match(r'#\s*define\s+([A-Za-z_]\w*)\s+(.+)$', stripped)
+            if match:
+                try:
+                    value, _ = self._evaluator.evaluate(tokenize(match.group(2)))
+                    self._model.symbols[match.group(1)] = value
+                except LinkerScriptError as e:
+                    logger.debug(f"忽略无法求值的宏 {match.group(1)}: {e}")
+            lines.append('')
+        return '\n'.join(lines)
+
+    def _region(self, name: str) -> MemoryRegion:
+        """按名称获取已解析的区域"""
+        if name not in self._regions:
+            raise LinkerScriptError(f"引用了未定义的区域: {name}")
+        return self._regions[name]
+
+    def _parse_base(self, tokens: List[Tuple[str, str]], pos: int, relative_to: int) -> Tuple[int, int]:
+        """解析区域基址，'+offset' 表示紧跟在前一个区域之后"""
+        if tokens[pos] == (TOKEN_OP, '+'):
+            offset, pos = self._evaluator.evaluate(tokens, pos + 1)
+            return relative_to + offset, pos
+        return self._evaluator.evaluate(tokens, pos)
+
+    def _parse_attributes_and_size(self, tokens: List[Tuple[str, str]], pos: int) -> Tuple[List[str], Optional[int], int]:
+        """解析区域属性和可选的最大大小/长度，返回 (属性列表, 大小, '{'位置)"""
+        attributes = []
+        size = None
+        while pos < len(tokens) and tokens[pos] != (TOKEN_OP, '{'):
+            kind, text = tokens[pos]
+            upper = text.upper()
+            if kind == TOKEN_IDENT and upper in self._FLAG_ATTRIBUTES:
+                attributes.append(upper)
+                pos += 1
+            elif kind == TOKEN_IDENT and upper in self._VALUE_ATTRIBUTES:
+                attributes.append(upper)
+                _, pos = self._evaluator.evaluate(tokens, pos + 1)
+            elif kind == TOKEN_IDENT and upper == 'SORTTYPE':
+                pos += 2
+            elif size is None:
+                size, pos = self._evaluator.evaluate(tokens, pos)
+            else:
+                raise LinkerScriptError(f"区域定义中无法识别的内容: {text}")
+        if pos >= len(tokens):
+            raise LinkerScriptError("区域定义缺少 '{'")
+        return attributes, size, pos
+
+    def _parse_load_region(self, tokens: List[Tuple[str, str]], pos: int,
+                           previous_load: Optional[MemoryRegion]) -> Tuple[MemoryRegion, int]:
+        """解析加载区域及其包含的执行区域"""
+        name = tokens[pos][1]
+        previous_end = previous_load.end if previous_load else 0
+        base, pos = self._parse_base(tokens, pos + 1, previous_end)
+        attributes, max_size, pos = self._parse_attributes_and_size(tokens, pos)
+
+        load_region = MemoryRegion(name, base, max_size or 0, 'flash', 'load', attributes=attributes)
+        self._regions[name] = load_region
+        self._model.add_region(load_region)
+
+        # 解析执行区域
+        pos += 1
+        previous_exec: Optional[MemoryRegion] = None
+        while pos < len(tokens) and tokens[pos] != (TOKEN_OP, '}'):
+            if tokens[pos] == (TOKEN_IDENT, 'ScatterAssert'):
+                pos = self._skip_parentheses(tokens, pos + 1)
+                continue
+            if tokens[pos][0] != TOKEN_IDENT:
+                pos += 1
+                continue
+            try:
+                previous_exec, pos = self._parse_exec_region(tokens, pos, load_region, previous_exec)
+            except LinkerScriptError as e:
+                logger.debug(f"跳过无法解析的SCT执行区域 ({tokens[pos][1]}): {e}")
+                pos = self._skip_to_block_end(tokens, pos)
+        return load_region, pos + 1
+
+    def _parse_exec_region(self, tokens: List[Tuple[str, str]], pos: int, load_region: MemoryRegion,
+                           previous_exec: Optional[MemoryRegion]) -> Tuple[MemoryRegion, int]:
+        """解析执行区域"""
+        name = tokens[pos][1]
+        relative_to = previous_exec.end if previous_exec else load_region.start
+        base, pos = self._parse_base(tokens, pos + 1, relative_to)
+        attributes, length, pos = self._parse_attributes_and_size(tokens, pos)
+        block_end = skip_block(tokens, pos)
+        section_words = {text.upper() for _, text in tokens[pos + 1:block_end - 1]}
+
+        start = base
+        if length is not None and length < 0:
+            # 负长度表示区域向低地址增长（常见于 ARM_LIB_STACK）
+            start, length = base + length, -length
+        if length is None:
+            # 未指定长度时，就地执行的区域最多占用到加载区域末尾
+            length = max(load_region.end - start, 0) if load_region.contains(start) else 0
+
+        memory_type = classify_memory_type(name)
+        if memory_type == 'unknown':
+            rw_only = bool(section_words & {'RW', 'ZI', '+RW', '+ZI'}) and not (section_words & {'RO', '+RO', 'XO', '+XO'})
+            in_place = load_region.contains(start) and 'EMPTY' not in attributes and 'UNINIT' not in attributes
+            memory_type = 'flash' if in_place and not rw_only else 'ram'
+
+        region = MemoryRegion(name, start, length, memory_type, 'exec', load_region.name, attributes)
+        self._regions[name] = region
+        self._model.add_region(region)
+        return region, block_end
+
+    @staticmethod
+    def _skip_parentheses(tokens: List[Tuple[str, str]], pos: int) -> int:
+        """跳过以 '(' 开始的括号表达式"""
+        depth = 0
+        while pos < len(tokens):
+            text = tokens[pos][1]
+            pos += 1
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth -= 1
+                if depth == 0:
+                    break
+        return pos
+
+    @staticmethod
+    def _skip_to_block_end(tokens: List[Tuple[str, str]], pos: int) -> int:
+        """跳过到下一个花括号块结束"""
+        while pos < len(tokens) and tokens[pos] != (TOKEN_OP, '{'):
+            pos += 1
+        return skip_block(tokens, pos)
+
+
+if __name__ == "__main__":
+    # 测试SCT解析
+    sample = """
+    #! armcc -E
+    #define m_text_start 0x08004000
+    #define m_text_size  0x0007C000
+    LR_IROM1 m_text_start m_text_size  {    ; load region size_region
+      ER_IROM1 m_text_start m_text_size  {  ; load address = execution address
+       *.o (RESET, +First)
+       *(InRoot$$Sections)
+       .ANY (+RO)
+      }
+      RW_IRAM1 0x20000000 0x00020000  {  ; RW data
+       .ANY (+RW +ZI)
+      }
+      ARM_LIB_STACK 0x20020000 EMPTY -0x1000 { }
+    }
+    LR_IROM2 0x08100000 0x00080000  {
+      ER_IROM2 +0 {
+       bank2.o (+RO)
+      }
+    }
+    """
+    model = SCTParser(use_cache=False).parse(sample, 'sample.sct')
+    for line in model.describe():
+        print(line)
+    print(f"入口地址: 0x{model.entry_address:08X}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MDK多项目工作区解析模块
+解析µVision多项目工作区文件(.uvmpw)中的成员项目，并可生成只包含部分项目的工作区文件
+"""
+
+import os
+from lib_logger import logger
+from typing import Dict, List, Optional
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def resolve_workspace_path(path: str, workspace_dir: str) -> str:
+    """
+    解析工作区文件中的项目路径（相对工作区目录、Windows路径分隔符）
+
+    Args:
+        path: 工作区文件中的路径
+        workspace_dir: 工作区文件所在目录
+
+    Returns:
+        str: 绝对路径
+    """
+    path = path.strip().replace('\\', os.sep)
+    if not os.path.isabs(path):
+        path = os.path.join(workspace_dir, path)
+    return os.path.normpath(path)
+
+
+class MDKWorkspaceParser:
+    """MDK多项目工作区解析器"""
+
+    def parse_file(self, uvmpw_path: str) -> Optional[Dict]:
+        """
+        解析多项目工作区文件
+
+        Args:
+            uvmpw_path: 工作区文件路径
+
+        Returns:
+            Optional[Dict]: {'workspace_path', 'workspace_dir', 'projects': [{'name', 'path', 'active'}]}，失败返回None
+        """
+        try:
+            if not os.path.exists(uvmpw_path):
+                logger.error(f"MDK工作区文件不存在: {uvmpw_path}")
+                return None
+
+            workspace_dir = os.path.dirname(os.path.abspath(uvmpw_path))
+            root = ET.parse(uvmpw_path).getroot()
+
+            projects = []
+            for project in root.findall('project'):
+                path_text = project.findtext('PathAndName')
+                if not path_text:
+                    continue
+                project_path = resolve_workspace_path(path_text, workspace_dir)
+                projects.append({
+                    'name': os.path.splitext(os.path.basename(project_path))[0],
+                    'path': project_path,
+                    'active': (project.findtext('NodeIsActive') or '').strip() == '1'
+                })
+
+            logger.info(f"解析MDK工作区: {uvmpw_path}, 项目 {len(projects)} 个")
+            return {
+                'workspace_path': uvmpw_path,
+                'workspace_dir': workspace_dir,
+                'projects': projects
+            }
+
+        except Exception as e:
+            logger.error(f"解析MDK工作区文件失败: {uvmpw_path}, 错误: {e}")
+            return None
+
+    def write_subset(self, uvmpw_path: str, project_names: List[str], output_path: str) -> bool:
+        """
+        生成只包含指定项目的工作区文件（UV4命令行不能选择工作区中的部分项目）
+
+        输出文件应与原工作区位于同一目录，使项目相对路径保持有效
+
+        Args:
+            uvmpw_path: 原工作区文件路径
+            project_names: 保留的项目名称（项目文件名，不含扩展名）
+            output_path: 输出工作区文件路径
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            wanted = {name.lower() for name in project_names}
+            tree = ET.parse(uvmpw_path)
+            root = tree.getroot()
+            kept = 0
+            for project in list(root.findall('project')):
+                path_text = (project.findtext('PathAndName') or '').replace('\\', '/')
+                name = os.path.splitext(os.path.basename(path_text))[0]
+                if name.lower() in wanted:
+                    kept += 1
+                else:
+                    root.remove(project)
+            if kept == 0:
+                logger.error(f"工作区中没有指定的项目: {', '.join(project_names)}")
+                return False
+            tree.write(output_path, encoding='UTF-8', xml_declaration=True)
+            logger.info(f"生成工作区文件: {output_path}, 包含 {kept} 个项目")
+            return True
+
+        except Exception as e:
+            logger.error(f"生成工作区文件失败: {output_path}, 错误: {e}")
+            return False
+
+
+if __name__ == "__main__":
+    # 测试工作区解析
+    import sys
+    if len(sys.argv) > 1:
+        workspace = MDKWorkspaceParser().parse_file(sys.argv[1])
+        if workspace:
+            for project in workspace['projects']:
+                print(f"项目: {project['name']} -> {project['path']}{' (活动)' if project['active'] else ''}")
+    else:
+        print("用法: python -m lib_MDK.workspace_parser <workspace.uvmpw>")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语言包
+各语言的界面文本分别存放，只在使用时导入，启动时只加载当前语言
+"""
+
+import importlib
+import threading
+from lib_logger import logger
+from typing import Dict
+
+DEFAULT_LANGUAGE = 'zh_CN'
+
+# 支持的语言: 代码 -> 名称（不需要导入语言包即可列出）
+LANGUAGE_NAMES = {
+    'zh_CN': '简体中文',
+    'zh_TW': '繁體中文',
+    'en_US': 'English',
+}
+
+_catalogs: Dict[str, Dict] = {}
+_catalogs_lock = threading.Lock()
+
+
+def is_supported(language_code: str) -> bool:
+    """是否支持该语言"""
+    return language_code in LANGUAGE_NAMES
+
+
+def load_texts(language_code: str) -> Dict:
+    """
+    获取语言的界面文本，首次使用时导入对应的语言包
+
+    Args:
+        language_code: 语言代码，不支持时使用默认语言
+
+    Returns:
+        Dict: 文本键 -> 文本
+    """
+    if not is_supported(language_code):
+        logger.warning(f"不支持的语言: {language_code}，使用{LANGUAGE_NAMES[DEFAULT_LANGUAGE]}")
+        language_code = DEFAULT_LANGUAGE
+    with _catalogs_lock:
+        texts = _catalogs.get(language_code)
+        if texts is None:
+            texts = importlib.import_module(f"{__name__}.{language_code}").TEXTS
+            _catalogs[language_code] = texts
+        return texts
+
+
+__all__ = ['DEFAULT_LANGUAGE', 'LANGUAGE_NAMES', 'is_supported', 'load_texts']
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英文语言包
+主界面、设置和对话框使用的文本，切换到该语言时才加载
+"""
+
+NAME = 'English'
+
+TEXTS = {
+    'app_title': 'Embedded Firmware Manager',
+    'project_path': 'Project Path:',
+    'iar_path': 'Compile Tool Path:',
+    'check_git': 'Check Git Status',
+    'check_version': 'Check Version',
+    'start_build': 'Start Build',
+    'build_all_configs': 'Build All Configs',
+    'building_all_configs': 'Building all configurations in parallel...',
+    'open_settings': 'Settings',
+    'open_firmware': 'Local Publish Directory',
+    'status_ready': 'Ready',
+    'status_checking': 'Checking...',
+    'status_building': 'Building...',
+    'project_info': 'Project Info',
+    'firmware_version': 'Firmware Version:',
+    'git_status': 'Git Status:',
+    'iar_path_display': 'Compile Tool Path:',
+    'flash_start_addr': 'Flash Start Address:',
+    'settings_title': 'Settings',
+    'project_settings': 'Project Settings',
+    'binary_settings': 'Binary Settings',
+    'compile_tool': 'Compile Tool:',
+    'iar_installation_path': 'IAR Installation Path:',
+    'mdk_installation_path': 'MDK Installation Path:',
+    'fw_publish_directory': 'Local Publish Directory:',
+    'remote_publish_directory': 'Remote Publish Directory:',
+    'enable_remote_publish': 'Enable Remote Publish',
+    'bin_start_address': 'Bin Start Address:',
+    'config_file': 'Config File:',
+    'language': 'Language:',
+    'select_directory': 'Select Directory',
+    'select': 'Select',
+    'save': 'Save',
+    'cancel': 'Cancel',
+    'example_bin_address': '(e.g.: 0x8000000)',
+    'browse': 'Browse',
+    'log_output': 'Log Output',
+    'success': 'Success',
+    'error': 'Error',
+    'warning': 'Warning',
+    'info': 'Info',
+    'not_checked': 'Not Checked',
+    'not_configured': 'Not Configured',
+    'msg_error': 'Error',
+    'msg_success': 'Success',
+    'msg_warning': 'Warning',
+    'msg_info': 'Info',
+    'msg_config_error': 'Configuration Error',
+    'msg_config_incomplete': 'Configuration Incomplete',
+    'msg_compile_failed': 'Compilation Failed',
+    'msg_modify_failed': 'Modification Failed',
+    'msg_file_process_failed': 'File Processing Failed',
+    'msg_firmware_publish_failed': 'Firmware Publish Failed',
+    'msg_firmware_publish_error': 'Firmware Publish Error',
+    'msg_cleanup_complete': 'Cleanup Complete',
+    'msg_cleanup_failed': 'Cleanup Failed',
+    'msg_settings_saved': 'Settings Saved',
+    'msg_bin_address_format_error': 'Bin Start Address Format Error',
+    'msg_save_settings_failed': 'Save Settings Failed',
+    'msg_select_directory_error': 'Error Selecting Directory',
+    'msg_open_directory_failed': 'Failed to Open Directory',
+    'msg_open_firmware_directory_failed': 'Failed to Open Firmware Directory',
+    'msg_select_config_file_error': 'Error Selecting Config File',
+    'msg_select_iar_directory_error': 'Error Selecting IAR Directory',
+    'msg_not_git_repo': 'Current directory is not a Git repository',
+    'msg_cannot_get_commit_id': 'Cannot get commit ID',
+    'feature_settings': 'Feature Settings',
+    'enable_git_commit_id': 'Git Commit ID',
+    'enable_file_size': 'File Size',
+    'enable_bin_checksum': 'Binary Checksum',
+    'enable_hash_value': 'Hash Value',
+    'git_commit_id_keyword': 'Git Commit ID Variable:',
+    'file_size_keyword': 'File Size Variable:',
+    'bin_checksum_keyword': 'Binary Checksum Variable:',
+    'hash_value_keyword': 'Hash Value Variable:',
+    'firmware_version_keyword': 'Firmware Version Variable:',
+    'add_timestamp_to_filename': 'Add timestamp to bin filename',
+    'publish_out_file': 'Publish .out file',
+    'feature_settings_desc': 'Select which feature modules to enable. Disabled features will not be executed.',
+    'msg_compile_success_no_bin': 'Compilation successful but no output bin file found',
+    'msg_compile_complete': 'Compilation Complete!',
+    'msg_compile_exception': 'Compilation Process Exception',
+    'msg_firmware_directory_not_exist': 'Firmware publish directory does not exist',
+    'msg_remote_publish_directory_not_exist': 'Remote publish directory does not exist',
+    'msg_remote_publish_success': 'Remote publish successful',
+    'msg_remote_publish_failed': 'Remote publish failed',
+    'msg_config_file_analysis_failed': 'Config file analysis failed',
+    'msg_check_config_file_pragma': 'Please check if the config file contains correct #pragma location definitions.',
+    'git_commit_dialog_title': 'Commit Message & Release Notes',
+    'git_commit_dialog_message': 'Please enter the update information for this commit (will be used for both Git commit and Release Notes):',
+    'git_commit_dialog_placeholder': 'e.g.: Fixed a bug, added new feature, etc...\n\nNote: "Release xxxx version" prefix will be added automatically\n\nShortcuts: Ctrl+Enter to confirm, Escape to cancel',
+    'git_commit_dialog_ok': 'OK',
+    'git_commit_dialog_cancel': 'Cancel',
+    'release_note_title': 'Release Notes',
+    'release_note_created': 'Release note file created',
+    'release_note_updated': 'Release note file updated',
+    'enabled': 'Enabled',
+    'disabled': 'Disabled',
+    'bin_address_auto_note': 'Note: Bin start address is now automatically obtained from ICF file, no manual configuration needed',
+    'build_configuration': 'Build Configuration:',
+    'not_selected': 'Not Selected',
+    'refresh_config': 'Refresh Config',
+    'no_valid_configs': 'No Valid Configs Found',
+    'no_configs_found': 'No Valid Build Configurations Found',
+    'refresh_config_failed': 'Refresh Config Failed',
+    'invalid_project_path': 'Invalid project path, cannot refresh configurations',
+    'config_parse_failed': 'Failed to parse project configurations',
+    'no_project_file': 'No Project File Found',
+    'configs_found': 'Found {count} configurations: {names}',
+    'current_selection': 'Current selection: {name}',
+    'config_selected': 'Configuration selected: {name}',
+    'output_directory': 'Output directory: {dir}',
+    'debug_mode': 'Debug mode: {mode}',
+    'config_selection_failed': 'Configuration selection failed',
+    'checking_git_status': 'Checking Git status...',
+    'not_git_repo_status': 'Current directory is not a Git repository',
+    'has_uncommitted_changes': 'Uncommitted changes detected',
+    'git_workdir_clean': 'Git working directory is clean, ready to build',
+    'git_check_complete': 'Git status check complete',
+    'checking_firmware_version': 'Checking firmware version...',
+    'version_check_complete': 'Version check complete',
+    'start_build_process': 'Starting build process...',
+    'input_update_info': 'Input update information...',
+    'committing_changes': 'Committing changes...',
+    'updating_version': 'Updating version...',
+    'updating_release_notes': 'Updating Release Notes...',
+    'committing_version_changes': 'Committing version changes and Release Notes...',
+    'compiling_project': 'Compiling project...',
+    'modifying_binary': 'Modifying binary file...',
+    'processing_files': 'Processing output files...',
+    'publishing_firmware': 'Publishing firmware...',
+    'publishing_remote': 'Publishing to remote directory...',
+    'build_process_complete': 'Build process complete',
+    'language_options': {
+        'zh_CN': 'zh_CN 简体中文',
+        'zh_TW': 'zh_TW 繁體中文',
+        'en_US': 'en_US English'
+    }
+}
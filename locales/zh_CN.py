@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+简体中文语言包
+主界面、设置和对话框使用的文本，切换到该语言时才加载
+"""
+
+NAME = '简体中文'
+
+TEXTS = {
+    'app_title': '嵌入式固件管理工具',
+    'project_path': '项目路径:',
+    'iar_path': '编译工具路径:',
+    'check_git': '检查Git状态',
+    'check_version': '检查版本',
+    'start_build': '开始编译',
+    'build_all_configs': '编译全部配置',
+    'building_all_configs': '并行编译全部配置...',
+    'open_settings': '设置',
+    'open_firmware': '本地发布目录',
+    'status_ready': '就绪',
+    'status_checking': '检查中...',
+    'status_building': '编译中...',
+    'project_info': '项目信息',
+    'firmware_version': '固件版本:',
+    'git_status': 'Git状态:',
+    'iar_path_display': '编译工具路径:',
+    'flash_start_addr': 'Flash起始地址:',
+    'settings_title': '设置',
+    'project_settings': '项目设置',
+    'binary_settings': '二进制设置',
+    'compile_tool': '编译工具:',
+    'iar_installation_path': 'IAR安装目录:',
+    'mdk_installation_path': 'MDK安装目录:',
+    'fw_publish_directory': '本地发布目录:',
+    'remote_publish_directory': '远程发布目录:',
+    'enable_remote_publish': '启用远程发布',
+    'bin_start_address': 'bin起始地址:',
+    'config_file': '配置文件:',
+    'language': '语言:',
+    'select_directory': '选择目录',
+    'select': '选择',
+    'save': '保存',
+    'cancel': '取消',
+    'example_bin_address': '(例如: 0x8000000)',
+    'browse': '浏览',
+    'log_output': '日志输出',
+    'success': '成功',
+    'error': '错误',
+    'warning': '警告',
+    'info': '信息',
+    'not_checked': '未检查',
+    'not_configured': '未配置',
+    'msg_error': '错误',
+    'msg_success': '成功',
+    'msg_warning': '警告',
+    'msg_info': '信息',
+    'msg_config_error': '配置错误',
+    'msg_config_incomplete': '配置不完整',
+    'msg_compile_failed': '编译失败',
+    'msg_modify_failed': '修改失败',
+    'msg_file_process_failed': '文件处理失败',
+    'msg_firmware_publish_failed': '固件发布失败',
+    'msg_firmware_publish_error': '固件发布异常',
+    'msg_cleanup_complete': '清理完成',
+    'msg_cleanup_failed': '清理失败',
+    'msg_settings_saved': '设置已保存',
+    'msg_bin_address_format_error': 'bin起始地址格式错误',
+    'msg_save_settings_failed': '保存设置失败',
+    'msg_select_directory_error': '选择目录时出错',
+    'msg_open_directory_failed': '打开目录失败',
+    'msg_open_firmware_directory_failed': '打开固件目录失败',
+    'msg_select_config_file_error': '选择配置文件时出错',
+    'msg_select_iar_directory_error': '选择IAR目录时出错',
+    'msg_not_git_repo': '当前目录不是Git仓库',
+    'msg_cannot_get_commit_id': '无法获取commit ID',
+    'feature_settings': '功能设置',
+    'enable_git_commit_id': 'Git提交ID',
+    'enable_file_size': '文件大小',
+    'enable_bin_checksum': '二进制校验和',
+    'enable_hash_value': '哈希校验和',
+    'git_commit_id_keyword': 'Git提交ID变量:',
+    'file_size_keyword': '文件大小变量:',
+    'bin_checksum_keyword': '二进制校验和变量:',
+    'hash_value_keyword': '哈希校验和变量:',
+    'firmware_version_keyword': '固件版本变量:',
+    'add_timestamp_to_filename': 'bin文件名添加时间戳',
+    'publish_out_file': '发布.out文件',
+    'feature_settings_desc': '选择要启用的功能模块，禁用后相关功能将不会执行',
+    'msg_compile_success_no_bin': '编译成功但未找到输出bin文件',
+    'msg_compile_complete': '编译完成！',
+    'msg_compile_exception': '编译流程异常',
+    'msg_firmware_directory_not_exist': '固件发布目录不存在',
+    'msg_remote_publish_directory_not_exist': '远程发布目录不存在',
+    'msg_remote_publish_success': '远程发布成功',
+    'msg_remote_publish_failed': '远程发布失败',
+    'msg_config_file_analysis_failed': '配置文件分析失败',
+    'msg_check_config_file_pragma': '请检查配置文件是否包含正确的#pragma location定义。',
+    'git_commit_dialog_title': '提交信息 & Release Notes',
+    'git_commit_dialog_message': '请输入本次提交的更新信息（将同时用于Git提交和Release Notes）：',
+    'git_commit_dialog_placeholder': '例如：修复了某个bug，添加了新功能等...\n\n注意：提交描述会自动添加"发布xxxx版本"前缀\n\n快捷键：Ctrl+Enter 确认，Escape 取消',
+    'git_commit_dialog_ok': '确定',
+    'git_commit_dialog_cancel': '取消',
+    'release_note_title': 'Release Notes',
+    'release_note_created': 'Release note文件已创建',
+    'release_note_updated': 'Release note文件已更新',
+    'enabled': '启用',
+    'disabled': '未启用',
+    'bin_address_auto_note': '注意：bin起始地址现在从ICF文件自动获取，无需手动配置',
+    'build_configuration': '编译配置:',
+    'not_selected': '未选择',
+    'refresh_config': '刷新配置',
+    'no_valid_configs': '未找到有效配置',
+    'no_configs_found': '未找到有效的编译配置',
+    'refresh_config_failed': '刷新配置失败',
+    'invalid_project_path': '项目路径无效，无法刷新配置',
+    'config_parse_failed': '解析项目配置失败',
+    'no_project_file': '未找到项目文件',
+    'configs_found': '找到 {count} 个配置: {names}',
+    'current_selection': '当前选择: {name}',
+    'config_selected': '选择配置: {name}',
+    'output_directory': '输出目录: {dir}',
+    'debug_mode': 'Debug模式: {mode}',
+    'config_selection_failed': '配置选择失败',
+    'checking_git_status': '检查Git状态中...',
+    'not_git_repo_status': '当前目录不是Git仓库',
+    'has_uncommitted_changes': '检测到未提交的更改',
+    'git_workdir_clean': 'Git工作区干净，可以编译',
+    'git_check_complete': 'Git状态检查完成',
+    'checking_firmware_version': '检查固件版本中...',
+    'version_check_complete': '版本检查完成',
+    'start_build_process': '开始编译流程...',
+    'input_update_info': '输入更新信息...',
+    'committing_changes': '提交更改...',
+    'updating_version': '更新版本号...',
+    'updating_release_notes': '更新Release Notes...',
+    'committing_version_changes': '提交版本号更改和Release Notes...',
+    'compiling_project': '编译项目中...',
+    'modifying_binary': '修改二进制文件...',
+    'processing_files': '处理输出文件...',
+    'publishing_firmware': '发布固件...',
+    'publishing_remote': '发布到远程目录...',
+    'build_process_complete': '编译流程完成',
+    'language_options': {
+        'zh_CN': 'zh_CN 简体中文',
+        'zh_TW': 'zh_TW 繁體中文',
+        'en_US': 'en_US English'
+    }
+}
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+繁体中文语言包
+主界面、设置和对话框使用的文本，切换到该语言时才加载
+"""
+
+NAME = '繁體中文'
+
+TEXTS = {
+    'app_title': 'IAR固件發布工具',
+    'project_path': '專案路徑:',
+    'iar_path': '編譯工具路徑:',
+    'check_git': '檢查Git狀態',
+    'check_version': '檢查版本',
+    'start_build': '開始編譯',
+    'build_all_configs': '編譯全部配置',
+    'building_all_configs': '並行編譯全部配置...',
+    'open_settings': '設定',
+    'open_firmware': '本地發布目錄',
+    'status_ready': '就緒',
+    'status_checking': '檢查中...',
+    'status_building': '編譯中...',
+    'project_info': '專案資訊',
+    'firmware_version': '固件版本:',
+    'git_status': 'Git狀態:',
+    'iar_path_display': '編譯工具路徑:',
+    'flash_start_addr': 'Flash起始位址:',
+    'settings_title': '設定',
+    'project_settings': '專案設定',
+    'binary_settings': '二進位設定',
+    'compile_tool': '編譯工具:',
+    'iar_installation_path': 'IAR安裝目錄:',
+    'mdk_installation_path': 'MDK安裝目錄:',
+    'fw_publish_directory': '本地發布目錄:',
+    'remote_publish_directory': '遠程發布目錄:',
+    'enable_remote_publish': '啟用遠程發布',
+    'bin_start_address': 'bin起始位址:',
+    'config_file': '配置檔案:',
+    'language': '語言:',
+    'select_directory': '選擇目錄',
+    'select': '選擇',
+    'save': '儲存',
+    'cancel': '取消',
+    'example_bin_address': '(例如: 0x8000000)',
+    'browse': '瀏覽',
+    'log_output': '日誌輸出',
+    'success': '成功',
+    'error': '錯誤',
+    'warning': '警告',
+    'info': '資訊',
+    'not_checked': '未檢查',
+    'not_configured': '未配置',
+    'msg_error': '錯誤',
+    'msg_success': '成功',
+    'msg_warning': '警告',
+    'msg_info': '資訊',
+    'msg_config_error': '配置錯誤',
+    'msg_config_incomplete': '配置不完整',
+    'msg_compile_failed': '編譯失敗',
+    'msg_modify_failed': '修改失敗',
+    'msg_file_process_failed': '檔案處理失敗',
+    'msg_firmware_publish_failed': '固件發布失敗',
+    'msg_firmware_publish_error': '固件發布異常',
+    'msg_cleanup_complete': '清理完成',
+    'msg_cleanup_failed': '清理失敗',
+    'msg_settings_saved': '設定已儲存',
+    'msg_bin_address_format_error': 'bin起始位址格式錯誤',
+    'msg_save_settings_failed': '儲存設定失敗',
+    'msg_select_directory_error': '選擇目錄時出錯',
+    'msg_open_directory_failed': '開啟目錄失敗',
+    'msg_open_firmware_directory_failed': '開啟固件目錄失敗',
+    'msg_select_config_file_error': '選擇配置檔案時出錯',
+    'msg_select_iar_directory_error': '選擇IAR目錄時出錯',
+    'msg_not_git_repo': '當前目錄不是Git倉庫',
+    'msg_cannot_get_commit_id': '無法獲取commit ID',
+    'feature_settings': '功能設置',
+    'enable_git_commit_id': 'Git提交ID',
+    'enable_file_size': '檔案大小',
+    'enable_bin_checksum': '二進制校驗和',
+    'enable_hash_value': '哈希校驗和',
+    'git_commit_id_keyword': 'Git提交ID變數:',
+    'file_size_keyword': '文件大小變數:',
+    'bin_checksum_keyword': '二進制校驗和變數:',
+    'hash_value_keyword': '哈希校驗和變數:',
+    'firmware_version_keyword': '固件版本變數:',
+    'add_timestamp_to_filename': 'bin檔案名添加時間戳',
+    'publish_out_file': '發布.out檔案',
+    'feature_settings_desc': '選擇要啟用的功能模組，禁用後相關功能將不會執行',
+    'msg_compile_success_no_bin': '編譯成功但未找到輸出bin檔案',
+    'msg_compile_complete': '編譯完成！',
+    'msg_compile_exception': '編譯流程異常',
+    'msg_firmware_directory_not_exist': '固件發布目錄不存在',
+    'msg_remote_publish_directory_not_exist': '遠程發布目錄不存在',
+    'msg_remote_publish_success': '遠程發布成功',
+    'msg_remote_publish_failed': '遠程發布失敗',
+    'msg_config_file_analysis_failed': '配置檔案分析失敗',
+    'msg_check_config_file_pragma': '請檢查配置檔案是否包含正確的#pragma location定義。',
+    'git_commit_dialog_title': '提交資訊 & Release Notes',
+    'git_commit_dialog_message': '請輸入本次提交的更新資訊（將同時用於Git提交和Release Notes）：',
+    'git_commit_dialog_placeholder': '例如：修復了某個bug，添加了新功能等...\n\n注意：提交描述會自動添加"發布xxxx版本"前綴\n\n快捷鍵：Ctrl+Enter 確認，Escape 取消',
+    'git_commit_dialog_ok': '確定',
+    'git_commit_dialog_cancel': '取消',
+    'release_note_title': 'Release Notes',
+    'release_note_created': 'Release note檔案已建立',
+    'release_note_updated': 'Release note檔案已更新',
+    'enabled': '啟用',
+    'disabled': '未啟用',
+    'bin_address_auto_note': '注意：bin起始位址現在從ICF檔案自動獲取，無需手動配置',
+    'build_configuration': '編譯配置:',
+    'not_selected': '未選擇',
+    'refresh_config': '刷新配置',
+    'no_valid_configs': '未找到有效配置',
+    'no_configs_found': '未找到有效的編譯配置',
+    'refresh_config_failed': '刷新配置失敗',
+    'invalid_project_path': '項目路徑無效，無法刷新配置',
+    'config_parse_failed': '解析項目配置失敗',
+    'no_project_file': '未找到項目檔案',
+    'configs_found': '找到 {count} 個配置: {names}',
+    'current_selection': '當前選擇: {name}',
+    'config_selected': '選擇配置: {name}',
+    'output_directory': '輸出目錄: {dir}',
+    'debug_mode': 'Debug模式: {mode}',
+    'config_selection_failed': '配置選擇失敗',
+    'checking_git_status': '檢查Git狀態中...',
+    'not_git_repo_status': '當前目錄不是Git倉庫',
+    'has_uncommitted_changes': '檢測到未提交的更改',
+    'git_workdir_clean': 'Git工作區乾淨，可以編譯',
+    'git_check_complete': 'Git狀態檢查完成',
+    'checking_firmware_version': '檢查固件版本中...',
+    'version_check_complete': '版本檢查完成',
+    'start_build_process': '開始編譯流程...',
+    'input_update_info': '輸入更新資訊...',
+    'committing_changes': '提交更改...',
+    'updating_version': '更新版本號...',
+    'updating_release_notes': '更新Release Notes...',
+    'committing_version_changes': '提交版本號更改和Release Notes...',
+    'compiling_project': '編譯專案中...',
+    'modifying_binary': '修改二進制檔案...',
+    'processing_files': '處理輸出檔案...',
+    'publishing_firmware': '發布固件...',
+    'publishing_remote': '發布到遠程目錄...',
+    'build_process_complete': '編譯流程完成',
+    'language_options': {
+        'zh_CN': 'zh_CN 简体中文',
+        'zh_TW': 'zh_TW 繁體中文',
+        'en_US': 'en_US English'
+    }
+}
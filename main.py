@@ -18,443 +18,54 @@ from pathlib import Path
 from typing import Optional
 
 # 导入自定义模块
-from git_manager import GitManager
-from builder_factory import BuilderFactory
 from project_analyzer_factory import ProjectAnalyzerFactory
-from binary_modifier import BinaryModifier
-from file_manager_factory import FileManagerFactory
-from version_manager import VersionManager
 from info_manager_factory import InfoManagerFactory
 from path_manager_factory import PathManagerFactory
 from tool_version_manager import ToolVersionManager
+from project_watcher import ProjectWatcher
+from toolchain_registry import get_toolchain_registry
+from firmware_pipeline import FirmwarePipeline, PipelineHooks
+from locales import DEFAULT_LANGUAGE, LANGUAGE_NAMES, is_supported, load_texts
 from version import VERSION
 
-# 语言配置
-LANGUAGES = {
-    'zh_CN': {
-        'name': '简体中文',
-        'texts': {
-            'app_title': '嵌入式固件管理工具',
-            'project_path': '项目路径:',
-            'iar_path': '编译工具路径:',
-            'check_git': '检查Git状态',
-            'check_version': '检查版本',
-            'start_build': '开始编译',
-            'open_settings': '设置',
-            'open_firmware': '本地发布目录',
-            'status_ready': '就绪',
-            'status_checking': '检查中...',
-            'status_building': '编译中...',
-            'project_info': '项目信息',
-            'firmware_version': '固件版本:',
-            'git_status': 'Git状态:',
-            'iar_path_display': '编译工具路径:',
-            'flash_start_addr': 'Flash起始地址:',
-            'settings_title': '设置',
-            'project_settings': '项目设置',
-            'binary_settings': '二进制设置',
-            'compile_tool': '编译工具:',
-            'iar_installation_path': 'IAR安装目录:',
-            'mdk_installation_path': 'MDK安装目录:',
-            'fw_publish_directory': '本地发布目录:',
-            'remote_publish_directory': '远程发布目录:',
-            'enable_remote_publish': '启用远程发布',
-            'bin_start_address': 'bin起始地址:',
-            'config_file': '配置文件:',
-            'language': '语言:',
-            'select_directory': '选择目录',
-            'select': '选择',
-            'save': '保存',
-            'cancel': '取消',
-            'example_bin_address': '(例如: 0x8000000)',
-            'browse': '浏览',
-            'log_output': '日志输出',
-            'success': '成功',
-            'error': '错误',
-            'warning': '警告',
-            'info': '信息',
-            'not_checked': '未检查',
-            'not_configured': '未配置',
-            'msg_error': '错误',
-            'msg_success': '成功',
-            'msg_warning': '警告',
-            'msg_info': '信息',
-            'msg_config_error': '配置错误',
-            'msg_config_incomplete': '配置不完整',
-            'msg_compile_failed': '编译失败',
-            'msg_modify_failed': '修改失败',
-            'msg_file_process_failed': '文件处理失败',
-            'msg_firmware_publish_failed': '固件发布失败',
-            'msg_firmware_publish_error': '固件发布异常',
-            'msg_cleanup_complete': '清理完成',
-            'msg_cleanup_failed': '清理失败',
-            'msg_settings_saved': '设置已保存',
-            'msg_bin_address_format_error': 'bin起始地址格式错误',
-            'msg_save_settings_failed': '保存设置失败',
-            'msg_select_directory_error': '选择目录时出错',
-            'msg_open_directory_failed': '打开目录失败',
-            'msg_open_firmware_directory_failed': '打开固件目录失败',
-            'msg_select_config_file_error': '选择配置文件时出错',
-            'msg_select_iar_directory_error': '选择IAR目录时出错',
-            'msg_not_git_repo': '当前目录不是Git仓库',
-            'msg_cannot_get_commit_id': '无法获取commit ID',
-            'feature_settings': '功能设置',
-            'enable_git_commit_id': 'Git提交ID',
-            'enable_file_size': '文件大小',
-            'enable_bin_checksum': '二进制校验和',
-            'enable_hash_value': '哈希校验和',
-            'git_commit_id_keyword': 'Git提交ID变量:',
-            'file_size_keyword': '文件大小变量:',
-            'bin_checksum_keyword': '二进制校验和变量:',
-            'hash_value_keyword': '哈希校验和变量:',
-            'firmware_version_keyword': '固件版本变量:',
-            'add_timestamp_to_filename': 'bin文件名添加时间戳',
-            'publish_out_file': '发布.out文件',
-            'feature_settings_desc': '选择要启用的功能模块，禁用后相关功能将不会执行',
-            'msg_compile_success_no_bin': '编译成功但未找到输出bin文件',
-            'msg_compile_complete': '编译完成！',
-            'msg_compile_exception': '编译流程异常',
-            'msg_firmware_directory_not_exist': '固件发布目录不存在',
-            'msg_remote_publish_directory_not_exist': '远程发布目录不存在',
-            'msg_remote_publish_success': '远程发布成功',
-            'msg_remote_publish_failed': '远程发布失败',
-            'msg_config_file_analysis_failed': '配置文件分析失败',
-            'msg_check_config_file_pragma': '请检查配置文件是否包含正确的#pragma location定义。',
-            'git_commit_dialog_title': '提交信息 & Release Notes',
-            'git_commit_dialog_message': '请输入本次提交的更新信息（将同时用于Git提交和Release Notes）：',
-            'git_commit_dialog_placeholder': '例如：修复了某个bug，添加了新功能等...\n\n注意：提交描述会自动添加"发布xxxx版本"前缀\n\n快捷键：Ctrl+Enter 确认，Escape 取消',
-            'git_commit_dialog_ok': '确定',
-            'git_commit_dialog_cancel': '取消',
-            'release_note_title': 'Release Notes',
-            'release_note_created': 'Release note文件已创建',
-            'release_note_updated': 'Release note文件已更新',
-            'enabled': '启用',
-            'disabled': '未启用',
-            'bin_address_auto_note': '注意：bin起始地址现在从ICF文件自动获取，无需手动配置',
-            'build_configuration': '编译配置:',
-            'not_selected': '未选择',
-            'refresh_config': '刷新配置',
-            'no_valid_configs': '未找到有效配置',
-            'no_configs_found': '未找到有效的编译配置',
-            'refresh_config_failed': '刷新配置失败',
-            'invalid_project_path': '项目路径无效，无法刷新配置',
-            'config_parse_failed': '解析项目配置失败',
-            'no_project_file': '未找到项目文件',
-            'configs_found': '找到 {count} 个配置: {names}',
-            'current_selection': '当前选择: {name}',
-            'config_selected': '选择配置: {name}',
-            'output_directory': '输出目录: {dir}',
-            'debug_mode': 'Debug模式: {mode}',
-            'config_selection_failed': '配置选择失败',
-            'checking_git_status': '检查Git状态中...',
-            'not_git_repo_status': '当前目录不是Git仓库',
-            'has_uncommitted_changes': '检测到未提交的更改',
-            'git_workdir_clean': 'Git工作区干净，可以编译',
-            'git_check_complete': 'Git状态检查完成',
-            'checking_firmware_version': '检查固件版本中...',
-            'version_check_complete': '版本检查完成',
-            'start_build_process': '开始编译流程...',
-            'input_update_info': '输入更新信息...',
-            'committing_changes': '提交更改...',
-            'updating_version': '更新版本号...',
-            'updating_release_notes': '更新Release Notes...',
-            'committing_version_changes': '提交版本号更改和Release Notes...',
-            'compiling_project': '编译项目中...',
-            'modifying_binary': '修改二进制文件...',
-            'processing_files': '处理输出文件...',
-            'publishing_firmware': '发布固件...',
-            'publishing_remote': '发布到远程目录...',
-            'build_process_complete': '编译流程完成',
-            'language_options': {
-                'zh_CN': 'zh_CN 简体中文',
-                'zh_TW': 'zh_TW 繁體中文',
-                'en_US': 'en_US English'
-            }
-        }
-    },
-    'zh_TW': {
-        'name': '繁體中文',
-        'texts': {
-            'app_title': 'IAR固件發布工具',
-            'project_path': '專案路徑:',
-            'iar_path': '編譯工具路徑:',
-            'check_git': '檢查Git狀態',
-            'check_version': '檢查版本',
-            'start_build': '開始編譯',
-            'open_settings': '設定',
-            'open_firmware': '本地發布目錄',
-            'status_ready': '就緒',
-            'status_checking': '檢查中...',
-            'status_building': '編譯中...',
-            'project_info': '專案資訊',
-            'firmware_version': '固件版本:',
-            'git_status': 'Git狀態:',
-            'iar_path_display': '編譯工具路徑:',
-            'flash_start_addr': 'Flash起始位址:',
-            'settings_title': '設定',
-            'project_settings': '專案設定',
-            'binary_settings': '二進位設定',
-            'compile_tool': '編譯工具:',
-            'iar_installation_path': 'IAR安裝目錄:',
-            'mdk_installation_path': 'MDK安裝目錄:',
-            'fw_publish_directory': '本地發布目錄:',
-            'remote_publish_directory': '遠程發布目錄:',
-            'enable_remote_publish': '啟用遠程發布',
-            'bin_start_address': 'bin起始位址:',
-            'config_file': '配置檔案:',
-            'language': '語言:',
-            'select_directory': '選擇目錄',
-            'select': '選擇',
-            'save': '儲存',
-            'cancel': '取消',
-            'example_bin_address': '(例如: 0x8000000)',
-            'browse': '瀏覽',
-            'log_output': '日誌輸出',
-            'success': '成功',
-            'error': '錯誤',
-            'warning': '警告',
-            'info': '資訊',
-            'not_checked': '未檢查',
-            'not_configured': '未配置',
-            'msg_error': '錯誤',
-            'msg_success': '成功',
-            'msg_warning': '警告',
-            'msg_info': '資訊',
-            'msg_config_error': '配置錯誤',
-            'msg_config_incomplete': '配置不完整',
-            'msg_compile_failed': '編譯失敗',
-            'msg_modify_failed': '修改失敗',
-            'msg_file_process_failed': '檔案處理失敗',
-            'msg_firmware_publish_failed': '固件發布失敗',
-            'msg_firmware_publish_error': '固件發布異常',
-            'msg_cleanup_complete': '清理完成',
-            'msg_cleanup_failed': '清理失敗',
-            'msg_settings_saved': '設定已儲存',
-            'msg_bin_address_format_error': 'bin起始位址格式錯誤',
-            'msg_save_settings_failed': '儲存設定失敗',
-            'msg_select_directory_error': '選擇目錄時出錯',
-            'msg_open_directory_failed': '開啟目錄失敗',
-            'msg_open_firmware_directory_failed': '開啟固件目錄失敗',
-            'msg_select_config_file_error': '選擇配置檔案時出錯',
-            'msg_select_iar_directory_error': '選擇IAR目錄時出錯',
-            'msg_not_git_repo': '當前目錄不是Git倉庫',
-            'msg_cannot_get_commit_id': '無法獲取commit ID',
-            'feature_settings': '功能設置',
-            'enable_git_commit_id': 'Git提交ID',
-            'enable_file_size': '檔案大小',
-            'enable_bin_checksum': '二進制校驗和',
-            'enable_hash_value': '哈希校驗和',
-            'git_commit_id_keyword': 'Git提交ID變數:',
-            'file_size_keyword': '文件大小變數:',
-            'bin_checksum_keyword': '二進制校驗和變數:',
-            'hash_value_keyword': '哈希校驗和變數:',
-            'firmware_version_keyword': '固件版本變數:',
-            'add_timestamp_to_filename': 'bin檔案名添加時間戳',
-            'publish_out_file': '發布.out檔案',
-            'feature_settings_desc': '選擇要啟用的功能模組，禁用後相關功能將不會執行',
-            'msg_compile_success_no_bin': '編譯成功但未找到輸出bin檔案',
-            'msg_compile_complete': '編譯完成！',
-            'msg_compile_exception': '編譯流程異常',
-            'msg_firmware_directory_not_exist': '固件發布目錄不存在',
-            'msg_remote_publish_directory_not_exist': '遠程發布目錄不存在',
-            'msg_remote_publish_success': '遠程發布成功',
-            'msg_remote_publish_failed': '遠程發布失敗',
-            'msg_config_file_analysis_failed': '配置檔案分析失敗',
-            'msg_check_config_file_pragma': '請檢查配置檔案是否包含正確的#pragma location定義。',
-            'git_commit_dialog_title': '提交資訊 & Release Notes',
-            'git_commit_dialog_message': '請輸入本次提交的更新資訊（將同時用於Git提交和Release Notes）：',
-            'git_commit_dialog_placeholder': '例如：修復了某個bug，添加了新功能等...\n\n注意：提交描述會自動添加"發布xxxx版本"前綴\n\n快捷鍵：Ctrl+Enter 確認，Escape 取消',
-            'git_commit_dialog_ok': '確定',
-            'git_commit_dialog_cancel': '取消',
-            'release_note_title': 'Release Notes',
-            'release_note_created': 'Release note檔案已建立',
-            'release_note_updated': 'Release note檔案已更新',
-            'enabled': '啟用',
-            'disabled': '未啟用',
-            'bin_address_auto_note': '注意：bin起始位址現在從ICF檔案自動獲取，無需手動配置',
-            'build_configuration': '編譯配置:',
-            'not_selected': '未選擇',
-            'refresh_config': '刷新配置',
-            'no_valid_configs': '未找到有效配置',
-            'no_configs_found': '未找到有效的編譯配置',
-            'refresh_config_failed': '刷新配置失敗',
-            'invalid_project_path': '項目路徑無效，無法刷新配置',
-            'config_parse_failed': '解析項目配置失敗',
-            'no_project_file': '未找到項目檔案',
-            'configs_found': '找到 {count} 個配置: {names}',
-            'current_selection': '當前選擇: {name}',
-            'config_selected': '選擇配置: {name}',
-            'output_directory': '輸出目錄: {dir}',
-            'debug_mode': 'Debug模式: {mode}',
-            'config_selection_failed': '配置選擇失敗',
-            'checking_git_status': '檢查Git狀態中...',
-            'not_git_repo_status': '當前目錄不是Git倉庫',
-            'has_uncommitted_changes': '檢測到未提交的更改',
-            'git_workdir_clean': 'Git工作區乾淨，可以編譯',
-            'git_check_complete': 'Git狀態檢查完成',
-            'checking_firmware_version': '檢查固件版本中...',
-            'version_check_complete': '版本檢查完成',
-            'start_build_process': '開始編譯流程...',
-            'input_update_info': '輸入更新資訊...',
-            'committing_changes': '提交更改...',
-            'updating_version': '更新版本號...',
-            'updating_release_notes': '更新Release Notes...',
-            'committing_version_changes': '提交版本號更改和Release Notes...',
-            'compiling_project': '編譯專案中...',
-            'modifying_binary': '修改二進制檔案...',
-            'processing_files': '處理輸出檔案...',
-            'publishing_firmware': '發布固件...',
-            'publishing_remote': '發布到遠程目錄...',
-            'build_process_complete': '編譯流程完成',
-            'language_options': {
-                'zh_CN': 'zh_CN 简体中文',
-                'zh_TW': 'zh_TW 繁體中文',
-                'en_US': 'en_US English'
-            }
-        }
-    },
-    'en_US': {
-        'name': 'English',
-        'texts': {
-            'app_title': 'Embedded Firmware Manager',
-            'project_path': 'Project Path:',
-            'iar_path': 'Compile Tool Path:',
-            'check_git': 'Check Git Status',
-            'check_version': 'Check Version',
-            'start_build': 'Start Build',
-            'open_settings': 'Settings',
-            'open_firmware': 'Local Publish Directory',
-            'status_ready': 'Ready',
-            'status_checking': 'Checking...',
-            'status_building': 'Building...',
-            'project_info': 'Project Info',
-            'firmware_version': 'Firmware Version:',
-            'git_status': 'Git Status:',
-            'iar_path_display': 'Compile Tool Path:',
-            'flash_start_addr': 'Flash Start Address:',
-            'settings_title': 'Settings',
-            'project_settings': 'Project Settings',
-            'binary_settings': 'Binary Settings',
-            'compile_tool': 'Compile Tool:',
-            'iar_installation_path': 'IAR Installation Path:',
-            'mdk_installation_path': 'MDK Installation Path:',
-            'fw_publish_directory': 'Local Publish Directory:',
-            'remote_publish_directory': 'Remote Publish Directory:',
-            'enable_remote_publish': 'Enable Remote Publish',
-            'bin_start_address': 'Bin Start Address:',
-            'config_file': 'Config File:',
-            'language': 'Language:',
-            'select_directory': 'Select Directory',
-            'select': 'Select',
-            'save': 'Save',
-            'cancel': 'Cancel',
-            'example_bin_address': '(e.g.: 0x8000000)',
-            'browse': 'Browse',
-            'log_output': 'Log Output',
-            'success': 'Success',
-            'error': 'Error',
-            'warning': 'Warning',
-            'info': 'Info',
-            'not_checked': 'Not Checked',
-            'not_configured': 'Not Configured',
-            'msg_error': 'Error',
-            'msg_success': 'Success',
-            'msg_warning': 'Warning',
-            'msg_info': 'Info',
-            'msg_config_error': 'Configuration Error',
-            'msg_config_incomplete': 'Configuration Incomplete',
-            'msg_compile_failed': 'Compilation Failed',
-            'msg_modify_failed': 'Modification Failed',
-            'msg_file_process_failed': 'File Processing Failed',
-            'msg_firmware_publish_failed': 'Firmware Publish Failed',
-            'msg_firmware_publish_error': 'Firmware Publish Error',
-            'msg_cleanup_complete': 'Cleanup Complete',
-            'msg_cleanup_failed': 'Cleanup Failed',
-            'msg_settings_saved': 'Settings Saved',
-            'msg_bin_address_format_error': 'Bin Start Address Format Error',
-            'msg_save_settings_failed': 'Save Settings Failed',
-            'msg_select_directory_error': 'Error Selecting Directory',
-            'msg_open_directory_failed': 'Failed to Open Directory',
-            'msg_open_firmware_directory_failed': 'Failed to Open Firmware Directory',
-            'msg_select_config_file_error': 'Error Selecting Config File',
-            'msg_select_iar_directory_error': 'Error Selecting IAR Directory',
-            'msg_not_git_repo': 'Current directory is not a Git repository',
-            'msg_cannot_get_commit_id': 'Cannot get commit ID',
-            'feature_settings': 'Feature Settings',
-            'enable_git_commit_id': 'Git Commit ID',
-            'enable_file_size': 'File Size',
-            'enable_bin_checksum': 'Binary Checksum',
-            'enable_hash_value': 'Hash Value',
-            'git_commit_id_keyword': 'Git Commit ID Variable:',
-            'file_size_keyword': 'File Size Variable:',
-            'bin_checksum_keyword': 'Binary Checksum Variable:',
-            'hash_value_keyword': 'Hash Value Variable:',
-            'firmware_version_keyword': 'Firmware Version Variable:',
-            'add_timestamp_to_filename': 'Add timestamp to bin filename',
-            'publish_out_file': 'Publish .out file',
-            'feature_settings_desc': 'Select which feature modules to enable. Disabled features will not be executed.',
-            'msg_compile_success_no_bin': 'Compilation successful but no output bin file found',
-            'msg_compile_complete': 'Compilation Complete!',
-            'msg_compile_exception': 'Compilation Process Exception',
-            'msg_firmware_directory_not_exist': 'Firmware publish directory does not exist',
-            'msg_remote_publish_directory_not_exist': 'Remote publish directory does not exist',
-            'msg_remote_publish_success': 'Remote publish successful',
-            'msg_remote_publish_failed': 'Remote publish failed',
-            'msg_config_file_analysis_failed': 'Config file analysis failed',
-            'msg_check_config_file_pragma': 'Please check if the config file contains correct #pragma location definitions.',
-            'git_commit_dialog_title': 'Commit Message & Release Notes',
-            'git_commit_dialog_message': 'Please enter the update information for this commit (will be used for both Git commit and Release Notes):',
-            'git_commit_dialog_placeholder': 'e.g.: Fixed a bug, added new feature, etc...\n\nNote: "Release xxxx version" prefix will be added automatically\n\nShortcuts: Ctrl+Enter to confirm, Escape to cancel',
-            'git_commit_dialog_ok': 'OK',
-            'git_commit_dialog_cancel': 'Cancel',
-            'release_note_title': 'Release Notes',
-            'release_note_created': 'Release note file created',
-            'release_note_updated': 'Release note file updated',
-            'enabled': 'Enabled',
-            'disabled': 'Disabled',
-            'bin_address_auto_note': 'Note: Bin start address is now automatically obtained from ICF file, no manual configuration needed',
-            'build_configuration': 'Build Configuration:',
-            'not_selected': 'Not Selected',
-            'refresh_config': 'Refresh Config',
-            'no_valid_configs': 'No Valid Configs Found',
-            'no_configs_found': 'No Valid Build Configurations Found',
-            'refresh_config_failed': 'Refresh Config Failed',
-            'invalid_project_path': 'Invalid project path, cannot refresh configurations',
-            'config_parse_failed': 'Failed to parse project configurations',
-            'no_project_file': 'No Project File Found',
-            'configs_found': 'Found {count} configurations: {names}',
-            'current_selection': 'Current selection: {name}',
-            'config_selected': 'Configuration selected: {name}',
-            'output_directory': 'Output directory: {dir}',
-            'debug_mode': 'Debug mode: {mode}',
-            'config_selection_failed': 'Configuration selection failed',
-            'checking_git_status': 'Checking Git status...',
-            'not_git_repo_status': 'Current directory is not a Git repository',
-            'has_uncommitted_changes': 'Uncommitted changes detected',
-            'git_workdir_clean': 'Git working directory is clean, ready to build',
-            'git_check_complete': 'Git status check complete',
-            'checking_firmware_version': 'Checking firmware version...',
-            'version_check_complete': 'Version check complete',
-            'start_build_process': 'Starting build process...',
-            'input_update_info': 'Input update information...',
-            'committing_changes': 'Committing changes...',
-            'updating_version': 'Updating version...',
-            'updating_release_notes': 'Updating Release Notes...',
-            'committing_version_changes': 'Committing version changes and Release Notes...',
-            'compiling_project': 'Compiling project...',
-            'modifying_binary': 'Modifying binary file...',
-            'processing_files': 'Processing output files...',
-            'publishing_firmware': 'Publishing firmware...',
-            'publishing_remote': 'Publishing to remote directory...',
-            'build_process_complete': 'Build process complete',
-            'language_options': {
-                'zh_CN': 'zh_CN 简体中文',
-                'zh_TW': 'zh_TW 繁體中文',
-                'en_US': 'en_US English'
-            }
-        }
-    }
-}
+
+class GuiPipelineHooks(PipelineHooks):
+    """编译发布流程的界面回调：日志窗口、状态栏、提交信息对话框和消息框"""
+    
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+    
+    def text(self, key: str) -> str:
+        return self.app.get_text(key)
+    
+    def log(self, message: str):
+        self.app.log_message(message)
+    
+    def status(self, message: str):
+        self.app.update_status(message)
+    
+    def build_output(self, event, configuration_name: str = None):
+        self.app.on_build_output_event(event, configuration_name)
+    
+    def on_config_updated(self, config: dict):
+        self.app.config = config
+        self.app._update_flash_start_addr_display()
+    
+    def on_version(self, current_version, next_version: str):
+        self.app.firmware_version_var.set(f"{current_version or '未知'} -> {next_version}")
+    
+    def ask_commit_message(self, default_message: str) -> str:
+        return self.app.show_git_commit_dialog(default_message)
+    
+    def confirm(self, message: str) -> bool:
+        return messagebox.askyesno("确认", message)
+    
+    def show_error(self, title_key: str, message: str):
+        messagebox.showerror(self.app.get_text(title_key), message)
+    
+    def show_success(self, message: str):
+        messagebox.showinfo(self.app.get_text('msg_success'), message)
 
 
 class MCUAutoBuildApp:
@@ -467,8 +78,8 @@ class MCUAutoBuildApp:
         self.log_queue = queue.Queue()
         
         # 初始化语言设置
-        self.current_language = 'zh_CN'  # 默认简体中文
-        self.texts = LANGUAGES[self.current_language]['texts']
+        self.current_language = DEFAULT_LANGUAGE  # 默认简体中文
+        self.texts = load_texts(self.current_language)
         
         # 初始化组件
         self.git_manager = None
@@ -479,18 +90,20 @@ class MCUAutoBuildApp:
         self.info_manager = None
         self.path_manager = None
         self.tool_version_manager = ToolVersionManager()
+        self._manager_lock = threading.Lock()
+        # 正在执行的编译流程，关闭程序时取消
+        self._running_pipeline = None
         
         # 缓存信息文件路径，避免重复查找
         self.cached_info_file_path = None
         
+        # 项目文件监视器：缓存项目文件索引、编译配置、版本号和flash偏移，文件变化时自动失效
+        self.project_watcher = ProjectWatcher()
+        
         # 配置相关变量
         self.available_configurations = []
         self.selected_configuration = None
         
-        # 操作成功标志位
-        self.git_status_checked = False
-        self.version_checked = False
-        
         # 设置窗口
         self.setup_window()
         
@@ -511,17 +124,60 @@ class MCUAutoBuildApp:
         
         # 启动日志处理
         self.process_log_queue()
+        
+        # 项目文件变化时提示缓存失效
+        self.project_watcher.add_listener(
+            lambda key, path: self.log_message(f"检测到文件变化，缓存已失效: {os.path.basename(path)}"))
+        
+        # 窗口显示后再在后台创建管理器（导入工具链模块）并启动项目文件监视，不阻塞窗口显示
+        self.root.after_idle(self._start_background_initialization)
+    
+    def _start_background_initialization(self):
+        """窗口显示后启动后台初始化"""
+        threading.Thread(target=self._initialize_in_background, name='StartupInit', daemon=True).start()
+    
+    def _initialize_in_background(self):
+        """创建路径管理器和信息管理器（首次导入工具链模块），然后启动项目文件监视"""
+        try:
+            compile_tool = self.config.get('compile_tool')
+            if compile_tool:
+                self._ensure_path_manager()
+                info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
+                with self._manager_lock:
+                    # 界面操作已经创建过时保留已有的管理器
+                    if self.info_manager is None:
+                        self.info_manager = info_manager
+            self.project_watcher.start()
+            logger.info("后台初始化完成")
+        except Exception as e:
+            self.log_message(f"后台初始化失败: {e}")
+    
+    def _ensure_path_manager(self, project_path: str = None):
+        """
+        获取路径管理器，尚未创建时立即创建（启动时由后台初始化创建，界面操作可能先于其完成）
+        
+        Args:
+            project_path: 新建路径管理器时使用的项目路径
+            
+        Returns:
+            路径管理器实例
+        """
+        with self._manager_lock:
+            if self.path_manager is None:
+                compile_tool = self.config.get('compile_tool', 'IAR')
+                self.path_manager = PathManagerFactory.create_path_manager(compile_tool, project_path)
+            return self.path_manager
     
     def set_language(self, language_code: str):
         """设置语言"""
-        if language_code in LANGUAGES:
+        if is_supported(language_code):
             self.current_language = language_code
-            self.texts = LANGUAGES[language_code]['texts']
+            self.texts = load_texts(language_code)
             # 只有在logger初始化后才记录日志
             if hasattr(self, 'logger'):
-                logger.info(f"语言已切换为: {LANGUAGES[language_code]['name']}")
+                logger.info(f"语言已切换为: {LANGUAGE_NAMES[language_code]}")
             else:
-                logger.info(f"语言已切换为: {LANGUAGES[language_code]['name']}")
+                logger.info(f"语言已切换为: {LANGUAGE_NAMES[language_code]}")
             return True
         return False
     
@@ -602,9 +258,9 @@ class MCUAutoBuildApp:
             # 优先加载语言设置（在界面创建之前）
             if 'language' in self.config:
                 language = self.config['language']
-                if language in LANGUAGES:
+                if is_supported(language):
                     self.set_language(language)
-                    self.log_message(f"语言设置已加载: {LANGUAGES[language]['name']}")
+                    self.log_message(f"语言设置已加载: {LANGUAGE_NAMES[language]}")
                 else:
                     self.log_message(f"不支持的语言设置: {language}，使用默认语言")
             else:
@@ -621,10 +277,7 @@ class MCUAutoBuildApp:
                 return
             
             self.log_message(f"使用编译工具: {compile_tool}")
-            # 不传入项目路径，完全由GUI输入决定
-            self.path_manager = PathManagerFactory.create_path_manager(compile_tool, None)
-            self.info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
-            # 注意：auto_find_paths需要在设置项目路径后调用
+            # 路径管理器和信息管理器在窗口显示后由后台初始化创建，auto_find_paths需要在设置项目路径后调用
             
             # 自动查找配置文件（需要在设置项目路径后进行）
             if not self.config.get('binary_settings', {}).get('config_file'):
@@ -822,6 +475,8 @@ class MCUAutoBuildApp:
         ttk.Button(button_frame, text=self.get_text('check_git'), command=self.check_git_status).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text=self.get_text('check_version'), command=self.check_version).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text=self.get_text('start_build'), command=self.start_build).pack(side=tk.LEFT, padx=(0, 10))
+        self.build_all_var = tk.BooleanVar(value=self.config.get('build_all_configurations', False))
+        ttk.Checkbutton(button_frame, text=self.get_text('build_all_configs'), variable=self.build_all_var).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text=self.get_text('open_firmware'), command=self.open_firmware_directory).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(button_frame, text=self.get_text('open_settings'), command=self.open_settings).pack(side=tk.LEFT)
         
@@ -854,6 +509,23 @@ class MCUAutoBuildApp:
         # 添加到队列
         self.log_queue.put(log_entry)
     
+    def on_build_output_event(self, event, configuration_name: str = None):
+        """
+        处理编译输出事件（在读取编译输出的线程中调用，只通过队列和状态变量更新界面）
+        
+        Args:
+            event: BuildEvent编译输出事件
+            configuration_name: 多配置并行编译时的配置名称，用于区分日志来源
+        """
+        prefix = f"[{configuration_name}]" if configuration_name else ""
+        if event.kind == 'progress':
+            self.status_var.set(f"{self.get_text('compiling_project')} {prefix}{event.message}")
+            self.log_message(f"{prefix}[编译] {event.message}")
+        elif event.kind == 'diagnostic':
+            self.log_message(f"{prefix}[{'错误' if event.severity == 'error' else '警告' if event.severity == 'warning' else '提示'}] {event}")
+        else:
+            self.log_message(f"{prefix}[编译] {event.message}")
+    
     def process_log_queue(self):
         """处理日志队列"""
         try:
@@ -891,7 +563,7 @@ class MCUAutoBuildApp:
                 self.log_message(f"选择项目路径: {directory}")
                 
                 # 设置PathManager的项目路径
-                self.path_manager.set_project_path(directory)
+                self._ensure_path_manager().set_project_path(directory)
                 self.config = self.path_manager.auto_find_paths(self.config)
                 self.log_message("已重新搜索项目文件")
                 
@@ -899,7 +571,7 @@ class MCUAutoBuildApp:
                 self.refresh_configurations()
                 
                 # 自动获取flash偏移地址
-                flash_offset = self.path_manager.get_flash_offset_from_configuration(self.selected_configuration)
+                flash_offset = self.get_flash_offset(self.selected_configuration)
                 if flash_offset:
                     # 更新配置中的bin起始地址
                     if 'binary_settings' not in self.config:
@@ -916,7 +588,7 @@ class MCUAutoBuildApp:
     
     def find_iar_executable(self, iar_dir: str) -> str:
         """
-        在IAR安装目录中查找IarBuild.exe
+        在IAR安装目录中查找IarBuild.exe（通过工具链注册表，已发现的安装直接返回）
         
         Args:
             iar_dir: IAR安装目录
@@ -924,22 +596,11 @@ class MCUAutoBuildApp:
         Returns:
             str: IarBuild.exe的完整路径，未找到返回空字符串
         """
-        possible_paths = [
-            os.path.join(iar_dir, "bin", "IarBuild.exe"),
-            os.path.join(iar_dir, "IarBuild.exe"),
-            os.path.join(iar_dir, "arm", "bin", "IarBuild.exe"),
-            os.path.join(iar_dir, "EWARM", "bin", "IarBuild.exe")
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        
-        return ""
+        return get_toolchain_registry().find_executable('IAR', iar_dir)
     
     def find_mdk_executable(self, mdk_dir: str) -> str:
         """
-        在MDK安装目录中查找UV4.exe
+        在MDK安装目录中查找UV4.exe（通过工具链注册表，已发现的安装直接返回）
         
         Args:
             mdk_dir: MDK安装目录
@@ -947,48 +608,97 @@ class MCUAutoBuildApp:
         Returns:
             str: UV4.exe的完整路径，未找到返回空字符串
         """
-        possible_paths = [
-            os.path.join(mdk_dir, "UV4", "UV4.exe"),
-            os.path.join(mdk_dir, "UV4.exe"),
-            os.path.join(mdk_dir, "bin", "UV4.exe"),
-            os.path.join(mdk_dir, "ARM", "UV4", "UV4.exe"),
-            os.path.join(mdk_dir, "ARM", "bin", "UV4.exe")
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        
-        return ""
+        return get_toolchain_registry().find_executable('MDK', mdk_dir)
     
     
-    def get_info_file_path_with_details(self, project_path: str) -> tuple[Optional[str], str]:
+    def clear_info_file_cache(self):
+        """清除信息文件路径缓存"""
+        self.cached_info_file_path = None
+
+    def find_project_files(self, project_path: str, compile_tool: str) -> list:
         """
-        获取信息文件路径，并返回详细的错误信息
-        
+        查找项目文件（结果由项目文件监视器缓存，目录项增删时失效）
+
         Args:
             project_path: 项目路径
-            
+            compile_tool: 编译工具类型
+
         Returns:
-            tuple: (文件路径, 错误信息)
+            list: 项目文件路径列表
         """
-        if self.cached_info_file_path and os.path.exists(self.cached_info_file_path):
-            return self.cached_info_file_path, ""
-        
-        if not self.path_manager:
-            compile_tool = self.config.get('compile_tool', 'IAR')
-            self.path_manager = PathManagerFactory.create_path_manager(compile_tool, project_path)
-        
-        info_file_name = self.config.get('info_file', 'main.c')
-        file_path, error_msg = self.path_manager.find_info_file_with_details(info_file_name)
-        if file_path:
-            self.cached_info_file_path = file_path
-        return file_path, error_msg
-    
-    def clear_info_file_cache(self):
-        """清除信息文件路径缓存"""
-        self.cached_info_file_path = None
-    
+        file_extension = ProjectAnalyzerFactory.get_file_extension(compile_tool)
+        cache_key = ('project_files', os.path.abspath(project_path), file_extension)
+        project_files = self.project_watcher.get(cache_key)
+        if project_files is not None:
+            return project_files
+
+        project_files = []
+        walked_dirs = []
+        for root, dirs, files in os.walk(project_path):
+            # 跳过版本控制和IDE目录，它们不会包含项目文件
+            dirs[:] = [d for d in dirs if d not in ('.git', '.svn', '.idea', '.vscode')]
+            walked_dirs.append(root)
+            for file in files:
+                if file.endswith(file_extension):
+                    project_files.append(os.path.join(root, file))
+
+        self.project_watcher.put(cache_key, project_files, files=project_files, directories=walked_dirs)
+        return project_files
+
+    def analyze_project_file(self, compile_tool: str, project_file: str) -> Optional[dict]:
+        """
+        解析项目文件中的编译配置（结果由项目文件监视器缓存，项目文件变化时失效）
+
+        Args:
+            compile_tool: 编译工具类型
+            project_file: 项目文件路径
+
+        Returns:
+            dict: 项目分析结果，失败返回None
+        """
+        cache_key = ('configurations', os.path.abspath(project_file))
+        result = self.project_watcher.get(cache_key)
+        if result is not None:
+            return result
+
+        signatures = self.project_watcher.snapshot(files=[project_file])
+        analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+        analyze_method = getattr(analyzer, ProjectAnalyzerFactory.get_analyze_method_name(compile_tool))
+        result = analyze_method(project_file)
+        if result:
+            # 分析结果包含各配置的链接脚本信息，链接脚本变化时同样需要失效（链接脚本在分析后才知道）
+            linker_files = [config.get('icf_file') or config.get('sct_file') for config in result.get('configurations', [])]
+            self.project_watcher.put(cache_key, result, files=[f for f in linker_files if f], snapshot=signatures)
+        return result
+
+    def get_flash_offset(self, configuration: Optional[dict]) -> Optional[int]:
+        """
+        获取配置对应的flash偏移地址（结果由项目文件监视器缓存，链接脚本变化时失效）
+
+        Args:
+            configuration: 编译配置信息
+
+        Returns:
+            int: flash偏移地址，失败返回None
+        """
+        linker_file = None
+        if configuration:
+            # 项目分析阶段已并行解析过链接脚本，直接使用结果
+            if configuration.get('flash_offset') is not None:
+                return configuration['flash_offset']
+            linker_file = configuration.get('icf_file') or configuration.get('sct_file')
+
+        cache_key = ('flash_offset', os.path.abspath(linker_file)) if linker_file else None
+        if cache_key:
+            flash_offset = self.project_watcher.get(cache_key)
+            if flash_offset is not None:
+                return flash_offset
+
+        signatures = self.project_watcher.snapshot(files=[linker_file]) if cache_key else None
+        flash_offset = self._ensure_path_manager().get_flash_offset_from_configuration(configuration)
+        if cache_key and flash_offset is not None:
+            self.project_watcher.put(cache_key, flash_offset, snapshot=signatures)
+        return flash_offset
     
     def save_config(self):
         """保存用户配置到文件"""
@@ -1031,52 +741,31 @@ class MCUAutoBuildApp:
                 self.update_status(self.get_text('checking_git_status'))
                 self.progress_bar.start()
                 
-                # 初始化Git管理器
-                project_path = self.project_path_var.get()
-                self.git_manager = GitManager(project_path)
-                
-                # 重新初始化路径管理器并更新配置
-                compile_tool = self.config.get('compile_tool', 'IAR')
-                self.path_manager = PathManagerFactory.create_path_manager(compile_tool, project_path)
-                self.config = self.path_manager.auto_find_paths(self.config)
-                
-                # 从IAR项目文件中提取项目名称
-                iar_project_path = self.config.get('project_settings', {}).get('iar_project_path') or self.config.get('iar_project_path')
-                if iar_project_path and os.path.exists(iar_project_path):
-                    project_name = os.path.splitext(os.path.basename(iar_project_path))[0]
-                    self.config['project_name'] = project_name
-                    self.log_message(f"检测到项目名称: {project_name}")
+                # 重新查找项目文件并更新配置，再检查Git仓库
+                pipeline = self._create_pipeline()
+                pipeline.discover_paths()
+                git_status = pipeline.check_git()
+                self._adopt_pipeline(pipeline)
                 
                 # 检查是否为Git仓库
-                if not self.git_manager.is_git_repo():
+                if not git_status['is_repo']:
                     self.git_status_var.set("不是Git仓库")
                     self.update_status(self.get_text('not_git_repo_status'))
                     return
                 
                 # 检查未提交更改
-                has_changes = self.git_manager.has_uncommitted_changes()
-                if has_changes:
+                if git_status['has_changes']:
                     self.git_status_var.set("有未提交更改")
                     self.update_status(self.get_text('has_uncommitted_changes'))
                 else:
                     self.git_status_var.set("工作区干净")
                     self.update_status(self.get_text('git_workdir_clean'))
                 
-                # 获取commit信息
-                commit_info = self.git_manager.get_commit_info()
-                if commit_info['commit_id']:
-                    self.log_message(f"当前commit: {commit_info['short_commit_id']}")
-                    self.log_message(f"分支: {commit_info['branch']}")
-                    self.log_message(f"作者: {commit_info['author']}")
-                
-                # 设置Git状态检查成功标志位
-                self.git_status_checked = True
                 self.log_message("Git状态检查完成")
                 
             except Exception as e:
                 self.log_message(f"检查Git状态失败: {e}")
                 self.git_status_var.set("检查失败")
-                self.git_status_checked = False
             finally:
                 self.progress_bar.stop()
                 self.update_status(self.get_text('git_check_complete'))
@@ -1090,44 +779,19 @@ class MCUAutoBuildApp:
                 self.update_status(self.get_text('checking_firmware_version'))
                 self.progress_bar.start()
                 
-                # 初始化版本管理器和main.c更新器
-                project_path = self.project_path_var.get()
-                fw_publish_dir = self.config.get('fw_publish_directory', './fw_publish')
-                
-                # 获取当前git分支
+                # 获取当前git分支，用于查找本分支已发布的版本
                 current_branch = None
                 if self.git_manager and self.git_manager.is_git_repo():
-                    git_info = self.git_manager.get_commit_info()
-                    current_branch = git_info.get('branch')
+                    current_branch = self.git_manager.get_commit_info().get('branch')
                     if current_branch:
                         logger.info(f"版本管理器初始化，检测到Git分支: {current_branch}")
                     else:
                         logger.warning("版本管理器初始化，无法获取Git分支信息")
                 
-                self.version_manager = VersionManager(self.config.get('version_settings', {}), project_path, fw_publish_dir, current_branch)
-                # 根据编译工具选择相应的信息管理器
-                compile_tool = self.config.get('compile_tool', 'IAR')
-                self.info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
-                
-                # 从信息文件中读取当前版本
-                main_file_path, _ = self.get_info_file_path_with_details(self.project_path_var.get())
-                if main_file_path:
-                    current_version = self.info_manager.extract_version_from_info_file(main_file_path)
-                else:
-                    current_version = None
-                
-                if current_version:
-                    self.log_message(f"当前代码版本: {current_version}")
-                    
-                    # 获取下一个版本号
-                    next_version, explanation = self.version_manager.get_next_version(current_version)
-                    self.log_message(f"建议下一个版本: {next_version}")
-                    self.log_message(explanation)
-                    
-                    # 更新界面显示
-                    self.firmware_version_var.set(f"{current_version} -> {next_version}")
-                else:
-                    self.log_message("无法从main.c中提取版本号")
+                pipeline = self._create_pipeline()
+                current_version, _ = pipeline.check_version(current_branch)
+                self._adopt_pipeline(pipeline)
+                if not current_version:
                     self.firmware_version_var.set("版本提取失败")
                 
                 # 更新flash起始地址显示
@@ -1142,146 +806,17 @@ class MCUAutoBuildApp:
                 else:
                     self.log_message("没有已发布的固件")
                 
-                # 设置版本检查成功标志位
-                self.version_checked = True
                 self.log_message("版本检查完成")
                 
             except Exception as e:
                 self.log_message(f"检查版本失败: {e}")
                 self.firmware_version_var.set("检查失败")
-                self.version_checked = False
             finally:
                 self.progress_bar.stop()
                 self.update_status(self.get_text('version_check_complete'))
         
         threading.Thread(target=check_thread, daemon=True).start()
     
-    
-    def _check_build_config(self):
-        """检查编译配置是否完整"""
-        missing_configs = []
-        
-        self.log_message("开始检查编译配置...")
-        
-        # 检查编译工具安装路径
-        compile_tool = self.config.get('compile_tool', 'IAR')
-        if compile_tool == 'IAR':
-            tool_path = self.config.get('iar_installation_path', '')
-            tool_name = "IAR"
-        else:  # MDK
-            tool_path = self.config.get('mdk_installation_path', '')
-            tool_name = "MDK"
-        
-        self.log_message(f"{tool_name}路径: {tool_path}")
-        if not tool_path:
-            missing_configs.append(f"{tool_name}安装路径")
-        
-        # 检查bin起始地址
-        binary_settings = self.config.get('binary_settings', {})
-        self.log_message(f"binary_settings配置: {binary_settings}")
-        bin_start_address = binary_settings.get('bin_start_address', 0)
-        self.log_message(f"检查bin起始地址: 0x{bin_start_address:08X}")
-        if bin_start_address == 0:
-            missing_configs.append("bin起始地址")
-            self.log_message("警告: bin起始地址未设置，这可能导致编译失败")
-        
-        # 检查编译配置选择
-        if not self.selected_configuration:
-            missing_configs.append("编译配置选择")
-            self.log_message("错误: 未选择编译配置")
-        else:
-            self.log_message(f"选择的编译配置: {self.selected_configuration.get('name', 'N/A')}")
-            self.log_message(f"配置中的bin文件: {self.selected_configuration.get('bin_file', 'N/A')}")
-        
-        # 检查信息文件
-        info_file_name = self.config.get('info_file', '')
-        self.log_message(f"信息文件名: {info_file_name}")
-        if not info_file_name:
-            missing_configs.append("信息文件")
-        else:
-            # 基于文件名查找完整路径
-            project_path = self.project_path_var.get()
-            self.log_message(f"项目路径: {project_path}")
-            if not project_path:
-                missing_configs.append("项目路径")
-            else:
-                # 查找信息文件
-                info_file_path, error_msg = self.get_info_file_path_with_details(project_path)
-                if info_file_path:
-                    self.log_message(f"找到的信息文件路径: {info_file_path}")
-                    # 尝试分析配置文件
-                    if not self.info_manager:
-                        # 根据编译工具创建相应的信息管理器
-                        compile_tool = self.config.get('compile_tool', 'IAR')
-                        self.info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
-                    
-                    try:
-                        feature_settings = {
-                            'enable_git_commit_id': self.config.get('enable_git_commit_id', True),
-                            'enable_file_size': self.config.get('enable_file_size', True),
-                            'enable_bin_checksum': self.config.get('enable_bin_checksum', True),
-                            'enable_hash_value': self.config.get('enable_hash_value', True),
-                            'git_commit_id_keyword': self.config.get('git_commit_id_keyword', '__git_commit_id'),
-                            'file_size_keyword': self.config.get('file_size_keyword', '__file_size'),
-                            'bin_checksum_keyword': self.config.get('bin_checksum_keyword', '__bin_checksum'),
-                            'hash_value_keyword': self.config.get('hash_value_keyword', '__hash_value'),
-                            'firmware_version_keyword': self.config.get('firmware_version_keyword', '__Firmware_Version')
-                        }
-                        binary_config = self.info_manager.analyze_config_file(info_file_path, feature_settings)
-                        # 更新配置
-                        if 'binary_settings' not in self.config:
-                            self.config = {}
-                        self.config.update(binary_config)
-                        
-                        # 检查地址是否已解析
-                        missing_fields = []
-                        if binary_config.get('firmware_version_offset', 0) == 0:
-                            missing_fields.append(f"{feature_settings.get('firmware_version_keyword', '__Firmware_Version')}地址")
-                        if binary_config.get('git_commit_id_offset', 0) == 0:
-                            missing_fields.append(f"{feature_settings.get('git_commit_id_keyword', '__git_commit_id')}地址")
-                        if binary_config.get('file_size_offset', 0) == 0:
-                            missing_fields.append(f"{feature_settings.get('file_size_keyword', '__file_size')}地址")
-                        if binary_config.get('bin_checksum_offset', 0) == 0:
-                            missing_fields.append(f"{feature_settings.get('bin_checksum_keyword', '__bin_checksum')}地址")
-                        
-                        if missing_fields:
-                            missing_configs.extend(missing_fields)
-                    except Exception as e:
-                        missing_configs.append(f"配置文件分析失败: {e}")
-                else:
-                    # 显示详细的错误信息
-                    self.log_message(error_msg)
-                    # 根据错误类型添加不同的错误信息
-                    if "找到多个信息文件" in error_msg:
-                        missing_configs.append("找到多个信息文件")
-                    elif "未找到信息文件" in error_msg:
-                        missing_configs.append("未找到信息文件")
-                    else:
-                        missing_configs.append("信息文件查找失败")
-        
-        if missing_configs:
-            error_msg = f"编译配置不完整，缺少以下配置:\n{', '.join(missing_configs)}\n\n"
-            error_msg += "请查看日志输出获取详细错误信息，然后点击'设置'按钮进行配置:\n"
-            
-            # 根据具体的错误类型提供针对性的建议
-            if "找到多个信息文件" in missing_configs:
-                error_msg += "1. 删除项目中的重复信息文件，只保留一个\n"
-                error_msg += "2. 建议保留源代码目录中的文件，删除构建系统生成的临时文件\n"
-                error_msg += "3. 在'项目设置'中指定具体的信息文件路径"
-            elif "未找到信息文件" in missing_configs:
-                error_msg += "1. 在'项目设置'中选择信息文件（如main.c）\n"
-                error_msg += "2. 确保信息文件中包含正确的#pragma location定义"
-            else:
-                error_msg += "1. 在'项目设置'中配置IAR安装目录和bin起始地址\n"
-                error_msg += "2. 在'项目设置'中选择信息文件（如main.c）\n"
-                error_msg += "3. 确保信息文件中包含正确的#pragma location定义"
-            
-            self.log_message(f"配置检查失败: {', '.join(missing_configs)}")
-            messagebox.showerror(self.get_text('msg_config_incomplete'), error_msg)
-            return False
-        
-        return True
-    
     def _update_flash_start_addr_display(self):
         """更新flash起始地址显示"""
         try:
@@ -1297,377 +832,48 @@ class MCUAutoBuildApp:
             self.flash_start_addr_var.set("获取失败")
             self.log_message(f"获取Flash起始地址失败: {e}")
     
+    def _create_pipeline(self) -> FirmwarePipeline:
+        """根据当前界面状态创建编译发布流程"""
+        pipeline = FirmwarePipeline(self.config, self.project_path_var.get(), GuiPipelineHooks(self),
+                                    self.project_watcher)
+        pipeline.path_manager = self.path_manager
+        pipeline.info_manager = self.info_manager
+        pipeline.cached_info_file_path = self.cached_info_file_path
+        pipeline.available_configurations = self.available_configurations
+        pipeline.selected_configuration = self.selected_configuration
+        pipeline.build_all = self.build_all_var.get()
+        return pipeline
     
+    def _adopt_pipeline(self, pipeline: FirmwarePipeline):
+        """同步编译发布流程更新的配置和各管理器"""
+        self.config = pipeline.config
+        self.cached_info_file_path = pipeline.cached_info_file_path
+        for name in ('path_manager', 'git_manager', 'version_manager', 'info_manager',
+                     'builder', 'binary_modifier', 'file_manager'):
+            manager = getattr(pipeline, name)
+            if manager is not None:
+                setattr(self, name, manager)
     
     def start_build(self):
-        """开始编译流程"""
+        """开始编译流程（流程本身由FirmwarePipeline执行，界面只提供进度显示和对话框）"""
         def build_thread():
+            pipeline = None
             try:
-                
-                self.update_status(self.get_text('start_build_process'))
                 self.progress_bar.start()
-                
-                # 0. 首先初始化路径管理器并调用auto_find_paths
-                project_path = self.project_path_var.get()
-                
-                # 确保路径管理器已初始化
-                if not self.path_manager:
-                    compile_tool = self.config.get('compile_tool', 'IAR')
-                    self.path_manager = PathManagerFactory.create_path_manager(compile_tool, project_path)
-                else:
-                    # 确保项目路径是最新的
-                    self.path_manager.set_project_path(project_path)
-                    
-                # 调用auto_find_paths来自动设置bin起始地址等配置
-                self.config = self.path_manager.auto_find_paths(self.config)
-                
-                # 更新flash起始地址显示
-                self._update_flash_start_addr_display()
-                
-                # 1. 检查配置是否完整（放在auto_find_paths之后）
-                if not self._check_build_config():
-                    return
-                
-                # 2. 检查Git状态（如果用户没有手动检查过）
-                if not self.git_status_checked:
-                    self.log_message("自动执行Git状态检查...")
-                    # 模拟点击Git状态检查按钮
-                    self.check_git_status()
-                    # 等待Git状态检查完成
-                    import time
-                    while not self.git_status_checked:
-                        time.sleep(0.1)  # 每100ms检查一次
-                    self.log_message("Git状态检查完成")
-                else:
-                    self.log_message("使用已完成的Git状态检查结果")
-                
-                # 3. 检查版本（如果用户没有手动检查过）
-                if not self.version_checked:
-                    self.log_message("自动执行版本检查...")
-                    # 模拟点击版本检查按钮
-                    self.check_version()
-                    # 等待版本检查完成
-                    import time
-                    while not self.version_checked:
-                        time.sleep(0.1)  # 每100ms检查一次
-                    self.log_message("版本检查完成")
-                else:
-                    self.log_message("使用已完成的版本检查结果")
-                
-                # 4. 确保Git管理器已初始化
-                if not self.git_manager:
-                    self.git_manager = GitManager(project_path)
-                
-                # 从IAR项目文件中提取项目名称
-                iar_project_path = self.config.get('project_settings', {}).get('iar_project_path') or self.config.get('iar_project_path')
-                if iar_project_path and os.path.exists(iar_project_path):
-                    project_name = os.path.splitext(os.path.basename(iar_project_path))[0]
-                    self.config['project_name'] = project_name
-                    self.log_message(f"检测到项目名称: {project_name}")
-                
-                if not self.git_manager.is_git_repo():
-                    messagebox.showerror(self.get_text('msg_error'), self.get_text('msg_not_git_repo'))
-                    return
-                
-                # 4. 获取版本信息（使用已检查的结果）
-                fw_publish_dir = self.config.get('fw_publish_directory', './fw_publish')
-                
-                # 获取当前git分支
-                current_branch = None
-                if self.git_manager and self.git_manager.is_git_repo():
-                    git_info = self.git_manager.get_commit_info()
-                    current_branch = git_info.get('branch')
-                    if current_branch:
-                        logger.info(f"编译时检测到Git分支: {current_branch}")
-                    else:
-                        logger.warning("编译时无法获取Git分支信息")
-                
-                # 确保版本管理器已初始化
-                if not self.version_manager:
-                    self.version_manager = VersionManager(self.config.get('version_settings', {}), project_path, fw_publish_dir, current_branch)
-                    # 根据编译工具选择相应的信息管理器
-                    compile_tool = self.config.get('compile_tool', 'IAR')
-                    self.info_manager = InfoManagerFactory.create_manager(compile_tool, self.config)
-                
-                # 从已检查的结果中获取版本信息
-                main_file_path, _ = self.get_info_file_path_with_details(project_path)
-                if main_file_path:
-                    current_version = self.info_manager.extract_version_from_info_file(main_file_path)
-                else:
-                    current_version = None
-                
-                if current_version:
-                    next_version, explanation = self.version_manager.get_next_version(current_version)
-                    self.log_message(f"当前版本: {current_version}")
-                    self.log_message(f"下一个版本: {next_version}")
-                    self.log_message(explanation)
-                else:
-                    next_version = "V0.0.0.1"
-                    self.log_message(f"无法提取版本，使用默认版本: {next_version}")
-                
-                # 更新界面显示
-                self.firmware_version_var.set(f"{current_version or '未知'} -> {next_version}")
-                
-                # 3. 检查是否有未提交的更改并提交
-                has_changes = self.git_manager.has_uncommitted_changes()
-                commit_message = ""  # 用于存储最终的提交信息
-                
-                # 总是显示Git提交信息输入弹窗，让用户输入更新信息
-                self.update_status(self.get_text('input_update_info'))
-                default_message = f"发布{next_version}版本"
-                commit_message = self.show_git_commit_dialog(default_message)
-                
-                if not commit_message:  # 用户取消输入
-                    self.log_message("用户取消了更新信息输入")
-                    result = messagebox.askyesno("确认", 
-                                               "未输入更新信息，是否继续编译？\n建议输入更新信息用于Release Notes。")
-                    if not result:
-                        return
-                    # 如果用户选择继续，使用默认信息
-                    commit_message = default_message
-                
-                # 如果有未提交的更改，进行Git提交
-                if has_changes:
-                    self.update_status(self.get_text('committing_changes'))
-                    self.log_message(f"准备提交: {commit_message}")
-                    if self.git_manager.commit_changes(commit_message):
-                        self.log_message(f"Git提交成功: {commit_message}")
-                    else:
-                        self.log_message("Git提交失败，但继续编译流程")
-                else:
-                    self.log_message("没有未提交的更改，跳过Git提交")
-                
-                # 4. 如果版本号需要更新，更新信息文件
-                version_updated = False
-                if current_version and next_version != current_version:
-                    self.update_status(self.get_text('updating_version'))
-                    main_file_path, error_msg = self.get_info_file_path_with_details(project_path)
-                    if main_file_path:
-                        success, message = self.info_manager.update_version_in_info_file(main_file_path, next_version)
-                    else:
-                        success, message = False, f"未找到信息文件\n\n{error_msg}"
-                    if success:
-                        self.log_message(f"版本号更新成功: {message}")
-                        version_updated = True
-                    else:
-                        self.log_message(f"版本号更新失败: {message}")
-                        # 继续使用原版本号
-                        next_version = current_version
-                
-                # 5. 创建或更新Release Note（无论版本号是否更新都执行）
-                self.update_status(self.get_text('updating_release_notes'))
-                self.create_or_update_release_note(next_version, commit_message)
-                
-                # 6. 如果有未提交的更改（包括版本号更新和Release Note），再次提交
-                if self.git_manager.has_uncommitted_changes():
-                    self.update_status(self.get_text('committing_version_changes'))
-                    # 使用相同的提交信息，或者如果用户之前取消了，则使用默认信息
-                    if not commit_message:
-                        commit_message = f"发布{next_version}版本"
-                    
-                    self.log_message(f"准备提交: {commit_message}")
-                    if self.git_manager.commit_changes(commit_message):
-                        self.log_message(f"Git提交成功: {commit_message}")
-                    else:
-                        self.log_message("Git提交失败，但继续编译流程")
-                
-                # 7. 检查是否还有其他未提交的更改
-                has_changes = self.git_manager.has_uncommitted_changes()
-                if has_changes:
-                    result = messagebox.askyesno("确认", 
-                                               "检测到未提交的更改，是否继续编译？\n建议先提交更改。")
-                    if not result:
-                        return
-                
-                # 8. 获取commit ID（使用7位短ID，与SourceTree一致）
-                commit_id = self.git_manager.get_short_commit_id(7)
-                if not commit_id:
-                    messagebox.showerror(self.get_text('msg_error'), self.get_text('msg_cannot_get_commit_id'))
-                    return
-                
-                self.log_message(f"使用commit ID: {commit_id}")
-                
-                # 9. 根据编译工具初始化相应的编译器
-                compile_tool = self.config.get('compile_tool', 'IAR')
-                self.builder = BuilderFactory.create_builder(compile_tool, self.config, self.selected_configuration)
-                
-                # 10. 智能编译项目
-                self.update_status(self.get_text('compiling_project'))
-                # 记录编译开始时间
-                compile_start_time = datetime.now()
-                # 判断是否只有版本号变化
-                # 如果版本号相同，说明没有版本号变化，应该使用增量编译
-                # 如果版本号不同，说明有版本号变化，也应该使用增量编译
-                # 只有在没有版本号信息时才使用清理编译
-                only_version_changed = current_version is not None
-                
-                # 调用构建器进行智能编译
-                success, message = self.builder.smart_build(only_version_changed)
-                
-                if not success:
-                    messagebox.showerror(self.get_text('msg_compile_failed'), message)
-                    return
-                
-                # 获取bin文件信息
-                bin_info = self.builder.get_bin_file_info(self.selected_configuration)
-                
-                if not bin_info['exists']:
-                    messagebox.showerror(self.get_text('msg_compile_failed'), self.get_text('msg_compile_success_no_bin'))
-                    return
-                
-                self.log_message("编译成功")
-                
-                # 11. 修改二进制文件
-                self.update_status(self.get_text('modifying_binary'))
-                feature_settings = {
-                    'enable_git_commit_id': self.config.get('enable_git_commit_id', True),
-                    'enable_file_size': self.config.get('enable_file_size', True),
-                    'enable_bin_checksum': self.config.get('enable_bin_checksum', True),
-                    'enable_hash_value': self.config.get('enable_hash_value', True),
-                    'git_commit_id_keyword': self.config.get('git_commit_id_keyword', '__git_commit_id'),
-                    'file_size_keyword': self.config.get('file_size_keyword', '__file_size'),
-                    'bin_checksum_keyword': self.config.get('bin_checksum_keyword', '__bin_checksum'),
-                    'hash_value_keyword': self.config.get('hash_value_keyword', '__hash_value'),
-                    'firmware_version_keyword': self.config.get('firmware_version_keyword', '__Firmware_Version')
-                }
-                self.binary_modifier = BinaryModifier(self.config, feature_settings)
-                
-                # 记录二进制文件信息
-                self.log_message(f"准备修改二进制文件: {bin_info['path']}")
-                self.log_message(f"文件大小: {bin_info['size']} 字节")
-                self.log_message(f"Commit ID: {commit_id}")
-                
-                # 获取固件版本
-                firmware_version = self.firmware_version_var.get()
-                if firmware_version == "未检查":
-                    firmware_version = None
-                
-                success, message, mod_info = self.binary_modifier.modify_binary_file(
-                    bin_info['path'], commit_id, firmware_version)
-                
-                if not success:
-                    self.log_message(f"二进制文件修改失败: {message}")
-                    messagebox.showerror(self.get_text('msg_modify_failed'), message)
-                    return
-                
-                self.log_message("二进制文件修改成功")
-                self.log_message(f"修改详情: {message}")
-                
-                # 12. 处理文件
-                self.update_status(self.get_text('processing_files'))
-                compile_tool = self.config.get('compile_tool', 'IAR')
-                self.file_manager = FileManagerFactory.create_file_manager(compile_tool, self.config, project_path, self.path_manager)
-                
-                success, message, file_info = self.file_manager.process_bin_file(
-                    bin_info['path'], commit_id, version=next_version)
-                
-                if not success:
-                    messagebox.showerror(self.get_text('msg_file_process_failed'), message)
-                    return
-                
-                self.log_message("文件处理成功")
-                
-                # 13. 发布固件到fw_publish目录
-                self.update_status(self.get_text('publishing_firmware'))
-                try:
-                    add_timestamp = self.config.get('add_timestamp_to_filename', False)
-                    publish_out_file = self.config.get('publish_out_file', False)
-                    current_timestamp = datetime.now() if add_timestamp else None
-                    success, message, publish_info = self.file_manager.publish_firmware(
-                        bin_info['path'], commit_id, next_version, timestamp=current_timestamp, 
-                        add_timestamp=add_timestamp, publish_out_file=publish_out_file, 
-                        configuration=self.selected_configuration, branch_name=current_branch or "main")
-                    
-                    if not success:
-                        self.log_message(f"固件发布失败: {message}")
-                        messagebox.showerror(self.get_text('msg_firmware_publish_failed'), message)
-                        return
-                    
-                    self.log_message("固件发布成功")
-                    self.log_message(f"发布详情: {message}")
-                    
-                    # 14. 发布到远程目录（如果启用了）
-                    enable_remote_publish = self.config.get('enable_remote_publish', False)
-                    remote_publish_dir = self.config.get('remote_publish_directory', '').strip()
-                    self.log_message(f"检查远程发布配置: 启用={enable_remote_publish}, 目录='{remote_publish_dir}'")
-                    
-                    if enable_remote_publish and remote_publish_dir:
-                        self.update_status(self.get_text('publishing_remote'))
-                        try:
-                            # 获取当前分支名称
-                            git_info = self.git_manager.get_commit_info()
-                            branch_name = git_info.get('branch')
-                            if not branch_name:
-                                error_msg = "无法获取Git分支信息，请检查Git仓库状态"
-                                logger.error(error_msg)
-                                self.log_message(error_msg)
-                                return
-                            else:
-                                logger.info(f"检测到Git分支: {branch_name}")
-                                self.log_message(f"当前Git分支: {branch_name}")
-                            
-                            # 使用重命名后的bin文件路径
-                            renamed_bin_path = publish_info.get('destination_path')
-                            if not renamed_bin_path or not os.path.exists(renamed_bin_path):
-                                self.log_message("重命名后的bin文件不存在，使用原始文件")
-                                renamed_bin_path = bin_info['path']
-                            
-                            # 获取Release Notes文件路径（在项目根目录）
-                            project_root = self.project_path_var.get()
-                            if not project_root:
-                                # 如果没有设置项目路径，使用当前脚本所在目录
-                                project_root = os.path.dirname(os.path.abspath(__file__))
-                            else:
-                                project_root = os.path.abspath(project_root)
-                            release_note_path = os.path.join(project_root, "RELEASE_NOTES.md")
-                            
-                            self.log_message(f"远程发布文件: bin={renamed_bin_path}, release_note={release_note_path}")
-                            
-                            # 发布到远程目录
-                            publish_out_file = self.config.get('publish_out_file', False)
-                            remote_success, remote_message, remote_info = self.file_manager.publish_to_remote(
-                                renamed_bin_path, release_note_path, branch_name, publish_out_file, 
-                                configuration=self.selected_configuration)
-                            
-                            if remote_success:
-                                self.log_message("远程发布成功")
-                                self.log_message(f"远程发布详情: {remote_message}")
-                            else:
-                                self.log_message(f"远程发布失败: {remote_message}")
-                                # 远程发布失败不影响主流程，只记录日志
-                        except Exception as e:
-                            self.log_message(f"远程发布异常: {e}")
-                            # 远程发布异常不影响主流程，只记录日志
-                    
-                except Exception as e:
-                    error_msg = f"发布固件时发生异常: {e}"
-                    self.log_message(error_msg)
-                    messagebox.showerror(self.get_text('msg_firmware_publish_error'), error_msg)
-                    return
-                
-                # 15. 完成
-                self.update_status(self.get_text('build_process_complete'))
-                # 计算编译时间
-                compile_end_time = datetime.now()
-                compile_duration = compile_end_time - compile_start_time
-                compile_time_str = f"{compile_duration.total_seconds():.1f}秒"
-                
-                success_message = f"{self.get_text('msg_compile_complete')}\n\n编译时间: {compile_time_str}\n\n{message}"
-                messagebox.showinfo(self.get_text('msg_success'), success_message)
-                
+                pipeline = self._create_pipeline()
+                self._running_pipeline = pipeline
+                pipeline.run()
             except Exception as e:
                 self.log_message(f"编译流程异常: {e}")
                 messagebox.showerror(self.get_text('msg_error'), f"{self.get_text('msg_compile_exception')}: {e}")
             finally:
+                self._running_pipeline = None
+                if pipeline:
+                    self._adopt_pipeline(pipeline)
                 self.progress_bar.stop()
-                # 编译完成后重置标志位，准备下一轮循环
-                self.git_status_checked = False
-                self.version_checked = False
-                self.log_message("标志位已重置，准备下一轮编译")
         
         threading.Thread(target=build_thread, daemon=True).start()
     
-    
     def open_firmware_directory(self):
         """打开固件发布目录"""
         try:
@@ -2059,7 +1265,7 @@ class MCUAutoBuildApp:
             self.log_message("正在从IAR项目文件自动获取flash偏移地址...")
             
             # 使用PathManager获取flash偏移地址
-            flash_offset = self.path_manager.get_flash_offset_from_configuration(self.selected_configuration)
+            flash_offset = self.get_flash_offset(self.selected_configuration)
             
             if flash_offset:
                 # 更新界面显示
@@ -2425,126 +1631,13 @@ class MCUAutoBuildApp:
         center_dialog()
         dialog.after(100, center_dialog)
     
-    def _format_changes_for_release_note(self, commit_message: str) -> str:
-        """
-        格式化用户输入的更新信息，以分号或句号为界换行
-        
-        Args:
-            commit_message: 原始提交信息
-            
-        Returns:
-            str: 格式化后的文本
-        """
-        try:
-            # 移除可能的前缀（如"发布V1.0.0.1版本 - "）
-            if " - " in commit_message:
-                # 提取用户实际输入的部分
-                user_input = commit_message.split(" - ", 1)[1]
-            else:
-                user_input = commit_message
-            
-            # 按分号和句号分割文本
-            import re
-            # 使用正则表达式分割，支持中英文标点符号
-            sentences = re.split(r'[;；。.]', user_input)
-            
-            # 过滤空字符串并去除首尾空格
-            sentences = [s.strip() for s in sentences if s.strip()]
-            
-            # 如果只有一个句子，直接返回
-            if len(sentences) <= 1:
-                return f"- {user_input}"
-            
-            # 多个句子，每个句子一行，添加项目符号
-            formatted_lines = []
-            for sentence in sentences:
-                if sentence:  # 确保句子不为空
-                    formatted_lines.append(f"- {sentence}")
-            
-            return "\n".join(formatted_lines)
-            
-        except Exception as e:
-            # 如果格式化失败，返回原始文本
-            self.log_message(f"格式化更新信息失败: {e}")
-            return f"- {commit_message}"
-    
-    def create_or_update_release_note(self, version: str, commit_message: str, 
-                                    timestamp: datetime = None) -> bool:
-        """
-        创建或更新release note文件
-        
-        Args:
-            version: 版本号
-            commit_message: 提交信息
-            timestamp: 时间戳，如果为None则使用当前时间
-            
-        Returns:
-            bool: 是否成功
-        """
-        try:
-            if timestamp is None:
-                timestamp = datetime.now()
-            
-            # 获取项目根目录
-            project_root = self.project_path_var.get()
-            if not project_root:
-                # 如果没有设置项目路径，使用当前脚本所在目录
-                project_root = os.path.dirname(os.path.abspath(__file__))
-            else:
-                project_root = os.path.abspath(project_root)
-            
-            # release note文件路径（放在项目主目录）
-            release_note_path = os.path.join(project_root, "RELEASE_NOTES.md")
-            
-            # 检查文件是否存在
-            file_exists = os.path.exists(release_note_path)
-            
-            # 准备新的条目
-            new_entry = f"## {version} - {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n"
-            
-            # 格式化用户输入的更新信息，以分号或句号为界换行
-            formatted_changes = self._format_changes_for_release_note(commit_message)
-            new_entry += f"**Changes:**\n{formatted_changes}\n\n"
-            
-            if file_exists:
-                # 读取现有内容
-                with open(release_note_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 在文件开头插入新条目
-                if content.strip():
-                    content = new_entry + content
-                else:
-                    content = new_entry
-                
-                # 写入更新后的内容
-                with open(release_note_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
-                self.log_message(self.get_text('release_note_updated'))
-            else:
-                # 创建新文件
-                header = f"# {self.get_text('release_note_title')}\n\n"
-                header += "本文档记录了固件版本的更新历史。\n\n"
-                header += "---\n\n"
-                
-                content = header + new_entry
-                
-                with open(release_note_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
-                self.log_message(self.get_text('release_note_created'))
-            
-            self.log_message(f"Release note文件路径: {release_note_path}")
-            return True
-            
-        except Exception as e:
-            self.log_message(f"创建/更新release note失败: {e}")
-            return False
-    
     def on_closing(self):
         """关闭应用程序"""
         logger.info("应用程序关闭")
+        # 取消正在执行的编译流程，不再开始后续阶段
+        if self._running_pipeline:
+            self._running_pipeline.cancel()
+        self.project_watcher.stop()
         self.root.destroy()
     
     def run(self):
@@ -2565,11 +1658,7 @@ class MCUAutoBuildApp:
             
             # 根据编译工具查找相应的项目文件
             file_extension = ProjectAnalyzerFactory.get_file_extension(compile_tool)
-            project_files = []
-            for root, dirs, files in os.walk(project_path):
-                for file in files:
-                    if file.endswith(file_extension):
-                        project_files.append(os.path.join(root, file))
+            project_files = self.find_project_files(project_path, compile_tool)
             
             if not project_files:
                 self.log_message(f"未找到{compile_tool}项目文件({file_extension})")
@@ -2580,9 +1669,7 @@ class MCUAutoBuildApp:
             
             # 解析第一个项目文件（通常只有一个）
             project_file = project_files[0]
-            analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
-            analyze_method = getattr(analyzer, ProjectAnalyzerFactory.get_analyze_method_name(compile_tool))
-            result = analyze_method(project_file)
+            result = self.analyze_project_file(compile_tool, project_file)
             
             if result and result.get('configurations'):
                 self.available_configurations = result['configurations']
@@ -2625,6 +1712,12 @@ class MCUAutoBuildApp:
                         self.log_message(self.get_text('config_selected').format(name=selected_name))
                         self.log_message(self.get_text('output_directory').format(dir=config['output_dir_abs']))
                         self.log_message(self.get_text('debug_mode').format(mode=config['debug']))
+                        
+                        # 使用项目分析阶段得到的flash偏移地址，切换配置无需重新解析链接脚本
+                        flash_offset = config.get('flash_offset')
+                        if flash_offset:
+                            self.config.setdefault('binary_settings', {})['bin_start_address'] = flash_offset
+                            self._update_flash_start_addr_display()
                         break
         except Exception as e:
             self.log_message(f"{self.get_text('config_selection_failed')}: {e}")
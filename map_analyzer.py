@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+链接器map文件尺寸分析模块
+提供IAR/MDK map解析器共用的尺寸报告模型、逐行流式解析入口、版本间尺寸差异比较和发布尺寸历史
+"""
+
+import io
+import os
+import re
+import json
+import threading
+from datetime import datetime
+from lib_logger import logger
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def find_map_file(directories: Sequence[str], base_name: str, extensions: Sequence[str] = ('.map',)) -> Optional[str]:
+    """
+    在候选目录中查找链接器输出的map文件
+
+    Args:
+        directories: 候选目录，按优先级排列
+        base_name: 文件名（不含扩展名），通常为项目名或输出名
+        extensions: 候选扩展名，按优先级排列
+
+    Returns:
+        str: 第一个存在的map文件路径，未找到返回None
+    """
+    for extension in extensions:
+        for directory in directories:
+            if not directory:
+                continue
+            candidate = os.path.join(directory, f"{base_name}{extension}")
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def normalize_section_name(name: str) -> str:
+    """
+    归并输入节名称，便于按节统计
+
+    例如 i.main、.text.main 归并为 .text，.ARM.Collect$$$$00000000 归并为 .ARM.Collect
+
+    Args:
+        name: 输入节名称
+
+    Returns:
+        str: 归并后的节名称
+    """
+    if name.startswith('i.'):
+        return '.text'
+    name = name.split('$$', 1)[0]
+    for prefix in ('.text.', '.rodata.', '.constdata.', '.conststring.', '.data.', '.bss.'):
+        if name.startswith(prefix):
+            return prefix[:-1]
+    return name or '<unnamed>'
+
+
+def format_size(value: int) -> str:
+    """格式化字节数"""
+    if abs(value) >= 1024:
+        return f"{value} ({value / 1024:.2f} KB)"
+    return f"{value}"
+
+
+def format_delta(value: int) -> str:
+    """格式化带符号的字节差值"""
+    return f"{value:+d}"
+
+
+class MapSizeReport:
+    """map文件尺寸报告：按目标文件和按节统计的ROM/RAM占用"""
+
+    def __init__(self, source: str = '', toolchain: str = ''):
+        """
+        初始化尺寸报告
+
+        Args:
+            source: map文件路径
+            toolchain: 工具链名称，'IAR' 或 'MDK'
+        """
+        self.source = source
+        self.toolchain = toolchain
+        # 目标文件名 -> {'rom': 字节, 'ram': 字节, 以及工具链原始列}
+        self.objects: Dict[str, Dict[str, int]] = {}
+        # 节名称 -> {'rom': 字节, 'ram': 字节}
+        self.sections: Dict[str, Dict[str, int]] = {}
+        # 映像总计，map文件未给出时由目标文件累加
+        self.totals: Dict[str, int] = {}
+
+    def add_object(self, name: str, rom: int, ram: int, **columns):
+        """累加目标文件的占用"""
+        entry = self.objects.setdefault(name, {'rom': 0, 'ram': 0})
+        entry['rom'] += rom
+        entry['ram'] += ram
+        for column, value in columns.items():
+            entry[column] = entry.get(column, 0) + value
+
+    def add_section(self, name: str, rom: int = 0, ram: int = 0):
+        """累加节的占用"""
+        entry = self.sections.setdefault(name, {'rom': 0, 'ram': 0})
+        entry['rom'] += rom
+        entry['ram'] += ram
+
+    def finalize(self):
+        """补全映像总计"""
+        for key in ('rom', 'ram'):
+            if key not in self.totals:
+                self.totals[key] = sum(entry[key] for entry in self.objects.values())
+
+    @property
+    def rom(self) -> int:
+        """ROM总占用"""
+        return self.totals.get('rom', 0)
+
+    @property
+    def ram(self) -> int:
+        """RAM总占用"""
+        return self.totals.get('ram', 0)
+
+    def top_objects(self, count: int = 10, key: str = 'rom') -> List[tuple]:
+        """获取占用最大的目标文件 [(名称, 字节)]"""
+        ranked = sorted(self.objects.items(), key=lambda item: item[1].get(key, 0), reverse=True)
+        return [(name, entry.get(key, 0)) for name, entry in ranked[:count] if entry.get(key, 0)]
+
+    def to_dict(self) -> Dict:
+        """转换为可JSON序列化的字典"""
+        return {
+            'source': self.source,
+            'toolchain': self.toolchain,
+            'totals': self.totals,
+            'objects': self.objects,
+            'sections': self.sections
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MapSizeReport':
+        """从字典恢复尺寸报告"""
+        report = cls(data.get('source', ''), data.get('toolchain', ''))
+        report.totals = dict(data.get('totals', {}))
+        report.objects = {name: dict(entry) for name, entry in data.get('objects', {}).items()}
+        report.sections = {name: dict(entry) for name, entry in data.get('sections', {}).items()}
+        return report
+
+
+class MapFileParser:
+    """map文件解析器基类，逐行读取文件，不一次性载入内存"""
+
+    # 工具链名称，由子类指定
+    TOOLCHAIN = ''
+
+    def parse_lines(self, lines: Iterable[str], report: MapSizeReport):
+        """
+        逐行解析map内容，由子类实现
+
+        Args:
+            lines: 行迭代器
+            report: 写入结果的尺寸报告
+        """
+        raise NotImplementedError
+
+    def parse(self, content: str, source: str = '') -> MapSizeReport:
+        """
+        解析map文本内容
+
+        Args:
+            content: map文件内容
+            source: 来源路径（仅用于记录）
+
+        Returns:
+            MapSizeReport: 尺寸报告
+        """
+        report = MapSizeReport(source, self.TOOLCHAIN)
+        self.parse_lines(io.StringIO(content), report)
+        report.finalize()
+        return report
+
+    def parse_file(self, map_path: str) -> Optional[MapSizeReport]:
+        """
+        流式解析map文件
+
+        Args:
+            map_path: map文件路径
+
+        Returns:
+            Optional[MapSizeReport]: 尺寸报告，失败返回None
+        """
+        if not map_path or not os.path.isfile(map_path):
+            logger.warning(f"map文件不存在: {map_path}")
+            return None
+
+        report = MapSizeReport(map_path, self.TOOLCHAIN)
+        try:
+            with open(map_path, 'r', encoding='utf-8', errors='replace') as f:
+                self.parse_lines(f, report)
+        except Exception as e:
+            logger.error(f"解析map文件失败: {map_path}, 错误: {e}")
+            return None
+
+        report.finalize()
+        logger.debug(f"map文件解析完成: {map_path}, 目标文件 {len(report.objects)} 个, "
+                     f"ROM {report.rom} 字节, RAM {report.ram} 字节")
+        return report
+
+
+def compare_size_reports(previous: MapSizeReport, current: MapSizeReport) -> Dict:
+    """
+    比较两次编译的尺寸报告
+
+    Args:
+        previous: 上一版本的尺寸报告
+        current: 本次的尺寸报告
+
+    Returns:
+        Dict: 包含总计差值、按目标文件和按节的差异列表（按变化量从大到小排序）
+    """
+    def diff_entries(old: Dict[str, Dict[str, int]], new: Dict[str, Dict[str, int]]) -> List[Dict]:
+        changes = []
+        for name in set(old) | set(new):
+            old_entry = old.get(name, {})
+            new_entry = new.get(name, {})
+            rom_delta = new_entry.get('rom', 0) - old_entry.get('rom', 0)
+            ram_delta = new_entry.get('ram', 0) - old_entry.get('ram', 0)
+            if not rom_delta and not ram_delta:
+                continue
+            status = 'added' if name not in old else 'removed' if name not in new else 'changed'
+            changes.append({
+                'name': name,
+                'status': status,
+                'rom': new_entry.get('rom', 0),
+                'ram': new_entry.get('ram', 0),
+                'rom_delta': rom_delta,
+                'ram_delta': ram_delta
+            })
+        changes.sort(key=lambda c: (abs(c['rom_delta']) + abs(c['ram_delta']), c['name']), reverse=True)
+        return changes
+
+    return {
+        'rom': current.rom,
+        'ram': current.ram,
+        'rom_delta': current.rom - previous.rom,
+        'ram_delta': current.ram - previous.ram,
+        'objects': diff_entries(previous.objects, current.objects),
+        'sections': diff_entries(previous.sections, current.sections)
+    }
+
+
+def format_size_summary(report: MapSizeReport, flash_size: int = None, ram_size: int = None,
+                        top_count: int = 5) -> List[str]:
+    """
+    生成尺寸摘要描述
+
+    Args:
+        report: 尺寸报告
+        flash_size: Flash区域大小，提供时输出占用百分比
+        ram_size: RAM区域大小，提供时输出占用百分比
+        top_count: 列出的最大目标文件数量
+
+    Returns:
+        List[str]: 描述行
+    """
+    rom_line = f"ROM: {format_size(report.rom)} 字节"
+    if flash_size:
+        rom_line += f"，占用 {report.rom * 100.0 / flash_size:.1f}% / {format_size(flash_size)}"
+    ram_line = f"RAM: {format_size(report.ram)} 字节"
+    if ram_size:
+        ram_line += f"，占用 {report.ram * 100.0 / ram_size:.1f}% / {format_size(ram_size)}"
+
+    lines = [rom_line, ram_line]
+    top = report.top_objects(top_count)
+    if top:
+        lines.append("ROM占用最大的目标文件: " + ", ".join(f"{name} {size}" for name, size in top))
+    return lines
+
+
+def format_size_delta(comparison: Dict, previous_version: str = '', limit: int = 10) -> List[str]:
+    """
+    生成尺寸差异描述
+
+    Args:
+        comparison: compare_size_reports 的结果
+        previous_version: 对比的上一版本号
+        limit: 最多列出的目标文件数量
+
+    Returns:
+        List[str]: 描述行
+    """
+    against = f"（对比 {previous_version}）" if previous_version else ''
+    lines = [f"ROM {format_delta(comparison['rom_delta'])} 字节，RAM {format_delta(comparison['ram_delta'])} 字节{against}"]
+    status_text = {'added': '新增', 'removed': '移除', 'changed': ''}
+    for change in comparison['objects'][:limit]:
+        status = status_text[change['status']]
+        lines.append(f"{change['name']}: ROM {format_delta(change['rom_delta'])}, "
+                     f"RAM {format_delta(change['ram_delta'])}" + (f" ({status})" if status else ''))
+    remaining = len(comparison['objects']) - limit
+    if remaining > 0:
+        lines.append(f"... 其余 {remaining} 个目标文件有变化")
+    return lines
+
+
+class SizeHistory:
+    """发布尺寸历史，按分支和编译配置保存在固件发布目录下"""
+
+    HISTORY_DIR = 'size_reports'
+    # 每个分支/配置保留的历史条目数量
+    MAX_ENTRIES = 50
+
+    def __init__(self, publish_directory: str):
+        """
+        初始化发布尺寸历史
+
+        Args:
+            publish_directory: 固件发布目录
+        """
+        self.history_dir = os.path.join(publish_directory, self.HISTORY_DIR)
+        self._lock = threading.Lock()
+
+    def _history_path(self, branch_name: str, configuration: str) -> str:
+        """获取分支/配置对应的历史文件路径"""
+        safe_name = re.sub(r'[^\w.-]+', '_', f"{branch_name or 'main'}__{configuration or 'default'}")
+        return os.path.join(self.history_dir, f"{safe_name}.json")
+
+    def load_entries(self, branch_name: str, configuration: str) -> List[Dict]:
+        """
+        读取分支/配置的历史条目（按时间先后排列）
+
+        Returns:
+            List[Dict]: 历史条目
+        """
+        path = self._history_path(branch_name, configuration)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', [])
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning(f"读取尺寸历史失败: {path} ({e})")
+            return []
+
+    def get_previous(self, branch_name: str, configuration: str, version: str = None) -> Optional[Dict]:
+        """
+        获取上一个发布版本的历史条目
+
+        Args:
+            branch_name: 分支名称
+            configuration: 编译配置名称
+            version: 当前版本号，同版本的重复发布不作为对比基准
+
+        Returns:
+            Optional[Dict]: 历史条目，其中report为MapSizeReport；无历史返回None
+        """
+        for entry in reversed(self.load_entries(branch_name, configuration)):
+            if version and entry.get('version') == version:
+                continue
+            entry = dict(entry)
+            entry['report'] = MapSizeReport.from_dict(entry.get('report', {}))
+            return entry
+        return None
+
+    def record(self, branch_name: str, configuration: str, version: str, commit_id: str,
+               report: MapSizeReport, firmware_path: str = None) -> bool:
+        """
+        记录一次发布的尺寸报告
+
+        Args:
+            branch_name: 分支名称
+            configuration: 编译配置名称
+            version: 版本号
+            commit_id: Git提交ID
+            report: 尺寸报告
+            firmware_path: 发布的固件文件路径
+
+        Returns:
+            bool: 是否成功
+        """
+        path = self._history_path(branch_name, configuration)
+        entry = {
+            'version': version,
+            'commit_id': commit_id,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'firmware': os.path.basename(firmware_path) if firmware_path else None,
+            'report': report.to_dict()
+        }
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with self._lock:
+                entries = self.load_entries(branch_name, configuration)
+                entries.append(entry)
+                os.makedirs(self.history_dir, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'branch': branch_name, 'configuration': configuration,
+                               'entries': entries[-self.MAX_ENTRIES:]}, f, ensure_ascii=False, indent=1)
+                os.replace(temp_path, path)
+            logger.info(f"尺寸报告已记录: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"记录尺寸报告失败: {path}, 错误: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+
+if __name__ == "__main__":
+    # 测试尺寸差异比较
+    old = MapSizeReport('old.map', 'IAR')
+    old.add_object('main.o', 1200, 64)
+    old.add_object('uart.o', 800, 16)
+    old.finalize()
+    new = MapSizeReport('new.map', 'IAR')
+    new.add_object('main.o', 1400, 64)
+    new.add_object('uart.o', 800, 24)
+    new.add_object('crc.o', 256, 0)
+    new.finalize()
+    for line in format_size_summary(new, flash_size=0x80000, ram_size=0x20000):
+        print(line)
+    for line in format_size_delta(compare_size_reports(old, new), 'V1.0.0.1'):
+        print(line)
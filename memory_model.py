@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+链接脚本内存模型模块
+提供ICF/SCT共用的词法分析、表达式求值，以及基于区间树的内存区域模型
+"""
+
+import os
+import re
+import threading
+from lib_logger import logger
+from typing import Callable, Dict, List, Optional, Tuple
+from parse_cache import ParseCache
+
+
+class LinkerScriptError(ValueError):
+    """链接脚本解析错误"""
+
+
+# 词法单元类型
+TOKEN_NUMBER = 'number'
+TOKEN_IDENT = 'ident'
+TOKEN_STRING = 'string'
+TOKEN_OP = 'op'
+
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<number>0[xX][0-9a-fA-F]+[KMGkmg]?|\d+[KMGkmg]?)
+  | (?P<string>"[^"]*")
+  | (?P<ident>[A-Za-z_.$][\w.$]*)
+  | (?P<op><<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^~!<>()\[\]{}:;,?=])
+  | (?P<other>.)
+''', re.VERBOSE)
+
+_SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def strip_comments(text: str, line_comment_chars: Tuple[str, ...] = ('//',)) -> str:
+    """
+    移除块注释和行注释，保留换行以便错误定位
+
+    Args:
+        text: 链接脚本内容
+        line_comment_chars: 行注释起始符，SCT文件额外使用 ';'
+
+    Returns:
+        str: 去除注释后的内容
+    """
+    text = re.sub(r'/\*.*?\*/', lambda m: '\n' * m.group(0).count('\n'), text, flags=re.S)
+    pattern = '|'.join(re.escape(c) for c in line_comment_chars)
+    return re.sub(rf'(?:{pattern})[^\n]*', '', text)
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """
+    将链接脚本切分为词法单元
+
+    Args:
+        text: 已去除注释的链接脚本内容
+
+    Returns:
+        List[Tuple[str, str]]: (类型, 文本)列表
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'ws':
+            continue
+        # 无法识别的字符（例如SCT输入节描述中的'*'通配符已被op覆盖）按运算符处理
+        tokens.append((TOKEN_OP if kind == 'other' else kind, match.group(0)))
+    return tokens
+
+
+def parse_number(text: str) -> int:
+    """解析数字字面量，支持0x前缀和K/M/G后缀"""
+    multiplier = 1
+    suffix = text[-1].upper()
+    if suffix in _SIZE_SUFFIXES:
+        multiplier = _SIZE_SUFFIXES[suffix]
+        text = text[:-1]
+    return int(text, 0) * multiplier
+
+
+class ExpressionEvaluator:
+    """链接脚本表达式求值器（C语言运算符优先级）"""
+
+    # 二元运算符优先级，数字越大优先级越高
+    _BINARY_PRECEDENCE = {
+        '||': 1, '&&': 2, '|': 3, '^': 4, '&': 5,
+        '==': 6, '!=': 6, '<': 7, '<=': 7, '>': 7, '>=': 7,
+        '<<': 8, '>>': 8, '+': 9, '-': 9, '*': 10, '/': 10, '%': 10
+    }
+
+    def __init__(self, symbols: Dict[str, int], functions: Dict[str, Callable] = None,
+                 name_functions: Dict[str, Callable[[str], int]] = None):
+        """
+        初始化表达式求值器
+
+        Args:
+            symbols: 符号表
+            functions: 以求值后参数调用的函数，例如 minimum、AlignExpr
+            name_functions: 以符号名调用的函数，例如 isdefinedsymbol、ImageLimit
+        """
+        self.symbols = symbols
+        self.functions = {k.lower(): v for k, v in (functions or {}).items()}
+        self.name_functions = {k.lower(): v for k, v in (name_functions or {}).items()}
+        self.name_functions.setdefault('isdefinedsymbol', lambda name: int(name in self.symbols))
+
+    def evaluate(self, tokens: List[Tuple[str, str]], pos: int = 0) -> Tuple[int, int]:
+        """
+        从指定位置开始求值一个表达式，遇到无法继续的词法单元即停止
+
+        Args:
+            tokens: 词法单元列表
+            pos: 起始位置
+
+        Returns:
+            Tuple[int, int]: (表达式值, 表达式结束后的位置)
+
+        Raises:
+            LinkerScriptError: 表达式无效或引用了未定义符号
+        """
+        self._tokens = tokens
+        value, pos = self._parse_conditional(pos)
+        return value, pos
+
+    def _peek(self, pos: int) -> Tuple[str, str]:
+        return self._tokens[pos] if pos < len(self._tokens) else ('', '')
+
+    def _parse_conditional(self, pos: int) -> Tuple[int, int]:
+        condition, pos = self._parse_binary(pos, 1)
+        if self._peek(pos) == (TOKEN_OP, '?'):
+            if_true, pos = self._parse_conditional(pos + 1)
+            if self._peek(pos) != (TOKEN_OP, ':'):
+                raise LinkerScriptError("条件表达式缺少 ':'")
+            if_false, pos = self._parse_conditional(pos + 1)
+            return (if_true if condition else if_false), pos
+        return condition, pos
+
+    def _parse_binary(self, pos: int, min_precedence: int) -> Tuple[int, int]:
+        left, pos = self._parse_unary(pos)
+        while True:
+            kind, text = self._peek(pos)
+            precedence = self._BINARY_PRECEDENCE.get(text) if kind == TOKEN_OP else None
+            if precedence is None or precedence < min_precedence:
+                return left, pos
+            right, pos = self._parse_binary(pos + 1, precedence + 1)
+            left = self._apply(text, left, right)
+
+    @staticmethod
+    def _apply(op: str, left: int, right: int) -> int:
+        if op in ('/', '%') and right == 0:
+            raise LinkerScriptError("表达式除数为0")
+        return {
+            '||': lambda: int(bool(left) or bool(right)),
+            '&&': lambda: int(bool(left) and bool(right)),
+            '|': lambda: left | right, '^': lambda: left ^ right, '&': lambda: left & right,
+            '==': lambda: int(left == right), '!=': lambda: int(left != right),
+            '<': lambda: int(left < right), '<=': lambda: int(left <= right),
+            '>': lambda: int(left > right), '>=': lambda: int(left >= right),
+            '<<': lambda: left << right, '>>': lambda: left >> right,
+            '+': lambda: left + right, '-': lambda: left - right,
+            '*': lambda: left * right, '/': lambda: int(left / right), '%': lambda: left % right,
+        }[op]()
+
+    def _parse_unary(self, pos: int) -> Tuple[int, int]:
+        kind, text = self._peek(pos)
+        if kind == TOKEN_OP and text in ('-', '+', '~', '!'):
+            value, pos = self._parse_unary(pos + 1)
+            return {'-': -value, '+': value, '~': ~value & 0xFFFFFFFF, '!': int(not value)}[text], pos
+        return self._parse_primary(pos)
+
+    def _parse_primary(self, pos: int) -> Tuple[int, int]:
+        kind, text = self._peek(pos)
+        if kind == TOKEN_NUMBER:
+            return parse_number(text), pos + 1
+        if kind == TOKEN_OP and text == '(':
+            value, pos = self._parse_conditional(pos + 1)
+            if self._peek(pos) != (TOKEN_OP, ')'):
+                raise LinkerScriptError("表达式缺少 ')'")
+            return value, pos + 1
+        if kind == TOKEN_IDENT:
+            if self._peek(pos + 1) == (TOKEN_OP, '('):
+                return self._parse_call(text, pos + 2)
+            if text in self.symbols:
+                return self.symbols[text], pos + 1
+            raise LinkerScriptError(f"未定义的符号: {text}")
+        raise LinkerScriptError(f"无效的表达式起始: {text or '<EOF>'}")
+
+    def _parse_call(self, name: str, pos: int) -> Tuple[int, int]:
+        lname = name.lower()
+        if lname in self.name_functions:
+            kind, arg = self._peek(pos)
+            if kind != TOKEN_IDENT or self._peek(pos + 1) != (TOKEN_OP, ')'):
+                raise LinkerScriptError(f"{name}() 需要一个符号名参数")
+            return self.name_functions[lname](arg), pos + 2
+        if lname not in self.functions:
+            raise LinkerScriptError(f"不支持的函数: {name}")
+        args = []
+        while self._peek(pos) != (TOKEN_OP, ')'):
+            value, pos = self._parse_conditional(pos)
+            args.append(value)
+            if self._peek(pos) == (TOKEN_OP, ','):
+                pos += 1
+            elif self._peek(pos) != (TOKEN_OP, ')'):
+                raise LinkerScriptError(f"{name}() 参数列表无效")
+        return self.functions[lname](*args), pos + 1
+
+
+def skip_statement(tokens: List[Tuple[str, str]], pos: int) -> int:
+    """
+    跳过当前语句，直到花括号外层的 ';' 或与当前层匹配的 '}'
+
+    Args:
+        tokens: 词法单元列表
+        pos: 起始位置
+
+    Returns:
+        int: 语句结束后的位置
+    """
+    depth = 0
+    while pos < len(tokens):
+        kind, text = tokens[pos]
+        pos += 1
+        if kind != TOKEN_OP:
+            continue
+        if text == '{':
+            depth += 1
+        elif text == '}':
+            depth -= 1
+            if depth < 0:
+                return pos - 1
+        elif text == ';' and depth == 0:
+            return pos
+    return pos
+
+
+def skip_block(tokens: List[Tuple[str, str]], pos: int) -> int:
+    """
+    跳过以 '{' 开始的花括号块
+
+    Args:
+        tokens: 词法单元列表
+        pos: '{' 所在位置
+
+    Returns:
+        int: 匹配的 '}' 之后的位置
+    """
+    depth = 0
+    while pos < len(tokens):
+        kind, text = tokens[pos]
+        pos += 1
+        if kind == TOKEN_OP and text == '{':
+            depth += 1
+        elif kind == TOKEN_OP and text == '}':
+            depth -= 1
+            if depth == 0:
+                return pos
+    return pos
+
+
+def classify_memory_type(name: str) -> str:
+    """
+    根据区域名称推断存储器类型
+
+    Args:
+        name: 区域名称
+
+    Returns:
+        str: 'flash'、'ram' 或 'unknown'
+    """
+    upper = name.upper()
+    if re.search(r'RAM|DTCM|ITCM|CCM|STACK|HEAP', upper):
+        return 'ram'
+    if re.search(r'ROM|FLASH|TEXT|CODE', upper):
+        return 'flash'
+    return 'unknown'
+
+
+class MemoryRegion:
+    """内存区域"""
+
+    def __init__(self, name: str, start: int, size: int, memory_type: str = 'unknown',
+                 kind: str = 'region', load_region: str = None, attributes: List[str] = None):
+        """
+        初始化内存区域
+
+        Args:
+            name: 区域名称
+            start: 起始地址（执行地址）
+            size: 区域大小（字节）
+            memory_type: 存储器类型，'flash'、'ram' 或 'unknown'
+            kind: 区域种类，ICF为 'region'，SCT为 'load' 或 'exec'
+            load_region: SCT执行区域所属的加载区域名称
+            attributes: 区域属性，例如 EMPTY、UNINIT
+        """
+        self.name = name
+        self.start = start
+        self.size = size
+        self.memory_type = memory_type
+        self.kind = kind
+        self.load_region = load_region
+        self.attributes = attributes or []
+
+    @property
+    def end(self) -> int:
+        """区域结束地址（不含）"""
+        return self.start + self.size
+
+    def contains(self, address: int, length: int = 1) -> bool:
+        """判断 [address, address + length) 是否完全落在区域内"""
+        return self.start <= address and address + length <= self.end
+
+    def to_dict(self) -> Dict:
+        """转换为可JSON序列化的字典"""
+        return {
+            'name': self.name,
+            'start': self.start,
+            'size': self.size,
+            'memory_type': self.memory_type,
+            'kind': self.kind,
+            'load_region': self.load_region,
+            'attributes': self.attributes
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MemoryRegion':
+        """从字典恢复内存区域"""
+        return cls(data['name'], data['start'], data['size'], data.get('memory_type', 'unknown'),
+                   data.get('kind', 'region'), data.get('load_region'), data.get('attributes'))
+
+    def __repr__(self) -> str:
+        return f"MemoryRegion({self.name}, 0x{self.start:08X}-0x{self.end - 1:08X}, {self.memory_type})"
+
+
+class IntervalTree:
+    """静态区间树（按起始地址平衡构建，节点记录子树最大结束地址）"""
+
+    def __init__(self, regions: List[MemoryRegion]):
+        """
+        构建区间树
+
+        Args:
+            regions: 内存区域列表，区域之间可以重叠
+        """
+        ordered = sorted((r for r in regions if r.size > 0), key=lambda r: (r.start, r.end))
+        self._root = self._build(ordered, 0, len(ordered))
+
+    def _build(self, ordered: List[MemoryRegion], lo: int, hi: int) -> Optional[list]:
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        left = self._build(ordered, lo, mid)
+        right = self._build(ordered, mid + 1, hi)
+        max_end = max(ordered[mid].end, left[1] if left else 0, right[1] if right else 0)
+        # 节点结构: [区域, 子树最大结束地址, 左子树, 右子树]
+        return [ordered[mid], max_end, left, right]
+
+    def overlapping(self, start: int, end: int) -> List[MemoryRegion]:
+        """
+        查找与 [start, end) 相交的所有区域
+
+        Returns:
+            List[MemoryRegion]: 按起始地址排序的区域列表
+        """
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node[1] <= start:
+                # 子树中所有区域都在查询区间之前结束
+                continue
+            region, _, left, right = node
+            stack.append(left)
+            if region.start < end:
+                if region.end > start:
+                    result.append(region)
+                # 只有当前节点起始地址小于查询结束地址时，右子树才可能相交
+                stack.append(right)
+        result.sort(key=lambda r: (r.start, r.end))
+        return result
+
+    def stab(self, address: int) -> List[MemoryRegion]:
+        """查找包含指定地址的所有区域"""
+        return self.overlapping(address, address + 1)
+
+
+class MemoryModel:
+    """链接脚本内存模型"""
+
+    def __init__(self, source: str = '', regions: List[MemoryRegion] = None,
+                 symbols: Dict[str, int] = None, entry_address: Optional[int] = None):
+        """
+        初始化内存模型
+
+        Args:
+            source: 链接脚本路径
+            regions: 内存区域列表
+            symbols: 链接脚本中定义的符号
+            entry_address: 中断向量表/镜像起始地址
+        """
+        self.source = source
+        self.regions: List[MemoryRegion] = list(regions or [])
+        self.symbols: Dict[str, int] = dict(symbols or {})
+        self.entry_address = entry_address
+        self._tree: Optional[IntervalTree] = None
+
+    def add_region(self, region: MemoryRegion):
+        """添加内存区域"""
+        self.regions.append(region)
+        self._tree = None
+
+    @property
+    def tree(self) -> IntervalTree:
+        """区间树（首次查询时构建）"""
+        if self._tree is None:
+            self._tree = IntervalTree(self.regions)
+        return self._tree
+
+    def find(self, address: int) -> List[MemoryRegion]:
+        """查找包含指定地址的区域"""
+        return self.tree.stab(address)
+
+    def overlapping(self, start: int, end: int) -> List[MemoryRegion]:
+        """查找与 [start, end) 相交的区域"""
+        return self.tree.overlapping(start, end)
+
+    def flash_regions(self) -> List[MemoryRegion]:
+        """所有Flash区域"""
+        return [r for r in self.regions if r.memory_type == 'flash' and r.size > 0]
+
+    def ram_regions(self) -> List[MemoryRegion]:
+        """所有RAM区域"""
+        return [r for r in self.regions if r.memory_type == 'ram' and r.size > 0]
+
+    def flash_region_for(self, address: int) -> Optional[MemoryRegion]:
+        """
+        获取包含指定地址的Flash区域，有多个时取结束地址最大的（即镜像可用的最大范围）
+
+        Args:
+            address: 绝对地址
+
+        Returns:
+            Optional[MemoryRegion]: Flash区域，未找到返回None
+        """
+        candidates = [r for r in self.find(address) if r.memory_type == 'flash']
+        if not candidates:
+            return None
+        return max(candidates, key=lambda r: (r.end, r.kind == 'load'))
+
+    def primary_flash_region(self) -> Optional[MemoryRegion]:
+        """获取主Flash区域：优先包含入口地址的区域，否则为第一个Flash区域"""
+        if self.entry_address is not None:
+            region = self.flash_region_for(self.entry_address)
+            if region:
+                return region
+        flash = self.flash_regions()
+        return flash[0] if flash else None
+
+    def primary_ram_region(self) -> Optional[MemoryRegion]:
+        """获取主RAM区域（起始地址最小且不是栈/堆的RAM区域）"""
+        ram = [r for r in self.ram_regions() if 'EMPTY' not in r.attributes]
+        ram = ram or self.ram_regions()
+        return min(ram, key=lambda r: r.start) if ram else None
+
+    def validate_range(self, start: int, length: int, memory_type: str = 'flash',
+                       within: Optional[MemoryRegion] = None) -> Tuple[bool, str]:
+        """
+        校验 [start, start + length) 是否完全位于指定类型的内存区域内
+
+        Args:
+            start: 起始地址
+            length: 长度（字节）
+            memory_type: 存储器类型
+            within: 限定必须位于的区域，为None时任意同类型区域均可
+
+        Returns:
+            Tuple[bool, str]: (是否有效, 说明信息)
+        """
+        end = start + max(length, 1)
+        candidates = [within] if within else [r for r in self.find(start) if r.memory_type == memory_type]
+        for region in candidates:
+            if region.contains(start, max(length, 1)):
+                return True, f"0x{start:08X}-0x{end - 1:08X} 位于 {region.name}"
+        if candidates:
+            region = max(candidates, key=lambda r: r.end)
+            return False, (f"0x{start:08X}-0x{end - 1:08X} 超出 {region.name} "
+                           f"(0x{region.start:08X}-0x{region.end - 1:08X})")
+        return False, f"0x{start:08X} 不在任何{memory_type}区域内"
+
+    def to_dict(self) -> Dict:
+        """转换为可JSON序列化的字典"""
+        return {
+            'source': self.source,
+            'regions': [r.to_dict() for r in self.regions],
+            'symbols': self.symbols,
+            'entry_address': self.entry_address
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MemoryModel':
+        """从字典恢复内存模型"""
+        return cls(data.get('source', ''), [MemoryRegion.from_dict(r) for r in data.get('regions', [])],
+                   data.get('symbols'), data.get('entry_address'))
+
+    def describe(self) -> List[str]:
+        """生成便于日志输出的区域描述"""
+        lines = []
+        for region in sorted(self.regions, key=lambda r: r.start):
+            owner = f" <- {region.load_region}" if region.load_region else ''
+            lines.append(f"{region.kind:6s} {region.name:24s} 0x{region.start:08X}-0x{region.end - 1:08X} "
+                         f"(0x{region.size:X}, {region.memory_type}){owner}")
+        return lines
+
+
+class LinkerScriptParser:
+    """链接脚本解析器基类，提供按文件缓存的解析入口"""
+
+    # 解析器版本，解析逻辑变化时递增，使旧的磁盘缓存失效
+    PARSER_VERSION = 1
+    # 磁盘缓存命名空间，由子类指定
+    CACHE_NAMESPACE = 'linker'
+    # 链接脚本类型名称，用于日志
+    SCRIPT_TYPE = '链接脚本'
+
+    # 进程内缓存: (命名空间, 路径) -> ((大小, 修改时间), 内存模型)
+    _memory_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], MemoryModel]] = {}
+    _memory_cache_lock = threading.Lock()
+
+    def __init__(self, use_cache: bool = True):
+        """
+        初始化链接脚本解析器
+
+        Args:
+            use_cache: 是否使用解析缓存（进程内缓存和磁盘缓存）
+        """
+        self.parse_cache = ParseCache(self.CACHE_NAMESPACE) if use_cache else None
+
+    def parse(self, content: str, source: str = '') -> MemoryModel:
+        """
+        解析链接脚本内容，由子类实现
+
+        Args:
+            content: 链接脚本内容
+            source: 来源路径（仅用于记录）
+
+        Returns:
+            MemoryModel: 内存模型
+        """
+        raise NotImplementedError
+
+    def parse_file(self, script_path: str) -> Optional[MemoryModel]:
+        """
+        解析链接脚本文件，结果按文件路径、大小和修改时间缓存
+
+        Args:
+            script_path: 链接脚本路径
+
+        Returns:
+            Optional[MemoryModel]: 内存模型，失败返回None
+        """
+        try:
+            st = os.stat(script_path)
+        except OSError:
+            logger.error(f"{self.SCRIPT_TYPE}文件不存在: {script_path}")
+            return None
+
+        cache_key = (self.CACHE_NAMESPACE, os.path.normcase(os.path.abspath(script_path)))
+        signature = (st.st_size, st.st_mtime_ns)
+        if self.parse_cache:
+            with self._memory_cache_lock:
+                cached = self._memory_cache.get(cache_key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            data = self.parse_cache.load(script_path, self.PARSER_VERSION)
+            if data is not None:
+                model = MemoryModel.from_dict(data)
+                with self._memory_cache_lock:
+                    self._memory_cache[cache_key] = (signature, model)
+                return model
+
+        try:
+            with open(script_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+            model = self.parse(content, script_path)
+        except Exception as e:
+            logger.error(f"解析{self.SCRIPT_TYPE}文件失败: {e}")
+            return None
+
+        if self.parse_cache:
+            self.parse_cache.save(script_path, self.PARSER_VERSION, model.to_dict())
+            with self._memory_cache_lock:
+                self._memory_cache[cache_key] = (signature, model)
+        return model
+
+
+if __name__ == "__main__":
+    # 测试表达式求值与区间查询
+    symbols = {'__ICFEDIT_region_ROM_start__': 0x08000000}
+    evaluator = ExpressionEvaluator(symbols)
+    tokens = tokenize('__ICFEDIT_region_ROM_start__ + 512K - 1')
+    value, _ = evaluator.evaluate(tokens)
+    print(f"表达式求值: 0x{value:08X}")
+
+    model = MemoryModel('selftest', [
+        MemoryRegion('BANK1', 0x08000000, 0x80000, 'flash'),
+        MemoryRegion('BANK2', 0x08080000, 0x80000, 'flash'),
+        MemoryRegion('RAM', 0x20000000, 0x20000, 'ram'),
+    ])
+    print(f"0x08090000所在区域: {model.find(0x08090000)}")
+    print(f"跨bank校验: {model.validate_range(0x0807FFF0, 0x20)}")
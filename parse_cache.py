@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析结果缓存模块
+将项目文件、链接脚本等的解析结果以JSON形式持久化到磁盘，文件未变化时直接复用
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+from lib_logger import logger
+from typing import Any, Dict, Optional
+
+
+def get_cache_root() -> str:
+    """获取缓存根目录，兼容exe和Python脚本环境"""
+    if getattr(sys, 'frozen', False):
+        # 如果是打包的exe，使用exe所在目录
+        base_dir = os.path.dirname(os.path.abspath(sys.executable))
+    else:
+        # 如果是Python脚本，使用脚本所在目录
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, 'cache')
+
+
+class ParseCache:
+    """解析结果磁盘缓存"""
+
+    def __init__(self, namespace: str, cache_dir: str = None):
+        """
+        初始化解析结果缓存
+
+        Args:
+            namespace: 缓存命名空间，例如 'iar_project'、'mdk_project'
+            cache_dir: 缓存根目录，默认为程序目录下的cache
+        """
+        self.namespace = namespace
+        self.cache_dir = os.path.join(cache_dir or get_cache_root(), namespace)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(file_path: str, version: Any) -> Optional[Dict]:
+        """
+        生成缓存键：路径、大小、修改时间和解析器版本
+
+        Returns:
+            Dict: 缓存键，文件不存在时返回None
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return {
+            'path': os.path.normcase(os.path.abspath(file_path)),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'version': version
+        }
+
+    def _entry_path(self, file_path: str) -> str:
+        """获取缓存条目文件路径"""
+        digest = hashlib.sha1(os.path.normcase(os.path.abspath(file_path)).encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def load(self, file_path: str, version: Any) -> Optional[Any]:
+        """
+        读取缓存的解析结果
+
+        Args:
+            file_path: 被解析的源文件路径
+            version: 解析器版本，版本变化时缓存自动失效
+
+        Returns:
+            Any: 缓存的解析结果，未命中返回None
+        """
+        key = self._make_key(file_path, version)
+        if key is None:
+            return None
+
+        entry_path = self._entry_path(file_path)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"读取解析缓存失败，忽略缓存: {entry_path} ({e})")
+            return None
+
+        if entry.get('key') != key:
+            return None
+        return entry.get('data')
+
+    def save(self, file_path: str, version: Any, data: Any) -> bool:
+        """
+        保存解析结果到缓存
+
+        Args:
+            file_path: 被解析的源文件路径
+            version: 解析器版本
+            data: 可JSON序列化的解析结果
+
+        Returns:
+            bool: 保存是否成功
+        """
+        key = self._make_key(file_path, version)
+        if key is None:
+            return False
+
+        entry_path = self._entry_path(file_path)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'data': data}, f, ensure_ascii=False, separators=(',', ':'))
+                # 先写临时文件再替换，避免并发读取到半截内容
+                os.replace(temp_path, entry_path)
+            return True
+        except Exception as e:
+            logger.debug(f"写入解析缓存失败: {entry_path} ({e})")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def invalidate(self, file_path: str):
+        """删除指定源文件的缓存条目"""
+        try:
+            os.remove(self._entry_path(file_path))
+        except OSError:
+            pass
+
+    def clear(self) -> int:
+        """
+        清空当前命名空间下的所有缓存
+
+        Returns:
+            int: 删除的条目数量
+        """
+        removed = 0
+        if not os.path.isdir(self.cache_dir):
+            return removed
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+if __name__ == "__main__":
+    # 测试解析结果缓存
+    cache = ParseCache('selftest')
+    print(f"缓存目录: {cache.cache_dir}")
+    print(f"保存: {cache.save(__file__, 1, {'configurations': ['Debug', 'Release']})}")
+    print(f"读取(版本1): {cache.load(__file__, 1)}")
+    print(f"读取(版本2): {cache.load(__file__, 2)}")
+    print(f"清除条目数: {cache.clear()}")
@@ -5,16 +5,19 @@
 根据编译工具类型创建相应的路径管理器
 """
 
-from typing import Union
-from lib_IAR.path_manager import IARPathManager
-from lib_MDK.path_manager import MDKPathManager
+from typing import TYPE_CHECKING, Union
+
+# 各编译工具的模块在创建实例时才导入，只加载实际使用的工具链，缩短启动时间
+if TYPE_CHECKING:
+    from lib_IAR.path_manager import IARPathManager
+    from lib_MDK.path_manager import MDKPathManager
 
 
 class PathManagerFactory:
     """路径管理器工厂类"""
     
     @staticmethod
-    def create_path_manager(compile_tool: str, project_path: str = None) -> Union[IARPathManager, MDKPathManager]:
+    def create_path_manager(compile_tool: str, project_path: str = None) -> Union['IARPathManager', 'MDKPathManager']:
         """
         根据编译工具类型创建相应的路径管理器
         
@@ -29,8 +32,10 @@ class PathManagerFactory:
             ValueError: 当编译工具类型不支持时
         """
         if compile_tool.upper() == 'IAR':
+            from lib_IAR.path_manager import IARPathManager
             return IARPathManager(project_path)
         elif compile_tool.upper() == 'MDK':
+            from lib_MDK.path_manager import MDKPathManager
             return MDKPathManager(project_path)
         else:
             raise ValueError(f"不支持的编译工具类型: {compile_tool}。支持的类型: IAR, MDK")
@@ -5,8 +5,7 @@
 根据编译工具类型创建相应的项目分析器
 """
 
-from lib_IAR.project_analyzer import IARProjectAnalyzer
-from lib_MDK.project_analyzer import MDKProjectAnalyzer
+# 各编译工具的模块在创建实例时才导入，只加载实际使用的工具链，缩短启动时间
 
 
 class ProjectAnalyzerFactory:
@@ -23,13 +22,12 @@ class ProjectAnalyzerFactory:
         Returns:
             相应的项目分析器实例
         """
-        if compile_tool == 'IAR':
-            return IARProjectAnalyzer()
-        elif compile_tool == 'MDK':
+        if compile_tool == 'MDK':
+            from lib_MDK.project_analyzer import MDKProjectAnalyzer
             return MDKProjectAnalyzer()
-        else:
-            # 默认使用IAR
-            return IARProjectAnalyzer()
+        # 默认使用IAR
+        from lib_IAR.project_analyzer import IARProjectAnalyzer
+        return IARProjectAnalyzer()
     
     @staticmethod
     def get_common_methods():
@@ -42,8 +40,13 @@ class ProjectAnalyzerFactory:
         return [
             'find_build_outputs',
             '_parse_configurations',
+            '_stream_configurations',
             'analyze_icf_file',  # IAR: analyze_icf_file, MDK: analyze_sct_file
-            'get_flash_offset_from_configuration'
+            'get_flash_offset_from_configuration',
+            'get_memory_model',
+            'get_size_report',
+            'get_project_inputs',
+            'get_configuration_digest'
         ]
     
     @staticmethod
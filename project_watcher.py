@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目文件监视模块
+在后台监视项目文件、信息文件和链接脚本的变化，只让依赖已变化文件的缓存条目失效
+"""
+
+import os
+import sys
+import struct
+import select
+import threading
+import ctypes
+import ctypes.util
+from lib_logger import logger
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+# inotify事件掩码（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+
+# 目录项增删事件，用于目录类型依赖（例如项目文件索引）
+_ENTRY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | _ENTRY_EVENTS |
+               IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct('iIII')
+
+# 文件签名：(mtime_ns, size)，文件不存在时为None
+Signature = Optional[Tuple[int, int]]
+
+
+def _stat_signature(path: str) -> Signature:
+    """获取文件签名，文件不存在时返回None"""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+class _InotifyBackend:
+    """基于Linux inotify的变化通知后端"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1失败")
+        self._dir_by_wd: Dict[int, str] = {}
+        self._wd_by_dir: Dict[str, int] = {}
+
+    def add_directory(self, directory: str) -> bool:
+        """添加目录监视，已监视的目录直接返回True"""
+        if directory in self._wd_by_dir:
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self._wd_by_dir[directory] = wd
+        self._dir_by_wd[wd] = directory
+        return True
+
+    def read_events(self, timeout: float) -> Optional[List[Tuple[str, str, int]]]:
+        """
+        读取变化事件
+
+        Args:
+            timeout: 等待超时时间（秒）
+
+        Returns:
+            Optional[List[Tuple[str, str, int]]]: (目录, 变化路径, 事件掩码)列表，事件队列溢出时返回None
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            directory = self._dir_by_wd.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # 目录本身被删除或移动，监视随之失效
+                self._dir_by_wd.pop(wd, None)
+                self._wd_by_dir.pop(directory, None)
+            changed = os.path.join(directory, os.fsdecode(name)) if name else directory
+            events.append((directory, changed, mask))
+        return events
+
+    def close(self):
+        """关闭inotify句柄"""
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+class ProjectWatcher:
+    """项目文件监视器"""
+
+    def __init__(self, poll_interval: float = 1.0, use_inotify: bool = True):
+        """
+        初始化项目文件监视器
+
+        Args:
+            poll_interval: 轮询模式下的检查间隔（秒）
+            use_inotify: 可用时是否使用inotify
+        """
+        self.poll_interval = max(0.2, float(poll_interval))
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # key -> (缓存值, {依赖路径: 签名}, {依赖目录: 签名})
+        self._entries: Dict[Hashable, Tuple[Any, Dict[str, Signature], Dict[str, Signature]]] = {}
+        self._listeners: List[Callable[[Hashable, str], None]] = []
+
+        self._use_inotify = use_inotify and sys.platform.startswith('linux')
+        self._inotify: Optional[_InotifyBackend] = self._create_inotify()
+
+    def _create_inotify(self) -> Optional[_InotifyBackend]:
+        """创建inotify后端，不可用时返回None（使用轮询模式）"""
+        if not self._use_inotify:
+            return None
+        try:
+            return _InotifyBackend()
+        except Exception as e:
+            logger.debug(f"inotify不可用，使用轮询模式: {e}")
+            return None
+
+    @property
+    def backend(self) -> str:
+        """当前使用的监视后端名称"""
+        return 'inotify' if self._inotify else 'polling'
+
+    def start(self):
+        """启动后台监视线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        if self._inotify is None and self._use_inotify:
+            # stop() 关闭了inotify句柄：重新创建并监视已有条目的目录，停止期间的变化在此校验
+            self._inotify = self._create_inotify()
+            with self._lock:
+                snapshot = list(self._entries.items())
+            for key, (_, file_sigs, dir_sigs) in snapshot:
+                self._watch(file_sigs, dir_sigs)
+                for path, sig in list(file_sigs.items()) + list(dir_sigs.items()):
+                    if _stat_signature(path) != sig:
+                        self._invalidate_key(key, path)
+                        break
+        target = self._inotify_loop if self._inotify else self._polling_loop
+        self._thread = threading.Thread(target=target, name='ProjectWatcher', daemon=True)
+        self._thread.start()
+        logger.info(f"项目文件监视已启动 (后端: {self.backend})")
+
+    def stop(self):
+        """停止后台监视线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def add_listener(self, callback: Callable[[Hashable, str], None]):
+        """
+        注册缓存失效回调
+
+        Args:
+            callback: 回调函数，参数为(缓存键, 触发变化的路径)
+        """
+        self._listeners.append(callback)
+
+    def snapshot(self, files: Iterable[str] = (),
+                 directories: Iterable[str] = ()) -> Tuple[Dict[str, Signature], Dict[str, Signature]]:
+        """
+        获取依赖文件/目录的签名并开始监视，在计算缓存值之前调用，计算期间的变化会使随后写入的条目失效
+
+        Args:
+            files: 依赖的文件列表
+            directories: 依赖的目录列表
+
+        Returns:
+            Tuple[Dict[str, Signature], Dict[str, Signature]]: ({文件: 签名}, {目录: 签名})，传给 put 的 snapshot 参数
+        """
+        file_sigs = {os.path.abspath(p): _stat_signature(p) for p in files if p}
+        dir_sigs = {os.path.abspath(d): _stat_signature(d) for d in directories if d}
+        with self._lock:
+            self._watch(file_sigs, dir_sigs)
+        return file_sigs, dir_sigs
+
+    def _watch(self, file_sigs: Dict[str, Signature], dir_sigs: Dict[str, Signature]):
+        """inotify模式下监视依赖所在的目录"""
+        if not self._inotify:
+            return
+        watch_dirs = set(dir_sigs)
+        watch_dirs.update(os.path.dirname(p) for p in file_sigs)
+        for directory in watch_dirs:
+            if os.path.isdir(directory) and not self._inotify.add_directory(directory):
+                logger.debug(f"无法监视目录: {directory}")
+
+    def put(self, key: Hashable, value: Any, files: Iterable[str] = (), directories: Iterable[str] = (),
+            snapshot: Tuple[Dict[str, Signature], Dict[str, Signature]] = None):
+        """
+        写入缓存条目
+
+        依赖文件在计算缓存值之前已知时，应先调用 snapshot 获取签名再计算并传入；
+        未传入时在写入时获取签名，计算期间发生的变化无法发现
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            files: 依赖的文件列表，任意文件内容或属性变化都会使条目失效
+            directories: 依赖的目录列表，只有目录项增删才会使条目失效
+            snapshot: 计算缓存值之前由 snapshot 获取的签名，与files/directories合并
+        """
+        file_sigs, dir_sigs = self.snapshot(files, directories)
+        if snapshot:
+            file_sigs.update(snapshot[0])
+            dir_sigs.update(snapshot[1])
+        with self._lock:
+            self._entries[key] = (value, file_sigs, dir_sigs)
+        # 写入前（inotify事件到达时条目尚不存在）已经发生的变化
+        for path, sig in list(file_sigs.items()) + list(dir_sigs.items()):
+            if _stat_signature(path) != sig:
+                self._invalidate_key(key, path)
+                break
+
+    def get(self, key: Hashable, verify: bool = False, default: Any = None) -> Any:
+        """
+        读取缓存条目
+
+        Args:
+            key: 缓存键
+            verify: 是否在返回前同步校验依赖文件签名（关键路径上使用，避免轮询间隔内的过期数据）
+            default: 未命中时的返回值
+
+        Returns:
+            Any: 缓存值，未命中或已失效时返回default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return default
+        value, file_sigs, dir_sigs = entry
+        if verify:
+            for path, sig in list(file_sigs.items()) + list(dir_sigs.items()):
+                if _stat_signature(path) != sig:
+                    self._invalidate_key(key, path)
+                    return default
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        """
+        使缓存失效
+
+        Args:
+            key: 缓存键，为None时清空所有缓存
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_path(self, path: str) -> int:
+        """
+        使依赖指定路径的缓存条目失效
+
+        Args:
+            path: 发生变化的文件或目录路径
+
+        Returns:
+            int: 失效的条目数量
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            keys = [key for key, (_, file_sigs, dir_sigs) in self._entries.items()
+                    if path in file_sigs or path in dir_sigs]
+        for key in keys:
+            self._invalidate_key(key, path)
+        return len(keys)
+
+    def _invalidate_key(self, key: Hashable, path: str):
+        """移除单个缓存条目并通知监听者"""
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+        logger.debug(f"缓存失效: {key} (变化文件: {path})")
+        for callback in list(self._listeners):
+            try:
+                callback(key, path)
+            except Exception as e:
+                logger.error(f"缓存失效回调执行失败: {e}")
+
+    def _polling_loop(self):
+        """轮询模式：定期比较依赖文件签名"""
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                with self._lock:
+                    snapshot = list(self._entries.items())
+                for key, (_, file_sigs, dir_sigs) in snapshot:
+                    for path, sig in list(file_sigs.items()) + list(dir_sigs.items()):
+                        if _stat_signature(path) != sig:
+                            self._invalidate_key(key, path)
+                            break
+            except Exception as e:
+                logger.error(f"轮询检查文件变化失败: {e}")
+
+    def _inotify_loop(self):
+        """inotify模式：根据内核事件失效缓存"""
+        while not self._stop_event.is_set():
+            try:
+                events = self._inotify.read_events(timeout=0.5)
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    logger.error(f"读取inotify事件失败: {e}")
+                break
+            if events is None:
+                # 事件队列溢出，无法确定哪些文件变化，全部失效
+                logger.warning("inotify事件队列溢出，清空所有缓存")
+                self.invalidate()
+                continue
+            for directory, changed, mask in events:
+                self.invalidate_path(changed)
+                if mask & _ENTRY_EVENTS:
+                    self.invalidate_path(directory)
+
+
+def test_project_watcher():
+    """测试项目文件监视器"""
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        info_file = os.path.join(temp_dir, 'main.c')
+        with open(info_file, 'w', encoding='utf-8') as f:
+            f.write('const char __Firmware_Version[] = "V1.0.0.1";\n')
+
+        watcher = ProjectWatcher(poll_interval=0.2)
+        watcher.add_listener(lambda key, path: print(f"缓存失效: {key} <- {path}"))
+        watcher.start()
+        print(f"监视后端: {watcher.backend}")
+
+        signatures = watcher.snapshot(files=[info_file])
+        watcher.put(('info_version', info_file), 'V1.0.0.1', snapshot=signatures)
+        print(f"首次读取: {watcher.get(('info_version', info_file))}")
+
+        time.sleep(0.1)
+        with open(info_file, 'w', encoding='utf-8') as f:
+            f.write('const char __Firmware_Version[] = "V1.0.0.2";\n')
+        time.sleep(0.6)
+        print(f"修改后读取: {watcher.get(('info_version', info_file))}")
+
+        watcher.stop()
+        watcher.start()
+        print(f"重新启动后的监视后端: {watcher.backend}")
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    test_project_watcher()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编译发布流程评测脚本
+使用模拟工具链对生成的IAR和MDK项目执行路径查找、Git、版本号更新、编译、二进制修改和发布的完整流程，并输出各阶段耗时
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from lib_logger import logger
+from git_manager import GitManager
+from version_manager import VersionManager
+from binary_modifier import BinaryModifier
+from builder_factory import BuilderFactory
+from info_manager_factory import InfoManagerFactory
+from file_manager_factory import FileManagerFactory
+from path_manager_factory import PathManagerFactory
+from project_analyzer_factory import ProjectAnalyzerFactory
+from fake_toolchain import install, ENV_COMPILE_SECONDS, ENV_LINE_DELAY, ENV_IMAGE_SIZE
+from typing import Dict, List
+
+STAGES = ['path_discovery', 'analysis', 'git', 'versioning', 'build', 'patch', 'publish']
+
+# 应用程序位于引导程序之后，与路径查找的默认值(0x08000000)不同，未从链接脚本获取偏移地址时评测失败
+FLASH_START = 0x08004000
+INFO_ADDRESS = 0x08004400
+
+FEATURE_SETTINGS = {
+    'enable_git_commit_id': True,
+    'enable_file_size': True,
+    'enable_bin_checksum': True,
+    'enable_hash_value': True,
+    'git_commit_id_keyword': '__git_commit_id',
+    'file_size_keyword': '__file_size',
+    'bin_checksum_keyword': '__bin_checksum',
+    'hash_value_keyword': '__hash_value',
+    'firmware_version_keyword': '__Firmware_Version'
+}
+
+GITIGNORE = "Debug/\nRelease/\nObjects/\nListings/\nsettings/\nfw_publish/\n*.log\n*.dep\n"
+
+
+def _write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+
+
+def _write_sources(project_root: str, source_count: int, info_text: str) -> List[str]:
+    """生成信息文件main.c和若干模块源文件，返回源文件名列表"""
+    names = ['main.c']
+    _write(os.path.join(project_root, 'Src', 'main.c'),
+           "#include <stdint.h>\n\n" + info_text + "\nint main(void)\n{\n    for (;;) {\n    }\n}\n")
+    for index in range(source_count):
+        name = f"module_{index:03d}.c"
+        names.append(name)
+        _write(os.path.join(project_root, 'Src', name),
+               f"#include <stdint.h>\n\nuint32_t module_{index:03d}_run(uint32_t value)\n"
+               f"{{\n    return value * {index + 3}u + {index}u;\n}}\n")
+    return names
+
+
+def generate_iar_project(project_root: str, source_count: int) -> str:
+    """
+    生成IAR项目：EWARM/Proj.ewp（Debug/Release配置）、链接脚本和带信息字段的main.c
+
+    Args:
+        project_root: 项目根目录
+        source_count: 额外的模块源文件数量
+
+    Returns:
+        str: 项目文件路径
+    """
+    info_text = (
+        f"#pragma location=0x{INFO_ADDRESS:08X}\n"
+        f"__root const char __Firmware_Version[10] = \"V1.0.0.1\";\n\n"
+        f"#pragma location=0x{INFO_ADDRESS + 0x10:08X}\n"
+        f"__root const char __git_commit_id[7] = \"\";\n\n"
+        f"#pragma location=0x{INFO_ADDRESS + 0x20:08X}\n"
+        f"__root volatile const uint32_t __file_size = 0;\n\n"
+        f"#pragma location=0x{INFO_ADDRESS + 0x24:08X}\n"
+        f"__root volatile const uint32_t __bin_checksum = 0;\n\n"
+        f"#pragma location=0x{INFO_ADDRESS + 0x30:08X}\n"
+        f"__root volatile const uint8_t __hash_value[32] = {{0}};\n"
+    )
+    names = _write_sources(project_root, source_count, info_text)
+
+    configurations = []
+    for name, debug in (('Debug', 1), ('Release', 0)):
+        configurations.append(
+            f"  <configuration>\n"
+            f"    <name>{name}</name>\n"
+            f"    <toolchain><name>ARM</name></toolchain>\n"
+            f"    <debug>{debug}</debug>\n"
+            f"    <settings><name>General</name><data>\n"
+            f"      <option><name>ExePath</name><state>{name}/Exe</state></option>\n"
+            f"      <option><name>ObjPath</name><state>{name}/Obj</state></option>\n"
+            f"      <option><name>ListPath</name><state>{name}/List</state></option>\n"
+            f"    </data></settings>\n"
+            f"    <settings><name>ILINK</name><data>\n"
+            f"      <option><name>IlinkIcfFile</name><state>$PROJ_DIR$/stm32.icf</state></option>\n"
+            f"    </data></settings>\n"
+            f"  </configuration>\n")
+    files = ''.join(f"    <file><name>$PROJ_DIR$/../Src/{name}</name></file>\n" for name in names)
+    ewp_path = os.path.join(project_root, 'EWARM', 'Proj.ewp')
+    _write(ewp_path, "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<project>\n  <fileVersion>3</fileVersion>\n"
+           + ''.join(configurations) + f"  <group>\n    <name>App</name>\n{files}  </group>\n</project>\n")
+    _write(os.path.join(project_root, 'EWARM', 'stm32.icf'),
+           f"define symbol __ICFEDIT_intvec_start__ = 0x{FLASH_START:08X};\n"
+           f"define symbol __ICFEDIT_region_ROM_start__ = 0x{FLASH_START:08X};\n"
+           f"define symbol __ICFEDIT_region_ROM_end__   = 0x0807FFFF;\n"
+           f"define symbol __ICFEDIT_region_RAM_start__ = 0x20000000;\n"
+           f"define symbol __ICFEDIT_region_RAM_end__   = 0x2001FFFF;\n"
+           f"define memory mem with size = 4G;\n"
+           f"define region ROM_region   = mem:[from __ICFEDIT_region_ROM_start__   to __ICFEDIT_region_ROM_end__];\n"
+           f"define region RAM_region   = mem:[from __ICFEDIT_region_RAM_start__   to __ICFEDIT_region_RAM_end__];\n"
+           f"place in ROM_region   {{ readonly }};\n"
+           f"place in RAM_region   {{ readwrite }};\n")
+    return ewp_path
+
+
+def generate_mdk_project(project_root: str, source_count: int) -> str:
+    """
+    生成MDK项目：MDK-ARM/Proj.uvprojx（目标Proj）、分散加载文件和带信息字段的main.c
+
+    Args:
+        project_root: 项目根目录
+        source_count: 额外的模块源文件数量
+
+    Returns:
+        str: 项目文件路径
+    """
+    info_text = (
+        f"const char __Firmware_Version[10] __attribute__((at(0x{INFO_ADDRESS:X}))) = \"V1.0.0.1\";\n\n"
+        f"const char __git_commit_id[7] __attribute__((at(0x{INFO_ADDRESS + 0x10:X}))) = \"\";\n\n"
+        f"const uint32_t __file_size __attribute__((at(0x{INFO_ADDRESS + 0x20:X}))) = 0;\n\n"
+        f"const uint32_t __bin_checksum __attribute__((at(0x{INFO_ADDRESS + 0x24:X}))) = 0;\n\n"
+        f"const uint8_t __hash_value[32] __attribute__((at(0x{INFO_ADDRESS + 0x30:X}))) = \"\";\n"
+    )
+    names = _write_sources(project_root, source_count, info_text)
+
+    files = ''.join(f"<File><FileName>{name}</FileName><FileType>1</FileType>"
+                    f"<FilePath>../Src/{name}</FilePath></File>" for name in names)
+    uvprojx_path = os.path.join(project_root, 'MDK-ARM', 'Proj.uvprojx')
+    _write(uvprojx_path,
+           "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"no\" ?>\n"
+           "<Project>\n  <SchemaVersion>2.1</SchemaVersion>\n  <Targets>\n    <Target>\n"
+           "      <TargetName>Proj</TargetName>\n      <ToolsetNumber>0x4</ToolsetNumber>\n"
+           "      <TargetOption>\n        <TargetCommonOption>\n"
+           "          <OutputDirectory>./Objects/</OutputDirectory>\n"
+           "          <OutputName>Proj</OutputName>\n"
+           "          <ListingPath>./Listings/</ListingPath>\n"
+           "          <DebugInformation>1</DebugInformation>\n"
+           "        </TargetCommonOption>\n"
+           "        <TargetArmAds>\n          <LDads><ScatterFile>./Proj.sct</ScatterFile></LDads>\n"
+           "        </TargetArmAds>\n      </TargetOption>\n"
+           f"      <Groups><Group><GroupName>App</GroupName><Files>{files}</Files></Group></Groups>\n"
+           "    </Target>\n  </Targets>\n</Project>\n")
+    _write(os.path.join(project_root, 'MDK-ARM', 'Proj.sct'),
+           f"LR_IROM1 0x{FLASH_START:08X} 0x00080000  {{\n"
+           f"  ER_IROM1 0x{FLASH_START:08X} 0x00080000  {{\n"
+           f"   *.o (RESET, +First)\n   .ANY (+RO)\n  }}\n"
+           f"  RW_IRAM1 0x20000000 0x00020000  {{\n   .ANY (+RW +ZI)\n  }}\n}}\n")
+    return uvprojx_path
+
+
+def init_git_repository(project_root: str):
+    """初始化Git仓库并提交生成的项目"""
+    _write(os.path.join(project_root, '.gitignore'), GITIGNORE)
+    for cmd in (['git', 'init', '-q', '-b', 'main'],
+                ['git', 'config', 'user.name', 'benchmark'],
+                ['git', 'config', 'user.email', 'benchmark@example.com'],
+                ['git', 'add', '-A'],
+                ['git', 'commit', '-q', '-m', 'initial project']):
+        subprocess.run(cmd, cwd=project_root, check=True, capture_output=True)
+
+
+class StageTimer:
+    """阶段计时器"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+
+def run_pipeline(compile_tool: str, project_root: str, base_config: Dict, configuration_name: str) -> Dict[str, float]:
+    """
+    按编译流程执行一次完整的版本发布
+
+    Args:
+        compile_tool: 'IAR' 或 'MDK'
+        project_root: 项目根目录
+        base_config: 基础配置（安装路径、发布目录等）
+        configuration_name: 编译的配置名称
+
+    Returns:
+        Dict[str, float]: 各阶段耗时（秒）
+    """
+    timer = StageTimer()
+    config = json.loads(json.dumps(base_config))
+    config['compile_tool'] = compile_tool
+    config['project_path'] = project_root
+
+    with timer.stage('path_discovery'):
+        path_manager = PathManagerFactory.create_path_manager(compile_tool, project_root)
+        config = path_manager.auto_find_paths(config)
+        info_path, error_msg = path_manager.find_info_file_with_details(config.get('info_file', 'main.c'))
+        if not info_path:
+            raise RuntimeError(error_msg)
+        discovered_offset = config.get('binary_settings', {}).get('bin_start_address')
+        if discovered_offset != FLASH_START:
+            raise RuntimeError(f"路径查找得到的flash偏移地址 0x{discovered_offset or 0:X} 与链接脚本 0x{FLASH_START:X} 不一致")
+
+    with timer.stage('analysis'):
+        analyzer = ProjectAnalyzerFactory.create_analyzer(compile_tool)
+        project_key = 'iar_project_path' if compile_tool == 'IAR' else 'mdk_project_path'
+        project_file = config['project_settings'][project_key]
+        project_info = getattr(analyzer, ProjectAnalyzerFactory.get_analyze_method_name(compile_tool))(project_file)
+        configuration = next(config_info for config_info in project_info['configurations']
+                             if config_info['name'] == configuration_name)
+        if configuration.get('flash_offset') != FLASH_START:
+            raise RuntimeError(f"未能从配置 {configuration_name} 的链接脚本获取flash偏移地址")
+
+    with timer.stage('git'):
+        git_manager = GitManager(project_root)
+        if not git_manager.is_git_repo():
+            raise RuntimeError(f"不是Git仓库: {project_root}")
+        branch = git_manager.get_commit_info().get('branch') or 'main'
+        git_manager.has_uncommitted_changes()
+
+    with timer.stage('versioning'):
+        info_manager = InfoManagerFactory.create_manager(compile_tool, config)
+        config.update(info_manager.analyze_config_file(info_path, FEATURE_SETTINGS))
+        current_version = info_manager.extract_version_from_info_file(info_path)
+        version_manager = VersionManager(config.get('version_settings', {}), project_root,
+                                         config['fw_publish_directory'], branch)
+        next_version, _ = version_manager.get_next_version(current_version)
+        success, message = info_manager.update_version_in_info_file(info_path, next_version)
+        if not success:
+            raise RuntimeError(message)
+        git_manager.commit_changes(f"发布{next_version}版本")
+        commit_id = git_manager.get_short_commit_id(7)
+
+    with timer.stage('build'):
+        builder = BuilderFactory.create_builder(compile_tool, config, configuration)
+        success, message = builder.smart_build(True)
+        if not success:
+            raise RuntimeError(message)
+        # 首次编译前输出目录不存在，编译后重新定位输出文件
+        configuration.update(analyzer.find_build_outputs(project_file, configuration))
+        bin_info = builder.get_bin_file_info(configuration)
+        if not bin_info['exists']:
+            raise RuntimeError("编译成功但未找到bin文件")
+
+    with timer.stage('patch'):
+        modifier_config = dict(config)
+        modifier_config['binary_settings'] = dict(config.get('binary_settings', {}),
+                                                  bin_start_address=configuration['flash_offset'])
+        binary_modifier = BinaryModifier(modifier_config, FEATURE_SETTINGS)
+        success, message, _ = binary_modifier.modify_binary_file(bin_info['path'], commit_id)
+        if not success:
+            raise RuntimeError(message)
+        image_version = binary_modifier.read_firmware_version(bin_info['path'])
+        if image_version != next_version:
+            raise RuntimeError(f"镜像中的版本号 {image_version} 与发布版本 {next_version} 不一致")
+
+    with timer.stage('publish'):
+        file_manager = FileManagerFactory.create_file_manager(compile_tool, config, project_root, path_manager)
+        success, message, _ = file_manager.process_bin_file(bin_info['path'], commit_id, version=next_version)
+        if not success:
+            raise RuntimeError(message)
+        success, message, _ = file_manager.publish_firmware(
+            bin_info['path'], commit_id, next_version, add_timestamp=False,
+            configuration=configuration, branch_name=branch)
+        if not success:
+            raise RuntimeError(message)
+
+    return timer.timings
+
+
+def format_report(results: Dict[str, List[Dict[str, float]]]) -> List[str]:
+    """
+    格式化各阶段耗时：首次（完整编译）和之后各次（增量编译）的平均值
+
+    Args:
+        results: {编译工具: 每次执行的阶段耗时列表}
+
+    Returns:
+        List[str]: 报告行
+    """
+    lines = []
+    for compile_tool, runs in results.items():
+        lines.append(f"{compile_tool} ({len(runs)} 次)")
+        lines.append(f"  {'阶段':<16}{'首次(s)':>10}{'之后平均(s)':>14}{'最小(s)':>10}{'最大(s)':>10}")
+        for stage in STAGES + ['total']:
+            values = [sum(run.values()) if stage == 'total' else run.get(stage, 0.0) for run in runs]
+            later = values[1:] or values
+            lines.append(f"  {stage:<16}{values[0]:>10.3f}{sum(later) / len(later):>14.3f}"
+                         f"{min(values):>10.3f}{max(values):>10.3f}")
+    return lines
+
+
+def main():
+    """运行评测"""
+    parser = argparse.ArgumentParser(description="使用模拟工具链评测完整的编译发布流程")
+    parser.add_argument('--tools', default='IAR,MDK', help="评测的编译工具，逗号分隔")
+    parser.add_argument('--iterations', type=int, default=3, help="每个编译工具连续发布的次数")
+    parser.add_argument('--sources', type=int, default=20, help="除信息文件外的源文件数量")
+    parser.add_argument('--compile-seconds', type=float, default=1.0, help="模拟完整编译的总耗时（秒）")
+    parser.add_argument('--line-delay', type=float, default=0.005, help="模拟编译输出每行的间隔（秒）")
+    parser.add_argument('--image-size', type=int, default=256 * 1024, help="模拟生成的bin文件大小（字节）")
+    parser.add_argument('--json', help="把各次的阶段耗时写入JSON文件")
+    parser.add_argument('--keep', action='store_true', help="保留生成的项目目录")
+    parser.add_argument('--verbose', action='store_true', help="输出流程中的INFO日志")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level='INFO' if args.verbose else 'WARNING')
+
+    os.environ[ENV_COMPILE_SECONDS] = str(args.compile_seconds)
+    os.environ[ENV_LINE_DELAY] = str(args.line_delay)
+    os.environ[ENV_IMAGE_SIZE] = str(args.image_size)
+
+    work_dir = tempfile.mkdtemp(prefix='efm_benchmark_')
+    results = {}
+    try:
+        toolchain = install(os.path.join(work_dir, 'toolchain'))
+        for compile_tool in [tool.strip().upper() for tool in args.tools.split(',') if tool.strip()]:
+            project_root = os.path.join(work_dir, compile_tool.lower())
+            if compile_tool == 'IAR':
+                generate_iar_project(project_root, args.sources)
+                configuration_name = 'Debug'
+            else:
+                generate_mdk_project(project_root, args.sources)
+                configuration_name = 'Proj'
+            init_git_repository(project_root)
+
+            base_config = {
+                'iar_installation_path': toolchain['iar_installation_path'],
+                'mdk_installation_path': toolchain['mdk_installation_path'],
+                'fw_publish_directory': os.path.join(project_root, 'fw_publish'),
+                'info_file': 'main.c',
+            }
+            runs = []
+            for iteration in range(args.iterations):
+                print(f"{compile_tool} 第 {iteration + 1}/{args.iterations} 次发布...", flush=True)
+                runs.append(run_pipeline(compile_tool, project_root, base_config, configuration_name))
+            results[compile_tool] = runs
+
+        print()
+        for line in format_report(results):
+            print(line)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+        return 0
+
+    except Exception as e:
+        print(f"评测失败: {e}")
+        return 1
+    finally:
+        if args.keep:
+            print(f"项目目录: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
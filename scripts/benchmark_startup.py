@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时评测脚本
+在独立的Python进程中多次导入界面和命令行入口模块，输出导入耗时、耗时最多的模块以及启动时被提前加载的工具链模块和语言包
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from statistics import median
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块 -> 导入后不应加载的模块前缀（按需导入）
+TARGETS = {
+    'main': ('lib_IAR.', 'lib_MDK.', 'locales.zh_CN', 'locales.zh_TW', 'locales.en_US'),
+    'firmware_pipeline': ('lib_IAR.', 'lib_MDK.', 'locales.', 'tkinter'),
+    'build_cli': ('lib_IAR.', 'lib_MDK.', 'locales.', 'tkinter'),
+}
+
+# 子进程中执行：导入模块并输出耗时和已加载的模块
+CHILD_CODE = """
+import sys, time, json
+start = time.perf_counter()
+__import__({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """
+    在新进程中导入模块
+
+    Args:
+        module: 模块名
+
+    Returns:
+        Tuple[float, List[str]]: (导入耗时秒数, 导入后已加载的模块)
+    """
+    result = subprocess.run([sys.executable, '-c', CHILD_CODE.format(module=module)],
+                            cwd=REPO_ROOT, capture_output=True, text=True, encoding='utf-8')
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败: {result.stderr.strip()}")
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return data['elapsed'], data['modules']
+
+
+def top_imports(module: str, count: int) -> List[Tuple[str, int]]:
+    """
+    使用 -X importtime 统计导入耗时最多的模块
+
+    Args:
+        module: 入口模块名
+        count: 输出的模块数量
+
+    Returns:
+        List[Tuple[str, int]]: [(模块名, 累计耗时微秒)]
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True, encoding='utf-8')
+    timings = []
+    for line in result.stderr.splitlines():
+        # 格式: import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        parts = line.split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            timings.append((parts[2].strip(), int(parts[1].strip())))
+        except ValueError:
+            continue
+    timings.sort(key=lambda item: item[1], reverse=True)
+    return timings[:count]
+
+
+def check_target(module: str, iterations: int) -> Dict:
+    """
+    多次测量一个入口模块的导入耗时
+
+    Args:
+        module: 入口模块名
+        iterations: 测量次数
+
+    Returns:
+        Dict: {'median_ms', 'min_ms', 'max_ms', 'eager_modules'}
+    """
+    timings = []
+    loaded = []
+    for _ in range(iterations):
+        elapsed, loaded = measure_import(module)
+        timings.append(elapsed * 1000)
+    prefixes = TARGETS[module]
+    eager_modules = [name for name in loaded if name.startswith(prefixes)]
+    return {
+        'median_ms': median(timings),
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+        'eager_modules': eager_modules,
+    }
+
+
+def main():
+    """运行评测"""
+    parser = argparse.ArgumentParser(description="评测界面和命令行入口的启动（导入）耗时")
+    parser.add_argument('--modules', default=','.join(TARGETS), help="评测的入口模块，逗号分隔")
+    parser.add_argument('--iterations', type=int, default=5, help="每个模块测量的次数")
+    parser.add_argument('--top', type=int, default=10, help="输出导入耗时最多的模块数量，0表示不输出")
+    parser.add_argument('--max-ms', type=float, help="导入耗时中位数上限（毫秒），超出时返回非0")
+    parser.add_argument('--json', help="把评测结果写入JSON文件")
+    args = parser.parse_args()
+
+    modules = [module.strip() for module in args.modules.split(',') if module.strip()]
+    unknown = [module for module in modules if module not in TARGETS]
+    if unknown:
+        print(f"不支持的模块: {', '.join(unknown)}，可选: {', '.join(TARGETS)}")
+        return 2
+
+    results = {}
+    failed = False
+    try:
+        for module in modules:
+            result = check_target(module, args.iterations)
+            results[module] = result
+            print(f"{module:<20}中位数 {result['median_ms']:>8.1f} ms"
+                  f"  (最小 {result['min_ms']:.1f} / 最大 {result['max_ms']:.1f})", flush=True)
+            if result['eager_modules']:
+                failed = True
+                print(f"  启动时提前加载了: {', '.join(result['eager_modules'])}")
+            if args.max_ms is not None and result['median_ms'] > args.max_ms:
+                failed = True
+                print(f"  超出耗时上限 {args.max_ms:.1f} ms")
+            if args.top > 0:
+                for name, cumulative in top_imports(module, args.top):
+                    print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+    except Exception as e:
+        print(f"评测失败: {e}")
+        return 1
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
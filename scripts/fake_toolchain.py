@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟编译工具链
+接受与IarBuild/UV4相同的命令行，按设定速度输出编译信息、模拟编译耗时，并在分析器期望的位置生成bin/out/axf文件，用于在Linux上测试和评测完整编译流程
+"""
+
+import os
+import re
+import sys
+import stat
+import time
+import hashlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from lib_logger import logger
+from lib_IAR.project_analyzer import IARProjectAnalyzer
+from lib_MDK.project_analyzer import MDKProjectAnalyzer
+from typing import Dict, List, Optional
+
+# 模拟参数（环境变量）
+ENV_COMPILE_SECONDS = 'FAKE_TOOLCHAIN_COMPILE_SECONDS'  # 完整编译的总耗时（秒），按编译的文件数分摊
+ENV_LINE_DELAY = 'FAKE_TOOLCHAIN_LINE_DELAY'            # 每行输出之间的间隔（秒）
+ENV_IMAGE_SIZE = 'FAKE_TOOLCHAIN_IMAGE_SIZE'            # 生成的bin文件大小（字节）
+ENV_IMAGE_BASE = 'FAKE_TOOLCHAIN_IMAGE_BASE'            # bin起始地址，默认取链接脚本中的flash起始地址
+ENV_FAIL = 'FAKE_TOOLCHAIN_FAIL'                        # 非空时模拟编译错误
+
+DEFAULT_IMAGE_BASE = 0x08000000
+SIMULATED_VERSION = '9.30.1.335'
+SIMULATED_MDK_VERSION = '5.38.0.0'
+
+# 信息文件中定位到固定地址的字符串常量：IAR #pragma location 和 MDK __attribute__((at()))
+_IAR_LOCATED_STRING = re.compile(
+    r'#pragma\s+location\s*=\s*(0x[0-9A-Fa-f]+)\s*\n[^;]*?\b\w+\s*\[\s*\d*\s*\]\s*=\s*"([^"]*)"')
+_MDK_LOCATED_STRING = re.compile(
+    r'\b\w+\s*\[\s*\d*\s*\]\s*__attribute__\s*\(\(\s*at\s*\(\s*(0x[0-9A-Fa-f]+)\s*\)\s*\)\)\s*=\s*"([^"]*)"')
+
+
+class SimulationSettings:
+    """模拟参数"""
+
+    def __init__(self, environ: Dict = None):
+        """
+        从环境变量读取模拟参数
+
+        Args:
+            environ: 环境变量字典，默认为os.environ
+        """
+        environ = os.environ if environ is None else environ
+        self.compile_seconds = float(environ.get(ENV_COMPILE_SECONDS, '1.0'))
+        self.line_delay = float(environ.get(ENV_LINE_DELAY, '0.01'))
+        self.image_size = int(environ.get(ENV_IMAGE_SIZE, str(64 * 1024)), 0)
+        base = environ.get(ENV_IMAGE_BASE, '')
+        self.image_base = int(base, 0) if base else None
+        self.fail = bool(environ.get(ENV_FAIL, ''))
+
+
+class OutputWriter:
+    """按设定速度输出编译信息（IAR写标准输出，UV4写 -o 日志文件）"""
+
+    def __init__(self, settings: SimulationSettings, log_path: str = None):
+        self.settings = settings
+        self.log_file = open(log_path, 'w', encoding='utf-8') if log_path else None
+
+    def line(self, text: str = ''):
+        """输出一行"""
+        if self.log_file:
+            self.log_file.write(text + '\n')
+            self.log_file.flush()
+        else:
+            print(text, flush=True)
+        if self.settings.line_delay > 0:
+            time.sleep(self.settings.line_delay)
+
+    def close(self):
+        if self.log_file:
+            self.log_file.close()
+
+
+def _located_strings(sources: List[str]) -> Dict[int, str]:
+    """从源文件中收集定位到固定地址的字符串常量（固件版本等） {地址: 内容}"""
+    located = {}
+    for path in sources:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError:
+            continue
+        for pattern in (_IAR_LOCATED_STRING, _MDK_LOCATED_STRING):
+            for match in pattern.finditer(text):
+                located[int(match.group(1), 16)] = match.group(2)
+    return located
+
+
+def synthesize_image(sources: List[str], image_base: int, image_size: int) -> bytes:
+    """
+    生成确定性的bin镜像：内容由源文件内容决定，固定地址的字符串常量写入对应偏移，其余信息字段保持为0
+
+    Args:
+        sources: 源文件路径
+        image_base: bin起始地址
+        image_size: 镜像大小，容纳不下固定地址的常量时自动扩大
+
+    Returns:
+        bytes: 镜像内容
+    """
+    seed = hashlib.sha1()
+    for path in sorted(sources):
+        try:
+            with open(path, 'rb') as f:
+                seed.update(f.read())
+        except OSError:
+            seed.update(path.encode('utf-8'))
+
+    located = _located_strings(sources)
+    for address, text in located.items():
+        image_size = max(image_size, address - image_base + len(text) + 1)
+
+    image = bytearray(hashlib.shake_256(seed.digest()).digest(image_size))
+    # 信息字段所在的256字节区域清零（链接器为零初始化的常量保留的空间）
+    for address in located:
+        start = (address - image_base) & ~0xFF
+        if start >= 0:
+            image[start:start + 0x100] = bytes(len(image[start:start + 0x100]))
+    for address, text in located.items():
+        offset = address - image_base
+        if offset >= 0:
+            data = text.encode('ascii', errors='replace') + b'\0'
+            image[offset:offset + len(data)] = data
+    return bytes(image)
+
+
+def _write_file(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _select_sources(sources: List[str], reference: Optional[str], rebuild: bool) -> List[str]:
+    """选择需要编译的源文件：完整编译时全部，增量编译时只选比上次输出新的文件"""
+    existing = [path for path in sources if os.path.isfile(path)]
+    if rebuild or not reference or not os.path.exists(reference):
+        return existing
+    reference_mtime = os.path.getmtime(reference)
+    return [path for path in existing if os.path.getmtime(path) > reference_mtime]
+
+
+def _image_base(settings: SimulationSettings, analyzer, configuration: Dict) -> int:
+    if settings.image_base is not None:
+        return settings.image_base
+    try:
+        return analyzer.get_flash_offset_from_configuration(configuration) or DEFAULT_IMAGE_BASE
+    except Exception:
+        return DEFAULT_IMAGE_BASE
+
+
+def _compile(writer: OutputWriter, settings: SimulationSettings, compiled: List[str], total: int,
+             line_format: str):
+    """模拟编译源文件，完整编译的总耗时按项目源文件数分摊到每个文件"""
+    per_file = settings.compile_seconds / max(1, total)
+    for path in compiled:
+        writer.line(line_format.format(name=os.path.basename(path)))
+        if per_file > 0:
+            time.sleep(per_file)
+
+
+def _iar_build_configuration(writer: OutputWriter, settings: SimulationSettings, analyzer: IARProjectAnalyzer,
+                             ewp_path: str, configuration: Dict, command: str) -> int:
+    """模拟IarBuild编译一个项目配置，返回错误数"""
+    project_name = os.path.splitext(os.path.basename(ewp_path))[0]
+    outputs = {'bin_file': None, 'out_file': None}
+    output_dir = configuration.get('output_dir_abs', '')
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = analyzer.find_build_outputs(ewp_path, configuration)
+
+    if command == '-clean':
+        writer.line(f"Cleaning configuration: {project_name} - {configuration['name']}")
+        for key in ('bin_file', 'out_file'):
+            if outputs.get(key) and os.path.exists(outputs[key]):
+                os.remove(outputs[key])
+        return 0
+
+    sources = analyzer.get_project_inputs(ewp_path)['sources']
+    compiled = _select_sources(sources, outputs.get('out_file'), command == '-build')
+    writer.line(f"Building configuration: {project_name} - {configuration['name']}")
+    writer.line("Updating build tree...")
+    writer.line()
+    _compile(writer, settings, compiled, len(sources), "{name}")
+
+    if settings.fail:
+        name = os.path.basename(compiled[0] if compiled else (sources[0] if sources else 'main.c'))
+        writer.line(f'Error[Pe020]: identifier "undefined_symbol" is undefined {os.path.abspath(name)} 1')
+        writer.line()
+        writer.line("Total number of errors: 1")
+        writer.line("Total number of warnings: 0")
+        return 1
+
+    if compiled or not (outputs.get('bin_file') and os.path.exists(outputs['bin_file'])):
+        writer.line("Linking")
+        image = synthesize_image(sources, _image_base(settings, analyzer, configuration), settings.image_size)
+        if outputs.get('bin_file'):
+            _write_file(outputs['bin_file'], image)
+        if outputs.get('out_file'):
+            _write_file(outputs['out_file'], b'\x7fELF' + image)
+    writer.line()
+    writer.line("Total number of errors: 0")
+    writer.line("Total number of warnings: 0")
+    return 0
+
+
+def run_iarbuild(args: List[str], settings: SimulationSettings) -> int:
+    """
+    模拟IarBuild: IarBuild <project.ewp> -make|-build|-clean <配置> [-log level] [-parallel N]
+    或 IarBuild <workspace.eww> -make|-build|-clean -batch <批量编译名称>
+
+    Returns:
+        int: 返回码，0为成功
+    """
+    writer = OutputWriter(settings)
+    writer.line(f"IAR Command Line Build Utility V{SIMULATED_VERSION} (simulated)")
+    writer.line("Copyright 2002-2024 IAR Systems AB.")
+    writer.line()
+    if not args or '-?' in args:
+        writer.line("Usage: IarBuild <project.ewp> -clean|-build|-make <configuration> [-log errors|warnings|info|all]")
+        writer.line("       IarBuild <workspace.eww> -clean|-build|-make -batch <batch name>")
+        return 0 if args else 1
+    if len(args) < 3:
+        writer.line("Error: missing command or configuration")
+        return 1
+
+    project_file, command = args[0], args[1]
+    if command not in ('-make', '-build', '-clean'):
+        writer.line(f"Error: unknown command {command}")
+        return 1
+
+    analyzer = IARProjectAnalyzer(use_cache=False)
+    if project_file.lower().endswith('.eww'):
+        if args[2] != '-batch' or len(args) < 4:
+            writer.line("Error: workspace builds require -batch <name>")
+            return 1
+        members = [(config['project_path'], dict(config, name=config['build_configuration']))
+                   for config in analyzer.get_batch_configurations(project_file, args[3])]
+        if not members:
+            writer.line(f"Error: batch {args[3]} not found")
+            return 1
+    else:
+        project_info = analyzer.analyze_ewp_file(project_file)
+        configuration = next((config for config in (project_info or {}).get('configurations', [])
+                              if config['name'] == args[2]), None)
+        if configuration is None:
+            writer.line(f"Error: configuration {args[2]} not found in {project_file}")
+            return 1
+        members = [(project_file, configuration)]
+
+    errors = 0
+    for ewp_path, configuration in members:
+        errors += _iar_build_configuration(writer, settings, analyzer, ewp_path, configuration, command)
+    return 1 if errors else 0
+
+
+def _uv4_build_target(writer: OutputWriter, settings: SimulationSettings, analyzer: MDKProjectAnalyzer,
+                      uvprojx_path: str, configuration: Dict, command: str) -> int:
+    """模拟UV4编译一个目标，返回错误数"""
+    outputs = {'bin_file': None, 'axf_file': None}
+    output_dir = configuration.get('output_dir_abs', '')
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = analyzer.find_build_outputs(uvprojx_path, configuration)
+
+    if command == '-c':
+        writer.line(f"Clean target '{configuration['name']}'")
+        for key in ('bin_file', 'axf_file'):
+            if outputs.get(key) and os.path.exists(outputs[key]):
+                os.remove(outputs[key])
+        return 0
+
+    sources = analyzer.get_project_inputs(uvprojx_path)['sources']
+    compiled = _select_sources(sources, outputs.get('axf_file'), command == '-r')
+    writer.line(f"{'Rebuild' if command == '-r' else 'Build'} target '{configuration['name']}'")
+    _compile(writer, settings, compiled, len(sources), "compiling {name}...")
+
+    axf_name = os.path.basename(outputs.get('axf_file') or f"{configuration['name']}.axf")
+    if settings.fail:
+        name = os.path.basename(compiled[0] if compiled else (sources[0] if sources else 'main.c'))
+        writer.line(f"{name}(1): error:  #20: identifier \"undefined_symbol\" is undefined")
+        writer.line(f'"{axf_name}" - 1 Error(s), 0 Warning(s).')
+        return 1
+
+    if compiled or not (outputs.get('bin_file') and os.path.exists(outputs['bin_file'])):
+        writer.line("linking...")
+        image = synthesize_image(sources, _image_base(settings, analyzer, configuration), settings.image_size)
+        writer.line(f"Program Size: Code={len(image)} RO-data=0 RW-data=0 ZI-data=0  ")
+        if outputs.get('axf_file'):
+            _write_file(outputs['axf_file'], b'\x7fELF' + image)
+        if outputs.get('bin_file'):
+            writer.line("FromELF: creating binary file...")
+            _write_file(outputs['bin_file'], image)
+    writer.line(f'"{axf_name}" - 0 Error(s), 0 Warning(s).')
+    return 0
+
+
+def run_uv4(args: List[str], settings: SimulationSettings) -> int:
+    """
+    模拟UV4: UV4 -b|-r|-c <project.uvprojx|workspace.uvmpw> [-t <目标>] [-z] [-j0] [-o <日志文件>]
+
+    Returns:
+        int: 返回码，0 无错误无警告，2 有错误，3 命令行错误
+    """
+    command = next((arg for arg in args if arg in ('-b', '-r', '-c')), None)
+    project_file = next((arg for index, arg in enumerate(args)
+                         if arg.lower().endswith(('.uvprojx', '.uvmpw')) and args[index - 1] not in ('-o', '-t')), None)
+    target = args[args.index('-t') + 1] if '-t' in args and args.index('-t') + 1 < len(args) else None
+    log_path = args[args.index('-o') + 1] if '-o' in args and args.index('-o') + 1 < len(args) else None
+    if not command or not project_file:
+        return 3
+
+    writer = OutputWriter(settings, log_path)
+    start_time = time.time()
+    try:
+        writer.line(f"*** Using Compiler 'V6.21 (simulated)', folder: '{os.path.dirname(os.path.abspath(__file__))}'")
+        analyzer = MDKProjectAnalyzer(use_cache=False)
+        if project_file.lower().endswith('.uvmpw'):
+            workspace = analyzer.analyze_uvmpw_file(project_file)
+            members = [(config['project_path'], dict(config, name=config['build_configuration']))
+                       for config in (workspace or {}).get('configurations', [])]
+            if '-z' not in args:
+                # 不加 -z 时只编译各项目的第一个（活动）目标
+                first = {}
+                for project_path, configuration in members:
+                    first.setdefault(project_path, configuration)
+                members = list(first.items())
+        else:
+            project_info = analyzer.analyze_uvprojx_file(project_file)
+            configurations = (project_info or {}).get('configurations', [])
+            if target:
+                configurations = [config for config in configurations if config['name'] == target]
+            members = [(project_file, config) for config in configurations[:1]]
+        if not members:
+            writer.line(f"*** Error: target '{target}' not found in {project_file}")
+            return 3
+
+        errors = 0
+        for uvprojx_path, configuration in members:
+            if len(members) > 1:
+                writer.line(f"Build started: Project: {os.path.splitext(os.path.basename(uvprojx_path))[0]}")
+            errors += _uv4_build_target(writer, settings, analyzer, uvprojx_path, configuration, command)
+        elapsed = int(time.time() - start_time)
+        writer.line(f"Build Time Elapsed:  {elapsed // 3600:02d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}")
+        return 2 if errors else 0
+    finally:
+        writer.close()
+
+
+def main(tool: str = None, argv: List[str] = None) -> int:
+    """
+    模拟工具链入口
+
+    Args:
+        tool: 'IAR' 或 'MDK'，为None时根据程序名判断
+        argv: 命令行参数（不含程序名），默认为sys.argv[1:]
+
+    Returns:
+        int: 返回码
+    """
+    # 模拟工具链的输出即编译输出，关闭分析器的日志
+    logger.remove()
+    argv = sys.argv[1:] if argv is None else argv
+    if tool is None:
+        tool = 'MDK' if 'uv4' in os.path.basename(sys.argv[0]).lower() else 'IAR'
+    settings = SimulationSettings()
+    if tool == 'MDK':
+        return run_uv4(argv, settings)
+    return run_iarbuild(argv, settings)
+
+
+def install(dest_dir: str) -> Dict[str, str]:
+    """
+    在目录中生成模拟的IAR和MDK安装目录，可执行文件为调用本模块的脚本
+
+    生成 <dest_dir>/IAR/common/bin/IarBuild.exe 和 <dest_dir>/Keil_v5/UV4/UV4.exe，
+    配置中的 iar_installation_path / mdk_installation_path 指向对应的安装目录即可（仅支持可直接执行脚本的系统）
+
+    Args:
+        dest_dir: 目标目录
+
+    Returns:
+        Dict[str, str]: {'iar_installation_path', 'mdk_installation_path', 'iar_executable', 'mdk_executable'}
+    """
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    iar_dir = os.path.join(dest_dir, 'IAR')
+    mdk_dir = os.path.join(dest_dir, 'Keil_v5')
+    executables = {
+        'IAR': os.path.join(iar_dir, 'common', 'bin', 'IarBuild.exe'),
+        'MDK': os.path.join(mdk_dir, 'UV4', 'UV4.exe'),
+    }
+    for tool, path in executables.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"#!{sys.executable}\n"
+                    f"import sys\n"
+                    f"sys.path.insert(0, {scripts_dir!r})\n"
+                    f"from fake_toolchain import main\n"
+                    f"sys.exit(main({tool!r}))\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    with open(os.path.join(mdk_dir, 'TOOLS.INI'), 'w', encoding='utf-8') as f:
+        f.write(f"[UV2]\nVERSION={SIMULATED_MDK_VERSION}\n")
+    return {
+        'iar_installation_path': iar_dir,
+        'mdk_installation_path': mdk_dir,
+        'iar_executable': executables['IAR'],
+        'mdk_executable': executables['MDK'],
+    }
+
+
+if __name__ == "__main__":
+    # python scripts/fake_toolchain.py install <目录>  生成模拟安装目录
+    # python scripts/fake_toolchain.py IAR|MDK <参数>  直接以指定工具运行
+    if len(sys.argv) > 2 and sys.argv[1] == 'install':
+        for key, value in install(sys.argv[2]).items():
+            print(f"{key}: {value}")
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] in ('IAR', 'MDK'):
+        sys.exit(main(sys.argv[1], sys.argv[2:]))
+    print("用法: python fake_toolchain.py install <目录> | IAR|MDK <参数>")
+    sys.exit(1)
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+源文件清单模块
+记录每次成功编译时项目输入文件的(路径, 大小, 修改时间, 哈希)和编译镜像，下次编译前比较变化并决定增量编译、完整编译或免编译更新版本号
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from lib_logger import logger
+from parse_cache import get_cache_root
+from build_cache import hash_file
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class SourceManifest:
+    """源文件清单"""
+
+    def __init__(self, files: Dict[str, Dict] = None, properties: Dict = None):
+        """
+        初始化源文件清单
+
+        Args:
+            files: {路径: {'size', 'mtime_ns', 'hash'}}
+            properties: 编译相关属性（linker_file、options_digest、toolchain等）
+        """
+        self.files = files or {}
+        self.properties = properties or {}
+
+    @classmethod
+    def scan(cls, paths: Iterable[str], properties: Dict = None,
+             previous: 'SourceManifest' = None) -> 'SourceManifest':
+        """
+        扫描文件生成清单，大小和修改时间与上一份清单相同的文件直接沿用其哈希
+
+        Args:
+            paths: 文件路径
+            properties: 编译相关属性
+            previous: 上一份清单
+
+        Returns:
+            SourceManifest: 清单
+        """
+        previous_files = previous.files if previous else {}
+        files = {}
+        hashed = 0
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = previous_files.get(path)
+            if old and old['size'] == st.st_size and old['mtime_ns'] == st.st_mtime_ns:
+                digest = old['hash']
+            else:
+                digest = hash_file(path)
+                hashed += 1
+            files[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest}
+        logger.debug(f"源文件清单: {len(files)} 个文件, 重新计算哈希 {hashed} 个")
+        return cls(files, properties)
+
+    def file_hashes(self) -> Dict[str, str]:
+        """获取 {路径: 哈希}"""
+        return {path: info['hash'] for path, info in self.files.items()}
+
+    def diff(self, previous: 'SourceManifest') -> Dict:
+        """
+        与上一份清单比较（按内容哈希，仅修改时间变化不算修改）
+
+        Args:
+            previous: 上一份清单
+
+        Returns:
+            Dict: {'added', 'removed', 'modified': 路径列表, 'properties': 变化的属性名列表}
+        """
+        added = sorted(set(self.files) - set(previous.files))
+        removed = sorted(set(previous.files) - set(self.files))
+        modified = sorted(path for path in set(self.files) & set(previous.files)
+                          if self.files[path]['hash'] != previous.files[path]['hash'])
+        keys = set(self.properties) | set(previous.properties)
+        properties = sorted(key for key in keys if self.properties.get(key) != previous.properties.get(key))
+        return {'added': added, 'removed': removed, 'modified': modified, 'properties': properties}
+
+    def to_dict(self) -> Dict:
+        """转换为可序列化的字典"""
+        return {'files': self.files, 'properties': self.properties}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SourceManifest':
+        """从字典恢复清单"""
+        return cls(data.get('files', {}), data.get('properties', {}))
+
+
+def version_masked_digest(info_file: str, version_keyword: str = '__Firmware_Version') -> Optional[str]:
+    """
+    计算信息文件去掉版本号字符串后的内容哈希（只修改版本号时不变，修改其他代码时变化）
+
+    Args:
+        info_file: 信息文件路径
+        version_keyword: 版本号变量名
+
+    Returns:
+        Optional[str]: 十六进制摘要，读取失败或找不到版本号定义时返回None
+    """
+    try:
+        with open(info_file, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+    except OSError as e:
+        logger.warning(f"读取信息文件失败: {e}")
+        return None
+    # IAR: __Firmware_Version[10] = "V1.0.0.1"; MDK: __Firmware_Version[10] __attribute__((at(0x...))) = "V1.0.0.1"
+    pattern = rf'(\b{re.escape(version_keyword)}\s*\[[^\]]*\]\s*(?:__attribute__\s*\(\(.*?\)\)\s*)?=\s*")[^"]*(")'
+    masked, count = re.subn(pattern, r'\g<1>\g<2>', content)
+    if count != 1:
+        return None
+    return hashlib.sha1(masked.encode('utf-8')).hexdigest()
+
+
+def is_info_file_only_change(current: SourceManifest, previous: Optional[SourceManifest],
+                             info_file: str = None) -> bool:
+    """
+    判断与上一份清单相比是否只有信息文件中的版本号变化（编译属性和其他文件均未变化）
+
+    清单属性 info_digest 为 version_masked_digest 的结果，两份清单都记录且一致时才说明信息文件中版本号以外的内容未变化
+
+    Args:
+        current: 当前清单
+        previous: 上一次成功编译的清单
+        info_file: 信息文件路径
+
+    Returns:
+        bool: 是否只有版本号变化
+    """
+    if previous is None or not info_file:
+        return False
+    if not current.properties.get('info_digest') or not previous.properties.get('info_digest'):
+        return False
+    changes = current.diff(previous)
+    if changes['properties'] or changes['added'] or changes['removed']:
+        return False
+    return changes['modified'] == [os.path.normcase(os.path.abspath(info_file))]
+
+
+def decide_build_strategy(current: SourceManifest, previous: Optional[SourceManifest],
+                          info_file: str = None) -> Tuple[bool, str]:
+    """
+    根据清单变化决定编译策略
+
+    工具链、链接脚本或编译选项变化时完整编译；只有信息文件变化或其他源文件变化时增量编译；
+    没有上一次编译的清单时无法确认输出目录中的目标文件是否可信，执行完整编译
+
+    Args:
+        current: 当前清单
+        previous: 上一次成功编译的清单
+        info_file: 信息文件（版本号所在文件）路径
+
+    Returns:
+        Tuple[bool, str]: (是否完整编译, 原因)
+    """
+    if previous is None:
+        return True, "无上次编译的源文件清单，执行完整编译"
+
+    changes = current.diff(previous)
+    rebuild_reasons = {
+        'toolchain': '编译工具变化',
+        'linker_file': '链接脚本路径变化',
+        'options_digest': '编译选项变化',
+    }
+    for key in changes['properties']:
+        if key in rebuild_reasons:
+            return True, f"{rebuild_reasons[key]}，执行完整编译"
+
+    linker_file = current.properties.get('linker_file')
+    if linker_file and linker_file in changes['modified']:
+        return True, "链接脚本内容变化，执行完整编译"
+
+    changed = changes['added'] + changes['removed'] + changes['modified']
+    if not changed:
+        return False, "源文件无变化，执行增量编译"
+    if is_info_file_only_change(current, previous, info_file):
+        return False, "仅版本号变化，执行增量编译"
+    return False, (f"源文件变化（新增 {len(changes['added'])}，删除 {len(changes['removed'])}，"
+                   f"修改 {len(changes['modified'])}），执行增量编译")
+
+
+class ManifestStore:
+    """源文件清单存储（每个项目文件/配置一份）"""
+
+    CACHE_NAMESPACE = 'source_manifest'
+
+    def __init__(self, cache_dir: str = None):
+        """
+        初始化清单存储
+
+        Args:
+            cache_dir: 存储目录，默认为程序缓存目录下的source_manifest
+        """
+        self.cache_dir = cache_dir or os.path.join(get_cache_root(), self.CACHE_NAMESPACE)
+        self._lock = threading.Lock()
+
+    def _entry_path(self, project_file: str, configuration: str, extension: str = '.json') -> str:
+        """获取清单文件路径（extension为.bin时为对应的编译镜像路径）"""
+        text = f"{os.path.normcase(os.path.abspath(project_file))}|{configuration}"
+        return os.path.join(self.cache_dir, f"{hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]}{extension}")
+
+    def image_path(self, project_file: str, configuration: str) -> Optional[str]:
+        """
+        获取与清单一同保存的编译镜像（未写入版本信息前的bin文件）
+
+        Args:
+            project_file: 项目文件路径
+            configuration: 配置名称
+
+        Returns:
+            Optional[str]: 镜像路径，不存在时返回None
+        """
+        path = self._entry_path(project_file, configuration, '.bin')
+        return path if os.path.isfile(path) else None
+
+    def save_image(self, project_file: str, configuration: str, bin_path: str) -> bool:
+        """
+        保存成功编译时工具链生成的bin文件，供仅版本号变化时直接重新写入版本信息
+
+        Args:
+            project_file: 项目文件路径
+            configuration: 配置名称
+            bin_path: 编译生成的bin文件路径
+
+        Returns:
+            bool: 是否成功
+        """
+        image_path = self._entry_path(project_file, configuration, '.bin')
+        temp_path = f"{image_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            shutil.copyfile(bin_path, temp_path)
+            os.replace(temp_path, image_path)
+            return True
+        except Exception as e:
+            logger.error(f"保存编译镜像失败: {e}")
+            return False
+
+    def load(self, project_file: str, configuration: str) -> Optional[SourceManifest]:
+        """
+        读取上一次成功编译的清单
+
+        Args:
+            project_file: 项目文件路径
+            configuration: 配置名称
+
+        Returns:
+            Optional[SourceManifest]: 清单，不存在时返回None
+        """
+        try:
+            with open(self._entry_path(project_file, configuration), 'r', encoding='utf-8') as f:
+                return SourceManifest.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取源文件清单失败，视为无清单: {e}")
+            return None
+
+    def save(self, project_file: str, configuration: str, manifest: SourceManifest) -> bool:
+        """
+        保存成功编译时的清单
+
+        Args:
+            project_file: 项目文件路径
+            configuration: 配置名称
+            manifest: 清单
+
+        Returns:
+            bool: 是否成功
+        """
+        entry_path = self._entry_path(project_file, configuration)
+        temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            data = manifest.to_dict()
+            data['saved_at'] = datetime.now().isoformat(timespec='seconds')
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(temp_path, entry_path)
+            return True
+        except Exception as e:
+            logger.error(f"保存源文件清单失败: {e}")
+            return False
+
+
+if __name__ == "__main__":
+    # 测试编译策略判断
+    import tempfile
+    work_dir = tempfile.mkdtemp()
+    main_c = os.path.normcase(os.path.join(work_dir, 'main.c'))
+    uart_c = os.path.normcase(os.path.join(work_dir, 'uart.c'))
+    for path in (main_c, uart_c):
+        with open(path, 'w') as f:
+            f.write('const char version[] = "V1.0.0.1";\n')
+
+    properties = {'linker_file': '', 'options_digest': 'a', 'toolchain': 't'}
+    first = SourceManifest.scan([main_c, uart_c], dict(properties, info_digest=version_masked_digest(main_c, 'version')))
+    print(decide_build_strategy(first, None, main_c))
+
+    with open(main_c, 'w') as f:
+        f.write('const char version[] = "V1.0.0.2";\n')
+    second = SourceManifest.scan([main_c, uart_c], dict(properties, info_digest=version_masked_digest(main_c, 'version')),
+                                 first)
+    print(decide_build_strategy(second, first, main_c))
+
+    third = SourceManifest.scan([main_c, uart_c], dict(properties, options_digest='b'), second)
+    print(decide_build_strategy(third, second, main_c))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流程阶段并行执行模块
+按阶段之间的依赖关系执行，互不依赖的阶段同时执行，依赖的阶段结果传给后续阶段，并记录各阶段耗时
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from lib_logger import logger
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class StageError(Exception):
+    """阶段执行失败（预期内的失败，如配置不完整），停止执行后续阶段"""
+
+    def __init__(self, message: str, detail: Any = None):
+        """
+        Args:
+            message: 失败信息
+            detail: 附加信息，由调用方解释（如错误对话框标题）
+        """
+        super().__init__(message)
+        self.message = message
+        self.detail = detail
+
+
+class StageExecutor:
+    """流程阶段执行器：阶段按依赖关系组成有向无环图，依赖完成后立即开始执行"""
+
+    def __init__(self, max_workers: int = None):
+        """
+        初始化执行器
+
+        Args:
+            max_workers: 同时执行的阶段数上限，为None时不限制（等于阶段数）
+        """
+        self.max_workers = max_workers
+        self._stages: Dict[str, Dict] = {}
+        self._cancel_event = threading.Event()
+
+    def add_stage(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                  depends: Sequence[str] = ()) -> 'StageExecutor':
+        """
+        添加阶段，依赖的阶段必须已经添加（保证不会出现循环依赖）
+
+        Args:
+            name: 阶段名称
+            func: 阶段函数，参数为 {依赖阶段名称: 结果}，返回本阶段结果，失败时抛出 StageError
+            depends: 依赖的阶段名称
+
+        Returns:
+            StageExecutor: 执行器本身，便于链式添加
+        """
+        if name in self._stages:
+            raise ValueError(f"阶段重复: {name}")
+        missing = [dependency for dependency in depends if dependency not in self._stages]
+        if missing:
+            raise ValueError(f"阶段 {name} 依赖的阶段未添加: {', '.join(missing)}")
+        self._stages[name] = {'func': func, 'depends': tuple(depends)}
+        return self
+
+    def cancel(self):
+        """取消执行：尚未开始的阶段不再执行，正在执行的阶段执行完成后返回"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消（阶段函数可以据此提前结束）"""
+        return self._cancel_event.is_set()
+
+    def run(self) -> Dict:
+        """
+        执行所有阶段
+
+        Returns:
+            Dict: {'success', 'results': {阶段: 结果}, 'timings': {阶段: 耗时秒数}, 'elapsed',
+                   'failed_stage', 'error', 'skipped': [未执行的阶段], 'cancelled'}
+        """
+        results = {}
+        timings = {}
+        failed_stage = None
+        error = None
+        pending = list(self._stages)
+        running = {}
+        start_time = time.perf_counter()
+
+        def run_stage(name: str, inputs: Dict[str, Any]):
+            stage_start = time.perf_counter()
+            try:
+                return self._stages[name]['func'](inputs)
+            finally:
+                timings[name] = time.perf_counter() - stage_start
+
+        max_workers = self.max_workers or max(1, len(self._stages))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stage') as executor:
+            while True:
+                # 失败或取消后不再开始新的阶段
+                if failed_stage is None and not self.cancelled:
+                    for name in list(pending):
+                        depends = self._stages[name]['depends']
+                        if all(dependency in results for dependency in depends):
+                            pending.remove(name)
+                            inputs = {dependency: results[dependency] for dependency in depends}
+                            running[executor.submit(run_stage, name, inputs)] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        logger.info(f"阶段 {name} 完成，耗时 {timings.get(name, 0.0):.3f}秒")
+                    except Exception as e:
+                        if failed_stage is None:
+                            failed_stage, error = name, e
+                        if isinstance(e, StageError):
+                            logger.warning(f"阶段 {name} 失败: {e}")
+                        else:
+                            logger.error(f"阶段 {name} 异常: {e}")
+
+        skipped = [name for name in self._stages if name not in results and name != failed_stage]
+        if skipped:
+            logger.info(f"未执行的阶段: {', '.join(skipped)}")
+        return {
+            'success': failed_stage is None and not skipped,
+            'results': results,
+            'timings': timings,
+            'elapsed': time.perf_counter() - start_time,
+            'failed_stage': failed_stage,
+            'error': error,
+            'skipped': skipped,
+            'cancelled': self.cancelled,
+        }
+
+    @staticmethod
+    def format_timings(result: Dict) -> List[str]:
+        """
+        生成各阶段耗时摘要
+
+        Args:
+            result: run 的返回结果
+
+        Returns:
+            List[str]: 摘要行
+        """
+        timings = result['timings']
+        lines = [f"{name}: {seconds:.3f}秒" for name, seconds in timings.items()]
+        lines.append(f"总耗时 {result['elapsed']:.3f}秒（各阶段合计 {sum(timings.values()):.3f}秒）")
+        return lines
+
+
+__all__ = ['StageError', 'StageExecutor']
+
+
+if __name__ == "__main__":
+    # 测试：paths和git互不依赖同时执行，version依赖两者，总耗时约为较慢的分支加version
+    def sleep_stage(seconds, value):
+        def stage(inputs):
+            time.sleep(seconds)
+            return value
+        return stage
+
+    stage_executor = StageExecutor()
+    stage_executor.add_stage('paths', sleep_stage(0.2, {'project': 'demo.ewp'}))
+    stage_executor.add_stage('git', sleep_stage(0.3, {'branch': 'main'}))
+    stage_executor.add_stage('config', sleep_stage(0.1, True), depends=['paths'])
+    stage_executor.add_stage('version', lambda inputs: f"V1.0.0.1 ({inputs['git']['branch']})",
+                             depends=['config', 'git'])
+    result = stage_executor.run()
+    print(result['results']['version'])
+    for line in StageExecutor.format_timings(result):
+        print(line)
+
+    def failing_stage(inputs):
+        raise StageError("配置不完整")
+
+    stage_executor = StageExecutor()
+    stage_executor.add_stage('config', failing_stage)
+    stage_executor.add_stage('version', sleep_stage(0.1, 'V1.0.0.1'), depends=['config'])
+    result = stage_executor.run()
+    print(result['failed_stage'], result['error'], result['skipped'])
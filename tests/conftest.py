@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""测试公共设置：把仓库根目录加入模块搜索路径，公共的测试数据"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def _write_file(path, data, bump_mtime=False):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data.encode('utf-8') if isinstance(data, str) else data)
+    if bump_mtime:
+        # 保证修改时间变化（文件系统时间精度可能较粗）
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def write_file():
+    """写入文件的函数 write_file(path, data, bump_mtime=False)：自动创建目录，str按UTF-8写入"""
+    return _write_file
+
+
+def _git(cwd, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(args),
+                   cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """提交了 board_a/main.c 和 board_b/main.c 的Git仓库（分支main）"""
+    repo = tmp_path / 'repo'
+    for board in ('board_a', 'board_b'):
+        (repo / board).mkdir(parents=True)
+        (repo / board / 'main.c').write_text('const char __Firmware_Version[] = "V1.0.0.1";\n')
+    _git(repo, 'init', '-q', '-b', 'main')
+    _git(repo, 'config', 'user.name', 'test')
+    _git(repo, 'config', 'user.email', 'test@example.com')
+    _git(repo, 'add', '-A')
+    _git(repo, 'commit', '-q', '-m', 'init')
+    return repo
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""编译结果缓存：多个实例并发读写索引、依赖头文件计入缓存键"""
+
+import os
+import threading
+
+from build_cache import BuildCache, collect_input_files
+from dependency_index import DependencyIndex
+
+
+def test_concurrent_store_from_separate_instances_keeps_index_complete(tmp_path, write_file):
+    cache_dir = str(tmp_path / 'cache')
+    entries_per_thread = 40
+
+    def worker(name):
+        # 与并行编译多个配置相同：每个配置各自创建缓存实例
+        cache = BuildCache(cache_dir)
+        for index in range(entries_per_thread):
+            output = str(tmp_path / name / f'{index}.bin')
+            write_file(output, os.urandom(256))
+            key = cache.compute_key([], {'configuration': name, 'index': index})
+            assert cache.store(key, {'bin_file': output}, f'{name}/{index}')
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ('Debug', 'Release')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    index = BuildCache(cache_dir)._load_index()
+    entry_dirs = [name for name in os.listdir(cache_dir) if os.path.isdir(os.path.join(cache_dir, name))]
+    assert len(index) == 2 * entries_per_thread
+    assert sorted(entry_dirs) == sorted(index)
+
+
+def test_header_outside_source_dirs_changes_key(tmp_path, write_file):
+    source = os.path.normcase(str(tmp_path / 'Src' / 'main.c'))
+    header = os.path.normcase(str(tmp_path / 'Common' / 'Config' / 'board.h'))
+    write_file(source, b'#include "board.h"\nint main(void) { return BOARD; }\n')
+    write_file(header, b'#define BOARD 1\n')
+
+    cache = BuildCache(str(tmp_path / 'cache'))
+    inputs = collect_input_files({'sources': [source], 'include_dirs': []})
+    assert header not in inputs
+    index = DependencyIndex({source: [header]})
+    files = sorted(set(inputs) | set(index.all_files()))
+
+    before = cache.compute_key(files, {'configuration': 'Debug'})
+    write_file(header, b'#define BOARD 2\n')
+    assert cache.compute_key(files, {'configuration': 'Debug'}) != before
+
+
+def test_restore_returns_output_paths(tmp_path, write_file):
+    cache = BuildCache(str(tmp_path / 'cache'))
+    output = str(tmp_path / 'Debug' / 'Exe' / 'Proj.bin')
+    write_file(output, b'\x01' * 64)
+    key = cache.compute_key([], {'configuration': 'Debug'})
+    cache.store(key, {'bin_file': output}, 'Proj/Debug')
+    os.remove(output)
+    os.rmdir(os.path.dirname(output))
+
+    restored = cache.restore(key)
+    assert restored == {'bin_file': os.path.abspath(output)}
+    assert os.path.isfile(output)
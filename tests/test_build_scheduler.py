@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""并行编译调度：输出目录或IAR项目文件冲突的配置放入同一组"""
+
+import os
+
+from build_scheduler import BuildScheduler, group_isolated_lanes
+
+
+def _configuration(name, project, output):
+    root = os.path.abspath(os.sep)
+    return {'name': name, 'project_path': os.path.join(root, 'fw', project),
+            'output_dir_abs': os.path.join(root, 'fw', output, 'Exe'),
+            'list_dir_abs': os.path.join(root, 'fw', output, 'List')}
+
+
+def _names(lanes):
+    return sorted(sorted(configuration['name'] for configuration in lane) for lane in lanes)
+
+
+def test_different_output_directories_run_in_parallel():
+    configurations = [_configuration('Debug', 'app.ewp', 'Debug'), _configuration('Release', 'app.ewp', 'Release')]
+    assert _names(group_isolated_lanes(configurations)) == [['Debug'], ['Release']]
+
+
+def test_configurations_of_one_project_file_share_lane():
+    configurations = [_configuration('Debug', 'app.ewp', 'Debug'), _configuration('Release', 'app.ewp', 'Release'),
+                      _configuration('Boot', 'boot.ewp', 'Boot')]
+    scheduler = BuildScheduler(configurations, cpu_count=8,
+                               shared_files=lambda configuration: [configuration['project_path']])
+    assert _names(scheduler.lanes) == [['Boot'], ['Debug', 'Release']]
+    # 组内保持原有顺序
+    assert [configuration['name'] for configuration in scheduler.lanes[0]] == ['Debug', 'Release']
+    assert scheduler.concurrent == 2
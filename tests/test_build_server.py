@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""编译服务：已结束任务的事件流、结束事件的顺序、任务取消和提交请求校验"""
+
+import json
+import subprocess
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from build_server import (BuildJob, BuildRequestHandler, BuildServer, BuildServerClient, JOB_CANCELLED, JOB_QUEUED,
+                          JOB_SUCCEEDED)
+
+
+@pytest.fixture
+def server(tmp_path):
+    build_server = BuildServer({}, token='secret')
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), BuildRequestHandler)
+    httpd.daemon_threads = True
+    httpd.build_server = build_server
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    # 不启动工作线程，任务由测试直接结束
+    job = build_server.submit({'path': str(tmp_path)})
+    job.finish(JOB_SUCCEEDED, {'message': 'ok'})
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", job
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_finished_job_events_after_last_return_immediately(server):
+    url, job = server
+    client = BuildServerClient(url, token='secret', timeout=5)
+
+    events = list(client.stream_events(job.job_id))
+    assert events[-1]['type'] == 'finished'
+    assert events[-1]['state'] == JOB_SUCCEEDED
+
+    # 从结束事件之后重连：不能一直等待
+    result = []
+    reader = threading.Thread(target=lambda: result.extend(client.stream_events(job.job_id, since=len(events))),
+                              daemon=True)
+    reader.start()
+    reader.join(5)
+    assert not reader.is_alive()
+    assert result == []
+
+
+def test_finish_adds_event_before_state():
+    job = BuildJob({'path': '/tmp'})
+    seen = []
+    original_add_event = job.add_event
+
+    def add_event(event_type, **fields):
+        seen.append(job.state)
+        original_add_event(event_type, **fields)
+
+    job.add_event = add_event
+    job.finish(JOB_SUCCEEDED)
+    assert seen == [JOB_QUEUED]
+    assert job.wait_events(len(job.events), timeout=5) == []
+
+
+def test_invalid_token_rejected(server):
+    url, job = server
+    with pytest.raises(RuntimeError):
+        BuildServerClient(url, token='wrong', timeout=5).get_job(job.job_id)
+    with pytest.raises(RuntimeError):
+        BuildServerClient(url, timeout=5).get_job(job.job_id)
+    assert BuildServerClient(url, token='secret', timeout=5).get_job(job.job_id)['state'] == JOB_SUCCEEDED
+
+
+def test_branch_checked_out_in_main_directory_shares_queue_key(tmp_path):
+    repo = tmp_path / 'repo'
+    project = repo / 'fw'
+    project.mkdir(parents=True)
+    (project / 'main.c').write_text('int main(void) { return 0; }\n')
+    for args in (['init', '-q', '-b', 'main'], ['add', '-A'],
+                 ['-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '-m', 'init'],
+                 ['branch', 'hotfix']):
+        subprocess.run(['git'] + args, cwd=repo, check=True)
+
+    build_server = BuildServer({})
+    plain = build_server.submit({'path': str(project)})
+    main = build_server.submit({'path': str(project), 'branch': 'main'})
+    hotfix = build_server.submit({'path': str(project), 'branch': 'hotfix'})
+    assert main.project_key == plain.project_key
+    assert hotfix.project_key != plain.project_key
+
+
+def test_projects_in_one_worktree_serialise_commit_stage(git_repo, tmp_path):
+    from firmware_pipeline import FirmwarePipeline
+
+    build_server = BuildServer({})
+    board_a = build_server.submit({'path': str(git_repo / 'board_a')})
+    board_b = build_server.submit({'path': str(git_repo / 'board_b')})
+    # 不同项目的任务可以同时执行，提交阶段使用同一个仓库锁
+    assert board_a.project_key != board_b.project_key
+    pipelines = []
+    for board, branch in (('board_a', None), ('board_b', None), ('board_a', 'hotfix')):
+        pipeline = FirmwarePipeline({'worktree_directory': str(tmp_path / 'worktrees')}, str(git_repo / board))
+        if branch:
+            subprocess.run(['git', 'branch', branch], cwd=git_repo, check=True)
+            assert pipeline.use_branch(branch)[0]
+        pipeline.check_git()
+        pipelines.append(pipeline)
+    assert pipelines[0].git_manager.worktree_lock() is pipelines[1].git_manager.worktree_lock()
+    # 分支工作树有自己的暂存区，不与主工作区共用锁
+    assert pipelines[2].git_manager.worktree_lock() is not pipelines[0].git_manager.worktree_lock()
+
+
+def test_cancel_before_pipeline_created(tmp_path):
+    build_server = BuildServer({})
+    job = build_server.submit({'path': str(tmp_path)})
+    # 工作线程已取出任务，流程尚未创建
+    assert build_server._next_job() is job and job.pipeline is None
+    assert build_server.cancel(job.job_id)
+    build_server._execute(job)
+    assert job.state == JOB_CANCELLED
+    assert job.pipeline is None
+
+
+def test_cancel_while_pipeline_created(tmp_path, monkeypatch):
+    import build_server as build_server_module
+
+    build_server = BuildServer({})
+    job = build_server.submit({'path': str(tmp_path)})
+    created = []
+
+    class Pipeline:
+        def __init__(self, *args):
+            self.cancelled = False
+            created.append(self)
+            # 创建流程期间收到取消请求
+            build_server.cancel(job.job_id)
+
+        def cancel(self):
+            self.cancelled = True
+
+        def use_branch(self, branch):
+            raise AssertionError("取消后不应继续执行")
+
+        discover_paths = load_configurations = run = use_branch
+
+    monkeypatch.setattr(build_server_module, 'FirmwarePipeline', Pipeline)
+    assert build_server._next_job() is job
+    build_server._execute(job)
+    assert job.state == JOB_CANCELLED
+    assert created[0].cancelled
+
+
+@pytest.fixture
+def open_server(tmp_path):
+    """未设置访问令牌的编译服务（不启动工作线程）"""
+    build_server = BuildServer({'iar_installation_path': r'C:\IAR'})
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), BuildRequestHandler)
+    httpd.daemon_threads = True
+    httpd.build_server = build_server
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", build_server
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(url, body, headers):
+    request = urllib.request.Request(f"{url}/jobs", data=body.encode('utf-8'), method='POST', headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_cross_site_job_submission_rejected(open_server, tmp_path):
+    url, build_server = open_server
+    body = json.dumps({'path': str(tmp_path)})
+    # 网页表单可以发送的 text/plain 请求
+    assert _post(url, body, {'Content-Type': 'text/plain'}) == 415
+    assert _post(url, body, {'Content-Type': 'application/json', 'Origin': 'http://evil.example'}) == 403
+    assert build_server.list_jobs() == []
+    host = url.split('//', 1)[1]
+    assert _post(url, body, {'Content-Type': 'application/json', 'Origin': f"http://{host}"}) == 202
+    assert _post(url, body, {'Content-Type': 'application/json; charset=utf-8'}) == 202
+
+
+def test_toolchain_overrides_need_token(open_server, tmp_path):
+    _, build_server = open_server
+    request = {'path': str(tmp_path), 'tool_path': r'C:\evil', 'remote_publish_directory': r'\\evil\share',
+               'config': {'iar_installation_path': r'C:\evil', 'build_configuration': 'Release'}}
+    job = build_server.submit(request)
+    assert 'tool_path' not in job.request and 'remote_publish_directory' not in job.request
+    assert job.request['config'] == {'build_configuration': 'Release'}
+    assert any('tool_path' in event.get('message', '') for event in job.events)
+    # 设置了访问令牌时按请求覆盖
+    trusted = BuildServer({}, token='secret').submit(request)
+    assert trusted.request['tool_path'] == r'C:\evil'
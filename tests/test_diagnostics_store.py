@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""编译诊断存储：增量编译沿用未重新编译文件的诊断"""
+
+from diagnostics_store import DiagnosticsStore
+
+UART_WARNING = {'file': 'src/uart.c', 'line': 20, 'severity': 'warning', 'code': 'Pe177', 'message': 'unused "y"'}
+MAIN_WARNING = {'file': 'src/main.c', 'line': 10, 'severity': 'warning', 'code': 'Pe550', 'message': 'unused "x"'}
+HEADER_WARNING = {'file': 'inc/board.h', 'line': 3, 'severity': 'warning', 'code': 'Pe1', 'message': 'shadowed'}
+
+
+def test_incremental_build_keeps_warnings_of_untouched_files(tmp_path):
+    store = DiagnosticsStore(str(tmp_path))
+    store.record_build('main', 'Debug', [MAIN_WARNING, UART_WARNING], 'IAR', 'V1.0.0.1')
+
+    # 只重新编译 main.c：uart.c 的警告不是“已修复”
+    incremental = store.record_build('main', 'Debug', [MAIN_WARNING], 'IAR', 'V1.0.0.2', compiled_files=['main.c'])
+    comparison = store.compare_with_previous(incremental)
+    assert comparison['new'] == [] and comparison['fixed'] == []
+    assert store.get_build(incremental)['incremental'] == 1
+    assert store.get_build(incremental)['warning_count'] == 2
+
+    # 之后的完整编译：uart.c 的警告也不是“新增”
+    full = store.record_build('main', 'Debug', [MAIN_WARNING, UART_WARNING], 'IAR', 'V1.0.0.3')
+    comparison = store.compare_with_previous(full)
+    assert comparison['new'] == [] and comparison['fixed'] == []
+    assert store.get_build(full)['incremental'] == 0
+
+
+def test_incremental_build_reports_fixed_warning_in_recompiled_file(tmp_path):
+    store = DiagnosticsStore(str(tmp_path))
+    store.record_build('main', 'Debug', [MAIN_WARNING, UART_WARNING], 'IAR')
+    incremental = store.record_build('main', 'Debug', [], 'IAR', compiled_files=['main.c'])
+    comparison = store.compare_with_previous(incremental)
+    assert [item['file'] for item in comparison['fixed']] == ['src/main.c']
+    assert comparison['new'] == []
+
+
+def test_header_warning_not_duplicated(tmp_path):
+    store = DiagnosticsStore(str(tmp_path))
+    # 头文件被两个源文件包含，完整编译时警告输出两次
+    store.record_build('main', 'Debug', [HEADER_WARNING, HEADER_WARNING], 'IAR')
+    incremental = store.record_build('main', 'Debug', [HEADER_WARNING], 'IAR', compiled_files=['main.c'])
+    comparison = store.compare_with_previous(incremental)
+    assert comparison['new'] == [] and comparison['fixed'] == []
+    assert len(store.get_diagnostics(incremental)) == 2
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""文件传输：从临时文件继续复制、中断后重试"""
+
+import glob
+import os
+
+import file_transfer
+from file_transfer import copy_files, copy_resumable, temp_path_for
+
+
+def _source(tmp_path, write_file, size=3 * 1024 * 1024):
+    path = str(tmp_path / 'firmware.bin')
+    write_file(path, os.urandom(size))
+    return path
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_resume_from_partial_file(tmp_path, write_file):
+    source = _source(tmp_path, write_file)
+    destination = str(tmp_path / 'remote' / 'firmware.bin')
+    os.makedirs(os.path.dirname(destination))
+    with open(temp_path_for(source, destination), 'wb') as part:
+        part.write(_read(source)[:1024 * 1024])
+
+    results, stats = copy_files([(source, destination)], buffer_size=256 * 1024)
+    assert results[destination] == (True, "")
+    assert stats['resumed_bytes'] == 1024 * 1024
+    assert stats['bytes'] == os.path.getsize(source)
+    assert _read(destination) == _read(source)
+    assert not glob.glob(f"{destination}.*.part")
+
+
+def test_corrupt_partial_file_copied_from_start(tmp_path, write_file):
+    source = _source(tmp_path, write_file)
+    destination = str(tmp_path / 'remote' / 'firmware.bin')
+    os.makedirs(os.path.dirname(destination))
+    with open(temp_path_for(source, destination), 'wb') as part:
+        part.write(b'\0' * 1024 * 1024)
+
+    results, stats = copy_files([(source, destination)], buffer_size=256 * 1024)
+    assert results[destination] == (True, "")
+    assert stats['resumed_bytes'] == 0
+    assert _read(destination) == _read(source)
+
+
+def test_interrupted_write_retried_from_verified_offset(tmp_path, monkeypatch, write_file):
+    source = _source(tmp_path, write_file)
+    destination = str(tmp_path / 'remote' / 'firmware.bin')
+    monkeypatch.setattr(file_transfer.time, 'sleep', lambda seconds: None)
+
+    # 第一次尝试写入 1MiB 后中断
+    real_open = open
+    state = {'written': 0, 'failed': False}
+
+    class FlakyFile:
+        def __init__(self, handle):
+            self._handle = handle
+
+        def write(self, data):
+            if not state['failed'] and state['written'] >= 1024 * 1024:
+                state['failed'] = True
+                raise OSError("network share disconnected")
+            state['written'] += len(data)
+            return self._handle.write(data)
+
+        def __getattr__(self, name):
+            return getattr(self._handle, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return self._handle.__exit__(*args)
+
+    def flaky_open(path, mode='r', *args, **kwargs):
+        handle = real_open(path, mode, *args, **kwargs)
+        return FlakyFile(handle) if str(path).endswith('.part') else handle
+
+    monkeypatch.setattr('builtins.open', flaky_open)
+    progress = file_transfer.TransferProgress(os.path.getsize(source))
+    ok, error = copy_resumable(source, destination, buffer_size=256 * 1024, retries=2, progress=progress)
+    monkeypatch.undo()
+
+    assert (ok, error) == (True, "")
+    assert state['failed']
+    assert progress.resumed_bytes == 1024 * 1024
+    assert progress.copied_bytes == os.path.getsize(source)
+    assert _read(destination) == _read(source)
+    assert not glob.glob(f"{destination}.*.part")
+
+
+def test_changed_source_does_not_reuse_partial_file(tmp_path, write_file):
+    source = _source(tmp_path, write_file, 1024 * 1024)
+    destination = str(tmp_path / 'firmware_copy.bin')
+    old_part = temp_path_for(source, destination)
+    with open(old_part, 'wb') as part:
+        part.write(_read(source)[:512 * 1024])
+
+    write_file(source, os.urandom(2 * 1024 * 1024))
+    assert temp_path_for(source, destination) != old_part
+    assert copy_resumable(source, destination, buffer_size=256 * 1024) == (True, "")
+    assert _read(destination) == _read(source)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Git管理：同一仓库中的多个项目同时提交"""
+
+import subprocess
+import threading
+
+from git_manager import GitManager
+
+
+def _changed_files(repo, rev):
+    result = subprocess.run(['git', 'show', '--name-only', '--pretty=format:', rev], cwd=repo,
+                            capture_output=True, text=True, check=True)
+    return sorted(line for line in result.stdout.splitlines() if line)
+
+
+def test_projects_in_one_repository_share_commit_lock(git_repo):
+    board_a = GitManager(str(git_repo / 'board_a'))
+    board_b = GitManager(str(git_repo / 'board_b'))
+    assert board_a.is_git_repo() and board_b.is_git_repo()
+    assert board_a.worktree_lock() is board_b.worktree_lock()
+
+
+def test_concurrent_releases_commit_only_their_own_changes(git_repo):
+    errors = []
+
+    def release(board, version):
+        manager = GitManager(str(git_repo / board))
+        try:
+            with manager.worktree_lock():
+                (git_repo / board / 'main.c').write_text(f'const char __Firmware_Version[] = "{version}";\n')
+                assert manager.commit_changes(f"{board} {version}")
+                commit_id = manager.get_current_commit_id()
+            assert _changed_files(git_repo, commit_id) == [f"{board}/main.c"]
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=release, args=(board, f"V1.0.0.{i}"))
+               for i in range(2, 6) for board in ('board_a', 'board_b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert not GitManager(str(git_repo)).has_uncommitted_changes()
+
+
+def test_commit_only_given_paths(git_repo):
+    manager = GitManager(str(git_repo / 'board_a'))
+    (git_repo / 'board_a' / 'RELEASE_NOTES.md').write_text('## V1.0.0.2\n')
+    (git_repo / 'board_a' / 'main.c').write_text('changed\n')
+    subprocess.run(['git', 'add', 'board_a/main.c'], cwd=git_repo, check=True)
+    assert manager.commit_changes('size', [str(git_repo / 'board_a' / 'RELEASE_NOTES.md')])
+    assert _changed_files(git_repo, 'HEAD') == ['board_a/RELEASE_NOTES.md']
+    assert manager.get_commit_subject() == 'size'
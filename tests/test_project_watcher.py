@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""项目文件监视：计算期间的变化、停止后重新启动"""
+
+import time
+
+from project_watcher import ProjectWatcher
+
+
+def test_change_while_computing_invalidates_entry(tmp_path, write_file):
+    info_file = str(tmp_path / 'main.c')
+    write_file(info_file, 'V1', bump_mtime=True)
+    watcher = ProjectWatcher()
+    signatures = watcher.snapshot(files=[info_file])
+    value = open(info_file, encoding='utf-8').read()
+    # 读取之后、写入缓存之前文件被修改
+    write_file(info_file, 'V2', bump_mtime=True)
+    watcher.put('version', value, snapshot=signatures)
+    assert watcher.get('version') is None
+
+
+def test_restart_keeps_watching(tmp_path, write_file):
+    info_file = str(tmp_path / 'main.c')
+    write_file(info_file, 'V1', bump_mtime=True)
+    watcher = ProjectWatcher(poll_interval=0.2)
+    backend = watcher.backend
+    watcher.start()
+    watcher.put('version', 'V1', snapshot=watcher.snapshot(files=[info_file]))
+    watcher.stop()
+
+    # 停止期间的变化在重新启动时发现
+    write_file(info_file, 'V2', bump_mtime=True)
+    watcher.start()
+    assert watcher.backend == backend
+    assert watcher.get('version') is None
+
+    # 重新启动后仍然监视
+    watcher.put('version', 'V2', snapshot=watcher.snapshot(files=[info_file]))
+    write_file(info_file, 'V3', bump_mtime=True)
+    deadline = time.time() + 5
+    while watcher.get('version') is not None and time.time() < deadline:
+        time.sleep(0.05)
+    watcher.stop()
+    assert watcher.get('version') is None
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""SCT解析：加载区域内的 ScatterAssert 不影响后面的执行区域"""
+
+from lib_MDK.sct_parser import SCTParser
+
+SAMPLE = """
+LR_IROM1 0x08000000 0x00080000 {
+  ER_IROM1 0x08000000 0x00080000 {
+   .ANY (+RO)
+  }
+  ScatterAssert(ImageLength(ER_IROM1) < 0x00080000)
+  RW_IRAM1 0x20000000 0x00020000 {
+   .ANY (+RW +ZI)
+  }
+}
+ScatterAssert(LoadLength(LR_IROM1) < 0x00080000)
+"""
+
+
+def test_scatter_assert_inside_load_region():
+    model = SCTParser(use_cache=False).parse(SAMPLE, 'sample.sct')
+    regions = {region.name: region for region in model.regions}
+    assert {'LR_IROM1', 'ER_IROM1', 'RW_IRAM1'} <= set(regions)
+    assert regions['RW_IRAM1'].start == 0x20000000
+    assert regions['RW_IRAM1'].size == 0x00020000
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""免编译更新版本号的判断：只有版本号变化时才可以复用上次的镜像"""
+
+import os
+
+from source_manifest import SourceManifest, is_info_file_only_change, version_masked_digest
+
+IAR_INFO = ('#pragma location=0x08001000\n'
+            '__root const char __Firmware_Version[10] = "{version}";\n'
+            'int main(void) {{ return {ret}; }}\n')
+MDK_INFO = ('const char __Firmware_Version[10] __attribute__((at(0x8001000)))  = "{version}";\n'
+            'int main(void) {{ return {ret}; }}\n')
+PROPERTIES = {'linker_file': '', 'options_digest': 'a', 'toolchain': 't'}
+
+
+def _scan(info_file, other_file, previous=None):
+    properties = dict(PROPERTIES, info_digest=version_masked_digest(info_file) or '')
+    return SourceManifest.scan([info_file, other_file], properties, previous)
+
+
+def _setup(tmp_path, write_file, template):
+    info_file = os.path.normcase(str(tmp_path / 'main.c'))
+    other_file = os.path.normcase(str(tmp_path / 'uart.c'))
+    write_file(info_file, template.format(version='V1.0.0.1', ret=0))
+    write_file(other_file, 'void uart(void) {}\n')
+    return info_file, other_file, _scan(info_file, other_file)
+
+
+def test_version_only_change_is_detected(tmp_path, write_file):
+    for template in (IAR_INFO, MDK_INFO):
+        info_file, other_file, first = _setup(tmp_path, write_file, template)
+        write_file(info_file, template.format(version='V1.0.0.2', ret=0))
+        assert is_info_file_only_change(_scan(info_file, other_file, first), first, info_file)
+
+
+def test_code_change_in_info_file_is_not_version_only(tmp_path, write_file):
+    for template in (IAR_INFO, MDK_INFO):
+        info_file, other_file, first = _setup(tmp_path, write_file, template)
+        write_file(info_file, template.format(version='V1.0.0.2', ret=1))
+        assert not is_info_file_only_change(_scan(info_file, other_file, first), first, info_file)
+
+
+def test_other_file_change_is_not_version_only(tmp_path, write_file):
+    info_file, other_file, first = _setup(tmp_path, write_file, IAR_INFO)
+    write_file(info_file, IAR_INFO.format(version='V1.0.0.2', ret=0))
+    write_file(other_file, 'void uart(void) { for (;;); }\n')
+    assert not is_info_file_only_change(_scan(info_file, other_file, first), first, info_file)
+
+
+def test_manifest_without_info_digest_is_not_version_only(tmp_path, write_file):
+    info_file, other_file, _ = _setup(tmp_path, write_file, IAR_INFO)
+    first = SourceManifest.scan([info_file, other_file], PROPERTIES)
+    write_file(info_file, IAR_INFO.format(version='V1.0.0.2', ret=0))
+    second = SourceManifest.scan([info_file, other_file], PROPERTIES, first)
+    assert not is_info_file_only_change(second, first, info_file)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""工具链注册表：可执行文件变化后重新查找和探测"""
+
+import os
+
+from toolchain_registry import ToolchainRegistry
+
+
+def test_changed_executable_found_again(tmp_path, write_file):
+    install_dir = str(tmp_path / 'Keil_v5')
+    old_exe = os.path.join(install_dir, 'UV4', 'UV4.exe')
+    write_file(old_exe, b'v1')
+    registry = ToolchainRegistry(str(tmp_path / 'registry.json'))
+    assert registry.find_executable('MDK', install_dir) == old_exe
+    assert registry.probe('MDK', old_exe) is not None
+
+    # 升级后可执行文件变化：重新探测
+    write_file(old_exe, b'version 2')
+    reloaded = ToolchainRegistry(registry.registry_path)
+    assert reloaded.find_executable('MDK', install_dir) == old_exe
+    assert reloaded.get_toolchain(old_exe) is None
+    assert reloaded._data['installations'][f"MDK|{reloaded._key(install_dir)}"]['stamp']['size'] == 9
+
+    # 原位置的可执行文件被删除：在其他候选位置查找
+    os.remove(old_exe)
+    new_exe = os.path.join(install_dir, 'ARM', 'UV4', 'UV4.exe')
+    write_file(new_exe, b'v3')
+    assert reloaded.find_executable('MDK', install_dir) == new_exe
+
+    os.remove(new_exe)
+    assert reloaded.find_executable('MDK', install_dir) == ""
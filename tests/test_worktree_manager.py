@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""分支工作树：替换特殊字符后同名的分支使用不同的工作树"""
+
+import os
+import subprocess
+
+from worktree_manager import WorktreeManager
+
+
+def test_branches_differing_in_special_characters_get_separate_worktrees(git_repo, tmp_path):
+    manager = WorktreeManager(str(git_repo / 'board_a'), str(tmp_path / 'worktrees'))
+    assert manager.worktree_path('feature/a') != manager.worktree_path('feature_a')
+
+    roots = []
+    for branch in ('feature/a', 'feature_a'):
+        subprocess.run(['git', 'branch', branch], cwd=git_repo, check=True)
+        root, error = manager.prepare(branch)
+        assert root, error
+        roots.append(root)
+    assert roots[0] != roots[1]
+    # 两个工作树同时存在，各自检出自己的分支
+    assert {manager.list_worktrees()[os.path.abspath(root)] for root in roots} == {'feature/a', 'feature_a'}
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工具链注册表模块
+记录已发现的IAR/MDK编译工具路径、版本和可用的调用方式并持久化，可执行文件修改时间变化时重新探测
+"""
+
+import os
+import re
+import json
+import threading
+import subprocess
+from datetime import datetime
+from lib_logger import logger
+from parse_cache import get_cache_root
+from typing import Dict, List, Optional, Tuple
+
+# 各编译工具的可执行文件名和相对安装目录的候选位置
+EXECUTABLE_CANDIDATES = {
+    'IAR': ('IarBuild.exe', [
+        ('common', 'bin'),
+        ('bin',),
+        (),
+        ('arm', 'bin'),
+        ('EWARM', 'bin'),
+    ]),
+    'MDK': ('UV4.exe', [
+        ('UV4',),
+        (),
+        ('bin',),
+        ('ARM', 'UV4'),
+        ('ARM', 'bin'),
+    ]),
+}
+
+# IarBuild调用方式: 名称 -> (shell, creationflags)
+INVOCATION_MODES = {
+    'no_window': (False, getattr(subprocess, 'CREATE_NO_WINDOW', 0)),
+    'plain': (False, 0),
+    'shell': (True, 0),
+}
+
+
+def _executable_stamp(path: str) -> Optional[Dict]:
+    """获取可执行文件的大小和修改时间，不存在时返回None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class ToolchainRegistry:
+    """工具链注册表"""
+
+    REGISTRY_NAME = 'toolchain_registry.json'
+    # 记录格式版本，结构变化时递增使旧记录失效
+    REGISTRY_VERSION = 2
+
+    def __init__(self, registry_path: str = None):
+        """
+        初始化工具链注册表
+
+        Args:
+            registry_path: 注册表文件路径，默认为程序缓存目录下的toolchain_registry.json
+        """
+        self.registry_path = registry_path or os.path.join(get_cache_root(), self.REGISTRY_NAME)
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> Dict:
+        """读取注册表"""
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.REGISTRY_VERSION:
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"工具链注册表损坏，重新建立: {e}")
+        return {'version': self.REGISTRY_VERSION, 'installations': {}, 'toolchains': {}}
+
+    def _save(self):
+        """写入注册表（调用方持有锁）"""
+        try:
+            os.makedirs(os.path.dirname(self.registry_path), exist_ok=True)
+            temp_path = f"{self.registry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.registry_path)
+        except Exception as e:
+            logger.warning(f"保存工具链注册表失败: {e}")
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """路径的注册表键"""
+        return os.path.normcase(os.path.abspath(path))
+
+    def _fresh_entry(self, exe_path: str) -> Optional[Dict]:
+        """获取未过期的工具链记录，可执行文件大小或修改时间变化时删除记录（调用方持有锁）"""
+        key = self._key(exe_path)
+        entry = self._data['toolchains'].get(key)
+        if not entry:
+            return None
+        stamp = _executable_stamp(exe_path)
+        if stamp is None or stamp != entry.get('stamp'):
+            logger.info(f"编译工具已变化，重新探测: {exe_path}")
+            del self._data['toolchains'][key]
+            self._save()
+            return None
+        return entry
+
+    def find_executable(self, compile_tool: str, installation_dir: str) -> str:
+        """
+        在安装目录中查找编译工具可执行文件，结果连同可执行文件的大小和修改时间记入注册表，
+        之后在可执行文件未变化时直接使用
+
+        Args:
+            compile_tool: 编译工具，'IAR' 或 'MDK'
+            installation_dir: 安装目录，也可以直接是可执行文件路径
+
+        Returns:
+            str: 可执行文件路径，未找到返回空字符串
+        """
+        if not installation_dir:
+            return ""
+        exe_name, candidates = EXECUTABLE_CANDIDATES.get(compile_tool, EXECUTABLE_CANDIDATES['IAR'])
+        if installation_dir.lower().endswith('.exe'):
+            return installation_dir if os.path.exists(installation_dir) else ""
+
+        key = f"{compile_tool}|{self._key(installation_dir)}"
+        with self._lock:
+            cached = self._data['installations'].get(key)
+        if cached:
+            if _executable_stamp(cached['path']) == cached.get('stamp'):
+                return cached['path']
+            # 工具被删除、升级或替换（例如安装了其他版本），重新查找
+            logger.info(f"编译工具已变化，重新查找: {cached['path']}")
+
+        logger.info(f"搜索{compile_tool}可执行文件，尝试以下路径:")
+        for parts in candidates:
+            path = os.path.join(installation_dir, *parts, exe_name)
+            stamp = _executable_stamp(path)
+            logger.info(f"  {path} - {'存在' if stamp else '不存在'}")
+            if stamp:
+                with self._lock:
+                    self._data['installations'][key] = {'path': path, 'stamp': stamp}
+                    # 同时删除可执行文件变化前的探测记录
+                    self._fresh_entry(path)
+                    self._save()
+                return path
+        if cached:
+            with self._lock:
+                self._data['installations'].pop(key, None)
+                self._save()
+        return ""
+
+    def get_toolchain(self, exe_path: str) -> Optional[Dict]:
+        """
+        获取工具链记录
+
+        Args:
+            exe_path: 可执行文件路径
+
+        Returns:
+            Optional[Dict]: {'tool', 'path', 'stamp', 'version', 'probed', 'invocation', 'probed_at'}，未记录或已过期返回None
+        """
+        with self._lock:
+            entry = self._fresh_entry(exe_path)
+            return dict(entry) if entry else None
+
+    def probe(self, compile_tool: str, exe_path: str, force: bool = False) -> Optional[Dict]:
+        """
+        探测工具链版本并记入注册表（已有未过期记录时直接返回）
+
+        Args:
+            compile_tool: 编译工具，'IAR' 或 'MDK'
+            exe_path: 可执行文件路径
+            force: 是否忽略已有记录重新探测
+
+        Returns:
+            Optional[Dict]: 工具链记录，可执行文件不存在时返回None
+        """
+        if not force:
+            entry = self.get_toolchain(exe_path)
+            if entry and entry.get('probed'):
+                return entry
+
+        stamp = _executable_stamp(exe_path)
+        if stamp is None:
+            return None
+        if compile_tool == 'IAR':
+            ok, version = self._probe_iar(exe_path)
+        else:
+            ok, version = True, self._probe_mdk(exe_path)
+
+        with self._lock:
+            entry = self._data['toolchains'].get(self._key(exe_path), {})
+            entry.update({
+                'tool': compile_tool,
+                'path': exe_path,
+                'stamp': stamp,
+                'version': version,
+                'probed': ok,
+                'probed_at': datetime.now().isoformat(timespec='seconds')
+            })
+            self._data['toolchains'][self._key(exe_path)] = entry
+            self._save()
+        logger.info(f"{compile_tool}工具链探测{'成功' if ok else '失败'}: {exe_path}, 版本: {version or '未知'}")
+        return dict(entry)
+
+    @staticmethod
+    def _probe_iar(exe_path: str) -> Tuple[bool, Optional[str]]:
+        """运行 IarBuild -? 获取版本，依次尝试非shell和shell调用"""
+        for use_shell in (False, True):
+            try:
+                cmd = f'"{exe_path}" -?' if use_shell else [exe_path, '-?']
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10, shell=use_shell)
+                output = f"{result.stdout}\n{result.stderr}"
+                if result.returncode == 0 or 'IAR' in output:
+                    match = re.search(r'\bV?(\d+\.\d+(?:\.\d+)*)', output)
+                    return True, match.group(1) if match else None
+            except Exception as e:
+                logger.warning(f"IAR命令测试异常 (shell={use_shell}): {e}")
+        return False, None
+
+    @staticmethod
+    def _probe_mdk(exe_path: str) -> Optional[str]:
+        """从安装目录的TOOLS.INI读取MDK版本（UV4没有不打开界面的版本查询命令）"""
+        install_dir = os.path.dirname(os.path.dirname(os.path.abspath(exe_path)))
+        tools_ini = os.path.join(install_dir, 'TOOLS.INI')
+        try:
+            with open(tools_ini, 'r', encoding='utf-8', errors='replace') as f:
+                match = re.search(r'^\s*VERSION\s*=\s*(\S+)', f.read(), re.MULTILINE)
+            return match.group(1) if match else None
+        except OSError:
+            return None
+
+    def get_invocation_order(self, exe_path: str) -> List[str]:
+        """
+        获取调用方式的尝试顺序，已记录可用的调用方式排在最前
+
+        Args:
+            exe_path: 可执行文件路径
+
+        Returns:
+            List[str]: 调用方式名称列表（INVOCATION_MODES的键）
+        """
+        entry = self.get_toolchain(exe_path)
+        preferred = entry.get('invocation') if entry else None
+        order = list(INVOCATION_MODES)
+        if preferred in order:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        return order
+
+    def record_invocation(self, exe_path: str, mode: str):
+        """
+        记录可用的调用方式
+
+        Args:
+            exe_path: 可执行文件路径
+            mode: 调用方式名称
+        """
+        stamp = _executable_stamp(exe_path)
+        if stamp is None:
+            return
+        with self._lock:
+            key = self._key(exe_path)
+            entry = self._data['toolchains'].setdefault(key, {'path': exe_path, 'stamp': stamp})
+            if entry.get('stamp') != stamp:
+                entry.clear()
+                entry.update({'path': exe_path, 'stamp': stamp})
+            if entry.get('invocation') != mode:
+                entry['invocation'] = mode
+                self._save()
+
+
+_registry: Optional[ToolchainRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_toolchain_registry() -> ToolchainRegistry:
+    """获取进程内共享的工具链注册表"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ToolchainRegistry()
+        return _registry
+
+
+if __name__ == "__main__":
+    # 测试工具链注册表
+    import sys
+    registry = get_toolchain_registry()
+    print(f"注册表文件: {registry.registry_path}")
+    if len(sys.argv) > 2:
+        tool, directory = sys.argv[1], sys.argv[2]
+        exe = registry.find_executable(tool, directory)
+        print(f"可执行文件: {exe or '未找到'}")
+        if exe:
+            print(f"探测结果: {registry.probe(tool, exe)}")
+            print(f"调用方式顺序: {registry.get_invocation_order(exe)}")
+    else:
+        print("用法: python toolchain_registry.py <IAR|MDK> <安装目录>")
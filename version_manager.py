@@ -327,6 +327,21 @@ class VersionManager:
         Args:
             current_version_str: 当前版本字符串
             
+        Returns:
+            Tuple[str, str]: (下一个版本字符串, 版本递增说明)
+        """
+        # 获取fw_publish目录中的最新版本
+        return self.get_next_version_from(current_version_str, self.get_latest_version_from_files())
+    
+    def get_next_version_from(self, current_version_str: str,
+                              latest_published: Optional[Tuple[int, int, int, int]]) -> Tuple[str, str]:
+        """
+        根据已查找到的已发布最新版本获取下一个版本号（查找已发布版本可以与读取当前版本同时进行）
+        
+        Args:
+            current_version_str: 当前版本字符串
+            latest_published: get_latest_version_from_files 的结果，没有已发布版本时为None
+            
         Returns:
             Tuple[str, str]: (下一个版本字符串, 版本递增说明)
         """
@@ -338,8 +353,6 @@ class VersionManager:
                 current_version = (0, 0, 0, 0)
                 logger.warning(f"无法解析版本号 {current_version_str}，使用默认版本 V0.0.0.0")
             
-            # 获取fw_publish目录中的最新版本
-            latest_published = self.get_latest_version_from_files()
             logger.info(f"当前代码版本: {self.format_version(*current_version)}")
             if latest_published:
                 logger.info(f"已发布的最新版本: {self.format_version(*latest_published)}")
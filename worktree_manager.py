@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Git工作树管理模块
+为每个分支在缓存目录中创建并复用 git worktree，各分支的编译输出互不影响，可以同时编译不同分支，切换分支也不会使增量编译失效
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import subprocess
+import threading
+from lib_logger import logger
+from git_manager import GitManager
+from parse_cache import get_cache_root
+from typing import Dict, Optional, Tuple
+
+# 自动查找得到的项目路径，切换到工作树时映射到工作树中的对应路径
+WORKTREE_PATH_KEYS = ('iar_project_path', 'mdk_project_path', 'iar_workspace_path', 'mdk_workspace_path',
+                      'output_bin_path')
+
+# 同一仓库的工作树增删需要串行执行（git会锁定仓库的worktree元数据）
+_repo_locks: Dict[str, threading.Lock] = {}
+_repo_locks_guard = threading.Lock()
+
+
+def _repo_lock(top_level: str) -> threading.Lock:
+    """获取仓库的工作树操作锁"""
+    with _repo_locks_guard:
+        return _repo_locks.setdefault(os.path.normcase(top_level), threading.Lock())
+
+
+class WorktreeManager:
+    """分支工作树管理：每个仓库的每个分支对应缓存目录中的一个工作树"""
+
+    CACHE_NAMESPACE = 'worktrees'
+
+    def __init__(self, repo_path: str, cache_dir: str = None):
+        """
+        初始化工作树管理器
+
+        Args:
+            repo_path: 仓库中的任意目录（通常为项目根目录）
+            cache_dir: 工作树存放目录，默认为程序缓存目录下的worktrees
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        self.cache_dir = cache_dir or os.path.join(get_cache_root(), self.CACHE_NAMESPACE)
+        self._top_level = None
+
+    def _git(self, args, cwd: str = None, timeout: int = 120) -> subprocess.CompletedProcess:
+        """执行git命令"""
+        kwargs = GitManager._get_subprocess_kwargs()
+        kwargs['cwd'] = cwd or self.repo_path
+        kwargs['timeout'] = timeout
+        return subprocess.run(['git'] + list(args), **kwargs)
+
+    def get_top_level(self) -> Optional[str]:
+        """获取仓库根目录（主工作区），失败时返回None"""
+        if self._top_level is None:
+            try:
+                result = self._git(['rev-parse', '--show-toplevel'], timeout=30)
+                if result.returncode == 0 and result.stdout.strip():
+                    self._top_level = os.path.abspath(result.stdout.strip())
+                else:
+                    logger.error(f"获取仓库根目录失败: {result.stderr}")
+            except Exception as e:
+                logger.error(f"获取仓库根目录异常: {e}")
+        return self._top_level
+
+    def worktree_path(self, branch: str) -> str:
+        """
+        分支工作树的存放路径：<缓存目录>/<仓库名>_<仓库路径哈希>/<分支名>_<分支名哈希>
+        （分支名中的特殊字符替换为下划线，哈希区分 feature/a 和 feature_a 这样替换后相同的分支）
+
+        Args:
+            branch: 分支名称
+
+        Returns:
+            str: 工作树路径
+        """
+        top_level = self.get_top_level() or self.repo_path
+        repo_key = hashlib.sha1(os.path.normcase(top_level).encode('utf-8')).hexdigest()[:8]
+        safe_branch = re.sub(r'[^A-Za-z0-9._-]', '_', branch)
+        branch_key = hashlib.sha1(branch.encode('utf-8')).hexdigest()[:8]
+        return os.path.join(self.cache_dir, f"{os.path.basename(top_level)}_{repo_key}", f"{safe_branch}_{branch_key}")
+
+    def list_worktrees(self) -> Dict[str, Optional[str]]:
+        """
+        获取仓库的所有工作树
+
+        Returns:
+            Dict[str, Optional[str]]: {工作树路径: 检出的分支（分离HEAD时为None）}
+        """
+        worktrees = {}
+        try:
+            result = self._git(['worktree', 'list', '--porcelain'], timeout=30)
+            if result.returncode != 0:
+                logger.error(f"获取工作树列表失败: {result.stderr}")
+                return worktrees
+            path = None
+            for line in result.stdout.splitlines():
+                if line.startswith('worktree '):
+                    path = os.path.abspath(line[len('worktree '):])
+                    worktrees[path] = None
+                elif line.startswith('branch refs/heads/') and path:
+                    worktrees[path] = line[len('branch refs/heads/'):]
+        except Exception as e:
+            logger.error(f"获取工作树列表异常: {e}")
+        return worktrees
+
+    def _ref_exists(self, ref: str) -> bool:
+        result = self._git(['rev-parse', '--verify', '--quiet', ref], timeout=30)
+        return result.returncode == 0
+
+    def resolve(self, branch: str) -> Optional[str]:
+        """
+        分支将要使用的工作树根目录（不创建）：分支已检出时为检出目录（可能是主工作区），否则为缓存目录中的工作树路径
+
+        Args:
+            branch: 分支名称
+
+        Returns:
+            Optional[str]: 工作树根目录，不是Git仓库时返回None
+        """
+        if not self.get_top_level():
+            return None
+        for path, checked_out in self.list_worktrees().items():
+            if checked_out == branch and os.path.isdir(path):
+                return path
+        return os.path.abspath(self.worktree_path(branch))
+
+    def prepare(self, branch: str) -> Tuple[Optional[str], str]:
+        """
+        获取分支的工作树，不存在时创建：
+        分支已在主工作区或其他工作树检出时直接使用该目录；本地没有该分支时从origin上的同名分支创建
+
+        Args:
+            branch: 分支名称
+
+        Returns:
+            Tuple[Optional[str], str]: (工作树根目录, 失败时的错误信息)
+        """
+        top_level = self.get_top_level()
+        if not top_level:
+            return None, f"不是Git仓库: {self.repo_path}"
+
+        try:
+            with _repo_lock(top_level):
+                worktrees = self.list_worktrees()
+                for path, checked_out in worktrees.items():
+                    if checked_out == branch and os.path.isdir(path):
+                        logger.info(f"分支 {branch} 已检出: {path}")
+                        return path, ""
+
+                target = self.worktree_path(branch)
+                if os.path.abspath(target) in worktrees:
+                    # 工作树中的分支被切换过，删除后按分支重新创建
+                    self._git(['worktree', 'remove', '--force', target], cwd=top_level, timeout=120)
+                if os.path.exists(target):
+                    # 工作树被删除或仓库被移动后留下的目录，清理后重新创建
+                    logger.warning(f"清理无效的工作树目录: {target}")
+                    self._git(['worktree', 'prune'], timeout=60)
+                    shutil.rmtree(target, ignore_errors=True)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                if self._ref_exists(f"refs/heads/{branch}"):
+                    args = ['worktree', 'add', target, branch]
+                elif self._ref_exists(f"refs/remotes/origin/{branch}"):
+                    args = ['worktree', 'add', '--track', '-b', branch, target, f"origin/{branch}"]
+                else:
+                    return None, f"分支不存在: {branch}"
+
+                result = self._git(args, cwd=top_level, timeout=600)
+                if result.returncode != 0:
+                    return None, f"创建分支 {branch} 的工作树失败: {result.stderr.strip()}"
+                logger.info(f"已创建分支 {branch} 的工作树: {target}")
+                return target, ""
+
+        except subprocess.TimeoutExpired:
+            return None, f"创建分支 {branch} 的工作树超时"
+        except Exception as e:
+            logger.error(f"准备分支工作树失败: {e}")
+            return None, f"准备分支 {branch} 的工作树失败: {e}"
+
+    def remove(self, branch: str) -> bool:
+        """
+        删除分支在缓存目录中的工作树（分支本身保留）
+
+        Args:
+            branch: 分支名称
+
+        Returns:
+            bool: 是否成功
+        """
+        top_level = self.get_top_level()
+        target = self.worktree_path(branch)
+        if not top_level or not os.path.exists(target):
+            return False
+        try:
+            with _repo_lock(top_level):
+                result = self._git(['worktree', 'remove', '--force', target], cwd=top_level, timeout=120)
+                if result.returncode != 0:
+                    logger.error(f"删除工作树失败: {result.stderr}")
+                    return False
+            logger.info(f"已删除分支 {branch} 的工作树: {target}")
+            return True
+        except Exception as e:
+            logger.error(f"删除工作树异常: {e}")
+            return False
+
+    def map_path(self, path: str, worktree_root: str) -> str:
+        """
+        把主工作区中的路径映射到工作树中的对应路径，不在主工作区中的路径不变
+
+        Args:
+            path: 路径
+            worktree_root: 工作树根目录
+
+        Returns:
+            str: 映射后的路径
+        """
+        top_level = self.get_top_level()
+        if not path or not top_level:
+            return path
+        path = os.path.abspath(path)
+        try:
+            relative = os.path.relpath(path, top_level)
+        except ValueError:
+            # Windows上不同盘符
+            return path
+        if relative == os.curdir:
+            return worktree_root
+        if relative.startswith(os.pardir):
+            return path
+        return os.path.join(worktree_root, relative)
+
+    def map_config(self, config: dict, worktree_root: str) -> dict:
+        """
+        把配置中自动查找得到的项目路径映射到工作树
+
+        Args:
+            config: 配置字典
+            worktree_root: 工作树根目录
+
+        Returns:
+            dict: 映射后的配置（新字典）
+        """
+        mapped = dict(config)
+        project_settings = dict(mapped.get('project_settings') or {})
+        for key in WORKTREE_PATH_KEYS:
+            if mapped.get(key):
+                mapped[key] = self.map_path(mapped[key], worktree_root)
+            if project_settings.get(key):
+                project_settings[key] = self.map_path(project_settings[key], worktree_root)
+        if 'project_settings' in mapped:
+            mapped['project_settings'] = project_settings
+        return mapped
+
+
+__all__ = ['WORKTREE_PATH_KEYS', 'WorktreeManager']
+
+
+if __name__ == "__main__":
+    # 测试：为当前仓库的分支创建工作树
+    import sys
+    branch_name = sys.argv[1] if len(sys.argv) > 1 else 'main'
+    manager = WorktreeManager('.')
+    worktree, error = manager.prepare(branch_name)
+    print(f"分支 {branch_name} 的工作树: {worktree or error}")
+    for worktree_dir, worktree_branch in manager.list_worktrees().items():
+        print(f"  {worktree_dir}: {worktree_branch}")